@@ -1,22 +1,199 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
-import stat
 import time
 from collections import Counter
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import matplotlib
 from matplotlib.ticker import ScalarFormatter
 import threading
 import datetime
+import bisect
+import functools
 import logging
-from PIL import Image
 from config import Config
-from utils_ui import log_errors
+from dataset_dedup import find_duplicates, find_split_leakage
+from dataset_export import export_analysis
+from dataset_ops import list_dataset_images
+from dataset_analysis import DatasetScan, new_stats
+from dataset_geometry import GeometryStats, histogram_quantile
+from chart_rendering import ChartRenderer, ChartSlot, aggregate_top_n
+from utils_ui import log_errors, VirtualTextView
 import localization
 logger = logging.getLogger(__name__)
 
+
+def _summarize_files(files):
+    by_extension = Counter(os.path.splitext(name)[1].lower() or '<sem extensão>' for name in files)
+    parts = [f'{count} {extension}' for extension, count in sorted(by_extension.items(), key=lambda item: (-item[1], item[0]))]
+    return f'[{len(files)} arquivos: {", ".join(parts)}]'
+
+
+def _tree_items(listing, dir_path, depth, max_depth, collapse_files):
+    entry = listing.get(dir_path)
+    if entry is None:
+        return [('[Acesso Negado]', None)]
+    subdirs, files = entry
+    if max_depth is not None and depth >= max_depth:
+        if subdirs or files:
+            return [(f'[... {len(subdirs)} pastas, {len(files)} arquivos]', None)]
+        return []
+    if collapse_files is not None and len(files) > collapse_files:
+        items = [(name, os.path.join(dir_path, name)) for name in subdirs]
+        items.append((_summarize_files(files), None))
+        return items
+    items = [(name, os.path.join(dir_path, name)) for name in subdirs]
+    items.extend((name, None) for name in files)
+    items.sort(key=lambda item: item[0])
+    return items
+
+
+def write_directory_tree(listing, root_dir, stream, max_depth=None, collapse_files=None):
+    stream.write('.\n')
+    stack = [['', _tree_items(listing, root_dir, 0, max_depth, collapse_files), 0, 0]]
+    while stack:
+        frame = stack[-1]
+        prefix, items, index, depth = frame
+        if index >= len(items):
+            stack.pop()
+            continue
+        frame[2] = index + 1
+        name, child_path = items[index]
+        last = index == len(items) - 1
+        stream.write(prefix + ('└── ' if last else '├── ') + name + '\n')
+        if child_path is not None:
+            child_items = _tree_items(listing, child_path, depth + 1, max_depth, collapse_files)
+            stack.append([prefix + ('    ' if last else '│   '), child_items, 0, depth + 1])
+
+
+def _hide_top_right_spines(ax):
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+
+
+def draw_class_chart(figure, labels, values, xlabel, title):
+    ax = figure.add_subplot(111)
+    colors = matplotlib.colormaps['plasma'](range(len(labels)))
+    ax.barh(labels, values, color=colors)
+    ax.set_xlabel(xlabel)
+    ax.set_title(title)
+    for i, v in enumerate(values):
+        ax.text(v, i, f' {v}', va='center', fontweight='bold')
+    figure.tight_layout()
+
+
+def draw_log_chart(figure, labels, values, ylabel, xlabel, title):
+    ax = figure.add_subplot(111)
+    formatter = ScalarFormatter()
+    formatter.set_scientific(False)
+    ax.yaxis.set_major_formatter(formatter)
+    ax.grid(axis='y', linestyle='-', alpha=0.3)
+    ax.set_axisbelow(True)
+    colors = matplotlib.colormaps['Set3'](range(len(labels)))
+    bars = ax.bar(labels, values, color=colors, edgecolor='#dddddd', linewidth=0.5)
+    ax.set_ylabel(ylabel, fontsize=12)
+    ax.set_xlabel(xlabel, fontsize=12)
+    ax.set_title(title, fontsize=16, pad=20)
+    ax.tick_params(axis='x', labelrotation=45, labelsize=10)
+    for tick in ax.get_xticklabels():
+        tick.set_horizontalalignment('right')
+    _hide_top_right_spines(ax)
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width() / 2.0, height + max(values) * 0.01, f'{int(height)}', ha='center', va='bottom', fontsize=9, fontweight='bold')
+    figure.tight_layout()
+
+
+def draw_split_chart(figure, splits, counts, title):
+    ax = figure.add_subplot(111)
+    bars = ax.bar(splits, counts, color=['#007bff', '#ffc107', '#28a745'])
+    ax.set_title(title)
+    _hide_top_right_spines(ax)
+    for bar in bars:
+        h = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width() / 2, h, str(h), ha='center', va='bottom', fontweight='bold')
+    figure.tight_layout()
+
+
+def draw_geometry_chart(figure, summary, titles, suptitle):
+    axes = figure.subplots(2, 2)
+    for ax, (metric, (counts, edges)) in zip(axes.flat, summary['histograms'].items()):
+        ax.stairs(counts, edges, fill=True, color='#007bff', alpha=0.7)
+        median = histogram_quantile(counts, edges, 0.5)
+        if median is not None:
+            ax.axvline(median, color='red', linestyle='--', linewidth=1)
+        if metric == 'area':
+            ax.set_xscale('symlog', linthresh=1e-06)
+        ax.set_title(titles[metric])
+        _hide_top_right_spines(ax)
+    figure.suptitle(suptitle)
+    figure.tight_layout()
+
+
+def draw_heatmap_chart(figure, summary, heatmap_title, count_title):
+    ax_map, ax_count = figure.subplots(1, 2)
+    image = ax_map.imshow(summary['heatmap'], extent=(0, 1, 1, 0), cmap='inferno', interpolation='nearest')
+    figure.colorbar(image, ax=ax_map)
+    ax_map.set_title(heatmap_title)
+    per_image = summary['objects_per_image']
+    ax_count.bar(range(len(per_image)), per_image, color='#28a745')
+    ax_count.set_title(count_title)
+    _hide_top_right_spines(ax_count)
+    figure.tight_layout()
+
+
+class _LineCollector(list):
+
+    def write(self, text):
+        self.extend(text.splitlines())
+
+
+class ReportModel:
+
+    def __init__(self):
+        self.segments = []
+        self.offsets = []
+        self.total = 0
+
+    def add_text(self, text, tag=None):
+        rows = [(line, tag) for line in text.split('\n')]
+        if self.segments and self.segments[-1][1] is None:
+            self.segments[-1][0].extend(rows)
+            self.total += len(rows)
+        else:
+            self.add_rows(rows)
+
+    def add_rows(self, rows, formatter=None):
+        self.offsets.append(self.total)
+        self.segments.append((rows, formatter))
+        self.total += len(rows)
+
+    def __len__(self):
+        return self.total
+
+    def line(self, index):
+        segment_index = bisect.bisect_right(self.offsets, index) - 1
+        rows, formatter = self.segments[segment_index]
+        row = rows[index - self.offsets[segment_index]]
+        return formatter(row) if formatter else row
+
+    def lines(self, start, stop):
+        return [self.line(index) for index in range(start, min(stop, self.total))]
+
+    def iter_lines(self):
+        for rows, formatter in self.segments:
+            for row in rows:
+                yield formatter(row) if formatter else row
+
+    def iter_text(self):
+        for text, _ in self.iter_lines():
+            yield text + '\n'
+
+
 class DatasetAnalyzerWindow:
+    IMAGE_EXTENSIONS = DatasetScan.IMAGE_EXTENSIONS
+    PROGRESS_INTERVAL_SECONDS = 0.5
+    CLIPBOARD_CHUNK_LINES = 2000
+    split_source = None
 
     def __init__(self, parent, base_dir, class_names):
         try:
@@ -29,21 +206,51 @@ class DatasetAnalyzerWindow:
                 self.top.geometry(f'{w}x{h}')
             self.base_dir = base_dir
             self.class_names = class_names
-            self.stats = {'counts': Counter(), 'total_images': 0, 'total_objects': 0, 'types': {'box': 0, 'polygon': 0}, 'split': {'train': {'img': 0, 'obj': 0}, 'val': {'img': 0, 'obj': 0}, 'test': {'img': 0, 'obj': 0}, 'uncategorized': {'img': 0, 'obj': 0}}, 'integrity': {'imgs_no_lbl': [], 'lbls_no_img': []}}
+            self.stats = new_stats()
             self.detailed_files = []
-            self.tree_structure = ''
-            self.generated_report_text = ''
-            self.fig_standard = None
-            self.fig_log = None
-            self.fig_split_img = None
-            self.fig_split_obj = None
+            self.directory_listing = {}
+            self.split_paths = {}
+            self.geometry = GeometryStats()
+            self.geometry_groups = []
+            self.report_model = None
+            self.chart_renderer = ChartRenderer(self._post_to_ui)
+            self.chart_slots = {}
+            self.cancel_event = threading.Event()
+            self.duplicate_cancel = threading.Event()
+            self.analysis_cancelled = False
             logger.info(f'Iniciando Análise Forense em: {base_dir}')
+            self.top.protocol('WM_DELETE_WINDOW', self._on_close)
             self._create_layout()
             self._start_analysis()
         except Exception as e:
             logger.error(f'Erro crítico ao inicializar analisador: {e}')
             messagebox.showerror('Erro', f'Falha ao abrir analisador: {e}')
 
+    def _tr(self, key: str, default: str) -> str:
+        value = localization.tr(key)
+        return default if value == key else value
+
+    def _post_to_ui(self, callback, *args):
+        try:
+            self.top.after(0, callback, *args)
+        except (RuntimeError, tk.TclError):
+            self.cancel_event.set()
+
+    def cancel_analysis(self):
+        if self.cancel_event.is_set():
+            return
+        self.cancel_event.set()
+        self.btn_cancel.config(state='disabled')
+        self.lbl_status.config(text=self._tr('MSG_CANCELLING_ANALYSIS', 'Cancelando análise...'), foreground='orange')
+
+    def _on_close(self):
+        self.cancel_event.set()
+        self.duplicate_cancel.set()
+        self.chart_renderer.shutdown()
+        for slot in self.chart_slots.values():
+            slot.clear()
+        self.top.destroy()
+
     def _create_layout(self):
         header = ttk.Frame(self.top, padding=10)
         header.pack(fill=tk.X)
@@ -52,8 +259,12 @@ class DatasetAnalyzerWindow:
             text=f"{localization.tr('LBL_DETAILED_TECH')} {os.path.basename(self.base_dir)}",
             font=('Impact', 14)
         ).pack(side=tk.LEFT, padx=5)
+        self.btn_cancel = ttk.Button(header, text=self._tr('BTN_CANCEL_ANALYSIS', 'Cancelar'), command=self.cancel_analysis)
+        self.btn_cancel.pack(side=tk.RIGHT, padx=5)
         self.lbl_status = ttk.Label(header, text=localization.tr('LBL_STATUS_INIT'), foreground='orange')
         self.lbl_status.pack(side=tk.RIGHT, padx=10)
+        self.progress_bar = ttk.Progressbar(header, orient=tk.HORIZONTAL, mode='determinate', length=220, maximum=100)
+        self.progress_bar.pack(side=tk.RIGHT, padx=5)
         self.notebook = ttk.Notebook(self.top)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         self.tab_report = ttk.Frame(self.notebook)
@@ -66,11 +277,16 @@ class DatasetAnalyzerWindow:
         self.notebook.add(self.tab_split, text=localization.tr('TAB_SPLIT'))
         self.tab_integrity = ttk.Frame(self.notebook)
         self.notebook.add(self.tab_integrity, text=localization.tr('TAB_INTEGRITY'))
+        self.tab_geometry = ttk.Frame(self.notebook)
+        self.notebook.add(self.tab_geometry, text=self._tr('TAB_GEOMETRY', 'Geometria'))
+        self.tab_heatmap = ttk.Frame(self.notebook)
+        self.notebook.add(self.tab_heatmap, text=self._tr('TAB_HEATMAP', 'Centros / Densidade'))
         self._build_report_tab()
         self._build_dashboard_tab()
         self._build_log_tab()
         self._build_split_tab()
         self._build_integrity_tab()
+        self._build_geometry_tabs()
 
     def _build_dashboard_tab(self):
         pane = ttk.PanedWindow(self.tab_dashboard, orient=tk.HORIZONTAL)
@@ -101,6 +317,7 @@ class DatasetAnalyzerWindow:
         ttk.Button(chart_toolbar, text=localization.tr('BTN_SAVE_IMG'), command=lambda: self.save_chart_image('standard')).pack(side=tk.RIGHT)
         self.chart_frame = ttk.Frame(right_main_frame)
         self.chart_frame.pack(fill=tk.BOTH, expand=True)
+        self.chart_slots['standard'] = ChartSlot(self.chart_frame, self.chart_renderer)
 
     def _build_log_tab(self):
         toolbar_frame = ttk.Frame(self.tab_log, padding=(10, 5))
@@ -109,22 +326,109 @@ class DatasetAnalyzerWindow:
         ttk.Button(toolbar_frame, text=localization.tr('BTN_SAVE_IMG'), command=lambda: self.save_chart_image('log')).pack(side=tk.RIGHT)
         self.log_chart_frame = ttk.Frame(self.tab_log, padding=10)
         self.log_chart_frame.pack(fill=tk.BOTH, expand=True)
+        self.chart_slots['log'] = ChartSlot(self.log_chart_frame, self.chart_renderer)
 
     def _build_split_tab(self):
         toolbar_frame = ttk.Frame(self.tab_split, padding=(10, 5))
         toolbar_frame.pack(fill=tk.X)
         ttk.Label(toolbar_frame, text=localization.tr('LBL_SPLIT_HEADER'), font=('Segoe UI', 11, 'bold')).pack(side=tk.LEFT)
         ttk.Button(toolbar_frame, text=localization.tr('BTN_SAVE_CHARTS'), command=lambda: self.save_chart_image('split')).pack(side=tk.RIGHT)
-        split_content = ttk.Frame(self.tab_split, padding=10)
-        split_content.pack(fill=tk.BOTH, expand=True)
+        self.lbl_split_source = ttk.Label(toolbar_frame, text='', foreground='#555555')
+        self.lbl_split_source.pack(side=tk.LEFT, padx=10)
+        split_pane = ttk.PanedWindow(self.tab_split, orient=tk.VERTICAL)
+        split_pane.pack(fill=tk.BOTH, expand=True)
+        split_content = ttk.Frame(split_pane, padding=10)
+        split_pane.add(split_content, weight=2)
         self.split_img_frame = ttk.LabelFrame(split_content, text=localization.tr('GRP_IMG_SPLIT'), padding=5)
         self.split_img_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
         self.split_obj_frame = ttk.LabelFrame(split_content, text=localization.tr('GRP_OBJ_SPLIT'), padding=5)
         self.split_obj_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(5, 0))
+        self.chart_slots['split_img'] = ChartSlot(self.split_img_frame, self.chart_renderer)
+        self.chart_slots['split_obj'] = ChartSlot(self.split_obj_frame, self.chart_renderer)
+        leak_fr = ttk.LabelFrame(split_pane, text=self._tr('GRP_SPLIT_LEAKAGE', 'Vazamento entre splits'), padding=5)
+        split_pane.add(leak_fr, weight=1)
+        leak_toolbar = ttk.Frame(leak_fr)
+        leak_toolbar.pack(fill=tk.X, pady=(0, 5))
+        self.btn_leakage = ttk.Button(leak_toolbar, text=self._tr('BTN_CHECK_LEAKAGE', 'Verificar vazamento'), command=self._start_leakage_check)
+        self.btn_leakage.pack(side=tk.LEFT)
+        self.lbl_leakage = ttk.Label(leak_toolbar, text='')
+        self.lbl_leakage.pack(side=tk.LEFT, padx=10)
+        leak_cols = ('Grupo', 'Tipo', 'Split', 'Arquivo', 'Caminho')
+        self.tree_leakage = ttk.Treeview(leak_fr, columns=leak_cols, show='headings')
+        self.tree_leakage.heading('Grupo', text=self._tr('COL_GROUP', 'Grupo'))
+        self.tree_leakage.heading('Tipo', text=self._tr('COL_KIND', 'Tipo'))
+        self.tree_leakage.heading('Split', text=self._tr('COL_SPLIT', 'Split'))
+        self.tree_leakage.heading('Arquivo', text=localization.tr('COL_FILENAME'))
+        self.tree_leakage.heading('Caminho', text=localization.tr('COL_FOLDER'))
+        self.tree_leakage.column('Grupo', width=60, anchor='center', stretch=False)
+        self.tree_leakage.column('Tipo', width=110, anchor='center', stretch=False)
+        self.tree_leakage.column('Split', width=70, anchor='center', stretch=False)
+        self.tree_leakage.column('Arquivo', width=200)
+        sb_leak = ttk.Scrollbar(leak_fr, orient=tk.VERTICAL, command=self.tree_leakage.yview)
+        self.tree_leakage.configure(yscrollcommand=sb_leak.set)
+        self.tree_leakage.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        sb_leak.pack(side=tk.RIGHT, fill=tk.Y)
+
+    def _leakage_split_paths(self):
+        return {split: paths for split, paths in self.split_paths.items() if split != 'uncategorized' and paths}
+
+    def _start_leakage_check(self):
+        split_paths = self._leakage_split_paths()
+        if len(split_paths) < 2:
+            messagebox.showinfo(
+                self._tr('GRP_SPLIT_LEAKAGE', 'Vazamento entre splits'),
+                self._tr('MSG_LEAKAGE_NEEDS_SPLITS', 'São necessários pelo menos dois splits com imagens.'),
+                parent=self.top
+            )
+            return
+        self.btn_leakage.config(state='disabled')
+        self.lbl_leakage.config(text=self._tr('MSG_SEARCHING_DUPLICATES', 'Calculando hashes...'))
+        threading.Thread(target=self._find_leakage, args=(split_paths,), name='split-leakage', daemon=True).start()
+
+    def _find_leakage(self, split_paths):
+        try:
+            report = find_split_leakage(
+                self.base_dir,
+                split_paths,
+                cancel_event=self.duplicate_cancel,
+                progress=lambda done, total: self._post_to_ui(self.lbl_leakage.config, {'text': f'{done}/{total}'})
+            )
+        except Exception as e:
+            logger.error(f'Erro na verificação de vazamento: {e}')
+            self._post_to_ui(self._show_leakage_error, str(e))
+            return
+        if not self.duplicate_cancel.is_set():
+            self._post_to_ui(self._show_leakage, report)
+
+    def _show_leakage_error(self, message):
+        self.btn_leakage.config(state='normal')
+        self.lbl_leakage.config(text='')
+        messagebox.showerror(localization.tr('TITLE_ERR_ANALYSIS'), message, parent=self.top)
+
+    def _show_leakage(self, report):
+        self.btn_leakage.config(state='normal')
+        for item in self.tree_leakage.get_children():
+            self.tree_leakage.delete(item)
+        kinds = {
+            'exact': self._tr('LBL_DUP_EXACT', 'Exata'),
+            'near': self._tr('LBL_DUP_NEAR', 'Quase idêntica'),
+            'stem': self._tr('LBL_LEAK_STEM', 'Mesmo nome'),
+        }
+        split_of = {path: split for split, paths in self._leakage_split_paths().items() for path in paths}
+        for number, cluster in enumerate(report.clusters, start=1):
+            for path in cluster.paths:
+                self.tree_leakage.insert('', 'end', values=(number, kinds[cluster.kind], split_of.get(path, '-'), os.path.basename(path), os.path.dirname(path)))
+        summary = report.summary()
+        pairs = ', '.join(f'{pair}: {count}' for pair, count in report.by_pair().items())
+        self.lbl_leakage.config(text=self._tr('MSG_LEAKAGE_FOUND', '{} exata(s), {} quase idêntica(s), {} mesmo nome; {} imagem(ns) envolvida(s) {}').format(
+            summary['exact_clusters'], summary['near_clusters'], summary['stem_clusters'], summary['images_involved'], f'({pairs})' if pairs else ''
+        ))
 
     def _build_integrity_tab(self):
-        pane = ttk.PanedWindow(self.tab_integrity, orient=tk.HORIZONTAL)
-        pane.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        outer = ttk.PanedWindow(self.tab_integrity, orient=tk.VERTICAL)
+        outer.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        pane = ttk.PanedWindow(outer, orient=tk.HORIZONTAL)
+        outer.add(pane, weight=1)
         left_fr = ttk.LabelFrame(pane, text=localization.tr('GRP_IMG_NO_LBL'), padding=5)
         pane.add(left_fr, weight=1)
         cols = ('Arquivo', 'Caminho')
@@ -146,174 +450,205 @@ class DatasetAnalyzerWindow:
         self.tree_no_img.configure(yscrollcommand=sb2.set)
         self.tree_no_img.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         sb2.pack(side=tk.RIGHT, fill=tk.Y)
+        dup_fr = ttk.LabelFrame(outer, text=self._tr('GRP_DUPLICATES', 'Imagens duplicadas'), padding=5)
+        outer.add(dup_fr, weight=1)
+        dup_toolbar = ttk.Frame(dup_fr)
+        dup_toolbar.pack(fill=tk.X, pady=(0, 5))
+        self.btn_duplicates = ttk.Button(dup_toolbar, text=self._tr('BTN_FIND_DUPLICATES', 'Procurar duplicatas'), command=self._start_duplicate_search)
+        self.btn_duplicates.pack(side=tk.LEFT)
+        self.lbl_duplicates = ttk.Label(dup_toolbar, text='')
+        self.lbl_duplicates.pack(side=tk.LEFT, padx=10)
+        dup_cols = ('Grupo', 'Tipo', 'Arquivo', 'Caminho')
+        self.tree_duplicates = ttk.Treeview(dup_fr, columns=dup_cols, show='headings')
+        self.tree_duplicates.heading('Grupo', text=self._tr('COL_GROUP', 'Grupo'))
+        self.tree_duplicates.heading('Tipo', text=self._tr('COL_KIND', 'Tipo'))
+        self.tree_duplicates.heading('Arquivo', text=localization.tr('COL_FILENAME'))
+        self.tree_duplicates.heading('Caminho', text=localization.tr('COL_FOLDER'))
+        self.tree_duplicates.column('Grupo', width=60, anchor='center', stretch=False)
+        self.tree_duplicates.column('Tipo', width=100, anchor='center', stretch=False)
+        self.tree_duplicates.column('Arquivo', width=200)
+        sb3 = ttk.Scrollbar(dup_fr, orient=tk.VERTICAL, command=self.tree_duplicates.yview)
+        self.tree_duplicates.configure(yscrollcommand=sb3.set)
+        self.tree_duplicates.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        sb3.pack(side=tk.RIGHT, fill=tk.Y)
+
+    def _start_duplicate_search(self):
+        self.btn_duplicates.config(state='disabled')
+        self.lbl_duplicates.config(text=self._tr('MSG_SEARCHING_DUPLICATES', 'Calculando hashes...'))
+        threading.Thread(target=self._find_duplicates, name='duplicate-search', daemon=True).start()
+
+    def _find_duplicates(self):
+        try:
+            report = find_duplicates(
+                self.base_dir,
+                list_dataset_images(self.base_dir),
+                cancel_event=self.duplicate_cancel,
+                progress=lambda done, total: self._post_to_ui(self.lbl_duplicates.config, {'text': f'{done}/{total}'})
+            )
+        except Exception as e:
+            logger.error(f'Erro na busca de duplicatas: {e}')
+            self._post_to_ui(self._show_duplicate_error, str(e))
+            return
+        if not self.duplicate_cancel.is_set():
+            self._post_to_ui(self._show_duplicates, report)
+
+    def _show_duplicate_error(self, message):
+        self.btn_duplicates.config(state='normal')
+        self.lbl_duplicates.config(text='')
+        messagebox.showerror(localization.tr('TITLE_ERR_ANALYSIS'), message, parent=self.top)
+
+    def _show_duplicates(self, report):
+        self.btn_duplicates.config(state='normal')
+        for item in self.tree_duplicates.get_children():
+            self.tree_duplicates.delete(item)
+        kinds = {'exact': self._tr('LBL_DUP_EXACT', 'Exata'), 'near': self._tr('LBL_DUP_NEAR', 'Quase idêntica')}
+        for number, cluster in enumerate(report.clusters, start=1):
+            for path in cluster.paths:
+                self.tree_duplicates.insert('', 'end', values=(number, kinds[cluster.kind], os.path.basename(path), os.path.dirname(path)))
+        summary = report.summary()
+        self.lbl_duplicates.config(text=self._tr('MSG_DUPLICATES_FOUND', '{} grupo(s) exato(s), {} quase idêntico(s); {} imagem(ns) redundante(s)').format(
+            summary['exact_clusters'], summary['near_clusters'], summary['redundant_images']
+        ))
+
+    def _build_geometry_tabs(self):
+        self.geometry_group_var = tk.StringVar()
+        for tab, chart_type in ((self.tab_geometry, 'geometry'), (self.tab_heatmap, 'heatmap')):
+            toolbar_frame = ttk.Frame(tab, padding=(10, 5))
+            toolbar_frame.pack(fill=tk.X)
+            ttk.Label(toolbar_frame, text=self._tr('LBL_GEOMETRY_GROUP', 'Grupo:'), font=('Segoe UI', 11, 'bold')).pack(side=tk.LEFT)
+            combo = ttk.Combobox(toolbar_frame, textvariable=self.geometry_group_var, state='readonly', width=30)
+            combo.pack(side=tk.LEFT, padx=5)
+            combo.bind('<<ComboboxSelected>>', lambda e: self._draw_geometry_charts())
+            ttk.Button(toolbar_frame, text=localization.tr('BTN_SAVE_IMG'), command=lambda t=chart_type: self.save_chart_image(t)).pack(side=tk.RIGHT)
+            if chart_type == 'geometry':
+                self.geometry_combo = combo
+                self.geometry_chart_frame = ttk.Frame(tab, padding=10)
+                self.geometry_chart_frame.pack(fill=tk.BOTH, expand=True)
+                self.chart_slots['geometry'] = ChartSlot(self.geometry_chart_frame, self.chart_renderer)
+            else:
+                self.heatmap_combo = combo
+                self.heatmap_chart_frame = ttk.Frame(tab, padding=10)
+                self.heatmap_chart_frame.pack(fill=tk.BOTH, expand=True)
+                self.chart_slots['heatmap'] = ChartSlot(self.heatmap_chart_frame, self.chart_renderer)
 
     def _build_report_tab(self):
         toolbar = ttk.Frame(self.tab_report, padding=5)
         toolbar.pack(fill=tk.X)
         ttk.Button(toolbar, text=localization.tr('BTN_COPY_ALL'), command=self.copy_to_clipboard).pack(side=tk.LEFT, padx=5)
         ttk.Button(toolbar, text=localization.tr('BTN_EXPORT'), command=self.save_report_file).pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text=self._tr('BTN_EXPORT_DATA', 'Exportar Dados (CSV/JSONL/NPZ)'), command=self.export_structured_data).pack(side=tk.LEFT, padx=5)
         ttk.Label(toolbar, text=localization.tr('LBL_REPORT_HINT'), font=('Segoe UI', 8, 'italic')).pack(side=tk.LEFT, padx=10)
-        self.txt_report = tk.Text(self.tab_report, wrap=tk.NONE, font=('Consolas', 9))
+        self.txt_report = VirtualTextView(self.tab_report, font=('Consolas', 9))
         self.txt_report.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        ys = ttk.Scrollbar(self.txt_report, orient='vertical', command=self.txt_report.yview)
-        xs = ttk.Scrollbar(self.txt_report, orient='horizontal', command=self.txt_report.xview)
-        self.txt_report.configure(yscrollcommand=ys.set, xscrollcommand=xs.set)
-        ys.pack(side=tk.RIGHT, fill=tk.Y)
-        xs.pack(side=tk.BOTTOM, fill=tk.X)
         self.txt_report.tag_config('header', foreground='blue', font=('Consolas', 10, 'bold'))
         self.txt_report.tag_config('section', foreground='purple', font=('Consolas', 10, 'bold'))
         self.txt_report.tag_config('error', foreground='red')
         self.txt_report.tag_config('tree', foreground='green')
 
     def _start_analysis(self):
+        self.cancel_event.clear()
+        self.analysis_cancelled = False
         self.lbl_status.config(text=localization.tr('MSG_SCANNING'))
         threading.Thread(target=self._analyze_data, daemon=True).start()
 
-    def _get_file_attributes(self, filepath):
-        attrs = []
-        try:
-            st = os.stat(filepath)
-            if os.name == 'nt':
-                import ctypes
-                attr = ctypes.windll.kernel32.GetFileAttributesW(filepath)
-                if attr != -1 and attr & 2:
-                    attrs.append('HIDDEN')
-            if not st.st_mode & stat.S_IWUSR:
-                attrs.append('READ-ONLY')
-        except:
-            pass
-        return ','.join(attrs) if attrs else 'NORMAL'
-
-    def _generate_tree_string(self, dir_path, prefix=''):
-        output = ''
-        try:
-            items = sorted(os.listdir(dir_path))
-            pointers = [('├── ', '│   ')] * (len(items) - 1) + [('└── ', '    ')]
-            for pointer, item in zip(pointers, items):
-                path = os.path.join(dir_path, item)
-                output += prefix + pointer[0] + item + '\n'
-                if os.path.isdir(path):
-                    output += self._generate_tree_string(path, prefix + pointer[1])
-        except PermissionError:
-            output += prefix + '└── [Acesso Negado]\n'
-        return output
+    def write_tree(self, stream, max_depth=None):
+        write_directory_tree(
+            self.directory_listing,
+            self.base_dir,
+            stream,
+            max_depth=max_depth,
+            collapse_files=Config.ANALYZER_TREE_COLLAPSE_FILES
+        )
+
+    def _build_progress_snapshot(self, processed, total, started_at):
+        elapsed = max(time.monotonic() - started_at, 1e-06)
+        rate = processed / elapsed
+        remaining = max(total - processed, 0)
+        return {
+            'processed': processed,
+            'total': total,
+            'elapsed': elapsed,
+            'rate': rate,
+            'eta': remaining / rate if rate > 0 else None,
+            'counts': Counter(self.stats['counts']),
+            'total_objects': self.stats['total_objects'],
+        }
 
     def _analyze_data(self):
         try:
-            self.stats['counts'] = Counter()
-            self.stats['total_images'] = 0
-            self.stats['total_objects'] = 0
-            self.stats['types'] = {'box': 0, 'polygon': 0}
-            for k in self.stats['split']:
-                self.stats['split'][k] = {'img': 0, 'obj': 0}
-            self.stats['integrity']['imgs_no_lbl'] = []
-            self.stats['integrity']['lbls_no_img'] = []
-            all_images_bases = set()
-            all_labels_bases = set()
-            for r, dirs, files in os.walk(self.base_dir):
-                dirs[:] = [directory for directory in dirs if directory.casefold() != 'labels']
-                path_lower = r.lower()
-                split_cat = 'uncategorized'
-                if 'train' in path_lower:
-                    split_cat = 'train'
-                elif 'valid' in path_lower or 'val' in path_lower:
-                    split_cat = 'val'
-                elif 'test' in path_lower:
-                    split_cat = 'test'
-                for f in sorted(files):
-                    lower_f = f.lower()
-                    if lower_f.endswith(('.jpg', '.png', '.jpeg', '.bmp', '.gif', '.tiff')):
-                        full_path = os.path.join(r, f)
-                        base_name = os.path.splitext(f)[0]
-                        all_images_bases.add(base_name)
-                        try:
-                            file_stat = os.stat(full_path)
-                            size_kb = file_stat.st_size / 1024
-                            created_dt = datetime.datetime.fromtimestamp(file_stat.st_ctime).strftime('%Y-%m-%d %H:%M:%S')
-                            mod_dt = datetime.datetime.fromtimestamp(file_stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
-                            attrs = self._get_file_attributes(full_path)
-                            width, height = (0, 0)
-                            img_format = 'UNK'
-                            img_mode = 'UNK'
-                            try:
-                                with Image.open(full_path) as img:
-                                    width, height = img.size
-                                    img_format = img.format
-                                    img_mode = img.mode
-                            except:
-                                pass
-                            label_name = base_name + '.txt'
-                            possible_lbls = [os.path.join(os.path.dirname(r), 'labels', label_name), os.path.join(r, label_name)]
-                            classes_in_img = []
-                            ann_count = 0
-                            found_label = False
-                            for lbl_path in possible_lbls:
-                                if os.path.exists(lbl_path):
-                                    found_label = True
-                                    with open(lbl_path, 'r') as lf:
-                                        for line in lf:
-                                            parts = line.split()
-                                            if len(parts) >= 5:
-                                                cid = int(parts[0])
-                                                self.stats['counts'][cid] += 1
-                                                classes_in_img.append(cid)
-                                                ann_count += 1
-                                                if len(parts) == 5:
-                                                    self.stats['types']['box'] += 1
-                                                elif len(parts) > 5:
-                                                    self.stats['types']['polygon'] += 1
-                                    break
-                            self.stats['total_images'] += 1
-                            self.stats['total_objects'] += ann_count
-                            self.stats['split'][split_cat]['img'] += 1
-                            self.stats['split'][split_cat]['obj'] += ann_count
-                            if ann_count == 0:
-                                self.stats['integrity']['imgs_no_lbl'].append(full_path)
-                            unique_classes = sorted(list(set(classes_in_img)))
-                            classes_str = ','.join([str(c) for c in unique_classes]) if unique_classes else 'None'
-                            self.detailed_files.append({'name': f, 'res': f'{width}x{height}', 'fmt': str(img_format), 'mode': str(img_mode), 'size_kb': f'{size_kb:.2f}', 'created': created_dt, 'mod': mod_dt, 'attrs': attrs, 'anns': ann_count, 'classes': classes_str, 'path': full_path})
-                        except Exception as e:
-                            self.detailed_files.append({'name': f, 'res': 'ERROR', 'path': full_path + f' [Error: {str(e)}]'})
-            for r, _, files in os.walk(self.base_dir):
-                for f in files:
-                    if f.lower().endswith('.txt') and f.lower() != 'classes.txt':
-                        base_name = os.path.splitext(f)[0]
-                        all_labels_bases.add(base_name)
-                        if base_name not in all_images_bases:
-                            self.stats['integrity']['lbls_no_img'].append(os.path.join(r, f))
-            self.tree_structure = f'.\n{self._generate_tree_string(self.base_dir)}'
-            self.top.after(0, self._update_ui)
+            scan = DatasetScan(self.base_dir, self.cancel_event)
+            self.stats = scan.stats
+            completed = scan.run(
+                progress=lambda processed, total, started_at: self._post_to_ui(self._render_progress, self._build_progress_snapshot(processed, total, started_at)),
+                progress_interval=self.PROGRESS_INTERVAL_SECONDS
+            )
+            self.detailed_files = scan.detailed_files
+            self.directory_listing = scan.directory_listing
+            self.split_paths = scan.split_paths
+            self.split_source = scan.split_resolver.source
+            self.geometry = scan.geometry
+            self.analysis_cancelled = not completed
+            self._post_to_ui(self._update_ui)
         except Exception as e:
             logger.error(f'Erro na thread de análise: {e}')
-            self.top.after(0, lambda: messagebox.showerror(localization.tr('TITLE_ERR_ANALYSIS'), str(e)))
+            self._post_to_ui(messagebox.showerror, localization.tr('TITLE_ERR_ANALYSIS'), str(e))
+
+    def _format_duration(self, seconds):
+        if seconds is None:
+            return '--:--'
+        minutes, secs = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        if hours:
+            return f'{hours:d}:{minutes:02d}:{secs:02d}'
+        return f'{minutes:02d}:{secs:02d}'
+
+    def _render_progress(self, snapshot):
+        if self.cancel_event.is_set():
+            return
+        total = snapshot['total']
+        processed = snapshot['processed']
+        self.progress_bar.config(value=(processed / total * 100) if total else 0)
+        status = self._tr('MSG_ANALYSIS_PROGRESS', '{} / {} imagens | {:.1f} img/s | ETA {}').format(
+            processed,
+            total,
+            snapshot['rate'],
+            self._format_duration(snapshot['eta'])
+        )
+        self.lbl_status.config(text=status, foreground='orange')
+        self._fill_class_tree(snapshot['counts'], snapshot['total_objects'])
+
+    def _fill_class_tree(self, counts, tot_obj):
+        for i in self.tree.get_children():
+            self.tree.delete(i)
+        labels_chart = []
+        values_chart = []
+        all_ids = set(counts.keys()) | set(range(len(self.class_names)))
+        for cid in sorted(all_ids):
+            count = counts.get(cid, 0)
+            name = self.class_names[cid] if 0 <= cid < len(self.class_names) else f'ID {cid}'
+            pct_val = count / tot_obj * 100 if tot_obj > 0 else 0.0
+            bar_len = int(pct_val / 5)
+            self.tree.insert('', 'end', values=(cid, name, count, f'{pct_val:.2f}%', '█' * bar_len))
+            if count > 0:
+                labels_chart.append(name)
+                values_chart.append(count)
+        return (labels_chart, values_chart)
 
     def _update_ui(self):
         try:
             self.lbl_status.config(text=localization.tr('MSG_GENERATING'), foreground='blue')
-            counts = self.stats['counts']
-            tot_obj = self.stats['total_objects']
-            for i in self.tree.get_children():
-                self.tree.delete(i)
-            sorted_ids = sorted(counts.keys())
-            all_ids = set(sorted_ids) | set(range(len(self.class_names)))
-            labels_chart = []
-            values_chart = []
-            for cid in sorted(all_ids):
-                count = counts.get(cid, 0)
-                name = self.class_names[cid] if cid < len(self.class_names) else f'ID {cid}'
-                pct_val = count / tot_obj * 100 if tot_obj > 0 else 0.0
-                bar_len = int(pct_val / 5)
-                self.tree.insert('', 'end', values=(cid, name, count, f'{pct_val:.2f}%', '█' * bar_len))
-                if count > 0:
-                    labels_chart.append(name)
-                    values_chart.append(count)
+            labels_chart, values_chart = self._fill_class_tree(self.stats['counts'], self.stats['total_objects'])
+            labels_chart, values_chart = aggregate_top_n(labels_chart, values_chart, Config.ANALYZER_CHART_TOP_N, self._tr('LBL_CHART_OTHERS', 'Outros'))
             self._draw_chart(labels_chart, values_chart)
             if labels_chart:
                 sorted_data = sorted(zip(labels_chart, values_chart), key=lambda x: x[1])
                 log_labels = [x[0] for x in sorted_data]
                 log_values = [x[1] for x in sorted_data]
                 self._draw_log_chart(log_labels, log_values)
+            else:
+                self.chart_slots['log'].clear()
             self._draw_split_charts()
+            self._refresh_geometry_groups()
             for i in self.tree_no_lbl.get_children():
                 self.tree_no_lbl.delete(i)
             for i in self.tree_no_img.get_children():
@@ -323,7 +658,13 @@ class DatasetAnalyzerWindow:
             for path in self.stats['integrity']['lbls_no_img']:
                 self.tree_no_img.insert('', 'end', values=(os.path.basename(path), os.path.dirname(path)))
             self._generate_text_report()
-            self.lbl_status.config(text=localization.tr('MSG_ANALYSIS_COMPLETE'), foreground='green')
+            self.btn_cancel.config(state='disabled')
+            if self.analysis_cancelled:
+                status = self._tr('MSG_ANALYSIS_CANCELLED', 'Análise cancelada. Resultados parciais: {} imagens.').format(self.stats['total_images'])
+                self.lbl_status.config(text=status, foreground='red')
+            else:
+                self.progress_bar.config(value=100)
+                self.lbl_status.config(text=localization.tr('MSG_ANALYSIS_COMPLETE'), foreground='green')
         except Exception as e:
             logger.error(f'Erro ao atualizar UI: {e}')
             messagebox.showerror(localization.tr('TITLE_ERR_RENDER'), str(e))
@@ -332,163 +673,185 @@ class DatasetAnalyzerWindow:
         splits = ['train', 'val', 'test']
         img_counts = [self.stats['split'][s]['img'] for s in splits]
         obj_counts = [self.stats['split'][s]['obj'] for s in splits]
-        colors = ['#007bff', '#ffc107', '#28a745']
-        for w in self.split_img_frame.winfo_children():
-            w.destroy()
-        self.fig_split_img, ax1 = plt.subplots(figsize=(4, 4), dpi=100)
-        bars1 = ax1.bar(splits, img_counts, color=colors)
-        ax1.set_title(localization.tr('CHART_IMG_BY_SPLIT'))
-        ax1.spines['top'].set_visible(False)
-        ax1.spines['right'].set_visible(False)
-        for bar in bars1:
-            h = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width() / 2, h, str(h), ha='center', va='bottom', fontweight='bold')
-        canvas1 = FigureCanvasTkAgg(self.fig_split_img, master=self.split_img_frame)
-        canvas1.draw()
-        canvas1.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        for w in self.split_obj_frame.winfo_children():
-            w.destroy()
-        self.fig_split_obj, ax2 = plt.subplots(figsize=(4, 4), dpi=100)
-        bars2 = ax2.bar(splits, obj_counts, color=colors)
-        ax2.set_title(localization.tr('CHART_OBJ_BY_SPLIT'))
-        ax2.spines['top'].set_visible(False)
-        ax2.spines['right'].set_visible(False)
-        for bar in bars2:
-            h = bar.get_height()
-            ax2.text(bar.get_x() + bar.get_width() / 2, h, str(h), ha='center', va='bottom', fontweight='bold')
-        canvas2 = FigureCanvasTkAgg(self.fig_split_obj, master=self.split_obj_frame)
-        canvas2.draw()
-        canvas2.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.chart_slots['split_img'].render(functools.partial(draw_split_chart, splits=splits, counts=img_counts, title=localization.tr('CHART_IMG_BY_SPLIT')))
+        self.chart_slots['split_obj'].render(functools.partial(draw_split_chart, splits=splits, counts=obj_counts, title=localization.tr('CHART_OBJ_BY_SPLIT')))
+        if self.split_source:
+            self.lbl_split_source.config(text=self._tr('LBL_SPLIT_SOURCE', 'Splits definidos em {}').format(os.path.basename(self.split_source)))
+        else:
+            self.lbl_split_source.config(text=self._tr('LBL_SPLIT_FROM_FOLDERS', 'Splits inferidos pelos nomes das pastas'))
+
+    def _geometry_group_label(self, kind, key):
+        if kind == 'all':
+            return self._tr('LBL_GEOMETRY_ALL', 'Todos os objetos')
+        if kind == 'split':
+            return f'Split: {key}'
+        name = self.class_names[key] if 0 <= key < len(self.class_names) else f'ID {key}'
+        return f'{key}: {name}'
+
+    def _refresh_geometry_groups(self):
+        self.geometry_groups = self.geometry.group_keys()
+        labels = [self._geometry_group_label(kind, key) for kind, key in self.geometry_groups]
+        self.geometry_combo.config(values=labels)
+        self.heatmap_combo.config(values=labels)
+        self.geometry_group_var.set(labels[0])
+        self._draw_geometry_charts()
+
+    def _selected_geometry_group(self):
+        labels = [self._geometry_group_label(kind, key) for kind, key in self.geometry_groups]
+        try:
+            return self.geometry_groups[labels.index(self.geometry_group_var.get())]
+        except ValueError:
+            return ('all', None)
+
+    def _draw_geometry_charts(self):
+        kind, key = self._selected_geometry_group()
+        summary = self.geometry.summary(kind, key)
+        titles = {
+            'width': self._tr('CHART_BOX_WIDTH', 'Largura (normalizada)'),
+            'height': self._tr('CHART_BOX_HEIGHT', 'Altura (normalizada)'),
+            'aspect': self._tr('CHART_BOX_ASPECT', 'Proporção log2(L/A)'),
+            'area': self._tr('CHART_BOX_AREA', 'Área (normalizada, log)'),
+        }
+        suptitle = f'{self._geometry_group_label(kind, key)} ({summary['objects']})'
+        self.chart_slots['geometry'].render(functools.partial(draw_geometry_chart, summary=summary, titles=titles, suptitle=suptitle))
+        self.chart_slots['heatmap'].render(functools.partial(
+            draw_heatmap_chart,
+            summary=summary,
+            heatmap_title=self._tr('CHART_CENTER_HEATMAP', 'Centros das caixas'),
+            count_title=self._tr('CHART_OBJECTS_PER_IMAGE', 'Objetos por imagem')
+        ))
 
     def _draw_chart(self, labels, values):
-        for widget in self.chart_frame.winfo_children():
-            widget.destroy()
         if not values:
+            self.chart_slots['standard'].clear()
             return
-        plt.style.use('default')
-        self.fig_standard, ax = plt.subplots(figsize=(5, 4), dpi=100)
-        colors = plt.cm.plasma(range(len(labels)))
-        ax.barh(labels, values, color=colors)
-        ax.set_xlabel(localization.tr('AXIS_QTY'))
-        ax.set_title(localization.tr('CHART_DIST_LINEAR'))
-        for i, v in enumerate(values):
-            ax.text(v, i, f' {v}', va='center', fontweight='bold')
-        plt.tight_layout()
-        canvas = FigureCanvasTkAgg(self.fig_standard, master=self.chart_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.chart_slots['standard'].render(functools.partial(draw_class_chart, labels=labels, values=values, xlabel=localization.tr('AXIS_QTY'), title=localization.tr('CHART_DIST_LINEAR')))
 
     def _draw_log_chart(self, labels, values):
-        for widget in self.log_chart_frame.winfo_children():
-            widget.destroy()
         if not values:
+            self.chart_slots['log'].clear()
             return
-        plt.style.use('default')
-        self.fig_log, ax = plt.subplots(figsize=(12, 6), dpi=100)
-        formatter = ScalarFormatter()
-        formatter.set_scientific(False)
-        ax.yaxis.set_major_formatter(formatter)
-        ax.grid(axis='y', linestyle='-', alpha=0.3)
-        ax.set_axisbelow(True)
-        colors = plt.cm.Set3(range(len(labels)))
-        bars = ax.bar(labels, values, color=colors, edgecolor='#dddddd', linewidth=0.5)
-        ax.set_ylabel(localization.tr('AXIS_ANNOTATIONS_NUM'), fontsize=12)
-        ax.set_xlabel(localization.tr('AXIS_CLASS'), fontsize=12)
-        ax.set_title(localization.tr('CHART_DIST_LOG'), fontsize=16, pad=20)
-        plt.xticks(rotation=45, ha='right', fontsize=10)
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width() / 2.0, height + max(values) * 0.01, f'{int(height)}', ha='center', va='bottom', fontsize=9, fontweight='bold')
-        plt.tight_layout()
-        canvas = FigureCanvasTkAgg(self.fig_log, master=self.log_chart_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.chart_slots['log'].render(functools.partial(
+            draw_log_chart,
+            labels=labels,
+            values=values,
+            ylabel=localization.tr('AXIS_ANNOTATIONS_NUM'),
+            xlabel=localization.tr('AXIS_CLASS'),
+            title=localization.tr('CHART_DIST_LOG')
+        ))
 
     def save_chart_image(self, chart_type):
-        target_fig = None
-        if chart_type == 'standard':
-            target_fig = self.fig_standard
-        elif chart_type == 'log':
-            target_fig = self.fig_log
-        elif chart_type == 'split':
-            if self.fig_split_img and self.fig_split_obj:
+        if chart_type == 'split':
+            slot_img = self.chart_slots['split_img']
+            slot_obj = self.chart_slots['split_obj']
+            if slot_img.has_content and slot_obj.has_content:
                 try:
                     f1 = filedialog.asksaveasfilename(defaultextension='.png', initialfile=f'split_img_{int(time.time())}.png', title=localization.tr('TITLE_SAVE_CHART').format('Images'))
                     if f1:
-                        self.fig_split_img.savefig(f1, dpi=300, bbox_inches='tight')
+                        slot_img.save(f1, dpi=300, bbox_inches='tight')
                     f2 = filedialog.asksaveasfilename(defaultextension='.png', initialfile=f'split_obj_{int(time.time())}.png', title=localization.tr('TITLE_SAVE_CHART').format('Objects'))
                     if f2:
-                        self.fig_split_obj.savefig(f2, dpi=300, bbox_inches='tight')
+                        slot_obj.save(f2, dpi=300, bbox_inches='tight')
                     messagebox.showinfo(localization.tr('MSG_SUCCESS_TITLE'), localization.tr('MSG_CHARTS_SAVED'))
                 except Exception as e:
                     messagebox.showerror(localization.tr('TITLE_ERR_RENDER'), str(e))
             return
-        if target_fig is None:
+        target_slot = self.chart_slots.get(chart_type)
+        if target_slot is None or not target_slot.has_content:
             messagebox.showwarning(localization.tr('TITLE_WARNING'), localization.tr('MSG_CHART_NOT_READY'))
             return
         default_name = f'grafico_{chart_type}_{int(time.time())}.png'
         filename = filedialog.asksaveasfilename(defaultextension='.png', initialfile=default_name, filetypes=[('PNG Image', '*.png')], title=localization.tr('TITLE_SAVE_CHART').format(chart_type))
         if filename:
             try:
-                target_fig.savefig(filename, dpi=300, bbox_inches='tight')
+                target_slot.save(filename, dpi=300, bbox_inches='tight')
                 messagebox.showinfo(localization.tr('MSG_SUCCESS_TITLE'), localization.tr('MSG_CHART_SAVED_AT').format(filename))
             except Exception as e:
                 messagebox.showerror(localization.tr('TITLE_ERR_RENDER'), str(e))
 
     def copy_to_clipboard(self):
+        if self.report_model is None:
+            return
         self.top.clipboard_clear()
-        self.top.clipboard_append(self.generated_report_text)
+        chunk = []
+        for text in self.report_model.iter_text():
+            chunk.append(text)
+            if len(chunk) >= self.CLIPBOARD_CHUNK_LINES:
+                self.top.clipboard_append(''.join(chunk))
+                chunk = []
+        if chunk:
+            self.top.clipboard_append(''.join(chunk))
         self.top.update()
         messagebox.showinfo(localization.tr('TITLE_CLIPBOARD'), localization.tr('MSG_COPIED'))
 
     def save_report_file(self):
-        if not self.generated_report_text:
+        if self.report_model is None:
             return
         filename = filedialog.asksaveasfilename(defaultextension='.txt', filetypes=[('TXT', '*.txt')], title=localization.tr('TITLE_SAVE_REPORT'))
         if filename:
             with open(filename, 'w', encoding='utf-8') as f:
-                f.write(self.generated_report_text)
+                f.writelines(self.report_model.iter_text())
             messagebox.showinfo(localization.tr('TITLE_SAVED'), localization.tr('MSG_REPORT_SAVED_AT').format(filename))
 
-    def _generate_text_report(self):
+    def export_structured_data(self):
+        if self.report_model is None:
+            return
+        output_dir = filedialog.askdirectory(title=self._tr('TITLE_EXPORT_DATA', 'Selecione a pasta de exportação'))
+        if not output_dir:
+            return
+        try:
+            written = export_analysis(output_dir, self.detailed_files, self.stats, self.class_names)
+        except (OSError, ValueError) as e:
+            logger.error(f'Falha ao exportar dados estruturados: {e}')
+            messagebox.showerror(localization.tr('TITLE_ERR_RENDER'), str(e))
+            return
+        messagebox.showinfo(localization.tr('TITLE_SAVED'), self._tr('MSG_DATA_EXPORTED', '{} arquivos exportados para:\n{}').format(len(written), output_dir))
+
+    def _format_file_row(self, item):
+        anns = item.get('anns', '-')
+        classes = item.get('classes', '-')
+        line = f'{item['name'][:25]:<25} | {item['res']:<10} | {str(anns):<4} | {classes:<10} | {item['path']}'
+        return (line, 'error' if item['res'] == 'ERROR' else None)
+
+    def _build_report_model(self):
         timestamp = datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')
-        report = []
-        report.append('=' * 120)
-        report.append(localization.tr('REPORT_TITLE'))
-        report.append(localization.tr('REPORT_GENERATED_AT').format(timestamp))
-        report.append(localization.tr('REPORT_BASE_DIR').format(self.base_dir))
-        report.append('=' * 120 + '\n')
-        report.append(localization.tr('REPORT_SUMMARY'))
-        report.append(localization.tr('REPORT_TOTAL_IMG').format(self.stats['total_images']))
-        report.append(localization.tr('REPORT_TOTAL_OBJ').format(self.stats['total_objects']))
+        model = ReportModel()
+        model.add_text('=' * 120)
+        model.add_rows([(localization.tr('REPORT_TITLE'), 'header')])
+        model.add_text(localization.tr('REPORT_GENERATED_AT').format(timestamp))
+        model.add_text(localization.tr('REPORT_BASE_DIR').format(self.base_dir))
+        model.add_text('=' * 120 + '\n')
+        model.add_rows([(localization.tr('REPORT_SUMMARY'), 'section')])
+        model.add_text(localization.tr('REPORT_TOTAL_IMG').format(self.stats['total_images']))
+        model.add_text(localization.tr('REPORT_TOTAL_OBJ').format(self.stats['total_objects']))
         n_box = self.stats['types']['box']
         n_poly = self.stats['types']['polygon']
-        report.append(localization.tr('REPORT_TYPES').format(n_box, n_poly))
-        report.append(localization.tr('REPORT_AVG').format(self.stats['total_objects'] / self.stats['total_images'] if self.stats['total_images'] > 0 else 0))
-        report.append(localization.tr('REPORT_DIST_SPLIT'))
+        model.add_text(localization.tr('REPORT_TYPES').format(n_box, n_poly))
+        model.add_text(localization.tr('REPORT_AVG').format(self.stats['total_objects'] / self.stats['total_images'] if self.stats['total_images'] > 0 else 0))
+        model.add_text(localization.tr('REPORT_DIST_SPLIT'), 'section')
         for k, v in self.stats['split'].items():
-            report.append(f'  {k.upper()}: {v['img']} imagens, {v['obj']} objetos')
-        report.append(localization.tr('REPORT_INTEGRITY'))
-        report.append(localization.tr('REPORT_NO_LBL').format(len(self.stats['integrity']['imgs_no_lbl'])))
-        report.append(localization.tr('REPORT_NO_IMG').format(len(self.stats['integrity']['lbls_no_img'])))
-        report.append('-' * 40 + '\n')
-        report.append(localization.tr('REPORT_FILE_DETAILS'))
+            model.add_text(f'  {k.upper()}: {v['img']} imagens, {v['obj']} objetos')
+        model.add_text(localization.tr('REPORT_INTEGRITY'), 'section')
+        model.add_text(localization.tr('REPORT_NO_LBL').format(len(self.stats['integrity']['imgs_no_lbl'])))
+        model.add_text(localization.tr('REPORT_NO_IMG').format(len(self.stats['integrity']['lbls_no_img'])))
+        model.add_text('-' * 40 + '\n')
+        model.add_rows([(localization.tr('REPORT_FILE_DETAILS'), 'section')])
         header_file = localization.tr('COL_FILE')
         header_res = localization.tr('COL_RES')
         header_anns = localization.tr('COL_ANNS')
         header_classes = localization.tr('COL_CLASSES')
         header_path = localization.tr('COL_PATH')
         header = f'{header_file:<25} | {header_res:<10} | {header_anns:<4} | {header_classes:<10} | {header_path}'
-        report.append(header)
-        report.append('-' * len(header))
-        for item in self.detailed_files:
-            line = f'{item['name'][:25]:<25} | {item['res']:<10} | {str(item['anns']):<4} | {item['classes']:<10} | {item['path']}'
-            report.append(line)
-        report.append('\n' + '=' * 120 + '\n')
-        report.append(localization.tr('REPORT_DIR_STRUCT'))
-        report.append(self.tree_structure)
-        self.generated_report_text = '\n'.join(report)
-        self.txt_report.delete('1.0', tk.END)
-        self.txt_report.insert('1.0', self.generated_report_text)
+        model.add_text(header)
+        model.add_text('-' * len(header))
+        model.add_rows(self.detailed_files, self._format_file_row)
+        model.add_text('\n' + '=' * 120 + '\n')
+        model.add_rows([(localization.tr('REPORT_DIR_STRUCT'), 'section')])
+        tree_lines = _LineCollector()
+        self.write_tree(tree_lines, max_depth=Config.ANALYZER_TREE_MAX_DEPTH)
+        model.add_rows(tree_lines, lambda text: (text, 'tree'))
+        return model
+
+    def _generate_text_report(self):
+        self.report_model = self._build_report_model()
+        self.txt_report.set_model(self.report_model)
@@ -0,0 +1,119 @@
+import tkinter as tk
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Sequence, Tuple
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PIL import Image, ImageTk
+logger = logging.getLogger(__name__)
+
+
+def aggregate_top_n(labels: Sequence[str], values: Sequence[int], limit: Optional[int], other_label: str = 'Outros') -> Tuple[list, list]:
+    if limit is None or len(values) <= limit:
+        return (list(labels), list(values))
+    ranked = sorted(zip(labels, values), key=lambda item: item[1], reverse=True)
+    head = ranked[:limit - 1]
+    rest = ranked[limit - 1:]
+    return ([label for label, _ in head] + [f'{other_label} ({len(rest)})'], [value for _, value in head] + [sum(value for _, value in rest)])
+
+
+class ChartSlot:
+    DPI = 100
+    DEFAULT_SIZE = (500, 400)
+    RESIZE_DELAY_MS = 250
+
+    def __init__(self, frame, renderer):
+        self.frame = frame
+        self.renderer = renderer
+        self.figure = Figure(dpi=self.DPI)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.lock = threading.Lock()
+        self.label = tk.Label(frame)
+        self.label.pack(fill=tk.BOTH, expand=True)
+        self.photo = None
+        self.draw_fn = None
+        self.generation = 0
+        self.rendered_size = None
+        self._resize_job = None
+        frame.bind('<Configure>', self._on_configure, add='+')
+
+    @property
+    def has_content(self) -> bool:
+        return self.draw_fn is not None
+
+    def _current_size(self) -> Tuple[int, int]:
+        width = self.frame.winfo_width()
+        height = self.frame.winfo_height()
+        if width <= 1 or height <= 1:
+            return self.DEFAULT_SIZE
+        return (width, height)
+
+    def render(self, draw_fn: Callable[[Figure], None]):
+        self.draw_fn = draw_fn
+        self.generation += 1
+        size = self._current_size()
+        self.rendered_size = size
+        self.renderer.submit(self, self.generation, draw_fn, size)
+
+    def clear(self):
+        self.draw_fn = None
+        self.generation += 1
+        with self.lock:
+            self.figure.clear()
+        self.photo = None
+        self.label.configure(image='')
+
+    def render_image(self, draw_fn: Callable[[Figure], None], size: Tuple[int, int]) -> Image.Image:
+        with self.lock:
+            self.figure.clear()
+            self.figure.set_size_inches(size[0] / self.DPI, size[1] / self.DPI)
+            draw_fn(self.figure)
+            self.canvas.draw()
+            width, height = self.canvas.get_width_height()
+            return Image.frombuffer('RGBA', (width, height), bytes(self.canvas.buffer_rgba()), 'raw', 'RGBA', 0, 1)
+
+    def show(self, generation: int, image: Image.Image):
+        if generation != self.generation:
+            return
+        self.photo = ImageTk.PhotoImage(image)
+        self.label.configure(image=self.photo)
+
+    def save(self, filename: str, **kwargs):
+        with self.lock:
+            self.figure.savefig(filename, **kwargs)
+
+    def _on_configure(self, event):
+        if self.draw_fn is None:
+            return
+        if self._resize_job is not None:
+            self.frame.after_cancel(self._resize_job)
+        self._resize_job = self.frame.after(self.RESIZE_DELAY_MS, self._rerender_if_resized)
+
+    def _rerender_if_resized(self):
+        self._resize_job = None
+        if self.draw_fn is not None and self._current_size() != self.rendered_size:
+            self.render(self.draw_fn)
+
+
+class ChartRenderer:
+
+    def __init__(self, post_to_ui: Callable):
+        self.post_to_ui = post_to_ui
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chart-render')
+
+    def submit(self, slot: ChartSlot, generation: int, draw_fn: Callable[[Figure], None], size: Tuple[int, int]):
+        return self.executor.submit(self._render_job, slot, generation, draw_fn, size)
+
+    def _render_job(self, slot, generation, draw_fn, size):
+        if generation != slot.generation:
+            return
+        try:
+            image = slot.render_image(draw_fn, size)
+        except Exception as e:
+            logger.error(f'Falha ao renderizar gráfico: {e}')
+            return
+        self.post_to_ui(slot.show, generation, image)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -31,16 +31,24 @@ class Config:
     MIN_ZOOM_LEVEL = 0.02
     MAX_ZOOM_LEVEL = 20.0
     ZOOM_PRESETS = (5, 10, 25, 33, 50, 75, 100, 150, 200, 300, 400, 600, 800, 1000, 1500, 2000)
+    ANALYZER_TREE_MAX_DEPTH = None
+    ANALYZER_TREE_COLLAPSE_FILES = 50
+    ANALYZER_CHART_TOP_N = 40
+    DATASET_COPY_WORKERS = None
+    DATASET_COPY_LINK_MODE = 'copy'
+    SPLIT_DEFAULT_SEED = 42
     FEATURE_SHOW_NEW_PROJECT = True
     FEATURE_SHOW_OPEN_PROJECT = True
     FEATURE_SHOW_GRID_VIEW = True
     FEATURE_SHOW_ANALYZER = True
+    FEATURE_SHOW_VALIDATION = True
     FEATURE_SHOW_REMOVE_UNLABELED = True
     FEATURE_SHOW_REDUCE_DATASET = True
     FEATURE_SHOW_SPLIT = True
     FEATURE_SHOW_ABOUT = True
     FEATURE_SHOW_LANGUAGE_SELECTOR = True
     FEATURE_SHOW_DIRECTORY_LABEL = True
+    FEATURE_SHOW_IMAGE_FILTER = True
     FEATURE_ENABLE_POLYGON = True
     FEATURE_ENABLE_TOOLTIPS = True
     CLASS_COLORS = ['#FF3B30', '#4CD964', '#FFCC00', '#5856D6', '#FF9500', '#5AC8FA', '#007AFF', '#FF2D55', '#8E8E93', '#E5E5EA', '#A2845E', '#FF375F', '#BF5AF2', '#64D2FF', '#0A84FF']
@@ -0,0 +1,144 @@
+import os
+import errno
+import shutil
+import sys
+import threading
+import time
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+RANGE_CHUNK_SIZE = 1 << 30
+LINK_MODES = ('copy', 'hardlink', 'reflink')
+FICLONE = 0x40049409
+FALLBACK_ERRNOS = frozenset(code for code in (getattr(errno, name, None) for name in ('EXDEV', 'ENOSYS', 'EINVAL', 'EOPNOTSUPP', 'ENOTSUP', 'EBADF', 'EPERM')) if code is not None)
+LINK_FALLBACK_ERRNOS = FALLBACK_ERRNOS | frozenset(code for code in (getattr(errno, name, None) for name in ('EMLINK', 'ENOTTY', 'EACCES')) if code is not None)
+
+
+@dataclass(frozen=True)
+class CopyTask:
+    name: str
+    files: Tuple[Tuple[str, str], ...]
+    link_primary: bool = False
+
+
+class CopyEngine:
+    PROGRESS_INTERVAL_SECONDS = 0.5
+    QUEUE_FACTOR = 4
+
+    def __init__(self, workers: Optional[int] = None, cancel_event: Optional[threading.Event] = None, link_mode: str = 'copy'):
+        if link_mode not in LINK_MODES:
+            raise ValueError(f'Modo de cópia desconhecido: {link_mode}')
+        self.workers = max(1, workers or DEFAULT_WORKERS)
+        self.cancel_event = cancel_event if cancel_event is not None else threading.Event()
+        self.link_mode = link_mode
+        self.use_copy_file_range = hasattr(os, 'copy_file_range')
+        self.linked_count = 0
+
+    def _copy_file_range(self, src: str, dst: str) -> bool:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            in_fd = fsrc.fileno()
+            out_fd = fdst.fileno()
+            copied = 0
+            while True:
+                try:
+                    sent = os.copy_file_range(in_fd, out_fd, RANGE_CHUNK_SIZE)
+                except OSError as exc:
+                    if copied == 0 and exc.errno in FALLBACK_ERRNOS:
+                        return False
+                    raise
+                if sent == 0:
+                    return True
+                copied += sent
+
+    def copy_file(self, src: str, dst: str) -> None:
+        if not (self.use_copy_file_range and self._copy_file_range(src, dst)):
+            self.use_copy_file_range = False
+            shutil.copyfile(src, dst)
+        shutil.copystat(src, dst)
+
+    def _reflink(self, src: str, dst: str) -> bool:
+        if fcntl is None or not sys.platform.startswith('linux'):
+            return False
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            try:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            except OSError as exc:
+                if exc.errno in LINK_FALLBACK_ERRNOS:
+                    return False
+                raise
+        shutil.copystat(src, dst)
+        return True
+
+    def link_file(self, src: str, dst: str) -> bool:
+        if self.link_mode == 'reflink':
+            return self._reflink(src, dst)
+        try:
+            os.link(src, dst)
+        except OSError as exc:
+            if exc.errno in LINK_FALLBACK_ERRNOS:
+                return False
+            raise
+        return True
+
+    def _run_task(self, task: CopyTask) -> Tuple[bool, Optional[str], bool]:
+        primary_copied = False
+        linked = False
+        try:
+            for src, dst in task.files:
+                if not primary_copied and task.link_primary and self.link_mode != 'copy' and self.link_file(src, dst):
+                    linked = True
+                else:
+                    self.copy_file(src, dst)
+                primary_copied = True
+        except Exception as exc:
+            return (primary_copied, f'{task.name}: {exc}', linked)
+        return (True, None, linked)
+
+    @staticmethod
+    def prepare_directories(tasks: Sequence[CopyTask]) -> None:
+        directories = {os.path.dirname(dst) for task in tasks for _, dst in task.files}
+        for directory in sorted(directories):
+            os.makedirs(directory, exist_ok=True)
+
+    def run(self, tasks: Sequence[CopyTask], progress: Optional[Callable[[int, int], None]] = None, on_done: Optional[Callable[[int], None]] = None) -> Tuple[int, List[str]]:
+        total = len(tasks)
+        results = [None] * total
+        self.prepare_directories(tasks)
+        last_emit = time.monotonic()
+        done = 0
+        pending = {}
+        next_index = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='dataset-copy') as executor:
+            while next_index < total or pending:
+                while next_index < total and len(pending) < self.workers * self.QUEUE_FACTOR and not self.cancel_event.is_set():
+                    pending[executor.submit(self._run_task, tasks[next_index])] = next_index
+                    next_index += 1
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index = pending.pop(future)
+                    results[index] = future.result()
+                    done += 1
+                    if on_done and results[index][1] is None:
+                        on_done(index)
+                now = time.monotonic()
+                if progress and now - last_emit >= self.PROGRESS_INTERVAL_SECONDS:
+                    last_emit = now
+                    progress(done, total)
+        if progress:
+            progress(done, total)
+        copied_count = sum(1 for result in results if result and result[0])
+        errors = [result[1] for result in results if result and result[1]]
+        self.linked_count = sum(1 for result in results if result and result[2])
+        if self.cancel_event.is_set():
+            logger.info(f'Cópia cancelada após {done} de {total} itens.')
+        return (copied_count, errors)
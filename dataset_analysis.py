@@ -0,0 +1,268 @@
+import os
+import stat
+import time
+import datetime
+import threading
+import logging
+from collections import Counter
+import numpy as np
+from config import Config
+from image_metadata import read_image_info
+from dataset_geometry import GeometryStats
+from label_reader import iter_labels
+from utils import lazy_import
+yaml = lazy_import('yaml')
+logger = logging.getLogger(__name__)
+
+SCAN_BATCH = 512
+
+SPLIT_KEYS = ('train', 'val', 'test', 'uncategorized')
+SPLIT_ALIASES = {
+    'train': 'train',
+    'training': 'train',
+    'val': 'val',
+    'valid': 'val',
+    'validation': 'val',
+    'test': 'test',
+    'testing': 'test',
+}
+
+
+def new_stats():
+    return {
+        'counts': Counter(),
+        'total_images': 0,
+        'total_objects': 0,
+        'types': {'box': 0, 'polygon': 0},
+        'split': {key: {'img': 0, 'obj': 0} for key in SPLIT_KEYS},
+        'integrity': {'imgs_no_lbl': [], 'lbls_no_img': []},
+    }
+
+
+def classify_split(dir_path, base_dir=None):
+    relative = os.path.relpath(dir_path, base_dir) if base_dir else dir_path
+    for part in reversed(os.path.normpath(relative).split(os.sep)):
+        split = SPLIT_ALIASES.get(part.casefold())
+        if split:
+            return split
+    return 'uncategorized'
+
+
+class SplitResolver:
+
+    def __init__(self, base_dir, roots=None, files=None, source=None):
+        self.base_dir = os.path.abspath(base_dir)
+        self.roots = roots or []
+        self.files = files or {}
+        self.source = source
+
+    @classmethod
+    def load(cls, base_dir):
+        base_dir = os.path.abspath(base_dir)
+        for yaml_file in Config.SUPPORTED_DATA_FILES:
+            yaml_path = os.path.join(base_dir, yaml_file)
+            if not os.path.exists(yaml_path):
+                continue
+            try:
+                with open(yaml_path, 'r', encoding='utf-8') as f:
+                    data = yaml.safe_load(f) or {}
+            except Exception as e:
+                logger.error(f'Erro ao ler splits de {yaml_file}: {e}')
+                continue
+            if not isinstance(data, dict):
+                continue
+            resolver = cls(base_dir, source=yaml_path)
+            root = str(data.get('path') or '')
+            root = os.path.normpath(os.path.join(base_dir, root)) if root else base_dir
+            for split in ('train', 'val', 'test'):
+                entries = data.get(split)
+                for entry in entries if isinstance(entries, list) else [entries]:
+                    if isinstance(entry, str) and entry.strip():
+                        resolver._add_entry(split, root, entry.strip())
+            if resolver.roots or resolver.files:
+                resolver.roots.sort(key=lambda item: -len(item[0]))
+                return resolver
+        return cls(base_dir)
+
+    def _candidates(self, root, entry):
+        parts = [part for part in entry.replace('\\', '/').split('/') if part and part != '.']
+        yield os.path.normpath(os.path.join(root, entry))
+        stripped = [part for part in parts if part != '..']
+        for start in range(max(1, len(stripped) - 1)):
+            yield os.path.join(self.base_dir, *stripped[start:])
+
+    def _add_entry(self, split, root, entry):
+        for candidate in self._candidates(root, entry):
+            if os.path.isdir(candidate):
+                self.roots.append((candidate, split))
+                return
+            if os.path.isfile(candidate) and candidate.lower().endswith('.txt'):
+                list_dir = os.path.dirname(candidate)
+                with open(candidate, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.strip()
+                        if line:
+                            self.files[os.path.normcase(os.path.normpath(os.path.join(list_dir, line)))] = split
+                return
+        logger.warning(f'Split {split} de {self.source} não encontrado: {entry}')
+
+    def classify_dir(self, dir_path):
+        dir_path = os.path.abspath(dir_path)
+        for root, split in self.roots:
+            if dir_path == root or dir_path.startswith(root + os.sep):
+                return split
+        return classify_split(dir_path, self.base_dir)
+
+    def classify(self, image_path, dir_split=None):
+        if self.files:
+            split = self.files.get(os.path.normcase(os.path.abspath(image_path)))
+            if split:
+                return split
+        return dir_split or self.classify_dir(os.path.dirname(image_path))
+
+
+def get_file_attributes(filepath):
+    attrs = []
+    try:
+        st = os.stat(filepath)
+        if os.name == 'nt':
+            import ctypes
+            attr = ctypes.windll.kernel32.GetFileAttributesW(filepath)
+            if attr != -1 and attr & 2:
+                attrs.append('HIDDEN')
+        if not st.st_mode & stat.S_IWUSR:
+            attrs.append('READ-ONLY')
+    except:
+        pass
+    return ','.join(attrs) if attrs else 'NORMAL'
+
+
+class DatasetScan:
+    IMAGE_EXTENSIONS = ('.jpg', '.png', '.jpeg', '.bmp', '.gif', '.tiff')
+
+    def __init__(self, base_dir, cancel_event=None):
+        self.base_dir = base_dir
+        self.cancel_event = cancel_event if cancel_event is not None else threading.Event()
+        self.stats = new_stats()
+        self.detailed_files = []
+        self.directory_listing = {}
+        self.geometry = GeometryStats(SPLIT_KEYS)
+        self.split_resolver = SplitResolver.load(base_dir)
+        self.split_paths = {key: [] for key in SPLIT_KEYS}
+        self.cancelled = False
+
+    def collect_image_entries(self):
+        entries = []
+        self.directory_listing = {}
+        self.split_paths = {key: [] for key in SPLIT_KEYS}
+        label_roots = set()
+        for r, dirs, files in os.walk(self.base_dir, onerror=lambda exc: logger.warning(f'Sem acesso a {exc.filename}: {exc}')):
+            if self.cancel_event.is_set():
+                break
+            dirs.sort()
+            files.sort()
+            self.directory_listing[r] = (list(dirs), list(files))
+            inside_labels = r in label_roots
+            for directory in dirs:
+                if inside_labels or directory.casefold() == 'labels':
+                    label_roots.add(os.path.join(r, directory))
+            if inside_labels:
+                continue
+            dir_split = self.split_resolver.classify_dir(r)
+            for f in files:
+                if f.lower().endswith(self.IMAGE_EXTENSIONS):
+                    full_path = os.path.join(r, f)
+                    split_cat = self.split_resolver.classify(full_path, dir_split) if self.split_resolver.files else dir_split
+                    entries.append((r, f, split_cat))
+                    self.split_paths[split_cat].append(full_path)
+        return entries
+
+    @staticmethod
+    def _label_path(r, base_name):
+        label_name = base_name + '.txt'
+        for lbl_path in (os.path.join(os.path.dirname(r), 'labels', label_name), os.path.join(r, label_name)):
+            if os.path.exists(lbl_path):
+                return lbl_path
+        return None
+
+    def _iter_entry_labels(self, image_entries):
+        for start in range(0, len(image_entries), SCAN_BATCH):
+            chunk = image_entries[start:start + SCAN_BATCH]
+            label_paths = [self._label_path(r, os.path.splitext(f)[0]) for r, f, _split_cat in chunk]
+            for entry, (label_path, labels, error) in zip(chunk, iter_labels(label_paths)):
+                if error:
+                    logger.warning(f'Label ilegível ignorado na análise: {label_path} ({error})')
+                yield (*entry, labels)
+
+    def _scan_image(self, r, f, split_cat, labels):
+        full_path = os.path.join(r, f)
+        try:
+            file_stat = os.stat(full_path)
+            size_kb = file_stat.st_size / 1024
+            created_dt = datetime.datetime.fromtimestamp(file_stat.st_ctime).strftime('%Y-%m-%d %H:%M:%S')
+            mod_dt = datetime.datetime.fromtimestamp(file_stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
+            attrs = get_file_attributes(full_path)
+            width, height = (0, 0)
+            img_format = 'UNK'
+            img_mode = 'UNK'
+            image_info = read_image_info(full_path)
+            if image_info is not None:
+                width, height = image_info.size
+                img_format = image_info.format
+                img_mode = image_info.mode
+            classes_in_img = []
+            boxes = []
+            ann_count = 0
+            if labels:
+                classes_in_img = labels.class_ids.tolist()
+                ann_count = len(classes_in_img)
+                self.stats['counts'].update(classes_in_img)
+                coord_counts = labels.coord_counts
+                box_count = int(np.count_nonzero(coord_counts == 4))
+                self.stats['types']['box'] += box_count
+                self.stats['types']['polygon'] += ann_count - box_count
+                keep = (coord_counts == 4) | (coord_counts >= 6)
+                boxes = list(zip(labels.class_ids[keep].tolist(), *labels.boxes()[keep].T.tolist()))
+            self.geometry.add_image(split_cat, boxes)
+            self.stats['total_images'] += 1
+            self.stats['total_objects'] += ann_count
+            self.stats['split'][split_cat]['img'] += 1
+            self.stats['split'][split_cat]['obj'] += ann_count
+            if ann_count == 0:
+                self.stats['integrity']['imgs_no_lbl'].append(full_path)
+            unique_classes = sorted(list(set(classes_in_img)))
+            classes_str = ','.join([str(c) for c in unique_classes]) if unique_classes else 'None'
+            self.detailed_files.append({'name': f, 'res': f'{width}x{height}', 'fmt': str(img_format), 'mode': str(img_mode), 'size_kb': f'{size_kb:.2f}', 'created': created_dt, 'mod': mod_dt, 'attrs': attrs, 'anns': ann_count, 'classes': classes_str, 'path': full_path})
+        except Exception as e:
+            self.detailed_files.append({'name': f, 'res': 'ERROR', 'path': full_path + f' [Error: {str(e)}]'})
+
+    def run(self, progress=None, progress_interval=0.5):
+        all_images_bases = set()
+        image_entries = self.collect_image_entries()
+        total_entries = len(image_entries)
+        started_at = time.monotonic()
+        last_emit = started_at
+        if progress:
+            progress(0, total_entries, started_at)
+        for processed, (r, f, split_cat, labels) in enumerate(self._iter_entry_labels(image_entries)):
+            now = time.monotonic()
+            if progress and processed and now - last_emit >= progress_interval:
+                last_emit = now
+                progress(processed, total_entries, started_at)
+            if self.cancel_event.is_set():
+                break
+            all_images_bases.add(os.path.splitext(f)[0])
+            self._scan_image(r, f, split_cat, labels)
+        if self.cancel_event.is_set():
+            self.cancelled = True
+            logger.info(f'Análise cancelada após {self.stats['total_images']} de {total_entries} imagens.')
+            return False
+        if progress:
+            progress(total_entries, total_entries, started_at)
+        for r, (_, files) in self.directory_listing.items():
+            for f in files:
+                if f.lower().endswith('.txt') and f.lower() != 'classes.txt':
+                    base_name = os.path.splitext(f)[0]
+                    if base_name not in all_images_bases:
+                        self.stats['integrity']['lbls_no_img'].append(os.path.join(r, f))
+        return True
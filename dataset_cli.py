@@ -0,0 +1,384 @@
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+from pathlib import Path
+from typing import List, Optional
+import dataset_coco
+import dataset_dedup
+import dataset_ops
+import dataset_pack
+import dataset_query
+import dataset_split
+import dataset_validation
+from copy_engine import LINK_MODES
+from dataset_analysis import SPLIT_KEYS, DatasetScan
+from dataset_export import EXPORT_FORMATS, export_analysis
+from managers import DatasetUtils, SplitCollisionError
+from operation_journal import JournalError
+logger = logging.getLogger(__name__)
+
+EXIT_OK = 0
+EXIT_ISSUES = 1
+EXIT_USAGE = 2
+EXIT_FAILURE = 3
+
+
+class CommandError(Exception):
+    pass
+
+
+def _require_dataset_dir(path: str) -> str:
+    if not os.path.isdir(path):
+        raise CommandError(f'Diretório não encontrado: {path}')
+    return os.path.abspath(path)
+
+
+def _parse_id_map(pairs: List[str]) -> dict:
+    id_map = {}
+    for pair in pairs:
+        try:
+            old_id, new_id = pair.split(':', 1)
+            id_map[int(old_id)] = int(new_id)
+        except ValueError:
+            raise CommandError(f'Mapeamento inválido (use ANTIGO:NOVO): {pair}')
+    return id_map
+
+
+def cmd_analyze(args) -> tuple:
+    base_dir = _require_dataset_dir(args.dataset)
+    class_names = dataset_ops.load_class_names(base_dir)
+    scan = DatasetScan(base_dir)
+    scan.run()
+    stats = scan.stats
+    result = {
+        'dataset': base_dir,
+        'total_images': stats['total_images'],
+        'total_objects': stats['total_objects'],
+        'types': stats['types'],
+        'split': stats['split'],
+        'classes': {
+            (class_names[cid] if 0 <= cid < len(class_names) else f'ID {cid}'): count
+            for cid, count in sorted(stats['counts'].items())
+        },
+        'images_without_labels': len(stats['integrity']['imgs_no_lbl']),
+        'labels_without_images': len(stats['integrity']['lbls_no_img']),
+        'unreadable_images': sum(1 for item in scan.detailed_files if item['res'] == 'ERROR'),
+    }
+    if args.export_dir:
+        result['exported'] = export_analysis(args.export_dir, scan.detailed_files, stats, class_names, formats=args.formats)
+    result['split_source'] = scan.split_resolver.source
+    if args.leakage:
+        split_paths = {split: paths for split, paths in scan.split_paths.items() if split != 'uncategorized' and paths}
+        report = dataset_dedup.find_split_leakage(base_dir, split_paths, near=not args.exact_only, progress=_log_progress)
+        result['leakage'] = {
+            'summary': report.summary(),
+            'by_pair': report.by_pair(),
+            'clusters': [{'kind': cluster.kind, 'splits': list(cluster.splits), 'paths': list(cluster.paths)} for cluster in report.clusters],
+        }
+        return (result, EXIT_ISSUES if report.clusters else EXIT_OK)
+    return (result, EXIT_OK)
+
+
+def cmd_split(args) -> tuple:
+    base_dir = _require_dataset_dir(args.dataset)
+    if abs(args.train + args.val + args.test - 1.0) > 1e-06:
+        raise CommandError('As proporções train/val/test devem somar 1.0')
+    if args.seed is not None:
+        random.seed(args.seed)
+    if args.rollback:
+        return ({'dataset': base_dir, 'restored': DatasetUtils.rollback_split(base_dir)}, EXIT_OK)
+    if args.stratify or args.group != 'none' or args.group_pattern or args.dry_run:
+        options = dataset_split.SplitOptions(stratify=args.stratify, group_mode=args.group, group_pattern=args.group_pattern, seed=args.seed, shuffle=not args.no_shuffle)
+        plan = dataset_split.plan_split(dataset_split.scan_split_items(base_dir), (args.train, args.val, args.test), options)
+        class_names = dataset_ops.load_class_names(base_dir)
+        preview = {
+            'images': dict(zip(plan.split_names, plan.image_counts.tolist())),
+            'groups': plan.group_count,
+            'classes': {name: dict(zip(plan.split_names, counts)) for _, name, *counts in plan.preview_rows(class_names)},
+        }
+        if args.dry_run:
+            preview['moves'] = sum(len(action['moves']) for action in DatasetUtils.plan_split_moves(base_dir, plan.assignments()))
+            return ({'dataset': base_dir, 'dry_run': True, 'preview': preview}, EXIT_OK)
+        counts = DatasetUtils.apply_split(base_dir, plan.assignments())
+        errors = counts.pop('errors', [])
+        return ({'dataset': base_dir, 'split': counts, 'preview': preview, 'errors': errors}, EXIT_ISSUES if errors else EXIT_OK)
+    counts = DatasetUtils.split_dataset(base_dir=base_dir, train_ratio=args.train, val_ratio=args.val, test_ratio=args.test, shuffle=not args.no_shuffle)
+    errors = counts.pop('errors', [])
+    return ({'dataset': base_dir, 'split': counts, 'errors': errors}, EXIT_ISSUES if errors else EXIT_OK)
+
+
+def _log_progress(done: int, total: int) -> None:
+    logger.info(f'{done}/{total}')
+
+
+def cmd_copy(args) -> tuple:
+    if args.resume or args.rollback:
+        target_dir = Path(args.dataset).resolve()
+        if args.rollback:
+            dataset_ops.rollback_copy(target_dir)
+            return ({'target': str(target_dir), 'rolled_back': True}, EXIT_OK)
+        copied_count, errors = dataset_ops.resume_copy(target_dir, progress=_log_progress, workers=args.workers)
+        return ({'target': str(target_dir), 'copied': copied_count, 'errors': errors}, EXIT_ISSUES if errors else EXIT_OK)
+    base_dir = _require_dataset_dir(args.dataset)
+    options = dataset_ops.DatasetCopyOptions(
+        remove_missing_labels=args.remove_missing_labels,
+        remove_empty_labels=args.remove_empty_labels,
+        reduce_percentage=args.reduce,
+        link_mode=args.link,
+        remove_duplicates=args.remove_duplicates,
+    )
+    rng = random.Random(args.seed) if args.seed is not None else random
+    image_paths = dataset_ops.list_dataset_images(base_dir)
+    total_images = len(image_paths)
+    if args.query:
+        try:
+            query = dataset_query.parse_query(args.query, dataset_ops.load_class_names(base_dir))
+        except dataset_query.QueryError as exc:
+            raise CommandError(str(exc))
+        image_paths = query.select(dataset_query.build_image_summary(base_dir, image_paths))
+    duplicate_groups = ()
+    if args.remove_duplicates:
+        report = dataset_dedup.find_duplicates(base_dir, image_paths, near=not args.exact_only, workers=args.workers or dataset_dedup.READ_WORKERS, progress=_log_progress)
+        duplicate_groups = [cluster.paths for cluster in report.clusters]
+    plan = dataset_ops.build_copy_plan(image_paths, options, rng=rng, total_images=total_images, duplicate_groups=duplicate_groups)
+    result = {
+        'dataset': base_dir,
+        'total_images': plan.total_images,
+        'removed_missing_labels': plan.removed_missing_labels,
+        'removed_empty_labels': plan.removed_empty_labels,
+        'removed_by_reduction': plan.removed_by_reduction,
+        'removed_by_filter': plan.removed_by_filter,
+        'removed_duplicates': plan.removed_duplicates,
+        'copied': 0,
+        'target': None,
+        'errors': [],
+    }
+    if plan.removed_total <= 0 or plan.copied_count <= 0:
+        return (result, EXIT_OK)
+    target_dir = dataset_ops.build_copy_directory(base_dir, options, plan)
+    if args.output:
+        target_dir = Path(args.output).resolve()
+    copied_count, errors = dataset_ops.copy_dataset_files(base_dir, list(plan.images_to_copy), target_dir, progress=_log_progress, workers=args.workers, link_mode=options.link_mode)
+    result.update(copied=copied_count, target=str(target_dir), errors=errors)
+    return (result, EXIT_ISSUES if errors else EXIT_OK)
+
+
+def cmd_remap(args) -> tuple:
+    base_dir = _require_dataset_dir(args.dataset)
+    class_names = dataset_ops.load_class_names(base_dir)
+    new_names = [name.strip() for name in args.names.split(',') if name.strip()]
+    if args.map:
+        id_map = _parse_id_map(args.map)
+    else:
+        id_map = {idx: idx for idx in range(min(len(class_names), len(new_names)))}
+    invalid = [new_id for new_id in id_map.values() if not 0 <= new_id < len(new_names)]
+    if invalid:
+        raise CommandError(f'IDs de destino fora da nova lista de classes: {invalid}')
+    try:
+        dataset_ops.remap_classes(base_dir, class_names, id_map, new_names)
+    except ValueError as exc:
+        return ({'dataset': base_dir, 'error': str(exc)}, EXIT_ISSUES)
+    return ({'dataset': base_dir, 'classes': new_names, 'id_map': {str(k): v for k, v in id_map.items()}}, EXIT_OK)
+
+
+def cmd_validate(args) -> tuple:
+    base_dir = _require_dataset_dir(args.dataset)
+    report = dataset_validation.validate_dataset(base_dir, args.classes, workers=args.workers or dataset_validation.DEFAULT_WORKERS, progress=_log_progress)
+    result = {
+        'dataset': base_dir,
+        'files_checked': report.files_checked,
+        'objects_checked': report.objects_checked,
+        'issue_count': len(report.issues),
+        'summary': report.summary(),
+        'issues': list(report.issues),
+    }
+    if args.fix:
+        files_changed, lines_changed, errors = dataset_validation.apply_fixes(report, args.fix)
+        report = dataset_validation.validate_dataset(base_dir, args.classes, workers=args.workers or dataset_validation.DEFAULT_WORKERS)
+        result.update(
+            fixed={'actions': args.fix, 'files': files_changed, 'lines': lines_changed, 'errors': errors},
+            remaining_issue_count=len(report.issues),
+            remaining_summary=report.summary(),
+        )
+    return (result, EXIT_ISSUES if report.issues else EXIT_OK)
+
+
+def cmd_coco_export(args) -> tuple:
+    base_dir = _require_dataset_dir(args.dataset)
+    output = args.output or os.path.join(base_dir, 'annotations.coco.json')
+    result = dataset_coco.export_coco(base_dir, output, workers=args.workers or dataset_coco.COCO_WORKERS, progress=_log_progress)
+    return ({
+        'dataset': base_dir,
+        'output': result.path,
+        'images': result.images,
+        'annotations': result.annotations,
+        'categories': result.categories,
+        'errors': list(result.errors),
+    }, EXIT_ISSUES if result.errors else EXIT_OK)
+
+
+def cmd_coco_import(args) -> tuple:
+    if not os.path.isfile(args.json):
+        raise CommandError(f'Arquivo COCO não encontrado: {args.json}')
+    images_dir = _require_dataset_dir(args.images)
+    try:
+        result = dataset_coco.import_coco(
+            args.json,
+            images_dir,
+            labels_dir=args.labels,
+            use_segments=not args.boxes_only,
+            include_crowd=args.include_crowd,
+            write_classes=not args.no_classes,
+            workers=args.workers or dataset_coco.COCO_WORKERS,
+            progress=_log_progress,
+        )
+    except dataset_coco.CocoFormatError as exc:
+        raise CommandError(str(exc))
+    return ({
+        'json': os.path.abspath(args.json),
+        'labels_dir': os.path.abspath(args.labels or dataset_coco.default_labels_dir(images_dir)),
+        'images': result.images,
+        'annotations': result.annotations,
+        'skipped': result.skipped,
+        'labels_written': result.labels_written,
+        'classes': list(result.class_names),
+        'errors': list(result.errors),
+    }, EXIT_ISSUES if result.errors else EXIT_OK)
+
+
+def cmd_pack(args) -> tuple:
+    base_dir = _require_dataset_dir(args.dataset)
+    packs = dataset_pack.export_split_packs(base_dir, args.output, splits=args.splits, workers=args.workers or dataset_pack.PACK_WORKERS, progress=_log_progress)
+    if not packs:
+        raise CommandError(f'Nenhuma imagem encontrada para empacotar em: {base_dir}')
+    return ({
+        'dataset': base_dir,
+        'packs': packs,
+    }, EXIT_ISSUES if any(pack['errors'] for pack in packs.values()) else EXIT_OK)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='dataset_cli', description='Operações de dataset YOLO sem interface gráfica.')
+    parser.add_argument('--format', choices=('json', 'text'), default='json', help='formato da saída (padrão: json)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='exibe logs no stderr')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    analyze = sub.add_parser('analyze', help='estatísticas e integridade do dataset')
+    analyze.add_argument('dataset')
+    analyze.add_argument('--export-dir', help='exporta registros e estatísticas para esta pasta')
+    analyze.add_argument('--leakage', action='store_true', help='procura imagens repetidas (exatas, quase idênticas ou de mesmo nome) entre train/val/test')
+    analyze.add_argument('--exact-only', action='store_true', help='com --leakage, ignora quase duplicatas')
+    analyze.add_argument('--formats', type=lambda value: tuple(part for part in value.split(',') if part), default=EXPORT_FORMATS, help='formatos de exportação separados por vírgula (csv,jsonl,npz)')
+    analyze.set_defaults(handler=cmd_analyze)
+
+    split = sub.add_parser('split', help='divide o dataset em train/valid/test')
+    split.add_argument('dataset')
+    split.add_argument('--train', type=float, default=0.7)
+    split.add_argument('--val', type=float, default=0.2)
+    split.add_argument('--test', type=float, default=0.1)
+    split.add_argument('--no-shuffle', action='store_true')
+    split.add_argument('--seed', type=int)
+    split.add_argument('--stratify', action='store_true', help='estratificação multi-rótulo por contagem de classes')
+    split.add_argument('--group', choices=dataset_split.GROUP_MODES, default='none', help='mantém grupos (prefixo do arquivo ou pasta) no mesmo split')
+    split.add_argument('--group-pattern', help='regex aplicada ao nome do arquivo; o 1º grupo (ou o match) é a chave do grupo')
+    split.add_argument('--dry-run', action='store_true', help='apenas mostra a distribuição prevista por classe')
+    split.add_argument('--rollback', action='store_true', help='desfaz o último split (concluído ou interrompido) usando o journal')
+    split.set_defaults(handler=cmd_split)
+
+    copy = sub.add_parser('copy', help='cria uma cópia filtrada e/ou reduzida')
+    copy.add_argument('dataset')
+    copy.add_argument('--remove-missing-labels', action='store_true')
+    copy.add_argument('--remove-empty-labels', action='store_true')
+    copy.add_argument('--reduce', type=int, default=0, metavar='PCT', help='percentual de imagens removidas aleatoriamente')
+    copy.add_argument('--output', help='pasta de destino (padrão: ao lado do dataset)')
+    copy.add_argument('--seed', type=int)
+    copy.add_argument('--query', help='copia apenas as imagens que atendem ao filtro (ex.: "class:7 objects>50")')
+    copy.add_argument('--remove-duplicates', action='store_true', help='mantém só uma imagem por grupo de duplicatas (exatas e quase idênticas)')
+    copy.add_argument('--exact-only', action='store_true', help='com --remove-duplicates, considera apenas cópias byte a byte')
+    copy.add_argument('--link', choices=LINK_MODES, default='copy', help='como materializar as imagens (labels sempre são copiados)')
+    copy.add_argument('--resume', action='store_true', help='DATASET é a pasta de uma cópia interrompida; continua a partir do journal')
+    copy.add_argument('--rollback', action='store_true', help='DATASET é a pasta de uma cópia interrompida; apaga a cópia parcial')
+    copy.add_argument('--workers', type=int, help='threads de cópia (padrão: automático)')
+    copy.set_defaults(handler=cmd_copy)
+
+    remap = sub.add_parser('remap', help='renomeia/reordena/remove classes e reescreve os labels')
+    remap.add_argument('dataset')
+    remap.add_argument('--names', required=True, help='nova lista de classes separada por vírgula')
+    remap.add_argument('--map', action='append', default=[], metavar='ANTIGO:NOVO', help='mapeamento de ID (repetível); IDs omitidos são removidos')
+    remap.set_defaults(handler=cmd_remap)
+
+    validate = sub.add_parser('validate', help='verifica labels malformados e arquivos órfãos')
+    validate.add_argument('dataset')
+    validate.add_argument('--classes', type=int, help='quantidade de classes (padrão: classes.txt/data.yaml)')
+    validate.add_argument('--fix', action='append', choices=dataset_validation.FIX_ACTIONS, help='corrige automaticamente (repita para combinar: clip, drop_degenerate, dedup)')
+    validate.add_argument('--workers', type=int, help='processos de validação (padrão: automático)')
+    validate.set_defaults(handler=cmd_validate)
+
+    coco_export = sub.add_parser('coco-export', help='exporta o dataset para um JSON COCO (gravação incremental)')
+    coco_export.add_argument('dataset')
+    coco_export.add_argument('--output', help='arquivo de saída (padrão: DATASET/annotations.coco.json)')
+    coco_export.add_argument('--workers', type=int, help='threads de leitura (padrão: automático)')
+    coco_export.set_defaults(handler=cmd_coco_export)
+
+    coco_import = sub.add_parser('coco-import', help='converte um JSON COCO em labels YOLO')
+    coco_import.add_argument('json')
+    coco_import.add_argument('images', help='pasta das imagens referenciadas pelo JSON')
+    coco_import.add_argument('--labels', help='pasta dos labels (padrão: labels/ ao lado de images/)')
+    coco_import.add_argument('--boxes-only', action='store_true', help='ignora segmentações e grava apenas caixas')
+    coco_import.add_argument('--include-crowd', action='store_true', help='importa também anotações iscrowd')
+    coco_import.add_argument('--no-classes', action='store_true', help='não grava classes.txt/data.yaml')
+    coco_import.add_argument('--workers', type=int, help='threads de escrita (padrão: automático)')
+    coco_import.set_defaults(handler=cmd_coco_import)
+
+    pack = sub.add_parser('pack', help='empacota os labels de cada split em um arquivo binário mapeável (treino)')
+    pack.add_argument('dataset')
+    pack.add_argument('--output', help='pasta de saída (padrão: DATASET/packed)')
+    pack.add_argument('--splits', nargs='+', choices=SPLIT_KEYS, help='splits a empacotar (padrão: todos com imagens)')
+    pack.add_argument('--workers', type=int, help='threads de leitura (padrão: automático)')
+    pack.set_defaults(handler=cmd_pack)
+    return parser
+
+
+def _write_text(payload, stream, indent=0):
+    pad = '  ' * indent
+    for key, value in payload.items():
+        if isinstance(value, dict):
+            stream.write(f'{pad}{key}:\n')
+            _write_text(value, stream, indent + 1)
+        elif isinstance(value, list):
+            stream.write(f'{pad}{key}: {len(value)}\n')
+            for item in value:
+                stream.write(f'{pad}  - {json.dumps(item, ensure_ascii=False) if isinstance(item, dict) else item}\n')
+        else:
+            stream.write(f'{pad}{key}: {value}\n')
+
+
+def main(argv: Optional[List[str]] = None, stdout=None) -> int:
+    stdout = stdout or sys.stdout
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as exc:
+        return EXIT_USAGE if exc.code else EXIT_OK
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, stream=sys.stderr)
+    try:
+        payload, code = args.handler(args)
+    except (CommandError, JournalError, SplitCollisionError) as exc:
+        payload, code = ({'error': str(exc)}, EXIT_USAGE)
+    except Exception as exc:
+        logger.exception(f'Falha ao executar {args.command}')
+        payload, code = ({'error': str(exc)}, EXIT_FAILURE)
+    payload = {'command': args.command, 'exit_code': code, **payload}
+    if args.format == 'json':
+        json.dump(payload, stdout, ensure_ascii=False, indent=2)
+        stdout.write('\n')
+    else:
+        _write_text(payload, stdout)
+    return code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
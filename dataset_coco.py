@@ -0,0 +1,344 @@
+import os
+import re
+import json
+import codecs
+import shutil
+import tempfile
+import datetime
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+from dataset_index import ClassIndex
+from dataset_ops import list_dataset_images, load_class_names, write_class_catalog
+from image_metadata import read_image_size
+from managers import AnnotationManager
+logger = logging.getLogger(__name__)
+
+COCO_CHUNK_SIZE = 1 << 20
+EXPORT_BATCH = 512
+COCO_SHARDS = 64
+COCO_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class CocoFormatError(ValueError):
+    pass
+
+
+class JsonStream:
+
+    def __init__(self, handle, chunk_size: int = COCO_CHUNK_SIZE, on_read: Optional[Callable[[int], None]] = None):
+        self.handle = handle
+        self.chunk_size = chunk_size
+        self.on_read = on_read
+        self.buffer = ''
+        self.pos = 0
+        self.bytes_read = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.handle.read(self.chunk_size)
+        self.bytes_read += len(chunk)
+        text = self.text_decoder.decode(chunk, final=not chunk)
+        if not chunk:
+            self.eof = True
+            if not text:
+                return False
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        if self.on_read:
+            self.on_read(self.bytes_read)
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise CocoFormatError(f'JSON inválido: esperado "{char}" na posição {self.pos}')
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as exc:
+                if self._fill():
+                    continue
+                raise CocoFormatError(f'JSON inválido: {exc}')
+            if end >= len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def iter_array(self) -> Iterator:
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise CocoFormatError(f'JSON inválido: esperado "," ou "]" na posição {self.pos - 1}')
+
+    def iter_object(self, array_keys: Sequence[str]) -> Iterator[Tuple[str, object]]:
+        remaining = set(array_keys)
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while remaining:
+            key = self.value()
+            self.expect(':')
+            if self.peek() == '[':
+                for item in self.iter_array():
+                    if key in remaining:
+                        yield (key, item)
+                remaining.discard(key)
+            else:
+                self.value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise CocoFormatError(f'JSON inválido: esperado "," ou "}}" na posição {self.pos - 1}')
+
+
+def iter_coco_arrays(json_path: str, array_keys: Sequence[str], chunk_size: int = COCO_CHUNK_SIZE, progress: Optional[Callable[[int, int], None]] = None) -> Iterator[Tuple[str, object]]:
+    total = os.path.getsize(json_path)
+    on_read = (lambda done: progress(done, total)) if progress else None
+    with open(json_path, 'rb') as handle:
+        yield from JsonStream(handle, chunk_size, on_read).iter_object(array_keys)
+
+
+def _polygon_area(points: Sequence[Tuple[float, float]]) -> float:
+    area = 0.0
+    for index, (x1, y1) in enumerate(points):
+        x2, y2 = points[index - 1]
+        area += x2 * y1 - x1 * y2
+    return abs(area) / 2
+
+
+def _image_record(base_dir: str, image_path: str) -> Tuple[Optional[dict], List[dict], Optional[str]]:
+    size = read_image_size(image_path)
+    if size is None:
+        return (None, [], f'{os.path.basename(image_path)}: tamanho da imagem ilegível')
+    record = {'file_name': os.path.relpath(image_path, base_dir).replace(os.sep, '/'), 'width': size[0], 'height': size[1]}
+    label_path = AnnotationManager.get_label_path(image_path)
+    annotations, error = AnnotationManager.load_annotations(label_path, size)
+    if error:
+        return (record, [], f'{os.path.basename(label_path)}: {error}')
+    objects = []
+    for ann in annotations:
+        x1, y1, x2, y2 = ann['rect_orig']
+        obj = {
+            'category_id': ann['class_id'] + 1,
+            'bbox': [round(x1, 2), round(y1, 2), round(x2 - x1, 2), round(y2 - y1, 2)],
+            'area': round((x2 - x1) * (y2 - y1), 2),
+            'iscrowd': 0,
+        }
+        if ann['type'] == 'polygon':
+            obj['segmentation'] = [[round(value, 2) for point in ann['points'] for value in point]]
+            obj['area'] = round(_polygon_area(ann['points']), 2)
+        objects.append(obj)
+    return (record, objects, None)
+
+
+@dataclass(frozen=True)
+class CocoExportResult:
+    path: str
+    images: int
+    annotations: int
+    categories: int
+    errors: Tuple[str, ...] = ()
+
+
+def export_coco(base_dir: str, output_path: str, image_paths: Optional[Sequence[str]] = None, workers: int = COCO_WORKERS, progress: Optional[Callable[[int, int], None]] = None) -> CocoExportResult:
+    base_dir = os.path.abspath(base_dir)
+    image_paths = list_dataset_images(base_dir) if image_paths is None else list(image_paths)
+    class_names = load_class_names(base_dir)
+    index = ClassIndex.open(base_dir)
+    class_count = max([len(class_names)] + [class_id + 1 for class_id in index.classes])
+    categories = [
+        {'id': class_id + 1, 'name': class_names[class_id] if class_id < len(class_names) else f'class_{class_id}', 'supercategory': 'none'}
+        for class_id in range(class_count)
+    ]
+    output_path = os.path.abspath(output_path)
+    output_dir = os.path.dirname(output_path)
+    os.makedirs(output_dir, exist_ok=True)
+    errors = []
+    annotation_id = 0
+    image_id = 0
+    info = {'description': os.path.basename(base_dir), 'date_created': datetime.datetime.now().isoformat(timespec='seconds')}
+    with tempfile.TemporaryFile('w+', encoding='utf-8', dir=output_dir) as annotations_file, \
+            open(output_path, 'w', encoding='utf-8') as out:
+        out.write('{"info": ')
+        out.write(json.dumps(info, ensure_ascii=False))
+        out.write(',\n"categories": ')
+        out.write(json.dumps(categories, ensure_ascii=False))
+        out.write(',\n"images": [')
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='coco-export') as executor:
+            for batch_start in range(0, len(image_paths), EXPORT_BATCH):
+                batch = image_paths[batch_start:batch_start + EXPORT_BATCH]
+                for record, objects, error in executor.map(lambda path: _image_record(base_dir, path), batch):
+                    if error:
+                        errors.append(error)
+                    if record is None:
+                        continue
+                    image_id += 1
+                    record['id'] = image_id
+                    out.write(',\n' if image_id > 1 else '\n')
+                    out.write(json.dumps(record, ensure_ascii=False))
+                    for obj in objects:
+                        annotation_id += 1
+                        obj['id'] = annotation_id
+                        obj['image_id'] = image_id
+                        annotations_file.write(',\n' if annotation_id > 1 else '\n')
+                        annotations_file.write(json.dumps(obj))
+                if progress:
+                    progress(min(batch_start + EXPORT_BATCH, len(image_paths)), len(image_paths))
+        out.write('\n],\n"annotations": [')
+        annotations_file.seek(0)
+        shutil.copyfileobj(annotations_file, out, COCO_CHUNK_SIZE)
+        out.write('\n]}\n')
+    logger.info(f'COCO exportado em {output_path}: {image_id} imagem(ns), {annotation_id} anotação(ões).')
+    return CocoExportResult(output_path, image_id, annotation_id, len(categories), tuple(errors))
+
+
+@dataclass(frozen=True)
+class CocoImportResult:
+    images: int
+    annotations: int
+    skipped: int
+    labels_written: int
+    class_names: Tuple[str, ...]
+    errors: Tuple[str, ...] = ()
+
+
+def default_labels_dir(images_dir: str) -> str:
+    images_dir = os.path.abspath(images_dir)
+    if os.path.basename(images_dir).casefold() == 'images':
+        return os.path.join(os.path.dirname(images_dir), 'labels')
+    return images_dir
+
+
+def _coco_to_yolo(ann: dict, class_id: int, size: Tuple[int, int], use_segments: bool) -> Optional[str]:
+    if size[0] <= 0 or size[1] <= 0:
+        return None
+    segmentation = ann.get('segmentation')
+    if use_segments and isinstance(segmentation, list) and segmentation:
+        polygon = max(segmentation, key=len) if isinstance(segmentation[0], list) else segmentation
+        if len(polygon) >= 6:
+            points = list(zip(polygon[0::2], polygon[1::2]))
+            return AnnotationManager.convert_poly_to_yolo(class_id, points, size)
+    img_w, img_h = size
+    try:
+        x, y, w, h = ann['bbox']
+        x1 = x if x > 0 else 0.0
+        y1 = y if y > 0 else 0.0
+        x2 = x + w if x + w < img_w else img_w
+        y2 = y + h if y + h < img_h else img_h
+        if w <= 0 or h <= 0 or x2 <= x1 or y2 <= y1:
+            return None
+    except (KeyError, TypeError, ValueError):
+        return None
+    return AnnotationManager.convert_box_to_yolo(class_id, [x1, y1, x2, y2], size)
+
+
+def _write_shard(shard_path: str, label_paths: List[str]) -> Tuple[set, List[str]]:
+    grouped = {}
+    with open(shard_path, 'r', encoding='utf-8') as shard:
+        for record in shard:
+            index, line = record.split('\t', 1)
+            grouped.setdefault(int(index), []).append(line)
+    errors = []
+    for index, lines in grouped.items():
+        label_path = label_paths[index]
+        try:
+            os.makedirs(os.path.dirname(label_path), exist_ok=True)
+            with open(label_path, 'w', encoding='utf-8') as f:
+                f.write(''.join(lines))
+        except OSError as exc:
+            errors.append(f'{os.path.basename(label_path)}: {exc}')
+    return (set(grouped), errors)
+
+
+def _write_empty_labels(label_paths: Sequence[str]) -> List[str]:
+    errors = []
+    for label_path in label_paths:
+        try:
+            os.makedirs(os.path.dirname(label_path), exist_ok=True)
+            open(label_path, 'w', encoding='utf-8').close()
+        except OSError as exc:
+            errors.append(f'{os.path.basename(label_path)}: {exc}')
+    return errors
+
+
+def import_coco(json_path: str, images_dir: str, labels_dir: Optional[str] = None, use_segments: bool = True, include_crowd: bool = False, write_classes: bool = True, workers: int = COCO_WORKERS, progress: Optional[Callable[[int, int], None]] = None) -> CocoImportResult:
+    labels_dir = os.path.abspath(labels_dir or default_labels_dir(images_dir))
+    images = {}
+    label_paths = []
+    categories = {}
+    for key, item in iter_coco_arrays(json_path, ('images', 'categories')):
+        if key == 'images':
+            stem = os.path.splitext(str(item['file_name']).replace('\\', '/'))[0]
+            parts = [part for part in stem.split('/') if part not in ('', '.', '..')]
+            images[item['id']] = (len(label_paths), (int(item['width']), int(item['height'])))
+            label_paths.append(os.path.join(labels_dir, *parts) + '.txt')
+        else:
+            categories[item['id']] = str(item.get('name', item['id']))
+    category_ids = sorted(categories)
+    class_map = {category_id: class_id for class_id, category_id in enumerate(category_ids)}
+    class_names = tuple(categories[category_id] for category_id in category_ids)
+
+    os.makedirs(labels_dir, exist_ok=True)
+    errors = []
+    imported = 0
+    skipped = 0
+    touched = set()
+    with tempfile.TemporaryDirectory(prefix='.coco-import-', dir=labels_dir) as spill_dir:
+        shard_paths = [os.path.join(spill_dir, f'{shard}.tsv') for shard in range(COCO_SHARDS)]
+        shards = [open(path, 'w', encoding='utf-8') for path in shard_paths]
+        try:
+            for _key, ann in iter_coco_arrays(json_path, ('annotations',), progress=progress):
+                image = images.get(ann.get('image_id'))
+                class_id = class_map.get(ann.get('category_id'))
+                if image is None or class_id is None or (ann.get('iscrowd') and not include_crowd):
+                    skipped += 1
+                    continue
+                line = _coco_to_yolo(ann, class_id, image[1], use_segments)
+                if line is None:
+                    skipped += 1
+                    continue
+                shards[image[0] % COCO_SHARDS].write(f'{image[0]}\t{line}\n')
+                imported += 1
+        finally:
+            for shard in shards:
+                shard.close()
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='coco-labels') as executor:
+            for written, shard_errors in executor.map(lambda path: _write_shard(path, label_paths), shard_paths):
+                touched.update(written)
+                errors.extend(shard_errors)
+
+    empty = [label_path for index, label_path in enumerate(label_paths) if index not in touched]
+    errors.extend(_write_empty_labels(empty))
+    if write_classes and class_names:
+        write_class_catalog(os.path.dirname(labels_dir) if os.path.basename(labels_dir).casefold() == 'labels' else labels_dir, list(class_names))
+    logger.info(f'COCO importado de {json_path}: {imported} anotação(ões) em {len(images)} imagem(ns), {skipped} ignorada(s).')
+    return CocoImportResult(len(images), imported, skipped, len(label_paths), class_names, tuple(errors))
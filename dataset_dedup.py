@@ -0,0 +1,363 @@
+import os
+import marshal
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from PIL import Image
+from dataset_index import INDEX_DIR_NAME
+logger = logging.getLogger(__name__)
+
+HASH_FORMAT = 1
+HASH_FILE_NAME = 'image_hashes.marshal'
+HASH_CHUNK_SIZE = 1 << 20
+HASH_BITS = 64
+DHASH_SIZE = 8
+PHASH_SIZE = 32
+PHASH_LOW = 8
+DEFAULT_NEAR_THRESHOLD = 6
+DEFAULT_PHASH_THRESHOLD = 12
+PAIR_BLOCK = 2048
+READ_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+
+
+def _dct_matrix(size: int) -> np.ndarray:
+    k = np.arange(size)
+    matrix = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * size)) * np.sqrt(2.0 / size)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+DCT_MATRIX = _dct_matrix(PHASH_SIZE)
+
+
+def content_hash(path: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    digest = hashlib.sha256()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, 'rb', buffering=0) as handle:
+        while True:
+            read = handle.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+    return digest.hexdigest()
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(bits.astype(np.uint8)).tobytes(), 'big')
+
+
+def perceptual_hashes(path: str) -> Tuple[int, int]:
+    with Image.open(path) as image:
+        image.draft('L', (PHASH_SIZE * 4, PHASH_SIZE * 4))
+        gray = image.convert('L')
+    small = np.asarray(gray.resize((PHASH_SIZE, PHASH_SIZE), Image.Resampling.BILINEAR), dtype=np.float64)
+    tiny = np.asarray(gray.resize((DHASH_SIZE + 1, DHASH_SIZE), Image.Resampling.BILINEAR), dtype=np.int16)
+    dhash = _bits_to_int((tiny[:, 1:] > tiny[:, :-1]).ravel())
+    low = (DCT_MATRIX @ small @ DCT_MATRIX.T)[:PHASH_LOW, :PHASH_LOW].ravel()
+    phash = _bits_to_int(low > np.median(low[1:]))
+    return (dhash, phash)
+
+
+class HashIndex:
+
+    def __init__(self, base_dir: str, index_path: Optional[str] = None):
+        self.base_dir = os.path.abspath(base_dir)
+        self.index_path = index_path or os.path.join(self.base_dir, INDEX_DIR_NAME, HASH_FILE_NAME)
+        self.files = {}
+        self.dirty = False
+        self.lock = threading.Lock()
+
+    def load(self) -> bool:
+        try:
+            with open(self.index_path, 'rb') as f:
+                data = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return False
+        if not isinstance(data, dict) or data.get('format') != HASH_FORMAT or data.get('base_dir') != self.base_dir:
+            return False
+        self.files = data['files']
+        return True
+
+    def save(self):
+        tmp_path = self.index_path + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            with self.lock:
+                with open(tmp_path, 'wb') as f:
+                    marshal.dump({'format': HASH_FORMAT, 'base_dir': self.base_dir, 'files': self.files}, f)
+            os.replace(tmp_path, self.index_path)
+            self.dirty = False
+        except OSError as exc:
+            logger.warning(f'Não foi possível salvar o índice de hashes em {self.index_path}: {exc}')
+
+    def _key(self, path: str) -> str:
+        return os.path.relpath(path, self.base_dir)
+
+    def _entry(self, path: str) -> Optional[list]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        entry = self.files.get(self._key(path))
+        if entry is None or entry[0] != st.st_mtime_ns or entry[1] != st.st_size:
+            entry = [st.st_mtime_ns, st.st_size, None, None, None]
+            with self.lock:
+                self.files[self._key(path)] = entry
+                self.dirty = True
+        return entry
+
+    def _fill(self, path: str, entry: list, need_content: bool, need_perceptual: bool) -> Optional[str]:
+        try:
+            if need_content and entry[2] is None:
+                entry[2] = content_hash(path)
+                self.dirty = True
+            if need_perceptual and entry[3] is None:
+                entry[3], entry[4] = perceptual_hashes(path)
+                self.dirty = True
+        except (OSError, ValueError, Image.DecompressionBombError) as exc:
+            return f'{os.path.basename(path)}: {exc}'
+        return None
+
+    def compute(self, image_paths: Sequence[str], need_content: Sequence[bool], need_perceptual: bool, workers: int = READ_WORKERS, cancel_event: Optional[threading.Event] = None, progress: Optional[Callable[[int, int], None]] = None) -> Tuple[List[Optional[list]], List[str]]:
+        entries = [self._entry(path) for path in image_paths]
+        todo = [
+            index for index, entry in enumerate(entries)
+            if entry is not None and ((need_content[index] and entry[2] is None) or (need_perceptual and entry[3] is None))
+        ]
+        errors = []
+        if todo:
+            def work(index):
+                if cancel_event is not None and cancel_event.is_set():
+                    return None
+                return self._fill(image_paths[index], entries[index], need_content[index], need_perceptual)
+            with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='image-hash') as executor:
+                for done, error in enumerate(executor.map(work, todo), start=1):
+                    if error:
+                        errors.append(error)
+                    if progress and (done % 256 == 0 or done == len(todo)):
+                        progress(done, len(todo))
+            logger.info(f'Hashes de imagem calculados para {len(todo)} arquivo(s).')
+        return (entries, errors)
+
+
+@dataclass(frozen=True)
+class DuplicateCluster:
+    kind: str
+    paths: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class DuplicateReport:
+    clusters: Tuple[DuplicateCluster, ...]
+    image_count: int
+    errors: Tuple[str, ...] = ()
+
+    def redundant_paths(self) -> List[str]:
+        return [path for cluster in self.clusters for path in cluster.paths[1:]]
+
+    def summary(self) -> Dict[str, int]:
+        summary = {'exact_clusters': 0, 'near_clusters': 0, 'redundant_images': len(self.redundant_paths())}
+        for cluster in self.clusters:
+            summary[f'{cluster.kind}_clusters'] += 1
+        return summary
+
+
+class _UnionFind:
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, item: int) -> int:
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def _hamming(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.bitwise_count(np.bitwise_xor(a, b))
+
+
+def _segment_pairs(dhashes: np.ndarray, phashes: np.ndarray, segment: np.ndarray, threshold: int, phash_threshold: int, query_mask: Optional[np.ndarray]) -> np.ndarray:
+    order = np.argsort(segment, kind='stable')
+    sorted_segment = segment[order]
+    starts = np.flatnonzero(np.r_[True, sorted_segment[1:] != sorted_segment[:-1]])
+    ends = np.r_[starts[1:], len(order)]
+    found = [np.empty((0, 2), dtype=np.int64)]
+    for start, end in zip(starts[ends - starts > 1].tolist(), ends[ends - starts > 1].tolist()):
+        members = np.sort(order[start:end])
+        member_dhashes = dhashes[members]
+        positions = np.arange(len(members)) if query_mask is None else np.flatnonzero(query_mask[members])
+        for block_start in range(0, len(positions), PAIR_BLOCK):
+            block = positions[block_start:block_start + PAIR_BLOCK]
+            first = int(block[0]) if query_mask is None else 0
+            close = _hamming(member_dhashes[block, None], member_dhashes[None, first:]) <= threshold
+            if np.count_nonzero(close) == len(block):
+                continue
+            left, right = np.divmod(np.flatnonzero(close), close.shape[1])
+            left = block[left]
+            right = right + first
+            keep = right > left if query_mask is None else right != left
+            left = members[left[keep]]
+            right = members[right[keep]]
+            keep = _hamming(phashes[left], phashes[right]) <= phash_threshold
+            found.append(np.column_stack((np.minimum(left[keep], right[keep]), np.maximum(left[keep], right[keep]))))
+    return np.concatenate(found)
+
+
+def near_pairs(dhashes: np.ndarray, phashes: np.ndarray, threshold: int = DEFAULT_NEAR_THRESHOLD, phash_threshold: int = DEFAULT_PHASH_THRESHOLD, query_mask: Optional[np.ndarray] = None, workers: int = 1) -> List[Tuple[int, int]]:
+    dhashes = np.asarray(dhashes, dtype=np.uint64)
+    phashes = np.asarray(phashes, dtype=np.uint64)
+    blocks = threshold + 1
+    segments = []
+    shift = HASH_BITS
+    for block in range(blocks):
+        width = HASH_BITS // blocks + (1 if block < HASH_BITS % blocks else 0)
+        shift -= width
+        segments.append((dhashes >> np.uint64(shift)) & np.uint64((1 << width) - 1))
+
+    def work(segment):
+        return _segment_pairs(dhashes, phashes, segment, threshold, phash_threshold, query_mask)
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, blocks), thread_name_prefix='near-pairs') as executor:
+            found = list(executor.map(work, segments))
+    else:
+        found = [work(segment) for segment in segments]
+    pairs = np.unique(np.concatenate(found), axis=0)
+    return list(zip(pairs[:, 0].tolist(), pairs[:, 1].tolist()))
+
+
+def _group_images(base_dir: str, image_paths: List[str], near: bool, threshold: int, workers: int, cancel_event: Optional[threading.Event], progress: Optional[Callable[[int, int], None]], query_mask: Optional[np.ndarray] = None) -> Tuple[List[Tuple[str, List[int]]], List[Optional[list]], List[str]]:
+    index = HashIndex(base_dir)
+    index.load()
+    sizes = []
+    for path in image_paths:
+        try:
+            sizes.append(os.path.getsize(path))
+        except OSError:
+            sizes.append(-1)
+    size_counts = {}
+    for size in sizes:
+        size_counts[size] = size_counts.get(size, 0) + 1
+    need_content = [size >= 0 and size_counts[size] > 1 for size in sizes]
+    entries, errors = index.compute(image_paths, need_content, near, workers, cancel_event, progress)
+    if index.dirty:
+        index.save()
+
+    union = _UnionFind(len(image_paths))
+    by_digest = {}
+    for row, entry in enumerate(entries):
+        if entry is not None and entry[2] is not None:
+            by_digest.setdefault(entry[2], []).append(row)
+    for rows in by_digest.values():
+        for row in rows[1:]:
+            union.union(rows[0], row)
+
+    if near and not (cancel_event is not None and cancel_event.is_set()):
+        rows = [row for row, entry in enumerate(entries) if entry is not None and entry[3] is not None and union.find(row) == row]
+        if len(rows) > 1:
+            dhashes = np.fromiter((entries[row][3] for row in rows), dtype=np.uint64, count=len(rows))
+            phashes = np.fromiter((entries[row][4] for row in rows), dtype=np.uint64, count=len(rows))
+            mask = None if query_mask is None else query_mask[rows]
+            for left, right in near_pairs(dhashes, phashes, threshold, query_mask=mask, workers=workers):
+                union.union(rows[left], rows[right])
+
+    groups = {}
+    for row in range(len(image_paths)):
+        groups.setdefault(union.find(row), []).append(row)
+    clusters = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        digests = {entries[row][2] for row in members}
+        kind = 'exact' if len(digests) == 1 and None not in digests else 'near'
+        members.sort(key=lambda row: (-entries[row][1], image_paths[row]))
+        clusters.append((kind, members))
+    return (clusters, entries, errors)
+
+
+def find_duplicates(base_dir: str, image_paths: Sequence[str], near: bool = True, threshold: int = DEFAULT_NEAR_THRESHOLD, workers: int = READ_WORKERS, cancel_event: Optional[threading.Event] = None, progress: Optional[Callable[[int, int], None]] = None) -> DuplicateReport:
+    image_paths = list(image_paths)
+    groups, _entries, errors = _group_images(base_dir, image_paths, near, threshold, workers, cancel_event, progress)
+    clusters = [DuplicateCluster(kind, tuple(image_paths[row] for row in members)) for kind, members in groups]
+    clusters.sort(key=lambda cluster: min(cluster.paths))
+    return DuplicateReport(tuple(clusters), len(image_paths), tuple(errors))
+
+
+@dataclass(frozen=True)
+class LeakageCluster:
+    kind: str
+    splits: Tuple[str, ...]
+    paths: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class LeakageReport:
+    clusters: Tuple[LeakageCluster, ...]
+    split_sizes: Dict[str, int]
+    errors: Tuple[str, ...] = ()
+
+    def summary(self) -> Dict[str, int]:
+        summary = {'exact_clusters': 0, 'near_clusters': 0, 'stem_clusters': 0}
+        for cluster in self.clusters:
+            summary[f'{cluster.kind}_clusters'] += 1
+        summary['images_involved'] = len({path for cluster in self.clusters for path in cluster.paths})
+        return summary
+
+    def by_pair(self) -> Dict[str, int]:
+        pairs = {}
+        for cluster in self.clusters:
+            for index, left in enumerate(cluster.splits):
+                for right in cluster.splits[index + 1:]:
+                    key = f'{left}/{right}'
+                    pairs[key] = pairs.get(key, 0) + 1
+        return pairs
+
+
+def _ordered_splits(splits, order: Sequence[str]) -> Tuple[str, ...]:
+    return tuple(sorted(set(splits), key=lambda split: (order.index(split) if split in order else len(order), split)))
+
+
+def find_split_leakage(base_dir: str, split_paths: Dict[str, Sequence[str]], near: bool = True, threshold: int = DEFAULT_NEAR_THRESHOLD, workers: int = READ_WORKERS, cancel_event: Optional[threading.Event] = None, progress: Optional[Callable[[int, int], None]] = None) -> LeakageReport:
+    order = list(split_paths)
+    image_paths = []
+    image_splits = []
+    for split, paths in split_paths.items():
+        image_paths.extend(paths)
+        image_splits.extend([split] * len(paths))
+    split_sizes = {split: len(paths) for split, paths in split_paths.items()}
+    largest = max(split_sizes, key=split_sizes.get) if split_sizes else None
+    query_mask = np.fromiter((split != largest for split in image_splits), dtype=bool, count=len(image_splits))
+
+    clusters = []
+    groups, _entries, errors = _group_images(base_dir, image_paths, near, threshold, workers, cancel_event, progress, query_mask)
+    for kind, members in groups:
+        splits = _ordered_splits((image_splits[row] for row in members), order)
+        if len(splits) > 1:
+            clusters.append(LeakageCluster(kind, splits, tuple(image_paths[row] for row in members)))
+
+    by_stem = {}
+    for row, path in enumerate(image_paths):
+        by_stem.setdefault(os.path.splitext(os.path.basename(path))[0].casefold(), []).append(row)
+    for rows in by_stem.values():
+        if len(rows) < 2:
+            continue
+        splits = _ordered_splits((image_splits[row] for row in rows), order)
+        if len(splits) > 1:
+            clusters.append(LeakageCluster('stem', splits, tuple(image_paths[row] for row in rows)))
+
+    clusters.sort(key=lambda cluster: (cluster.kind, min(cluster.paths)))
+    logger.info(f'Vazamento entre splits: {len(clusters)} grupo(s) em {len(image_paths)} imagem(ns).')
+    return LeakageReport(tuple(clusters), split_sizes, tuple(errors))
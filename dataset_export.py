@@ -0,0 +1,115 @@
+import os
+import csv
+import json
+import logging
+from typing import Iterable, Iterator, Optional, Sequence
+import numpy as np
+logger = logging.getLogger(__name__)
+
+FILE_FIELDS = ('name', 'res', 'fmt', 'mode', 'size_kb', 'created', 'mod', 'attrs', 'anns', 'classes', 'path')
+STATS_FIELDS = ('section', 'key', 'name', 'images', 'objects', 'path')
+INT_FIELDS = frozenset(('anns', 'images', 'objects'))
+FLOAT_FIELDS = frozenset(('size_kb',))
+EXPORT_FORMATS = ('csv', 'jsonl', 'npz')
+
+
+def _coerce(field: str, value):
+    if field in INT_FIELDS:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return -1
+    if field in FLOAT_FIELDS:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return float('nan')
+    return '' if value is None else str(value)
+
+
+def iter_file_rows(detailed_files: Iterable[dict]) -> Iterator[dict]:
+    for item in detailed_files:
+        yield {field: _coerce(field, item.get(field)) for field in FILE_FIELDS}
+
+
+def iter_stats_rows(stats: dict, class_names: Sequence[str] = ()) -> Iterator[dict]:
+    yield {'section': 'summary', 'key': 'total', 'name': '', 'images': stats['total_images'], 'objects': stats['total_objects'], 'path': ''}
+    for kind, count in stats['types'].items():
+        yield {'section': 'type', 'key': kind, 'name': '', 'images': -1, 'objects': count, 'path': ''}
+    for cid in sorted(set(stats['counts']) | set(range(len(class_names)))):
+        name = class_names[cid] if 0 <= cid < len(class_names) else f'ID {cid}'
+        yield {'section': 'class', 'key': str(cid), 'name': name, 'images': -1, 'objects': stats['counts'].get(cid, 0), 'path': ''}
+    for split, values in stats['split'].items():
+        yield {'section': 'split', 'key': split, 'name': '', 'images': values['img'], 'objects': values['obj'], 'path': ''}
+    for kind, paths in stats['integrity'].items():
+        for path in paths:
+            yield {'section': 'integrity', 'key': kind, 'name': os.path.basename(path), 'images': -1, 'objects': -1, 'path': path}
+
+
+def write_csv(rows: Iterable[dict], fields: Sequence[str], path: str) -> int:
+    count = 0
+    with open(path, 'w', encoding='utf-8', newline='') as handle:
+        writer = csv.DictWriter(handle, fieldnames=list(fields), extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_jsonl(rows: Iterable[dict], path: str) -> int:
+    count = 0
+    with open(path, 'w', encoding='utf-8') as handle:
+        for row in rows:
+            handle.write(json.dumps(row, ensure_ascii=False))
+            handle.write('\n')
+            count += 1
+    return count
+
+
+def write_npz(rows: Iterable[dict], fields: Sequence[str], path: str) -> int:
+    columns = {field: [] for field in fields}
+    count = 0
+    for row in rows:
+        for field in fields:
+            columns[field].append(row.get(field))
+        count += 1
+    arrays = {}
+    for field, values in columns.items():
+        if field in INT_FIELDS:
+            arrays[field] = np.asarray(values, dtype=np.int64)
+        elif field in FLOAT_FIELDS:
+            arrays[field] = np.asarray(values, dtype=np.float64)
+        else:
+            arrays[field] = np.asarray(values, dtype=np.str_) if values else np.empty(0, dtype=np.str_)
+    np.savez_compressed(path, **arrays)
+    return count
+
+
+def load_npz(path: str) -> dict:
+    with np.load(path, allow_pickle=False) as data:
+        return {field: data[field] for field in data.files}
+
+
+def export_analysis(output_dir: str, detailed_files: Sequence[dict], stats: dict, class_names: Sequence[str] = (), formats: Optional[Sequence[str]] = None) -> list:
+    formats = EXPORT_FORMATS if formats is None else tuple(formats)
+    unknown = set(formats) - set(EXPORT_FORMATS)
+    if unknown:
+        raise ValueError(f'Formato de exportação desconhecido: {", ".join(sorted(unknown))}')
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    for prefix, fields, make_rows in (
+        ('files', FILE_FIELDS, lambda: iter_file_rows(detailed_files)),
+        ('stats', STATS_FIELDS, lambda: iter_stats_rows(stats, class_names)),
+    ):
+        for fmt in formats:
+            path = os.path.join(output_dir, f'{prefix}.{fmt}')
+            if fmt == 'csv':
+                count = write_csv(make_rows(), fields, path)
+            elif fmt == 'jsonl':
+                count = write_jsonl(make_rows(), path)
+            else:
+                count = write_npz(make_rows(), fields, path)
+            logger.info(f'Exportadas {count} linhas para {path}')
+            written.append(path)
+    return written
@@ -0,0 +1,158 @@
+import logging
+from typing import Iterable, Optional, Sequence, Tuple
+import numpy as np
+logger = logging.getLogger(__name__)
+
+SPLITS = ('train', 'val', 'test', 'uncategorized')
+SIZE_EDGES = np.linspace(0.0, 1.0, 51)
+AREA_EDGES = np.concatenate(([0.0], np.logspace(-6, 0, 49)))
+ASPECT_EDGES = np.linspace(-4.0, 4.0, 41)
+METRIC_EDGES = {'width': SIZE_EDGES, 'height': SIZE_EDGES, 'aspect': ASPECT_EDGES, 'area': AREA_EDGES}
+HEATMAP_BINS = 32
+MAX_OBJECTS_PER_IMAGE = 100
+
+
+def polygon_to_box(coords: Sequence[float]) -> Tuple[float, float, float, float]:
+    xs = coords[0::2]
+    ys = coords[1::2]
+    x_min, x_max = min(xs), max(xs)
+    y_min, y_max = min(ys), max(ys)
+    return ((x_min + x_max) / 2, (y_min + y_max) / 2, x_max - x_min, y_max - y_min)
+
+
+def parse_label_box(parts: Sequence[str]) -> Optional[Tuple[int, float, float, float, float]]:
+    try:
+        cid = int(parts[0])
+        values = [float(value) for value in parts[1:]]
+    except ValueError:
+        return None
+    if len(values) == 4:
+        return (cid, *values)
+    if len(values) >= 6:
+        return (cid, *polygon_to_box(values))
+    return None
+
+
+def _bin_index(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    return np.clip(np.searchsorted(edges, values, side='right') - 1, 0, len(edges) - 2)
+
+
+class GeometryStats:
+    FLUSH_SIZE = 65536
+
+    def __init__(self, splits: Sequence[str] = SPLITS):
+        self.splits = tuple(splits)
+        self.split_index = {name: index + 1 for index, name in enumerate(self.splits)}
+        groups = len(self.splits) + 1
+        self.split_hist = {metric: np.zeros((groups, len(edges) - 1), dtype=np.int64) for metric, edges in METRIC_EDGES.items()}
+        self.split_heatmap = np.zeros((groups, HEATMAP_BINS, HEATMAP_BINS), dtype=np.int64)
+        self.split_objects_per_image = np.zeros((groups, MAX_OBJECTS_PER_IMAGE + 1), dtype=np.int64)
+        self.class_hist = {metric: np.zeros((0, len(edges) - 1), dtype=np.int64) for metric, edges in METRIC_EDGES.items()}
+        self.class_heatmap = np.zeros((0, HEATMAP_BINS, HEATMAP_BINS), dtype=np.int64)
+        self.class_objects_per_image = np.zeros((0, MAX_OBJECTS_PER_IMAGE + 1), dtype=np.int64)
+        self.class_rows = {}
+        self._pending = []
+
+    @property
+    def class_count(self) -> int:
+        return self.class_heatmap.shape[0]
+
+    def _ensure_classes(self, count: int):
+        extra = count - self.class_count
+        if extra <= 0:
+            return
+        for metric, hist in self.class_hist.items():
+            self.class_hist[metric] = np.vstack((hist, np.zeros((extra, hist.shape[1]), dtype=np.int64)))
+        self.class_heatmap = np.concatenate((self.class_heatmap, np.zeros((extra, HEATMAP_BINS, HEATMAP_BINS), dtype=np.int64)))
+        self.class_objects_per_image = np.vstack((self.class_objects_per_image, np.zeros((extra, MAX_OBJECTS_PER_IMAGE + 1), dtype=np.int64)))
+
+    def _class_rows_for(self, cids: np.ndarray) -> np.ndarray:
+        unique, inverse = np.unique(cids, return_inverse=True)
+        unique = unique.tolist()
+        for cid in unique:
+            if cid not in self.class_rows:
+                self.class_rows[cid] = len(self.class_rows)
+        self._ensure_classes(len(self.class_rows))
+        return np.array([self.class_rows[cid] for cid in unique], dtype=np.intp)[inverse]
+
+    def add_image(self, split: str, boxes: Iterable[Tuple[int, float, float, float, float]]):
+        split_row = self.split_index.get(split, self.split_index[self.splits[-1]])
+        boxes = [box for box in boxes if box[0] >= 0]
+        n_objects = min(len(boxes), MAX_OBJECTS_PER_IMAGE)
+        self.split_objects_per_image[0, n_objects] += 1
+        self.split_objects_per_image[split_row, n_objects] += 1
+        if not boxes:
+            return
+        class_rows = self._class_rows_for(np.fromiter((box[0] for box in boxes), dtype=np.int64, count=len(boxes)))
+        per_class = np.bincount(class_rows)
+        present = np.nonzero(per_class)[0]
+        self.class_objects_per_image[present, np.minimum(per_class[present], MAX_OBJECTS_PER_IMAGE)] += 1
+        self._pending.extend((split_row, class_row, *box[1:]) for class_row, box in zip(class_rows.tolist(), boxes))
+        if len(self._pending) >= self.FLUSH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        data = np.asarray(self._pending, dtype=np.float64)
+        self._pending = []
+        split_rows = data[:, 0].astype(np.intp)
+        class_rows = data[:, 1].astype(np.intp)
+        x_center = np.clip(data[:, 2], 0.0, 1.0)
+        y_center = np.clip(data[:, 3], 0.0, 1.0)
+        width = np.clip(data[:, 4], 0.0, 1.0)
+        height = np.clip(data[:, 5], 0.0, 1.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            aspect = np.log2(np.maximum(width, 1e-09) / np.maximum(height, 1e-09))
+        values = {'width': width, 'height': height, 'aspect': aspect, 'area': width * height}
+        groups = self.split_hist['width'].shape[0]
+        n_classes = self.class_count
+        for metric, edges in METRIC_EDGES.items():
+            bins = _bin_index(values[metric], edges)
+            n_bins = len(edges) - 1
+            self.split_hist[metric][0] += np.bincount(bins, minlength=n_bins)
+            self.split_hist[metric] += np.bincount(split_rows * n_bins + bins, minlength=groups * n_bins).reshape(groups, n_bins)
+            self.class_hist[metric] += np.bincount(class_rows * n_bins + bins, minlength=n_classes * n_bins).reshape(n_classes, n_bins)
+        cells = np.minimum((y_center * HEATMAP_BINS).astype(np.intp), HEATMAP_BINS - 1) * HEATMAP_BINS + np.minimum((x_center * HEATMAP_BINS).astype(np.intp), HEATMAP_BINS - 1)
+        n_cells = HEATMAP_BINS * HEATMAP_BINS
+        self.split_heatmap[0] += np.bincount(cells, minlength=n_cells).reshape(HEATMAP_BINS, HEATMAP_BINS)
+        self.split_heatmap += np.bincount(split_rows * n_cells + cells, minlength=groups * n_cells).reshape(groups, HEATMAP_BINS, HEATMAP_BINS)
+        self.class_heatmap += np.bincount(class_rows * n_cells + cells, minlength=n_classes * n_cells).reshape(n_classes, HEATMAP_BINS, HEATMAP_BINS)
+
+    def group_keys(self) -> list:
+        self.flush()
+        keys = [('all', None)] + [('split', name) for name in self.splits]
+        used = self.class_objects_per_image.sum(axis=1)
+        keys.extend(('class', cid) for cid, row in sorted(self.class_rows.items()) if used[row])
+        return keys
+
+    def summary(self, kind: str = 'all', key=None) -> dict:
+        self.flush()
+        if kind == 'class':
+            row = self.class_rows[key]
+            hists = {metric: hist[row] for metric, hist in self.class_hist.items()}
+            heatmap = self.class_heatmap[row]
+            objects_per_image = self.class_objects_per_image[row]
+        else:
+            row = 0 if kind == 'all' else self.split_index[key]
+            hists = {metric: hist[row] for metric, hist in self.split_hist.items()}
+            heatmap = self.split_heatmap[row]
+            objects_per_image = self.split_objects_per_image[row]
+        return {
+            'histograms': {metric: (hists[metric].copy(), METRIC_EDGES[metric]) for metric in METRIC_EDGES},
+            'heatmap': heatmap.copy(),
+            'objects_per_image': objects_per_image.copy(),
+            'objects': int(hists['width'].sum()),
+        }
+
+
+def histogram_quantile(counts: np.ndarray, edges: np.ndarray, q: float) -> Optional[float]:
+    total = counts.sum()
+    if total == 0:
+        return None
+    cumulative = np.cumsum(counts)
+    index = int(np.searchsorted(cumulative, q * total, side='left'))
+    index = min(index, len(counts) - 1)
+    before = cumulative[index - 1] if index > 0 else 0
+    fraction = (q * total - before) / counts[index] if counts[index] else 0.0
+    return float(edges[index] + (edges[index + 1] - edges[index]) * fraction)
@@ -0,0 +1,205 @@
+import os
+import marshal
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from utils import lazy_import
+label_reader = lazy_import('label_reader')
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT = 1
+INDEX_DIR_NAME = '.xanotation'
+INDEX_FILE_NAME = 'class_index.marshal'
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp')
+READ_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+READ_CHUNK = 512
+
+
+def iter_annotation_entries(base_dir: str) -> Iterator[Tuple[str, int, int]]:
+    stack = [base_dir]
+    while stack:
+        root = stack.pop()
+        try:
+            with os.scandir(root) as iterator:
+                entries = list(iterator)
+        except OSError as exc:
+            logger.warning(f'Sem acesso a {root}: {exc}')
+            continue
+        files = []
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        stack.append(entry.path)
+                    continue
+            except OSError:
+                pass
+            files.append(entry)
+        image_stems = {os.path.splitext(entry.name)[0] for entry in files if entry.name.lower().endswith(IMAGE_EXTENSIONS)}
+        is_labels_dir = os.path.basename(root).casefold() == 'labels'
+        for entry in files:
+            if not entry.name.lower().endswith('.txt') or entry.name == 'classes.txt':
+                continue
+            if is_labels_dir or os.path.splitext(entry.name)[0] in image_stems:
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                yield (entry.path, st.st_mtime_ns, st.st_size)
+
+
+def read_class_counts_many(label_paths: Sequence[str]) -> List[Dict[int, int]]:
+    results = []
+    for batch in label_reader.iter_label_batches(label_paths, coordinates=False):
+        class_ids = batch.class_ids.tolist()
+        bounds = batch.line_offsets.tolist()
+        for index, error in enumerate(batch.errors):
+            if error:
+                logger.warning(f'Label ilegível ignorado no índice: {batch.paths[index]} ({error})')
+            counts = {}
+            for class_id in class_ids[bounds[index]:bounds[index + 1]]:
+                counts[class_id] = counts.get(class_id, 0) + 1
+            results.append(counts)
+    return results
+
+
+def read_class_counts(label_path: str) -> Dict[int, int]:
+    return read_class_counts_many([label_path])[0]
+
+
+class ClassIndex:
+
+    def __init__(self, base_dir: str, index_path: Optional[str] = None):
+        self.base_dir = os.path.abspath(base_dir)
+        self.index_path = index_path or os.path.join(self.base_dir, INDEX_DIR_NAME, INDEX_FILE_NAME)
+        self.files = {}
+        self.classes = {}
+        self.object_totals = {}
+        self.dirty = False
+        self.lock = threading.Lock()
+
+    @classmethod
+    def open(cls, base_dir: str) -> 'ClassIndex':
+        index = cls(base_dir)
+        index.load()
+        index.refresh()
+        return index
+
+    def load(self) -> bool:
+        try:
+            with open(self.index_path, 'rb') as f:
+                data = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return False
+        if not isinstance(data, dict) or data.get('format') != INDEX_FORMAT or data.get('base_dir') != self.base_dir:
+            return False
+        self.files = data['files']
+        self.classes = data['classes']
+        self.object_totals = {class_id: sum(owners.values()) for class_id, owners in self.classes.items()}
+        return True
+
+    def save(self):
+        tmp_path = self.index_path + '.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            with self.lock:
+                data = {'format': INDEX_FORMAT, 'base_dir': self.base_dir, 'files': self.files, 'classes': self.classes}
+                with open(tmp_path, 'wb') as f:
+                    marshal.dump(data, f)
+            os.replace(tmp_path, self.index_path)
+            self.dirty = False
+        except OSError as exc:
+            logger.warning(f'Não foi possível salvar o índice de classes em {self.index_path}: {exc}')
+
+    def relative(self, path: str) -> str:
+        path = os.path.abspath(path)
+        if path.startswith(self.base_dir + os.sep):
+            return path[len(self.base_dir) + 1:]
+        return os.path.relpath(path, self.base_dir)
+
+    def absolute(self, rel_path: str) -> str:
+        return os.path.join(self.base_dir, rel_path)
+
+    def _drop(self, rel_path: str):
+        entry = self.files.pop(rel_path, None)
+        if entry is None:
+            return
+        for class_id in entry[2]:
+            owners = self.classes.get(class_id)
+            if owners is not None:
+                self.object_totals[class_id] -= owners.pop(rel_path, 0)
+                if not owners:
+                    del self.classes[class_id]
+                    del self.object_totals[class_id]
+
+    def _store(self, rel_path: str, mtime_ns: int, size: int, counts: Dict[int, int]):
+        with self.lock:
+            self._drop(rel_path)
+            self.files[rel_path] = (mtime_ns, size, tuple(sorted(counts)))
+            for class_id, count in counts.items():
+                self.classes.setdefault(class_id, {})[rel_path] = count
+                self.object_totals[class_id] = self.object_totals.get(class_id, 0) + count
+            self.dirty = True
+
+    def _read_many(self, stale: List[Tuple[str, int, int]], workers: int):
+        def read(chunk):
+            return read_class_counts_many([self.absolute(rel_path) for rel_path, _mtime_ns, _size in chunk])
+        chunks = [stale[start:start + READ_CHUNK] for start in range(0, len(stale), READ_CHUNK)]
+        if len(chunks) < 2 or workers <= 1:
+            results = map(read, chunks)
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='class-index') as executor:
+                results = list(executor.map(read, chunks))
+        for chunk, chunk_counts in zip(chunks, results):
+            for (rel_path, mtime_ns, size), counts in zip(chunk, chunk_counts):
+                self._store(rel_path, mtime_ns, size, counts)
+
+    def refresh(self, workers: int = READ_WORKERS) -> int:
+        seen = set()
+        stale = []
+        for path, mtime_ns, size in iter_annotation_entries(self.base_dir):
+            rel_path = self.relative(path)
+            seen.add(rel_path)
+            entry = self.files.get(rel_path)
+            if entry is None or entry[0] != mtime_ns or entry[1] != size:
+                stale.append((rel_path, mtime_ns, size))
+        removed = [rel_path for rel_path in self.files if rel_path not in seen]
+        with self.lock:
+            for rel_path in removed:
+                self._drop(rel_path)
+        self._read_many(stale, workers)
+        if stale or removed:
+            logger.info(f'Índice de classes atualizado: {len(stale)} label(s) lidos, {len(removed)} removidos.')
+            self.save()
+        return len(stale) + len(removed)
+
+    def update_paths(self, paths: Iterable[str]):
+        present = []
+        for path in paths:
+            rel_path = self.relative(path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                with self.lock:
+                    self._drop(rel_path)
+                    self.dirty = True
+                continue
+            present.append((rel_path, st.st_mtime_ns, st.st_size, path))
+        for (rel_path, mtime_ns, size, _path), counts in zip(present, read_class_counts_many([item[3] for item in present])):
+            self._store(rel_path, mtime_ns, size, counts)
+
+    def files_with_classes(self, class_ids: Iterable[int]) -> List[str]:
+        rel_paths = set()
+        for class_id in class_ids:
+            rel_paths.update(self.classes.get(class_id, ()))
+        return [self.absolute(rel_path) for rel_path in sorted(rel_paths)]
+
+    def usage(self, class_count: int) -> Tuple[List[int], List[int]]:
+        file_counts = [0] * max(class_count, 0)
+        object_counts = [0] * max(class_count, 0)
+        for class_id, owners in self.classes.items():
+            if 0 <= class_id < class_count:
+                file_counts[class_id] = len(owners)
+                object_counts[class_id] = self.object_totals.get(class_id, 0)
+        return (file_counts, object_counts)
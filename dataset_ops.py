@@ -0,0 +1,341 @@
+import os
+import random
+import shutil
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from config import Config
+from copy_engine import LINK_MODES, CopyEngine, CopyTask
+from operation_journal import COPY_JOURNAL_NAME, JournalError, OperationJournal
+from managers import AnnotationManager, ClassCatalogManager
+from utils import lazy_import
+yaml = lazy_import('yaml')
+label_reader = lazy_import('label_reader')
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+@dataclass(frozen=True)
+class DatasetCopyOptions:
+    remove_missing_labels: bool = False
+    remove_empty_labels: bool = False
+    reduce_percentage: int = 0
+    link_mode: str = 'copy'
+    remove_duplicates: bool = False
+
+
+@dataclass(frozen=True)
+class DatasetCopyPlan:
+    total_images: int
+    images_to_copy: Tuple[str, ...]
+    removed_missing_labels: int = 0
+    removed_empty_labels: int = 0
+    removed_by_reduction: int = 0
+    removed_by_filter: int = 0
+    removed_duplicates: int = 0
+
+    @property
+    def copied_count(self) -> int:
+        return len(self.images_to_copy)
+
+    @property
+    def removed_total(self) -> int:
+        return self.removed_missing_labels + self.removed_empty_labels + self.removed_by_reduction + self.removed_by_filter + self.removed_duplicates
+
+
+def list_dataset_images(base_dir: str) -> List[str]:
+    image_paths = []
+    for r, dirs, files in os.walk(base_dir):
+        dirs[:] = [directory for directory in dirs if directory.casefold() != 'labels']
+        for f in sorted(files):
+            if f.lower().endswith(IMAGE_EXTENSIONS):
+                image_paths.append(os.path.join(r, f))
+    return image_paths
+
+
+def label_file_is_empty(label_path: str) -> bool:
+    data, _error = label_reader.read_label_bytes(label_path)
+    return data is not None and not data.strip()
+
+
+def unlabeled_cleanup_groups(image_paths: Iterable[str]) -> Tuple[List[str], List[str]]:
+    missing_label_images = []
+    empty_label_images = []
+    image_paths = list(image_paths)
+    label_paths = [AnnotationManager.get_label_path(image_path) for image_path in image_paths]
+    for image_path, (label_path, data, error) in zip(image_paths, label_reader.iter_label_bytes(label_paths)):
+        if data is None:
+            if error is None or not os.path.isfile(label_path):
+                missing_label_images.append(image_path)
+        elif not data.strip():
+            empty_label_images.append(image_path)
+    return (missing_label_images, empty_label_images)
+
+
+def calculate_reduction_count(total_images: int, reduce_percentage: int) -> int:
+    if total_images <= 1 or reduce_percentage <= 0:
+        return 0
+    percentage = max(1, min(99, int(reduce_percentage)))
+    delete_count = int(total_images * percentage / 100 + 0.5)
+    return min(total_images - 1, max(1, delete_count))
+
+
+def build_copy_plan(image_paths: List[str], options: DatasetCopyOptions, rng=random, total_images: Optional[int] = None, duplicate_groups: Sequence[Sequence[str]] = ()) -> DatasetCopyPlan:
+    total_images = len(image_paths) if total_images is None else total_images
+    cleanup_exclusions = set()
+    removed_missing_labels = 0
+    removed_empty_labels = 0
+
+    if options.remove_missing_labels or options.remove_empty_labels:
+        missing_label_images, empty_label_images = unlabeled_cleanup_groups(image_paths)
+        if options.remove_missing_labels:
+            cleanup_exclusions.update(missing_label_images)
+            removed_missing_labels = len(missing_label_images)
+        if options.remove_empty_labels:
+            cleanup_exclusions.update(empty_label_images)
+            removed_empty_labels = len(empty_label_images)
+
+    removed_duplicates = 0
+    if options.remove_duplicates and duplicate_groups:
+        available = set(image_paths) - cleanup_exclusions
+        for group in duplicate_groups:
+            survivors = [image_path for image_path in group if image_path in available]
+            cleanup_exclusions.update(survivors[1:])
+            removed_duplicates += max(0, len(survivors) - 1)
+
+    candidate_images = [image_path for image_path in image_paths if image_path not in cleanup_exclusions]
+
+    removed_by_reduction = 0
+    images_to_copy = list(candidate_images)
+    if options.reduce_percentage > 0:
+        removed_by_reduction = calculate_reduction_count(len(candidate_images), options.reduce_percentage)
+        if removed_by_reduction > 0:
+            excluded_by_reduction = set(rng.sample(candidate_images, removed_by_reduction))
+            images_to_copy = [image_path for image_path in candidate_images if image_path not in excluded_by_reduction]
+
+    return DatasetCopyPlan(
+        total_images=total_images,
+        images_to_copy=tuple(images_to_copy),
+        removed_missing_labels=removed_missing_labels,
+        removed_empty_labels=removed_empty_labels,
+        removed_by_reduction=removed_by_reduction,
+        removed_by_filter=total_images - len(image_paths),
+        removed_duplicates=removed_duplicates,
+    )
+
+
+def build_copy_directory(base_dir: str, options: DatasetCopyOptions, plan: DatasetCopyPlan) -> Path:
+    base_path = Path(base_dir).resolve()
+    keep_percentage = int(round((plan.copied_count / plan.total_images) * 100)) if plan.total_images else 0
+
+    if options.reduce_percentage > 0 and not options.remove_missing_labels and not options.remove_empty_labels and not options.remove_duplicates:
+        target_name = f'{base_path.name}_reduzido_{keep_percentage}pct'
+    else:
+        name_parts = ['copia']
+        if options.remove_missing_labels:
+            name_parts.append('sem_label')
+        if options.remove_empty_labels:
+            name_parts.append('sem_vazio')
+        if options.remove_duplicates:
+            name_parts.append('sem_duplicatas')
+        if options.reduce_percentage > 0:
+            name_parts.append(f'reduzido_{keep_percentage}pct')
+        target_name = f'{base_path.name}_' + '_'.join(name_parts)
+
+    candidate = base_path.parent / target_name
+    suffix = 2
+    while candidate.exists():
+        candidate = base_path.parent / f'{target_name}_{suffix}'
+        suffix += 1
+    return candidate
+
+
+def relative_to_base(base_dir: str, path: str) -> Optional[Path]:
+    try:
+        return Path(path).resolve().relative_to(Path(base_dir).resolve())
+    except ValueError:
+        return None
+
+
+def copy_dataset_metadata(base_dir: str, target_dir: Path) -> None:
+    base_path = Path(base_dir).resolve()
+    metadata_files = ['classes.txt', *Config.SUPPORTED_DATA_FILES]
+    for file_name in metadata_files:
+        source_path = base_path / file_name
+        if not source_path.is_file():
+            continue
+        target_path = target_dir / file_name
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(source_path, target_path)
+        if file_name in Config.SUPPORTED_DATA_FILES:
+            try:
+                with open(target_path, 'r', encoding='utf-8') as handle:
+                    data = yaml.safe_load(handle) or {}
+                if isinstance(data, dict) and 'path' in data:
+                    data['path'] = '.'
+                    with open(target_path, 'w', encoding='utf-8') as handle:
+                        yaml.dump(data, handle, sort_keys=False, allow_unicode=True)
+            except Exception:
+                logger.exception(f'Falha ao ajustar path em {target_path}')
+
+
+def build_copy_tasks(base_dir: str, image_paths: List[str], target_dir: Path) -> Tuple[List[CopyTask], List[str]]:
+    roots = {os.path.abspath(base_dir), os.path.realpath(base_dir)}
+    target_root = str(target_dir)
+
+    def relative(path):
+        abs_path = os.path.abspath(path)
+        for root in roots:
+            if abs_path.startswith(root + os.sep):
+                return abs_path[len(root) + 1:]
+        relative_path = relative_to_base(base_dir, path)
+        return str(relative_path) if relative_path is not None else None
+
+    tasks = []
+    errors = []
+    for image_path in image_paths:
+        name = os.path.basename(image_path)
+        relative_image_path = relative(image_path)
+        if relative_image_path is None:
+            errors.append(f'{name}: caminho fora do dataset')
+            continue
+        files = [(image_path, os.path.join(target_root, relative_image_path))]
+        label_path = AnnotationManager.get_label_path(image_path)
+        if os.path.isfile(label_path):
+            relative_label_path = relative(label_path)
+            if relative_label_path is not None:
+                files.append((label_path, os.path.join(target_root, relative_label_path)))
+        tasks.append(CopyTask(name, tuple(files), link_primary=True))
+    return (tasks, errors)
+
+
+def _run_journaled_copy(journal: OperationJournal, progress, workers) -> Tuple[int, List[str]]:
+    pending = journal.pending()
+    tasks = [CopyTask(action['name'], tuple(tuple(pair) for pair in action['files']), link_primary=action['link_primary']) for _, action in pending]
+    engine = CopyEngine(workers or Config.DATASET_COPY_WORKERS, link_mode=journal.meta['link_mode'])
+    try:
+        copied_count, errors = engine.run(tasks, progress, on_done=lambda index: journal.mark_done(pending[index][0]))
+    finally:
+        journal.close()
+    if journal.meta['link_mode'] != 'copy':
+        logger.info(f'{engine.linked_count} de {copied_count} imagem(ns) vinculadas via {journal.meta['link_mode']}; as demais foram copiadas.')
+    if not errors:
+        journal.finish()
+    already_copied = len(journal.actions) - len(pending)
+    return (already_copied + copied_count, list(journal.meta.get('skipped', [])) + errors)
+
+
+def copy_dataset_files(base_dir: str, image_paths: List[str], target_dir: Path, progress: Optional[Callable[[int, int], None]] = None, workers: Optional[int] = None, link_mode: str = 'copy') -> Tuple[int, List[str]]:
+    if link_mode not in LINK_MODES:
+        raise ValueError(f'Modo de cópia desconhecido: {link_mode}')
+    target_dir = Path(target_dir)
+    target_dir.mkdir(parents=True, exist_ok=False)
+    copy_dataset_metadata(base_dir, target_dir)
+    tasks, errors = build_copy_tasks(base_dir, image_paths, target_dir)
+    journal = OperationJournal.create(
+        str(target_dir / COPY_JOURNAL_NAME),
+        'copy',
+        {'base_dir': os.path.abspath(base_dir), 'link_mode': link_mode, 'skipped': errors},
+        ({'name': task.name, 'files': [list(pair) for pair in task.files], 'link_primary': task.link_primary} for task in tasks),
+    )
+    return _run_journaled_copy(journal, progress, workers)
+
+
+def find_interrupted_copies(base_dir: str) -> List[Path]:
+    base_path = Path(base_dir).resolve()
+    interrupted = []
+    try:
+        siblings = sorted(base_path.parent.iterdir())
+    except OSError:
+        return interrupted
+    for candidate in siblings:
+        journal = OperationJournal.find(str(candidate / COPY_JOURNAL_NAME), 'copy')
+        if journal is not None and not journal.finished and journal.meta.get('base_dir') == str(base_path):
+            interrupted.append(candidate)
+    return interrupted
+
+
+def resume_copy(target_dir: Path, progress: Optional[Callable[[int, int], None]] = None, workers: Optional[int] = None) -> Tuple[int, List[str]]:
+    journal = OperationJournal.find(str(Path(target_dir) / COPY_JOURNAL_NAME), 'copy')
+    if journal is None:
+        raise JournalError(f'Nenhuma cópia interrompida em {target_dir}')
+    for _, action in journal.pending():
+        for _, dst in action['files']:
+            if os.path.lexists(dst):
+                os.remove(dst)
+    copy_dataset_metadata(journal.meta['base_dir'], Path(target_dir))
+    logger.info(f'Retomando cópia em {target_dir}: {len(journal.pending())} de {len(journal.actions)} item(ns) pendentes.')
+    return _run_journaled_copy(journal, progress, workers)
+
+
+def rollback_copy(target_dir: Path) -> None:
+    if OperationJournal.find(str(Path(target_dir) / COPY_JOURNAL_NAME), 'copy') is None:
+        raise JournalError(f'Nenhuma cópia interrompida em {target_dir}')
+    shutil.rmtree(target_dir)
+
+
+def load_class_names(base_dir: str) -> List[str]:
+    p = os.path.join(base_dir, 'classes.txt')
+    if os.path.exists(p):
+        with open(p, 'r', encoding='utf-8') as f:
+            return [x.strip() for x in f if x.strip()]
+    for yaml_file in Config.SUPPORTED_DATA_FILES:
+        yaml_path = os.path.join(base_dir, yaml_file)
+        if not os.path.exists(yaml_path):
+            continue
+        class_names = []
+        try:
+            with open(yaml_path, 'r', encoding='utf-8') as f:
+                data = yaml.safe_load(f)
+                if data and 'names' in data:
+                    names = data['names']
+                    if isinstance(names, dict):
+                        class_names = [str(names[k]) for k in sorted(names.keys())]
+                    elif isinstance(names, list):
+                        class_names = [str(n) for n in names]
+        except Exception as e:
+            logger.error(f'Erro ao carregar classes de {yaml_file}: {e}')
+        if class_names:
+            return class_names
+    return []
+
+
+def write_class_catalog(base_dir: str, class_names: List[str]) -> None:
+    with open(os.path.join(base_dir, 'classes.txt'), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(class_names))
+    yaml_updated = False
+    for yaml_file in Config.SUPPORTED_DATA_FILES:
+        yaml_path = os.path.join(base_dir, yaml_file)
+        if not os.path.exists(yaml_path):
+            continue
+        try:
+            with open(yaml_path, 'r', encoding='utf-8') as f:
+                data = yaml.safe_load(f) or {}
+            if not isinstance(data, dict):
+                continue
+            data['nc'] = len(class_names)
+            if isinstance(data.get('names'), dict):
+                data['names'] = {idx: name for idx, name in enumerate(class_names)}
+            else:
+                data['names'] = class_names
+            with open(yaml_path, 'w', encoding='utf-8') as f:
+                yaml.dump(data, f, sort_keys=False, allow_unicode=True)
+            yaml_updated = True
+        except Exception as exc:
+            logger.error(f'Erro ao atualizar {yaml_file}: {exc}')
+    if not yaml_updated:
+        yaml_path = os.path.join(base_dir, 'data.yaml')
+        data = {
+            'nc': len(class_names),
+            'names': {idx: name for idx, name in enumerate(class_names)},
+        }
+        with open(yaml_path, 'w', encoding='utf-8') as f:
+            yaml.dump(data, f, sort_keys=False, allow_unicode=True)
+
+
+def remap_classes(base_dir: str, class_names: List[str], class_id_map: Dict[int, int], new_class_names: List[str]) -> None:
+    deleted_ids = set(range(len(class_names))) - set(class_id_map)
+    ClassCatalogManager.remap_annotation_class_ids(base_dir, class_id_map, deleted_ids=deleted_ids)
+    write_class_catalog(base_dir, new_class_names)
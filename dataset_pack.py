@@ -0,0 +1,206 @@
+import os
+import json
+import struct
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from dataset_analysis import DatasetScan
+from dataset_index import ClassIndex
+from label_reader import iter_label_batches
+from managers import AnnotationManager
+logger = logging.getLogger(__name__)
+
+PACK_MAGIC = b'XAPACK\x00\x00'
+PACK_FORMAT = 1
+PACK_EXTENSION = '.xapack'
+PACK_ALIGN = 64
+PACK_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+CHUNK_SIZE = 512
+_PREAMBLE = struct.Struct('<8sII')
+PACK_ARRAYS = (
+    ('image_offsets', np.int64),
+    ('label_mtime_ns', np.int64),
+    ('classes', np.int32),
+    ('boxes', np.float32),
+    ('polygon_offsets', np.int64),
+    ('polygon_coords', np.float32),
+    ('path_offsets', np.int64),
+    ('path_blob', np.uint8),
+)
+
+
+class PackFormatError(ValueError):
+    pass
+
+
+def _read_chunk(label_paths: Sequence[Optional[str]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, List[str]]:
+    counts = [np.zeros(0, dtype=np.int64)]
+    classes = [np.zeros(0, dtype=np.int64)]
+    boxes = [np.zeros((0, 4))]
+    polygon_sizes = [np.zeros(0, dtype=np.int64)]
+    coords = [np.zeros(0)]
+    errors = []
+    for batch in iter_label_batches(label_paths):
+        coord_counts = batch.coord_counts
+        keep = (coord_counts == 4) | ((coord_counts >= 6) & (coord_counts % 2 == 0))
+        is_polygon = keep & (coord_counts != 4)
+        counts.append(np.bincount(batch.line_files[keep], minlength=len(batch)))
+        classes.append(batch.class_ids[keep])
+        boxes.append(batch.boxes()[keep])
+        polygon_sizes.append(np.where(is_polygon, coord_counts // 2, 0)[keep])
+        coords.append(batch.coords[np.repeat(is_polygon, coord_counts)])
+        errors.extend(f'{os.path.basename(label_path)}: {error}' for label_path, error in zip(batch.paths, batch.errors) if error)
+    return (np.concatenate(counts), np.concatenate(classes), np.concatenate(boxes), np.concatenate(polygon_sizes), np.concatenate(coords), errors)
+
+
+def _align(offset: int) -> int:
+    return (offset + PACK_ALIGN - 1) // PACK_ALIGN * PACK_ALIGN
+
+
+def write_pack(output_path: str, arrays: Dict[str, np.ndarray], meta: dict):
+    layout = {}
+    offset = 0
+    for name, dtype in PACK_ARRAYS:
+        array = np.ascontiguousarray(arrays[name], dtype=dtype)
+        arrays[name] = array
+        layout[name] = {'dtype': np.dtype(dtype).str, 'shape': list(array.shape), 'offset': offset}
+        offset = _align(offset + array.nbytes)
+    header = json.dumps({**meta, 'arrays': layout}, ensure_ascii=False).encode('utf-8')
+    data_start = _align(_PREAMBLE.size + len(header))
+    tmp_path = output_path + '.tmp'
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(tmp_path, 'wb') as f:
+        f.write(_PREAMBLE.pack(PACK_MAGIC, PACK_FORMAT, len(header)))
+        f.write(header)
+        for name, _dtype in PACK_ARRAYS:
+            f.seek(data_start + layout[name]['offset'])
+            f.write(arrays[name].reshape(-1).view(np.uint8))
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, output_path)
+
+
+def pack_labels(base_dir: str, image_paths: Sequence[str], output_path: str, index: Optional[ClassIndex] = None, split: str = '', workers: int = PACK_WORKERS) -> Tuple[int, int, List[str]]:
+    base_dir = os.path.abspath(base_dir)
+    image_paths = list(image_paths)
+    index = index or ClassIndex.open(base_dir)
+    label_paths = AnnotationManager.resolve_label_paths(image_paths)
+    mtimes = np.full(len(image_paths), -1, dtype=np.int64)
+    read_paths = [None] * len(image_paths)
+    for row, label_path in enumerate(label_paths):
+        entry = index.files.get(index.relative(label_path)) if label_path else None
+        if entry is None:
+            continue
+        mtimes[row] = entry[0]
+        if entry[2]:
+            read_paths[row] = label_path
+
+    chunks = [read_paths[start:start + CHUNK_SIZE] for start in range(0, len(read_paths), CHUNK_SIZE)] or [[]]
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='label-pack') as executor:
+        results = list(executor.map(_read_chunk, chunks))
+    counts, classes, boxes, polygon_sizes, polygon_coords = (np.concatenate(part) for part in list(zip(*results))[:5])
+    errors = [error for result in results for error in result[5]]
+    image_offsets = np.zeros(len(image_paths) + 1, dtype=np.int64)
+    np.cumsum(counts, out=image_offsets[1:])
+    object_count = int(image_offsets[-1])
+    polygon_offsets = np.zeros(object_count + 1, dtype=np.int64)
+    np.cumsum(polygon_sizes, out=polygon_offsets[1:])
+    polygon_coords = polygon_coords.reshape(-1, 2)
+
+    encoded = [index.relative(path).replace(os.sep, '/').encode('utf-8') for path in image_paths]
+    path_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(item) for item in encoded], out=path_offsets[1:])
+    path_blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+    write_pack(output_path, {
+        'image_offsets': image_offsets,
+        'label_mtime_ns': mtimes,
+        'classes': classes,
+        'boxes': boxes,
+        'polygon_offsets': polygon_offsets,
+        'polygon_coords': polygon_coords,
+        'path_offsets': path_offsets,
+        'path_blob': path_blob,
+    }, {'format': PACK_FORMAT, 'base_dir': base_dir, 'split': split, 'images': len(image_paths), 'objects': object_count})
+    logger.info(f'Labels empacotados em {output_path}: {len(image_paths)} imagem(ns), {object_count} objeto(s).')
+    return (len(image_paths), object_count, errors)
+
+
+def export_split_packs(base_dir: str, output_dir: Optional[str] = None, splits: Optional[Sequence[str]] = None, workers: int = PACK_WORKERS, progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, dict]:
+    base_dir = os.path.abspath(base_dir)
+    output_dir = output_dir or os.path.join(base_dir, 'packed')
+    scan = DatasetScan(base_dir)
+    scan.collect_image_entries()
+    split_paths = {split: paths for split, paths in scan.split_paths.items() if paths and (not splits or split in splits)}
+    index = ClassIndex.open(base_dir)
+    results = {}
+    for done, (split, paths) in enumerate(split_paths.items(), start=1):
+        output_path = os.path.join(output_dir, split + PACK_EXTENSION)
+        images, objects, errors = pack_labels(base_dir, paths, output_path, index=index, split=split, workers=workers)
+        results[split] = {'path': output_path, 'images': images, 'objects': objects, 'errors': errors}
+        if progress:
+            progress(done, len(split_paths))
+    return results
+
+
+class PackedLabels:
+
+    def __init__(self, path: str):
+        self.path = path
+        self._buffer = np.memmap(path, dtype=np.uint8, mode='r')
+        if self._buffer.size < _PREAMBLE.size:
+            raise PackFormatError(f'Arquivo de labels empacotados inválido: {path}')
+        magic, version, header_len = _PREAMBLE.unpack(self._buffer[:_PREAMBLE.size].tobytes())
+        if magic != PACK_MAGIC or version != PACK_FORMAT:
+            raise PackFormatError(f'Arquivo de labels empacotados inválido ou de outra versão: {path}')
+        self.meta = json.loads(self._buffer[_PREAMBLE.size:_PREAMBLE.size + header_len].tobytes().decode('utf-8'))
+        data_start = _align(_PREAMBLE.size + header_len)
+        for name, spec in self.meta['arrays'].items():
+            dtype = np.dtype(spec['dtype'])
+            start = data_start + spec['offset']
+            count = int(np.prod(spec['shape'], dtype=np.int64))
+            array = np.asarray(self._buffer[start:start + count * dtype.itemsize]).view(dtype).reshape(spec['shape'])
+            setattr(self, name, array)
+        self._path_lookup = None
+
+    def __len__(self) -> int:
+        return len(self.image_offsets) - 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        mmap_handle = getattr(self._buffer, '_mmap', None)
+        for name, _dtype in PACK_ARRAYS:
+            self.__dict__.pop(name, None)
+        self._buffer = None
+        if mmap_handle is not None:
+            try:
+                mmap_handle.close()
+            except BufferError:
+                pass
+
+    def image_path(self, row: int) -> str:
+        return self.path_blob[self.path_offsets[row]:self.path_offsets[row + 1]].tobytes().decode('utf-8')
+
+    def index_of(self, image_path: str) -> int:
+        if self._path_lookup is None:
+            blob = self.path_blob.tobytes()
+            offsets = self.path_offsets.tolist()
+            self._path_lookup = {blob[offsets[row]:offsets[row + 1]].decode('utf-8'): row for row in range(len(self))}
+        key = image_path
+        if os.path.isabs(key):
+            key = os.path.relpath(key, self.meta['base_dir'])
+        return self._path_lookup[key.replace(os.sep, '/')]
+
+    def labels(self, row: int) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = self.image_offsets[row], self.image_offsets[row + 1]
+        return (self.classes[start:end], self.boxes[start:end])
+
+    def polygons(self, row: int) -> List[Optional[np.ndarray]]:
+        start, end = self.image_offsets[row], self.image_offsets[row + 1]
+        offsets = self.polygon_offsets[start:end + 1]
+        return [self.polygon_coords[offsets[i]:offsets[i + 1]] if offsets[i + 1] > offsets[i] else None for i in range(end - start)]
@@ -0,0 +1,356 @@
+import os
+import re
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from dataset_index import INDEX_DIR_NAME
+from image_metadata import read_image_size
+from label_reader import LabelArrays, iter_labels
+from managers import AnnotationManager
+logger = logging.getLogger(__name__)
+
+SUMMARY_FORMAT = 1
+SUMMARY_FILE_NAME = 'image_summary.npz'
+READ_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+READ_CHUNK = 512
+NUMERIC_FIELDS = ('objects', 'boxes', 'polygons', 'classes', 'minsize', 'maxsize')
+HAS_VALUES = ('box', 'polygon', 'label')
+COMPARISON = re.compile(r'^(?P<field>[a-z]+)(?P<op>>=|<=|!=|>|<|=)(?P<value>[-+]?[0-9]*\.?[0-9]+)(?:px)?$')
+
+
+class QueryError(ValueError):
+    pass
+
+
+def summarize_labels(labels: Optional[LabelArrays], image_size: Optional[Tuple[int, int]]) -> Tuple[int, int, float, float, Dict[int, int]]:
+    if not labels:
+        return (0, 0, float('nan'), float('nan'), {})
+    boxes = int(np.count_nonzero(labels.coord_counts == 4))
+    width, height = image_size if image_size else (float('nan'), float('nan'))
+    extents = labels.boxes()[:, 2:] * (width, height)
+    classes = {}
+    for class_id in labels.class_ids.tolist():
+        classes[class_id] = classes.get(class_id, 0) + 1
+    return (boxes, len(labels) - boxes, float(extents.min()), float(extents.max()), classes)
+
+
+def _stat_pair(image_path: str, label_path: Optional[str]) -> Tuple[int, int, int]:
+    try:
+        image_mtime = os.stat(image_path).st_mtime_ns
+    except OSError:
+        image_mtime = -1
+    if label_path is None:
+        return (image_mtime, -1, -1)
+    try:
+        st = os.stat(label_path)
+        return (image_mtime, st.st_mtime_ns, st.st_size)
+    except OSError:
+        return (image_mtime, -1, -1)
+
+
+class ImageSummary:
+
+    def __init__(self, base_dir: str, image_paths: Sequence[str]):
+        self.base_dir = os.path.abspath(base_dir)
+        self.image_paths = list(image_paths)
+        self.rows = {path: row for row, path in enumerate(self.image_paths)}
+        total = len(self.image_paths)
+        self.image_mtime = np.full(total, -1, dtype=np.int64)
+        self.label_mtime = np.full(total, -1, dtype=np.int64)
+        self.label_size = np.full(total, -1, dtype=np.int64)
+        self.box_count = np.zeros(total, dtype=np.int32)
+        self.polygon_count = np.zeros(total, dtype=np.int32)
+        self.min_size = np.full(total, np.nan, dtype=np.float32)
+        self.max_size = np.full(total, np.nan, dtype=np.float32)
+        self.pair_image = np.zeros(0, dtype=np.int64)
+        self.pair_class = np.zeros(0, dtype=np.int64)
+        self.pair_count = np.zeros(0, dtype=np.int64)
+        self._class_totals = None
+        self._file_names = None
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.image_paths)
+
+    @property
+    def object_count(self) -> np.ndarray:
+        return self.box_count + self.polygon_count
+
+    @property
+    def class_totals(self) -> np.ndarray:
+        if self._class_totals is None:
+            self._class_totals = np.bincount(self.pair_image, minlength=len(self)).astype(np.int32)
+        return self._class_totals
+
+    @property
+    def file_names(self) -> List[str]:
+        if self._file_names is None:
+            self._file_names = [path[path.rfind(os.sep) + 1:].casefold() for path in self.image_paths]
+        return self._file_names
+
+    def class_mask(self, class_ids: Sequence[int]) -> np.ndarray:
+        mask = np.zeros(len(self), dtype=bool)
+        mask[self.pair_image[np.isin(self.pair_class, np.asarray(class_ids, dtype=np.int64))]] = True
+        return mask
+
+    def _set_row(self, row: int, stats: Tuple[int, int, int], summary) -> Tuple[List[int], List[int]]:
+        boxes, polygons, min_size, max_size, classes = summary
+        self.image_mtime[row], self.label_mtime[row], self.label_size[row] = stats
+        self.box_count[row] = boxes
+        self.polygon_count[row] = polygons
+        self.min_size[row] = min_size
+        self.max_size[row] = max_size
+        return (list(classes), list(classes.values()))
+
+    def _read_rows(self, rows: Sequence[int]) -> Tuple[List[int], List[int], List[int]]:
+        pair_image, pair_class, pair_count = [], [], []
+        label_paths = AnnotationManager.resolve_label_paths([self.image_paths[row] for row in rows])
+        row_stats = [_stat_pair(self.image_paths[row], label_path) for row, label_path in zip(rows, label_paths)]
+        read_paths = [label_path if stats[1] >= 0 else None for label_path, stats in zip(label_paths, row_stats)]
+        for row, stats, (_label_path, labels, _error) in zip(rows, row_stats, iter_labels(read_paths)):
+            summary = summarize_labels(labels, read_image_size(self.image_paths[row]) if labels else None)
+            class_ids, counts = self._set_row(row, stats, summary)
+            pair_image.extend([row] * len(class_ids))
+            pair_class.extend(class_ids)
+            pair_count.extend(counts)
+        return (pair_image, pair_class, pair_count)
+
+    def _stale_rows(self, rows: Sequence[int]) -> List[int]:
+        label_paths = AnnotationManager.resolve_label_paths([self.image_paths[row] for row in rows])
+        stale = []
+        for row, label_path in zip(rows, label_paths):
+            stats = _stat_pair(self.image_paths[row], label_path)
+            if stats != (self.image_mtime[row], self.label_mtime[row], self.label_size[row]):
+                stale.append(row)
+        return stale
+
+    def _replace_pairs(self, rows: Sequence[int], results):
+        drop = np.zeros(len(self), dtype=bool)
+        drop[np.asarray(rows, dtype=np.int64)] = True
+        keep = ~drop[self.pair_image]
+        images = [self.pair_image[keep]]
+        classes = [self.pair_class[keep]]
+        counts = [self.pair_count[keep]]
+        for pair_image, pair_class, pair_count in results:
+            images.append(np.asarray(pair_image, dtype=np.int64))
+            classes.append(np.asarray(pair_class, dtype=np.int64))
+            counts.append(np.asarray(pair_count, dtype=np.int64))
+        self.pair_image = np.concatenate(images)
+        self.pair_class = np.concatenate(classes)
+        self.pair_count = np.concatenate(counts)
+        self._class_totals = None
+        self.dirty = True
+
+    def refresh(self, workers: int = READ_WORKERS, progress: Optional[Callable[[int, int], None]] = None) -> int:
+        chunks = [range(start, min(start + READ_CHUNK, len(self))) for start in range(0, len(self), READ_CHUNK)]
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='image-summary') as executor:
+            stale = [row for rows in executor.map(self._stale_rows, chunks) for row in rows]
+            stale_chunks = [stale[start:start + READ_CHUNK] for start in range(0, len(stale), READ_CHUNK)]
+            results = []
+            for done, result in enumerate(executor.map(self._read_rows, stale_chunks), start=1):
+                results.append(result)
+                if progress:
+                    progress(min(done * READ_CHUNK, len(stale)), len(stale))
+        if stale:
+            self._replace_pairs(stale, results)
+            logger.info(f'Resumo de imagens atualizado: {len(stale)} de {len(self)} imagem(ns) relidas.')
+        return len(stale)
+
+    def update_paths(self, image_paths: Sequence[str]) -> None:
+        rows = [self.rows[path] for path in image_paths if path in self.rows]
+        if rows:
+            self._replace_pairs(rows, [self._read_rows(rows)])
+
+    def remove_paths(self, image_paths: Sequence[str]) -> None:
+        removed = {self.rows[path] for path in image_paths if path in self.rows}
+        if not removed:
+            return
+        keep = np.ones(len(self), dtype=bool)
+        keep[list(removed)] = False
+        new_rows = np.cumsum(keep) - 1
+        self.image_paths = [path for row, path in enumerate(self.image_paths) if keep[row]]
+        self.rows = {path: row for row, path in enumerate(self.image_paths)}
+        self._file_names = None
+        for name in ('image_mtime', 'label_mtime', 'label_size', 'box_count', 'polygon_count', 'min_size', 'max_size'):
+            setattr(self, name, getattr(self, name)[keep])
+        pair_keep = keep[self.pair_image]
+        self.pair_image = new_rows[self.pair_image[pair_keep]]
+        self.pair_class = self.pair_class[pair_keep]
+        self.pair_count = self.pair_count[pair_keep]
+        self._class_totals = None
+        self.dirty = True
+
+    def save(self, cache_path: Optional[str] = None) -> None:
+        cache_path = cache_path or summary_cache_path(self.base_dir)
+        tmp_path = cache_path + '.tmp.npz'
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            relative = np.array([os.path.relpath(path, self.base_dir) for path in self.image_paths], dtype=str)
+            np.savez(
+                tmp_path,
+                format=np.array(SUMMARY_FORMAT),
+                image_paths=relative,
+                image_mtime=self.image_mtime,
+                label_mtime=self.label_mtime,
+                label_size=self.label_size,
+                box_count=self.box_count,
+                polygon_count=self.polygon_count,
+                min_size=self.min_size,
+                max_size=self.max_size,
+                pair_image=self.pair_image,
+                pair_class=self.pair_class,
+                pair_count=self.pair_count,
+            )
+            os.replace(tmp_path, cache_path)
+            self.dirty = False
+        except OSError as exc:
+            logger.warning(f'Não foi possível salvar o resumo de imagens em {cache_path}: {exc}')
+
+    def load_cached(self, cache_path: Optional[str] = None) -> int:
+        cache_path = cache_path or summary_cache_path(self.base_dir)
+        try:
+            with np.load(cache_path, allow_pickle=False) as data:
+                if int(data['format']) != SUMMARY_FORMAT:
+                    return 0
+                cached = {os.path.join(self.base_dir, rel_path): row for row, rel_path in enumerate(data['image_paths'].tolist())}
+                columns = {name: data[name] for name in data.files if name not in ('format', 'image_paths')}
+        except (OSError, KeyError, ValueError) as exc:
+            logger.warning(f'Resumo de imagens ignorado em {cache_path}: {exc}')
+            return 0
+        old_rows = np.fromiter((cached.get(path, -1) for path in self.image_paths), dtype=np.int64, count=len(self))
+        found = old_rows >= 0
+        for name in ('image_mtime', 'label_mtime', 'label_size', 'box_count', 'polygon_count', 'min_size', 'max_size'):
+            getattr(self, name)[found] = columns[name][old_rows[found]]
+        old_to_new = np.full(len(cached), -1, dtype=np.int64)
+        old_to_new[old_rows[found]] = np.flatnonzero(found)
+        pair_rows = old_to_new[columns['pair_image']]
+        keep = pair_rows >= 0
+        self.pair_image = pair_rows[keep]
+        self.pair_class = columns['pair_class'][keep]
+        self.pair_count = columns['pair_count'][keep]
+        self._class_totals = None
+        return int(found.sum())
+
+
+def summary_cache_path(base_dir: str) -> str:
+    return os.path.join(base_dir, INDEX_DIR_NAME, SUMMARY_FILE_NAME)
+
+
+def build_image_summary(base_dir: str, image_paths: Sequence[str], workers: int = READ_WORKERS, progress: Optional[Callable[[int, int], None]] = None, use_cache: bool = True) -> ImageSummary:
+    summary = ImageSummary(base_dir, image_paths)
+    cache_path = summary_cache_path(base_dir)
+    if use_cache and os.path.isfile(cache_path):
+        summary.load_cached(cache_path)
+    if summary.refresh(workers, progress) and use_cache:
+        summary.save(cache_path)
+    summary.dirty = False
+    return summary
+
+
+def _compare(values: np.ndarray, op: str, threshold: float) -> np.ndarray:
+    if op == '>':
+        return values > threshold
+    if op == '>=':
+        return values >= threshold
+    if op == '<':
+        return values < threshold
+    if op == '<=':
+        return values <= threshold
+    if op == '!=':
+        return values != threshold
+    return values == threshold
+
+
+def _resolve_classes(value: str, class_names: Sequence[str]) -> List[int]:
+    lookup = {name.casefold(): idx for idx, name in enumerate(class_names)}
+    class_ids = []
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        if item.lstrip('-').isdigit():
+            class_ids.append(int(item))
+        elif item.casefold() in lookup:
+            class_ids.append(lookup[item.casefold()])
+        else:
+            raise QueryError(f'Classe desconhecida no filtro: {item}')
+    if not class_ids:
+        raise QueryError('Informe ao menos uma classe em class:')
+    return class_ids
+
+
+@dataclass(frozen=True)
+class QueryTerm:
+    kind: str
+    negate: bool
+    field: str = ''
+    op: str = ''
+    value: object = None
+
+
+@dataclass(frozen=True)
+class ImageQuery:
+    text: str
+    terms: Tuple[QueryTerm, ...]
+
+    def _term_mask(self, summary: ImageSummary, term: QueryTerm) -> np.ndarray:
+        if term.kind == 'class':
+            return summary.class_mask(term.value)
+        if term.kind == 'has':
+            if term.value == 'box':
+                return summary.box_count > 0
+            if term.value == 'polygon':
+                return summary.polygon_count > 0
+            return summary.label_mtime >= 0
+        if term.kind == 'empty':
+            return summary.object_count == 0
+        if term.kind == 'name':
+            needle = term.value
+            return np.fromiter((needle in name for name in summary.file_names), dtype=bool, count=len(summary))
+        values = {
+            'objects': summary.object_count,
+            'boxes': summary.box_count,
+            'polygons': summary.polygon_count,
+            'classes': summary.class_totals,
+            'minsize': summary.min_size,
+            'maxsize': summary.max_size,
+        }[term.field]
+        return _compare(values, term.op, term.value)
+
+    def mask(self, summary: ImageSummary) -> np.ndarray:
+        result = np.ones(len(summary), dtype=bool)
+        for term in self.terms:
+            term_mask = self._term_mask(summary, term)
+            result &= ~term_mask if term.negate else term_mask
+        return result
+
+    def select(self, summary: ImageSummary) -> List[str]:
+        return [summary.image_paths[row] for row in np.flatnonzero(self.mask(summary)).tolist()]
+
+
+def parse_query(text: str, class_names: Sequence[str] = ()) -> ImageQuery:
+    terms = []
+    for token in text.split():
+        negate = token[0] in '-!' and len(token) > 1
+        body = token[1:] if negate else token
+        lowered = body.lower()
+        key, separator, value = body.partition(':')
+        key = key.lower()
+        if separator and key == 'class':
+            terms.append(QueryTerm('class', negate, value=tuple(_resolve_classes(value, class_names))))
+        elif separator and key == 'has':
+            if value.lower() not in HAS_VALUES:
+                raise QueryError(f'Valor inválido para has: {value} (use {", ".join(HAS_VALUES)})')
+            terms.append(QueryTerm('has', negate, value=value.lower()))
+        elif separator and key == 'name':
+            terms.append(QueryTerm('name', negate, value=value.casefold()))
+        elif lowered == 'empty':
+            terms.append(QueryTerm('empty', negate))
+        else:
+            match = COMPARISON.match(lowered)
+            if not match or match.group('field') not in NUMERIC_FIELDS:
+                raise QueryError(f'Termo de filtro não reconhecido: {token}')
+            terms.append(QueryTerm('compare', negate, match.group('field'), match.group('op'), float(match.group('value'))))
+    return ImageQuery(text.strip(), tuple(terms))
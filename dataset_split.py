@@ -0,0 +1,214 @@
+import os
+import re
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from label_reader import iter_label_batches
+from managers import AnnotationManager
+logger = logging.getLogger(__name__)
+
+SPLIT_NAMES = ('train', 'valid', 'test')
+GROUP_MODES = ('none', 'prefix', 'folder')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff')
+FRAME_SEPARATORS = '_-. '
+READ_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+READ_CHUNK = 512
+
+
+@dataclass(frozen=True)
+class SplitOptions:
+    stratify: bool = True
+    group_mode: str = 'none'
+    group_pattern: Optional[str] = None
+    seed: Optional[int] = None
+    shuffle: bool = True
+
+
+@dataclass(frozen=True)
+class SplitItems:
+    image_paths: Tuple[str, ...]
+    pair_image: np.ndarray
+    pair_class: np.ndarray
+    pair_count: np.ndarray
+    class_count: int
+
+    def __len__(self):
+        return len(self.image_paths)
+
+
+@dataclass(frozen=True)
+class SplitPlan:
+    split_names: Tuple[str, ...]
+    ratios: Tuple[float, ...]
+    image_paths: Tuple[str, ...]
+    assignment: np.ndarray
+    image_counts: np.ndarray
+    class_counts: np.ndarray
+    group_count: int
+    class_ids: np.ndarray
+
+    def assignments(self) -> Dict[str, List[str]]:
+        result = {name: [] for name, ratio in zip(self.split_names, self.ratios) if ratio > 0}
+        result.setdefault(self.split_names[1], [])
+        for path, split_index in zip(self.image_paths, self.assignment.tolist()):
+            result.setdefault(self.split_names[split_index], []).append(path)
+        return result
+
+    def preview_rows(self, class_names: Sequence[str] = ()) -> List[Tuple]:
+        rows = []
+        for column, class_id in enumerate(self.class_ids.tolist()):
+            counts = self.class_counts[:, column]
+            if not counts.any():
+                continue
+            name = class_names[class_id] if class_id < len(class_names) else f'ID {class_id}'
+            rows.append((class_id, name, *counts.tolist()))
+        return rows
+
+
+def list_split_images(base_dir: str) -> List[str]:
+    image_paths = []
+    for r, dirs, files in os.walk(base_dir):
+        dirs[:] = sorted(directory for directory in dirs if directory.casefold() != 'labels')
+        for f in sorted(files):
+            if f.lower().endswith(IMAGE_EXTENSIONS):
+                image_paths.append(os.path.join(r, f))
+    return image_paths
+
+
+def _read_chunk(image_paths: Sequence[str], offset: int) -> Tuple[np.ndarray, np.ndarray]:
+    rows = [np.zeros(0, dtype=np.int64)]
+    classes = [np.zeros(0, dtype=np.int64)]
+    for batch in iter_label_batches(AnnotationManager.resolve_label_paths(image_paths), coordinates=False):
+        rows.append(batch.line_files + offset)
+        classes.append(batch.class_ids)
+        offset += len(batch)
+    return (np.concatenate(rows), np.concatenate(classes))
+
+
+def scan_split_items(base_dir: str, image_paths: Optional[Sequence[str]] = None, workers: int = READ_WORKERS) -> SplitItems:
+    image_paths = tuple(image_paths if image_paths is not None else list_split_images(base_dir))
+    chunks = [(image_paths[start:start + READ_CHUNK], start) for start in range(0, len(image_paths), READ_CHUNK)]
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='split-scan') as executor:
+        results = list(executor.map(lambda chunk: _read_chunk(*chunk), chunks))
+    rows = np.concatenate([chunk_rows for chunk_rows, _ in results] or [np.zeros(0, dtype=np.int64)])
+    classes = np.concatenate([chunk_classes for _, chunk_classes in results] or [np.zeros(0, dtype=np.int64)])
+    valid = classes >= 0
+    rows = rows[valid]
+    classes = classes[valid]
+    class_count = int(classes.max()) + 1 if classes.size else 0
+    if rows.size:
+        class_ids, dense_classes = np.unique(classes, return_inverse=True)
+        keys, counts = np.unique(rows * len(class_ids) + dense_classes, return_counts=True)
+        pair_image = keys // len(class_ids)
+        pair_class = class_ids[keys % len(class_ids)]
+    else:
+        pair_image = pair_class = counts = np.zeros(0, dtype=np.int64)
+    return SplitItems(image_paths, pair_image, pair_class, counts.astype(np.int64), class_count)
+
+
+def strip_frame_suffix(stem: str) -> str:
+    head = stem.rstrip('0123456789')
+    if head == stem:
+        return stem
+    head = head.rstrip(FRAME_SEPARATORS)
+    if head.lower().endswith('frame'):
+        head = head[:-5].rstrip(FRAME_SEPARATORS)
+    return head or stem
+
+
+def group_keys(image_paths: Sequence[str], mode: str = 'none', pattern: Optional[str] = None) -> np.ndarray:
+    if mode not in GROUP_MODES:
+        raise ValueError(f'Modo de agrupamento desconhecido: {mode}')
+    if pattern:
+        regex = re.compile(pattern)
+
+        def key_of(path):
+            match = regex.search(os.path.basename(path))
+            if not match:
+                return path
+            return match.group(1) if match.groups() else match.group(0)
+    elif mode == 'prefix':
+
+        def key_of(path):
+            directory, _, name = path.rpartition(os.sep)
+            return (directory, strip_frame_suffix(name.rpartition('.')[0] or name))
+    elif mode == 'folder':
+        key_of = os.path.dirname
+    else:
+        return np.arange(len(image_paths), dtype=np.int64)
+    index = {}
+    return np.fromiter((index.setdefault(key_of(path), len(index)) for path in image_paths), dtype=np.int64, count=len(image_paths))
+
+
+def _allocate(weights: np.ndarray, share: np.ndarray, fallback: np.ndarray) -> np.ndarray:
+    share = np.clip(share, 0.0, None)
+    if share.sum() <= 0:
+        share = fallback
+    bounds = np.cumsum(share) / share.sum() * weights.sum()
+    midpoints = np.cumsum(weights) - weights / 2.0
+    return np.minimum(np.searchsorted(bounds, midpoints, side='right'), len(share) - 1)
+
+
+def plan_split(items: SplitItems, ratios: Sequence[float], options: SplitOptions = SplitOptions(), split_names: Sequence[str] = SPLIT_NAMES) -> SplitPlan:
+    ratios = np.asarray(ratios, dtype=np.float64)
+    if ratios.size != len(split_names) or ratios.min() < 0 or ratios.sum() <= 0:
+        raise ValueError('Proporções de split inválidas')
+    ratios = ratios / ratios.sum()
+    rng = np.random.default_rng(options.seed)
+    image_total = len(items)
+    if image_total == 0:
+        raise FileNotFoundError('Nenhuma imagem encontrada no diretório base.')
+
+    image_group = group_keys(items.image_paths, options.group_mode, options.group_pattern)
+    group_total = int(image_group.max()) + 1
+    group_sizes = np.bincount(image_group, minlength=group_total).astype(np.float64)
+    class_ids, item_class = np.unique(items.pair_class, return_inverse=True)
+    class_count = max(len(class_ids), 1)
+    if items.pair_image.size:
+        flat = image_group[items.pair_image] * class_count + item_class
+        keys, inverse = np.unique(flat, return_inverse=True)
+        group_counts = np.bincount(inverse, weights=items.pair_count).astype(np.float64)
+        pair_group = keys // class_count
+        pair_class = keys % class_count
+    else:
+        pair_group = pair_class = np.zeros(0, dtype=np.int64)
+        group_counts = np.zeros(0, dtype=np.float64)
+
+    group_split = np.full(group_total, -1, dtype=np.int64)
+    desired_total = ratios * image_total
+    if options.stratify and pair_group.size:
+        class_totals = np.bincount(pair_class, weights=group_counts, minlength=class_count)
+        desired_class = ratios[:, None] * class_totals[None, :]
+        order = np.argsort(pair_class, kind='stable')
+        class_starts = np.searchsorted(pair_class[order], np.arange(class_count + 1))
+        for class_id in np.argsort(class_totals, kind='stable'):
+            if class_totals[class_id] <= 0:
+                continue
+            members = order[class_starts[class_id]:class_starts[class_id + 1]]
+            members = members[group_split[pair_group[members]] < 0]
+            if members.size == 0:
+                continue
+            members = members[rng.permutation(members.size)]
+            groups = pair_group[members]
+            chosen = _allocate(group_counts[members], desired_class[:, class_id], ratios)
+            group_split[groups] = chosen
+            assigned = np.zeros(group_total, dtype=bool)
+            assigned[groups] = True
+            touched = assigned[pair_group]
+            np.subtract.at(desired_class, (group_split[pair_group[touched]], pair_class[touched]), group_counts[touched])
+            desired_total -= np.bincount(chosen, weights=group_sizes[groups], minlength=len(ratios))
+
+    remaining = np.flatnonzero(group_split < 0)
+    if remaining.size:
+        if options.shuffle:
+            remaining = remaining[rng.permutation(remaining.size)]
+        group_split[remaining] = _allocate(group_sizes[remaining], desired_total, ratios)
+
+    assignment = group_split[image_group]
+    image_counts = np.bincount(assignment, minlength=len(ratios))
+    class_counts = np.zeros((len(ratios), class_count), dtype=np.int64)
+    if items.pair_image.size:
+        np.add.at(class_counts, (assignment[items.pair_image], item_class), items.pair_count)
+    return SplitPlan(tuple(split_names), tuple(ratios.tolist()), items.image_paths, assignment, image_counts, class_counts, group_total, class_ids)
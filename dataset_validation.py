@@ -0,0 +1,320 @@
+import os
+import errno
+import logging
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import dataset_ops
+from label_reader import iter_label_text
+from managers import AnnotationManager, ClassCatalogManager
+logger = logging.getLogger(__name__)
+
+ISSUE_FIXES = {
+    'missing_label': None,
+    'orphan_label': None,
+    'unreadable': None,
+    'malformed_line': None,
+    'odd_polygon_coordinates': None,
+    'not_a_number': None,
+    'class_out_of_range': None,
+    'coordinate_out_of_range': 'clip',
+    'box_out_of_bounds': 'clip',
+    'degenerate_box': 'drop_degenerate',
+    'degenerate_polygon': 'drop_degenerate',
+    'duplicate_box': 'dedup',
+}
+FIX_ACTIONS = ('clip', 'drop_degenerate', 'dedup')
+MIN_EXTENT = 1e-6
+BOUNDS_TOLERANCE = 1e-6
+DUPLICATE_DECIMALS = 6
+CHUNK_SIZE = 512
+PROCESS_THRESHOLD = 4096
+DEFAULT_WORKERS = max(1, min(8, os.cpu_count() or 1))
+
+
+@dataclass(frozen=True)
+class ValidationReport:
+    base_dir: str
+    issues: Tuple[dict, ...]
+    files_checked: int
+    objects_checked: int
+
+    def summary(self) -> Dict[str, int]:
+        counts = {}
+        for issue in self.issues:
+            counts[issue['issue']] = counts.get(issue['issue'], 0) + 1
+        return counts
+
+    def by_category(self) -> Dict[str, List[dict]]:
+        grouped = {}
+        for issue in self.issues:
+            grouped.setdefault(issue['issue'], []).append(issue)
+        return grouped
+
+    def fixable_files(self, actions: Iterable[str] = FIX_ACTIONS) -> List[str]:
+        actions = set(actions)
+        return sorted({issue['file'] for issue in self.issues if ISSUE_FIXES.get(issue['issue']) in actions})
+
+
+def _issue(label_path: str, line_number: int, name: str, **extra) -> dict:
+    return dict({'file': label_path, 'line': line_number, 'issue': name}, **extra)
+
+
+def _parse_floats(tokens: List[str], width: int) -> Tuple[np.ndarray, np.ndarray]:
+    try:
+        values = np.asarray(tokens, dtype=np.float64).reshape(-1, width)
+        return (values, np.ones(len(values), dtype=bool))
+    except ValueError:
+        pass
+    rows = []
+    ok = []
+    for start in range(0, len(tokens), width):
+        try:
+            rows.append([float(value) for value in tokens[start:start + width]])
+            ok.append(True)
+        except ValueError:
+            rows.append([np.nan] * width)
+            ok.append(False)
+    return (np.asarray(rows, dtype=np.float64).reshape(-1, width), np.asarray(ok, dtype=bool))
+
+
+def _check_polygon(label_path: str, line_number: int, class_id: int, coords: np.ndarray, class_count: int, issues: List[dict]):
+    if class_id < 0 or (class_count and class_id >= class_count):
+        issues.append(_issue(label_path, line_number, 'class_out_of_range', class_id=class_id))
+    if ((coords < 0.0) | (coords > 1.0)).any():
+        issues.append(_issue(label_path, line_number, 'coordinate_out_of_range'))
+        return
+    xs, ys = coords[0::2], coords[1::2]
+    area = 0.5 * abs(np.dot(xs, np.roll(ys, 1)) - np.dot(ys, np.roll(xs, 1)))
+    if area <= MIN_EXTENT * MIN_EXTENT:
+        issues.append(_issue(label_path, line_number, 'degenerate_polygon'))
+
+
+def validate_label_files(label_paths: Sequence[str], class_count: int) -> Tuple[List[dict], int]:
+    issues = []
+    box_tokens = []
+    box_meta = []
+    polygon_keys = set()
+    objects = 0
+    for file_index, (label_path, text, error) in enumerate(iter_label_text(label_paths)):
+        if text is None or error:
+            issues.append(_issue(label_path, 0, 'unreadable', error=error or os.strerror(errno.ENOENT)))
+            continue
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        lines = text.split('\n')
+        for line_number, line in enumerate(lines, start=1):
+            parts = line.split()
+            if not parts:
+                continue
+            objects += 1
+            if len(parts) < 5:
+                issues.append(_issue(label_path, line_number, 'malformed_line'))
+                continue
+            if len(parts) % 2 == 0:
+                issues.append(_issue(label_path, line_number, 'odd_polygon_coordinates'))
+                continue
+            if not parts[0].lstrip('-').isdigit():
+                issues.append(_issue(label_path, line_number, 'not_a_number'))
+                continue
+            if len(parts) == 5:
+                box_tokens.extend(parts)
+                box_meta.append((file_index, line_number))
+                continue
+            try:
+                coords = np.asarray(parts[1:], dtype=np.float64)
+            except ValueError:
+                issues.append(_issue(label_path, line_number, 'not_a_number'))
+                continue
+            class_id = int(parts[0])
+            key = (file_index, class_id, tuple(np.round(coords, DUPLICATE_DECIMALS).tolist()))
+            if key in polygon_keys:
+                issues.append(_issue(label_path, line_number, 'duplicate_box'))
+            polygon_keys.add(key)
+            _check_polygon(label_path, line_number, class_id, coords, class_count, issues)
+    if box_meta:
+        issues.extend(_check_boxes(label_paths, box_tokens, box_meta, class_count))
+    issues.sort(key=lambda issue: (issue['file'], issue['line']))
+    return (issues, objects)
+
+
+def _check_boxes(label_paths: Sequence[str], box_tokens: List[str], box_meta: List[Tuple[int, int]], class_count: int) -> List[dict]:
+    values, parsed = _parse_floats(box_tokens, 5)
+    meta = np.asarray(box_meta, dtype=np.int64)
+    class_ids = values[:, 0]
+    coords = values[:, 1:]
+    flags = []
+    flags.append(('not_a_number', ~parsed))
+    class_bad = parsed & (class_ids < 0)
+    if class_count:
+        class_bad |= parsed & (class_ids >= class_count)
+    flags.append(('class_out_of_range', class_bad))
+    coord_bad = parsed & ((coords < 0.0) | (coords > 1.0)).any(axis=1)
+    flags.append(('coordinate_out_of_range', coord_bad))
+    x, y, w, h = coords.T
+    edges = np.column_stack((x - w / 2, y - h / 2, x + w / 2, y + h / 2))
+    outside = parsed & ~coord_bad & ((edges < -BOUNDS_TOLERANCE) | (edges > 1.0 + BOUNDS_TOLERANCE)).any(axis=1)
+    flags.append(('box_out_of_bounds', outside))
+    flags.append(('degenerate_box', parsed & ~coord_bad & ((w <= MIN_EXTENT) | (h <= MIN_EXTENT))))
+
+    duplicate = np.zeros(len(values), dtype=bool)
+    candidates = np.flatnonzero(parsed)
+    if candidates.size > 1:
+        keys = np.column_stack((meta[candidates, 0], np.rint(values[candidates] * 10 ** DUPLICATE_DECIMALS).astype(np.int64)))
+        order = np.lexsort(keys.T[::-1])
+        same = (keys[order][1:] == keys[order][:-1]).all(axis=1)
+        duplicate[candidates[order[1:][same]]] = True
+    flags.append(('duplicate_box', duplicate))
+
+    issues = []
+    for name, mask in flags:
+        for row in np.flatnonzero(mask).tolist():
+            file_index, line_number = box_meta[row]
+            if name == 'class_out_of_range':
+                issues.append(_issue(label_paths[file_index], line_number, name, class_id=int(class_ids[row])))
+            else:
+                issues.append(_issue(label_paths[file_index], line_number, name))
+    return issues
+
+
+def _validate_chunk(args) -> Tuple[List[dict], int]:
+    label_paths, class_count = args
+    return validate_label_files(label_paths, class_count)
+
+
+def validate_dataset(base_dir: str, class_count: Optional[int] = None, workers: int = DEFAULT_WORKERS, progress: Optional[Callable[[int, int], None]] = None) -> ValidationReport:
+    if class_count is None:
+        class_count = len(dataset_ops.load_class_names(base_dir))
+    image_paths = dataset_ops.list_dataset_images(base_dir)
+    issues = []
+    label_paths = []
+    labelled = set()
+    for image_path, label_path in zip(image_paths, AnnotationManager.resolve_label_paths(image_paths)):
+        if label_path is None:
+            issues.append(_issue(image_path, 0, 'missing_label'))
+            continue
+        label_paths.append(label_path)
+        labelled.add(os.path.normcase(os.path.abspath(label_path)))
+    for label_path in ClassCatalogManager.iter_annotation_files(base_dir):
+        if os.path.normcase(os.path.abspath(label_path)) not in labelled:
+            issues.append(_issue(label_path, 0, 'orphan_label'))
+
+    chunks = [(label_paths[start:start + CHUNK_SIZE], class_count) for start in range(0, len(label_paths), CHUNK_SIZE)]
+    objects = 0
+    if workers > 1 and len(label_paths) >= PROCESS_THRESHOLD:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            results = executor.map(_validate_chunk, chunks)
+            for done, (chunk_issues, chunk_objects) in enumerate(results, start=1):
+                issues.extend(chunk_issues)
+                objects += chunk_objects
+                if progress:
+                    progress(min(done * CHUNK_SIZE, len(label_paths)), len(label_paths))
+    else:
+        for done, chunk in enumerate(chunks, start=1):
+            chunk_issues, chunk_objects = _validate_chunk(chunk)
+            issues.extend(chunk_issues)
+            objects += chunk_objects
+            if progress:
+                progress(min(done * CHUNK_SIZE, len(label_paths)), len(label_paths))
+    return ValidationReport(os.path.abspath(base_dir), tuple(issues), len(label_paths), objects)
+
+
+def _format_values(class_id: int, coords: Sequence[float]) -> str:
+    return ' '.join([str(class_id)] + [f'{value:.6f}' for value in coords])
+
+
+def _fix_line(parts: List[str], actions: set) -> Tuple[Optional[str], bool]:
+    try:
+        class_id = int(parts[0])
+        coords = [float(value) for value in parts[1:]]
+    except ValueError:
+        return (None, False)
+    changed = False
+    if len(coords) == 4:
+        x, y, w, h = coords
+        x1, y1, x2, y2 = (x - w / 2, y - h / 2, x + w / 2, y + h / 2)
+        if 'clip' in actions and (min(x1, y1) < -BOUNDS_TOLERANCE or max(x2, y2) > 1.0 + BOUNDS_TOLERANCE):
+            x1, y1 = max(x1, 0.0), max(y1, 0.0)
+            x2, y2 = min(x2, 1.0), min(y2, 1.0)
+            coords = [(x1 + x2) / 2, (y1 + y2) / 2, max(x2 - x1, 0.0), max(y2 - y1, 0.0)]
+            changed = True
+        degenerate = coords[2] <= MIN_EXTENT or coords[3] <= MIN_EXTENT
+    else:
+        if 'clip' in actions and any(value < 0.0 or value > 1.0 for value in coords):
+            coords = [min(max(value, 0.0), 1.0) for value in coords]
+            changed = True
+        xs, ys = np.asarray(coords[0::2]), np.asarray(coords[1::2])
+        degenerate = 0.5 * abs(np.dot(xs, np.roll(ys, 1)) - np.dot(ys, np.roll(xs, 1))) <= MIN_EXTENT * MIN_EXTENT
+    if degenerate and 'drop_degenerate' in actions:
+        return ('', True)
+    return (_format_values(class_id, coords) if changed else None, changed)
+
+
+def _replace_lines(label_path: str, lines: List[str]):
+    fd, tmp_path = tempfile.mkstemp(prefix='.fix-', suffix='.tmp', dir=os.path.dirname(label_path))
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+            handle.writelines(lines)
+        os.chmod(tmp_path, os.stat(label_path).st_mode & 0o7777)
+        os.replace(tmp_path, label_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def fix_label_file(label_path: str, actions: Iterable[str] = FIX_ACTIONS) -> int:
+    actions = set(actions)
+    with open(label_path, 'r', encoding='utf-8') as handle:
+        lines = handle.readlines()
+    output = []
+    seen = set()
+    changes = 0
+    for line in lines:
+        parts = line.split()
+        if len(parts) < 5 or len(parts) % 2 == 0:
+            output.append(line if line.endswith('\n') else line + '\n')
+            continue
+        fixed, changed = _fix_line(parts, actions)
+        if fixed == '':
+            changes += 1
+            continue
+        text = fixed if fixed is not None else ' '.join(parts)
+        if 'dedup' in actions:
+            key = text.split()
+            try:
+                key = (key[0],) + tuple(round(float(value), DUPLICATE_DECIMALS) for value in key[1:])
+            except ValueError:
+                pass
+            if key in seen:
+                changes += 1
+                continue
+            seen.add(key)
+        if changed:
+            changes += 1
+            output.append(fixed + '\n')
+        else:
+            output.append(line if line.endswith('\n') else line + '\n')
+    if changes:
+        _replace_lines(label_path, output)
+    return changes
+
+
+def apply_fixes(report: ValidationReport, actions: Iterable[str] = FIX_ACTIONS) -> Tuple[int, int, List[str]]:
+    actions = [action for action in actions if action in FIX_ACTIONS]
+    files_changed = 0
+    lines_changed = 0
+    errors = []
+    for label_path in report.fixable_files(actions):
+        try:
+            changes = fix_label_file(label_path, actions)
+        except (OSError, UnicodeDecodeError) as exc:
+            errors.append(f'{os.path.basename(label_path)}: {exc}')
+            continue
+        if changes:
+            files_changed += 1
+            lines_changed += changes
+    logger.info(f'Correções aplicadas ({", ".join(actions)}): {lines_changed} linha(s) em {files_changed} arquivo(s).')
+    return (files_changed, lines_changed, errors)
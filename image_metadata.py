@@ -0,0 +1,217 @@
+import struct
+import threading
+import logging
+from dataclasses import dataclass
+from typing import Optional
+logger = logging.getLogger(__name__)
+
+HEADER_PROBE_SIZE = 4096
+JPEG_SOF_MARKERS = frozenset((0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF))
+JPEG_MODES = {1: 'L', 3: 'RGB', 4: 'CMYK'}
+PNG_MODES = {0: 'L', 2: 'RGB', 3: 'P', 4: 'LA', 6: 'RGBA'}
+TIFF_TYPE_FORMATS = {3: 'H', 4: 'I'}
+_thread_state = threading.local()
+
+
+@dataclass(frozen=True)
+class ImageInfo:
+    width: int
+    height: int
+    format: str
+    mode: str
+
+    @property
+    def size(self):
+        return (self.width, self.height)
+
+    @property
+    def resolution(self) -> str:
+        return f'{self.width}x{self.height}'
+
+
+def _probe_buffer() -> bytearray:
+    buffer = getattr(_thread_state, 'buffer', None)
+    if buffer is None:
+        buffer = bytearray(HEADER_PROBE_SIZE)
+        _thread_state.buffer = buffer
+    return buffer
+
+
+def _parse_png(header: memoryview) -> Optional[ImageInfo]:
+    if len(header) < 26 or bytes(header[12:16]) != b'IHDR':
+        return None
+    width, height, bit_depth, color_type = struct.unpack('>IIBB', header[16:26])
+    mode = PNG_MODES.get(color_type, 'UNK')
+    if color_type == 0 and bit_depth == 1:
+        mode = '1'
+    elif color_type == 0 and bit_depth == 16:
+        mode = 'I;16'
+    return ImageInfo(width, height, 'PNG', mode)
+
+
+def _parse_gif(header: memoryview) -> Optional[ImageInfo]:
+    if len(header) < 10:
+        return None
+    width, height = struct.unpack('<HH', header[6:10])
+    return ImageInfo(width, height, 'GIF', 'P')
+
+
+def _parse_bmp(header: memoryview) -> Optional[ImageInfo]:
+    if len(header) < 26:
+        return None
+    dib_size = struct.unpack('<I', header[14:18])[0]
+    if dib_size == 12:
+        width, height, _, bits = struct.unpack('<HHHH', header[18:26])
+    elif len(header) >= 30:
+        width, height, _, bits = struct.unpack('<iiHH', header[18:30])
+    else:
+        return None
+    if bits == 1:
+        mode = '1'
+    elif bits <= 8:
+        mode = 'P'
+    else:
+        mode = 'RGB'
+    return ImageInfo(abs(width), abs(height), 'BMP', mode)
+
+
+def _parse_webp(header: memoryview) -> Optional[ImageInfo]:
+    if len(header) < 30 or bytes(header[8:12]) != b'WEBP':
+        return None
+    chunk = bytes(header[12:16])
+    if chunk == b'VP8 ':
+        width, height = struct.unpack('<HH', header[26:30])
+        return ImageInfo(width & 0x3FFF, height & 0x3FFF, 'WEBP', 'RGB')
+    if chunk == b'VP8L':
+        bits = struct.unpack('<I', header[21:25])[0]
+        width = (bits & 0x3FFF) + 1
+        height = ((bits >> 14) & 0x3FFF) + 1
+        return ImageInfo(width, height, 'WEBP', 'RGBA' if (bits >> 28) & 1 else 'RGB')
+    if chunk == b'VP8X':
+        flags = header[20]
+        width = int.from_bytes(header[24:27], 'little') + 1
+        height = int.from_bytes(header[27:30], 'little') + 1
+        return ImageInfo(width, height, 'WEBP', 'RGBA' if flags & 0x10 else 'RGB')
+    return None
+
+
+def _parse_jpeg(handle, header: memoryview) -> Optional[ImageInfo]:
+    offset = 2
+    available = len(header)
+    while True:
+        if offset + 4 > available:
+            handle.seek(offset)
+            segment = handle.read(4)
+            if len(segment) < 4:
+                return None
+            block = memoryview(segment)
+            local = 0
+        else:
+            block = header
+            local = offset
+        if block[local] != 0xFF:
+            return None
+        marker = block[local + 1]
+        if marker == 0xFF:
+            offset += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            offset += 2
+            continue
+        length = struct.unpack('>H', block[local + 2:local + 4])[0]
+        if marker in JPEG_SOF_MARKERS:
+            if offset + 10 <= available:
+                sof = bytes(header[offset + 4:offset + 10])
+            else:
+                handle.seek(offset + 4)
+                sof = handle.read(6)
+            if len(sof) < 6:
+                return None
+            _, height, width, components = struct.unpack('>BHHB', sof)
+            return ImageInfo(width, height, 'JPEG', JPEG_MODES.get(components, 'UNK'))
+        if marker in (0xD9, 0xDA):
+            return None
+        offset += 2 + length
+
+
+def _parse_tiff(handle, header: memoryview) -> Optional[ImageInfo]:
+    endian = '<' if bytes(header[:2]) == b'II' else '>'
+    ifd_offset = struct.unpack(endian + 'I', header[4:8])[0]
+    handle.seek(ifd_offset)
+    count_raw = handle.read(2)
+    if len(count_raw) < 2:
+        return None
+    entry_count = struct.unpack(endian + 'H', count_raw)[0]
+    entries = handle.read(entry_count * 12)
+    tags = {}
+    for index in range(len(entries) // 12):
+        tag, field_type, count = struct.unpack(endian + 'HHI', entries[index * 12:index * 12 + 8])
+        value_format = TIFF_TYPE_FORMATS.get(field_type)
+        if value_format is None:
+            continue
+        value_raw = entries[index * 12 + 8:index * 12 + 12]
+        value = struct.unpack(endian + value_format, value_raw[:struct.calcsize(value_format)])[0]
+        if count == 1 or tag == 258:
+            tags[tag] = (value, count)
+    if 256 not in tags or 257 not in tags:
+        return None
+    photometric = tags.get(262, (2, 1))[0]
+    samples = tags.get(277, (1, 1))[0]
+    bits_value, bits_count = tags.get(258, (8, 1))
+    bits = bits_value if bits_count == 1 else 8
+    if photometric in (0, 1):
+        mode = '1' if bits == 1 else 'I;16' if bits == 16 else 'L'
+    elif photometric == 3:
+        mode = 'P'
+    elif photometric == 5:
+        mode = 'CMYK'
+    else:
+        mode = 'RGBA' if samples == 4 else 'RGB'
+    return ImageInfo(tags[256][0], tags[257][0], 'TIFF', mode)
+
+
+def probe_image_header(path: str) -> Optional[ImageInfo]:
+    buffer = _probe_buffer()
+    with open(path, 'rb', buffering=0) as handle:
+        read = handle.readinto(buffer)
+        header = memoryview(buffer)[:read]
+        try:
+            signature = bytes(header[:12])
+            if signature.startswith(b'\x89PNG\r\n\x1a\n'):
+                return _parse_png(header)
+            if signature.startswith(b'\xff\xd8'):
+                return _parse_jpeg(handle, header)
+            if signature.startswith((b'GIF87a', b'GIF89a')):
+                return _parse_gif(header)
+            if signature.startswith(b'BM'):
+                return _parse_bmp(header)
+            if signature.startswith(b'RIFF'):
+                return _parse_webp(header)
+            if signature.startswith((b'II*\x00', b'MM\x00*')):
+                return _parse_tiff(handle, header)
+            return None
+        except (struct.error, IndexError, OSError, ValueError):
+            return None
+        finally:
+            header.release()
+
+
+def read_image_info(path: str) -> Optional[ImageInfo]:
+    try:
+        info = probe_image_header(path)
+    except OSError as exc:
+        logger.debug(f'Falha ao ler cabecalho de {path}: {exc}')
+        return None
+    if info is not None and info.width > 0 and info.height > 0:
+        return info
+    try:
+        from PIL import Image
+        with Image.open(path) as img:
+            return ImageInfo(img.size[0], img.size[1], img.format or 'UNK', img.mode or 'UNK')
+    except Exception:
+        return None
+
+
+def read_image_size(path: str) -> Optional[tuple]:
+    info = read_image_info(path)
+    return info.size if info else None
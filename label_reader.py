@@ -0,0 +1,364 @@
+import os
+import mmap
+import logging
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+logger = logging.getLogger(__name__)
+
+BATCH_FILES = 512
+BATCH_BYTES = 1 << 20
+MMAP_THRESHOLD = 4 << 20
+TOKEN_WIDTH = 32
+FAST_WIDTH = 15
+_POWERS_OF_TEN = 10.0 ** np.arange(FAST_WIDTH + 1)
+_OPEN_FLAGS = os.O_RDONLY | getattr(os, 'O_BINARY', 0)
+
+
+if hasattr(os, 'readv'):
+    def _read_fd(fd: int, view: memoryview) -> int:
+        return os.readv(fd, [view])
+else:
+    def _read_fd(fd: int, view: memoryview) -> int:
+        data = os.read(fd, len(view))
+        view[:len(data)] = data
+        return len(data)
+
+
+@dataclass(frozen=True)
+class LabelArrays:
+    class_ids: np.ndarray
+    offsets: np.ndarray
+    coords: np.ndarray
+    line_numbers: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.class_ids)
+
+    @property
+    def coord_counts(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def row(self, index: int) -> np.ndarray:
+        return self.coords[self.offsets[index]:self.offsets[index + 1]]
+
+    def boxes(self) -> np.ndarray:
+        boxes = np.empty((len(self), 4), dtype=np.float64)
+        if not len(self):
+            return boxes
+        counts = self.coord_counts
+        starts = self.offsets[:-1]
+        is_x = (np.arange(len(self.coords)) - np.repeat(starts, counts)) % 2 == 0
+        x_min = np.minimum.reduceat(np.where(is_x, self.coords, np.inf), starts)
+        x_max = np.maximum.reduceat(np.where(is_x, self.coords, -np.inf), starts)
+        y_min = np.minimum.reduceat(np.where(is_x, np.inf, self.coords), starts)
+        y_max = np.maximum.reduceat(np.where(is_x, -np.inf, self.coords), starts)
+        boxes[:, 0] = (x_min + x_max) / 2
+        boxes[:, 1] = (y_min + y_max) / 2
+        boxes[:, 2] = x_max - x_min
+        boxes[:, 3] = y_max - y_min
+        is_box = counts == 4
+        if is_box.any():
+            boxes[is_box] = self.coords[starts[is_box, None] + np.arange(4)]
+        return boxes
+
+
+EMPTY_LABELS = LabelArrays(
+    np.empty(0, dtype=np.int64),
+    np.zeros(1, dtype=np.int64),
+    np.empty(0, dtype=np.float64),
+    np.empty(0, dtype=np.int64),
+)
+
+
+def _parse_tokens_slow(tokens: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    values = np.empty(len(tokens), dtype=np.float64)
+    bad = np.zeros(len(tokens), dtype=bool)
+    for position, token in enumerate(tokens.tolist()):
+        try:
+            values[position] = float(token)
+        except ValueError:
+            values[position] = np.nan
+            bad[position] = True
+    return (values, bad)
+
+
+def _parse_other(raw: np.ndarray, starts: np.ndarray, lengths: np.ndarray, values: np.ndarray, bad: np.ndarray, other: np.ndarray):
+    short = other[lengths[other] <= TOKEN_WIDTH]
+    if len(short):
+        width = int(lengths[short].max())
+        columns = np.arange(width)
+        chars = np.where(columns < lengths[short, None], raw[np.minimum(starts[short, None] + columns, len(raw) - 1)], 0).astype(np.uint8)
+        tokens = chars.view(f'S{width}').ravel()
+        try:
+            values[short] = tokens.astype(np.float64)
+        except ValueError:
+            values[short], bad[short] = _parse_tokens_slow(tokens)
+    for position in other[lengths[other] > TOKEN_WIDTH].tolist():
+        start = starts[position]
+        try:
+            values[position] = float(raw[start:start + lengths[position]].tobytes())
+        except ValueError:
+            bad[position] = True
+
+
+def _parse_numbers(raw: np.ndarray, starts: np.ndarray, lengths: np.ndarray, compute_values: bool = True) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    count = len(starts)
+    mantissa = np.zeros(count, dtype=np.int64)
+    fraction = np.zeros(count, dtype=np.int64)
+    digits = np.zeros(count, dtype=np.int64)
+    seen_dot = np.zeros(count, dtype=bool)
+    first = raw[starts]
+    negative = first == 45
+    simple = (lengths <= FAST_WIDTH) & (negative | (first == 43) | (first == 46) | (first - np.uint8(48) < 10))
+    last = len(raw) - 1
+    for column in range(min(int(lengths.max(initial=0)), FAST_WIDTH)):
+        inside = lengths > column
+        char = raw[np.minimum(starts + column, last)]
+        digit = char - np.uint8(48)
+        is_digit = (digit < 10) & inside
+        is_dot = (char == 46) & inside
+        if compute_values:
+            np.copyto(mantissa, mantissa * 10 + digit, where=is_digit)
+            fraction += is_digit & seen_dot
+        digits += is_digit
+        if column:
+            simple &= is_digit | ~inside | (is_dot & ~seen_dot)
+        else:
+            simple &= ~is_dot | (lengths > 1)
+        seen_dot |= is_dot
+    simple &= digits > 0
+    values = mantissa / _POWERS_OF_TEN[np.minimum(fraction, FAST_WIDTH)]
+    values[negative] *= -1.0
+    bad = np.zeros(count, dtype=bool)
+    other = np.flatnonzero(~simple)
+    if len(other):
+        _parse_other(raw, starts, lengths, values, bad, other)
+    return (values, bad, simple & ~seen_dot)
+
+
+@dataclass(frozen=True)
+class LabelBatch:
+    paths: List[Optional[str]]
+    errors: List[Optional[str]]
+    present: np.ndarray
+    line_offsets: np.ndarray
+    class_ids: np.ndarray
+    line_numbers: np.ndarray
+    offsets: np.ndarray
+    coords: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    @property
+    def line_files(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self.paths)), np.diff(self.line_offsets))
+
+    @property
+    def coord_counts(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def boxes(self) -> np.ndarray:
+        return LabelArrays(self.class_ids, self.offsets, self.coords, self.line_numbers).boxes()
+
+    def labels(self, index: int) -> Optional[LabelArrays]:
+        if not self.present[index]:
+            return None
+        first, last = int(self.line_offsets[index]), int(self.line_offsets[index + 1])
+        if first == last:
+            return EMPTY_LABELS
+        low, high = int(self.offsets[first]), int(self.offsets[last])
+        return LabelArrays(self.class_ids[first:last], self.offsets[first:last + 1] - low, self.coords[low:high], self.line_numbers[first:last])
+
+    def __iter__(self) -> Iterator[Tuple[Optional[str], Optional[LabelArrays], Optional[str]]]:
+        for index, label_path in enumerate(self.paths):
+            yield (label_path, self.labels(index), self.errors[index])
+
+
+def parse_label_batch(raw: np.ndarray, file_starts: np.ndarray, coordinates: bool = True) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    file_count = len(file_starts) - 1
+    solid = (raw > 32).view(np.int8)
+    edges = np.diff(solid, prepend=np.int8(0), append=np.int8(0))
+    starts = np.flatnonzero(edges == 1)
+    lengths = np.flatnonzero(edges == -1) - starts
+    newlines = np.flatnonzero(raw == 10)
+    token_line = np.searchsorted(newlines, starts)
+    new_line = np.ones(len(starts), dtype=bool)
+    np.not_equal(token_line[1:], token_line[:-1], out=new_line[1:])
+    line_first = np.flatnonzero(new_line)
+    line_tokens = np.diff(line_first, append=len(starts))
+
+    if coordinates:
+        values, bad, is_integer = _parse_numbers(raw, starts, lengths)
+        valid = (line_tokens >= 5) & is_integer[line_first]
+        if len(line_first):
+            valid &= ~np.logical_or.reduceat(bad, line_first)
+        class_values = values[line_first[valid]]
+        token_valid = np.repeat(valid, line_tokens)
+        token_valid[line_first] = False
+        coords = values[token_valid]
+    else:
+        values, _bad, is_integer = _parse_numbers(raw, starts[line_first], lengths[line_first])
+        valid = (line_tokens >= 5) & is_integer
+        coord_tokens = np.ones(len(starts), dtype=bool)
+        coord_tokens[line_first] = False
+        coord_tokens = np.flatnonzero(coord_tokens)
+        bad = np.zeros(len(starts), dtype=bool)
+        bad[coord_tokens] = _parse_numbers(raw, starts[coord_tokens], lengths[coord_tokens], compute_values=False)[1]
+        if len(line_first):
+            valid &= ~np.logical_or.reduceat(bad, line_first)
+        class_values = values[valid]
+        coords = EMPTY_LABELS.coords
+    valid_first = line_first[valid]
+    class_ids = class_values.astype(np.int64)
+    offsets = np.zeros(len(valid_first) + 1, dtype=np.int64)
+    np.cumsum(line_tokens[valid] - 1, out=offsets[1:])
+    line_file = np.searchsorted(file_starts, starts[valid_first], side='right') - 1
+    file_first_line = np.searchsorted(newlines, file_starts[:-1])
+    line_numbers = token_line[valid_first] - file_first_line[line_file] + 1
+    line_offsets = np.searchsorted(line_file, np.arange(file_count + 1))
+    return (line_offsets, class_ids, line_numbers, offsets, coords)
+
+
+def parse_label_bytes(data, coordinates: bool = True) -> LabelArrays:
+    raw = np.frombuffer(data, dtype=np.uint8)
+    line_offsets, class_ids, line_numbers, offsets, coords = parse_label_batch(raw, np.array([0, len(raw)], dtype=np.int64), coordinates)
+    return LabelArrays(class_ids, offsets, coords, line_numbers)
+
+
+class LabelReader:
+
+    def __init__(self, batch_files: int = BATCH_FILES, batch_bytes: int = BATCH_BYTES):
+        self.batch_files = max(1, batch_files)
+        self.batch_bytes = max(1, batch_bytes)
+        self._buffer = bytearray(self.batch_bytes)
+
+    def _reserve(self, used: int, needed: int) -> memoryview:
+        buffer = bytearray(max(needed, 2 * len(self._buffer)))
+        buffer[:used] = memoryview(self._buffer)[:used]
+        self._buffer = buffer
+        return memoryview(buffer)
+
+    def _batches(self, label_paths: Iterable[Optional[str]]) -> Iterator[Tuple[list, object]]:
+        entries = []
+        position = 0
+        view = memoryview(self._buffer)
+        for label_path in label_paths:
+            if len(entries) >= self.batch_files or position >= self.batch_bytes:
+                yield (entries, self._buffer)
+                entries = []
+                position = 0
+            if label_path is None:
+                entries.append((label_path, None, None, None))
+                continue
+            try:
+                fd = os.open(label_path, _OPEN_FLAGS)
+            except FileNotFoundError:
+                entries.append((label_path, None, None, None))
+                continue
+            except OSError as exc:
+                entries.append((label_path, None, None, str(exc)))
+                continue
+            try:
+                size = os.fstat(fd).st_size
+                if size >= MMAP_THRESHOLD:
+                    if entries:
+                        yield (entries, self._buffer)
+                        entries = []
+                        position = 0
+                    with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mapped:
+                        yield ([(label_path, 0, size, None)], mapped)
+                    continue
+                start = position
+                end = position + size
+                if end >= len(view):
+                    view = self._reserve(position, end + 1)
+                while position < end:
+                    count = _read_fd(fd, view[position:end])
+                    if count == 0:
+                        break
+                    position += count
+                view[position] = 10
+                entries.append((label_path, start, position, None))
+                position += 1
+            except OSError as exc:
+                entries.append((label_path, None, None, str(exc)))
+            finally:
+                os.close(fd)
+        if entries:
+            yield (entries, self._buffer)
+
+    def iter_bytes(self, label_paths: Iterable[Optional[str]]) -> Iterator[Tuple[Optional[str], Optional[bytes], Optional[str]]]:
+        for entries, buffer in self._batches(label_paths):
+            for label_path, start, end, error in entries:
+                yield (label_path, None if start is None else bytes(buffer[start:end]), error)
+
+    def iter_text(self, label_paths: Iterable[Optional[str]]) -> Iterator[Tuple[Optional[str], Optional[str], Optional[str]]]:
+        for entries, buffer in self._batches(label_paths):
+            with memoryview(buffer) as view:
+                for label_path, start, end, error in entries:
+                    text = None
+                    if start is not None:
+                        try:
+                            text = str(view[start:end], 'utf-8')
+                        except UnicodeDecodeError as exc:
+                            error = str(exc)
+                    yield (label_path, text, error)
+
+    def iter_batches(self, label_paths: Iterable[Optional[str]], coordinates: bool = True) -> Iterator[LabelBatch]:
+        for entries, buffer in self._batches(label_paths):
+            paths = [entry[0] for entry in entries]
+            errors = [entry[3] for entry in entries]
+            present = np.array([entry[1] is not None for entry in entries], dtype=bool)
+            spans = [(entry[1], entry[2]) for entry in entries if entry[1] is not None]
+            line_counts = np.zeros(len(entries), dtype=np.int64)
+            if spans:
+                file_starts = np.empty(len(spans) + 1, dtype=np.int64)
+                file_starts[:-1] = [start for start, _end in spans]
+                file_starts[-1] = spans[-1][1]
+                raw = np.frombuffer(buffer, dtype=np.uint8, count=spans[-1][1])
+                present_offsets, class_ids, line_numbers, offsets, coords = parse_label_batch(raw, file_starts, coordinates)
+                del raw
+                line_counts[present] = np.diff(present_offsets)
+            else:
+                class_ids = line_numbers = EMPTY_LABELS.class_ids
+                offsets, coords = (EMPTY_LABELS.offsets, EMPTY_LABELS.coords)
+            line_offsets = np.zeros(len(entries) + 1, dtype=np.int64)
+            np.cumsum(line_counts, out=line_offsets[1:])
+            yield LabelBatch(paths, errors, present, line_offsets, class_ids, line_numbers, offsets, coords)
+
+    def iter_labels(self, label_paths: Iterable[Optional[str]], coordinates: bool = True) -> Iterator[Tuple[Optional[str], Optional[LabelArrays], Optional[str]]]:
+        for batch in self.iter_batches(label_paths, coordinates):
+            yield from batch
+
+
+def iter_label_batches(label_paths: Iterable[Optional[str]], coordinates: bool = True) -> Iterator[LabelBatch]:
+    return LabelReader().iter_batches(label_paths, coordinates)
+
+
+def iter_labels(label_paths: Iterable[Optional[str]], coordinates: bool = True) -> Iterator[Tuple[Optional[str], Optional[LabelArrays], Optional[str]]]:
+    return LabelReader().iter_labels(label_paths, coordinates)
+
+
+def iter_label_bytes(label_paths: Iterable[Optional[str]]) -> Iterator[Tuple[Optional[str], Optional[bytes], Optional[str]]]:
+    return LabelReader().iter_bytes(label_paths)
+
+
+def iter_label_text(label_paths: Iterable[Optional[str]]) -> Iterator[Tuple[Optional[str], Optional[str], Optional[str]]]:
+    return LabelReader().iter_text(label_paths)
+
+
+def read_label(label_path: Optional[str], coordinates: bool = True) -> Tuple[Optional[LabelArrays], Optional[str]]:
+    _path, labels, error = next(LabelReader(1, 1 << 12).iter_labels([label_path], coordinates))
+    return (labels, error)
+
+
+def read_label_bytes(label_path: Optional[str]) -> Tuple[Optional[bytes], Optional[str]]:
+    _path, data, error = next(LabelReader(1, 1 << 12).iter_bytes([label_path]))
+    return (data, error)
+
+
+def read_label_text(label_path: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    _path, text, error = next(LabelReader(1, 1 << 12).iter_text([label_path]))
+    return (text, error)
@@ -1,60 +1,144 @@
 import xml.etree.ElementTree as ET
+import marshal
+import os
+import sys
 from pathlib import Path
 
+CACHE_FORMAT = 1
+FALLBACK_LANGUAGES = ('pt_BR', 'en_US')
+XML_PATH = Path(__file__).resolve().with_name('languages.xml')
+CACHE_DIR = Path(__file__).resolve().with_name('__pycache__') / 'languages'
+
+
+def _source_stamp(xml_path):
+    st = os.stat(xml_path)
+    return (CACHE_FORMAT, marshal.version, tuple(sys.version_info[:2]), st.st_mtime_ns, st.st_size)
+
+
+def _write_marshal(path, data):
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        marshal.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def iter_xml_languages(xml_path):
+    for _, element in ET.iterparse(xml_path, events=('end',)):
+        if element.tag != 'language':
+            continue
+        strings = {string.get('key'): string.text for string in element.findall('string')}
+        yield (element.get('code'), element.get('name'), strings)
+        element.clear()
+
+
+def read_catalog_index(xml_path=XML_PATH, cache_dir=CACHE_DIR):
+    try:
+        with open(Path(cache_dir) / 'index.marshal', 'rb') as f:
+            index = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(index, dict) or index.get('stamp') != _source_stamp(xml_path):
+        return None
+    return index['languages']
+
+
+def compile_catalog(xml_path=XML_PATH, cache_dir=CACHE_DIR):
+    stamp = _source_stamp(xml_path)
+    cache_dir = Path(cache_dir)
+    names = {}
+    unsaved = {}
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        writable = True
+    except OSError:
+        writable = False
+    for code, name, strings in iter_xml_languages(xml_path):
+        names[code] = name
+        if writable:
+            try:
+                _write_marshal(cache_dir / f'{code}.marshal', strings)
+                continue
+            except OSError:
+                writable = False
+        unsaved[code] = strings
+    if writable:
+        try:
+            _write_marshal(cache_dir / 'index.marshal', {'stamp': stamp, 'languages': names})
+        except OSError:
+            pass
+    return (names, unsaved)
+
+
+def load_language_strings(code, cache_dir=CACHE_DIR):
+    with open(Path(cache_dir) / f'{code}.marshal', 'rb') as f:
+        return marshal.load(f)
+
+
 class LocalizationManager:
     _instance = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(LocalizationManager, cls).__new__(cls)
-            cls._instance.languages = {}
+            cls._instance.xml_path = XML_PATH
+            cls._instance.cache_dir = CACHE_DIR
+            cls._instance.language_names = {}
+            cls._instance.strings = {}
+            cls._instance.lookup = {}
             cls._instance.current_language = 'pt_BR'
             cls._instance.load_languages()
         return cls._instance
 
     def load_languages(self):
         try:
-            xml_path = Path(__file__).resolve().with_name('languages.xml')
-            tree = ET.parse(xml_path)
-            root = tree.getroot()
-            for lang in root.findall('language'):
-                code = lang.get('code')
-                name = lang.get('name')
-                strings = {}
-                for string in lang.findall('string'):
-                    key = string.get('key')
-                    value = string.text
-                    strings[key] = value
-                self.languages[code] = {'name': name, 'strings': strings}
+            names = read_catalog_index(self.xml_path, self.cache_dir)
+            unsaved = {}
+            if names is None:
+                names, unsaved = compile_catalog(self.xml_path, self.cache_dir)
+            self.language_names = names
+            self.strings = unsaved
         except Exception as e:
             print(f'Error loading languages: {e}')
+        self._rebuild_lookup()
+
+    def _rebuild_lookup(self):
+        lookup = {}
+        for code in reversed((self.current_language,) + FALLBACK_LANGUAGES):
+            strings = self._strings_for(code)
+            if strings:
+                lookup.update(strings)
+        self.lookup = lookup
+
+    def _strings_for(self, code):
+        strings = self.strings.get(code)
+        if strings is not None or code not in self.language_names:
+            return strings
+        try:
+            strings = load_language_strings(code, self.cache_dir)
+        except (OSError, EOFError, ValueError, TypeError):
+            strings = next((data for lang_code, _, data in iter_xml_languages(self.xml_path) if lang_code == code), {})
+        self.strings[code] = strings
+        return strings
 
     def reload_languages(self):
-        self.languages = {}
+        self.language_names = {}
+        self.strings = {}
         self.load_languages()
 
     def set_language(self, code):
-        if code in self.languages:
+        if code in self.language_names and code != self.current_language:
             self.current_language = code
+            self._rebuild_lookup()
 
     def get_string(self, key):
-        lang_data = self.languages.get(self.current_language)
-        if lang_data and key in lang_data['strings']:
-            return lang_data['strings'][key]
-        pt_data = self.languages.get('pt_BR')
-        if pt_data and key in pt_data['strings']:
-            return pt_data['strings'][key]
-        en_data = self.languages.get('en_US')
-        if en_data and key in en_data['strings']:
-            return en_data['strings'][key]
-        return key
+        return self.lookup.get(key, key)
 
     def get_available_languages(self):
-        return [(data['name'], code) for code, data in self.languages.items()]
+        return [(name, code) for code, name in self.language_names.items()]
 _loc_manager = LocalizationManager()
 
 def tr(key):
-    return _loc_manager.get_string(key)
+    return _loc_manager.lookup.get(key, key)
 
 def reload():
     _loc_manager.reload_languages()
@@ -65,5 +149,8 @@ def set_language(code):
 def get_languages():
     return _loc_manager.get_available_languages()
 
+def get_lookup():
+    return _loc_manager.lookup
+
 def get_current_language():
     return _loc_manager.current_language
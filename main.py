@@ -1,53 +1,43 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog
-from dataclasses import dataclass
 from pathlib import Path
 from PIL import Image
-import os, json, yaml, logging, copy, random, shutil
+import os, json, logging, copy, threading
 from typing import List, Tuple, Optional
 import localization
 import logger_config
 from config import Config
 from state import AppState
 from managers import AnnotationManager, ClassCatalogManager, DatasetUtils
+from dataset_index import ClassIndex
+import dataset_ops
+from dataset_ops import DatasetCopyOptions, DatasetCopyPlan
 from canvas import CanvasController
 from ui import UIManager
 from window_class_manager import ClassManagerWindow
-from window_new_project import NewProjectWindow
-from window_split_wizard import SplitWizard
-from visualizador_grid import GridViewerWindow
-from analisador_dataset import DatasetAnalyzerWindow
-from window_about import AboutWindow
+from utils import lazy_import
 from utils_ui import center_window, maximize_window
+window_new_project = lazy_import('window_new_project')
+window_split_wizard = lazy_import('window_split_wizard')
+dataset_split = lazy_import('dataset_split')
+dataset_query = lazy_import('dataset_query')
+dataset_dedup = lazy_import('dataset_dedup')
+dataset_validation = lazy_import('dataset_validation')
+window_validation = lazy_import('window_validation')
+visualizador_grid = lazy_import('visualizador_grid')
+analisador_dataset = lazy_import('analisador_dataset')
+window_about = lazy_import('window_about')
 logger_config.setup_logging()
 logger = logging.getLogger(__name__)
 
 
-@dataclass(frozen=True)
-class DatasetCopyOptions:
-    remove_missing_labels: bool = False
-    remove_empty_labels: bool = False
-    reduce_percentage: int = 0
-
-
-@dataclass(frozen=True)
-class DatasetCopyPlan:
-    total_images: int
-    images_to_copy: Tuple[str, ...]
-    removed_missing_labels: int = 0
-    removed_empty_labels: int = 0
-    removed_by_reduction: int = 0
-
-    @property
-    def copied_count(self) -> int:
-        return len(self.images_to_copy)
-
-    @property
-    def removed_total(self) -> int:
-        return self.removed_missing_labels + self.removed_empty_labels + self.removed_by_reduction
-
-
 class MainApplication:
+    class_index = None
+    image_summary = None
+    duplicate_report = None
+    background_tasks = frozenset()
+    summary_pending_paths = frozenset()
+    pending_image_filter = ''
 
     def __init__(self, root: tk.Tk):
         logger.info('Start Application...')
@@ -232,13 +222,9 @@ class MainApplication:
             self.toggle_drawing_mode(force_state=False)
         self.ui.dir_label.config(text=f"{localization.tr('COL_FOLDER')}: {os.path.basename(self.app_state.base_directory)}")
         self._load_class_names()
-        valid = ('.png', '.jpg', '.jpeg', '.bmp')
-        self.app_state.image_paths = []
-        for r, dirs, files in os.walk(self.app_state.base_directory):
-            dirs[:] = [directory for directory in dirs if directory.casefold() != 'labels']
-            for f in sorted(files):
-                if f.lower().endswith(valid):
-                    self.app_state.image_paths.append(os.path.join(r, f))
+        self.app_state.image_paths = dataset_ops.list_dataset_images(self.app_state.base_directory)
+        self._reset_image_filter()
+        self._start_class_index(self.app_state.base_directory)
         self.ui.refresh_image_list()
         if self.app_state.image_paths:
             self.ui.add_box_check.config(state='normal')
@@ -253,6 +239,144 @@ class MainApplication:
             self.ui.annotation_listbox.delete(0, tk.END)
             self.ui.add_box_check.config(state='disabled')
 
+    def _start_class_index(self, base_dir: str):
+        if self.class_index is not None and self.class_index.dirty:
+            self.class_index.save()
+        self.class_index = None
+
+        def build():
+            try:
+                index = ClassIndex.open(base_dir)
+            except OSError as exc:
+                logger.warning(f'Índice de classes indisponível para {base_dir}: {exc}')
+                return
+            if self.app_state.base_directory == base_dir:
+                self.class_index = index
+        threading.Thread(target=build, name='class-index', daemon=True).start()
+
+    def _post_to_ui(self, callback, *args):
+        try:
+            self.root.after(0, callback, *args)
+        except (RuntimeError, tk.TclError):
+            pass
+
+    def _run_in_background(self, name: str, work, on_done, on_error=None) -> bool:
+        if name in self.background_tasks:
+            return False
+        self.background_tasks = self.background_tasks | {name}
+
+        def finish(callback, *args):
+            self.background_tasks = self.background_tasks - {name}
+            callback(*args)
+
+        def show_error(message):
+            messagebox.showerror('Erro', message, parent=self.root)
+
+        def run():
+            try:
+                result = work()
+            except Exception as exc:
+                logger.error(f'Falha na tarefa {name}: {exc}')
+                self._post_to_ui(finish, on_error or show_error, str(exc))
+                return
+            self._post_to_ui(finish, on_done, result)
+        threading.Thread(target=run, name=name, daemon=True).start()
+        return True
+
+    def _reset_image_filter(self):
+        if self.image_summary is not None and self.image_summary.dirty:
+            self.image_summary.save()
+        self.image_summary = None
+        self.summary_pending_paths = frozenset()
+        self.duplicate_report = None
+        self.app_state.all_image_paths = list(self.app_state.image_paths)
+        self.app_state.image_filter = ''
+        self.ui.filter_var.set('')
+        self.ui.update_filter_status(len(self.app_state.image_paths), len(self.app_state.image_paths))
+
+    def _build_image_summary_in_background(self, on_done) -> bool:
+        base_dir = self.app_state.base_directory
+        image_paths = list(self.app_state.all_image_paths)
+
+        def work():
+            return dataset_query.build_image_summary(
+                base_dir,
+                image_paths,
+                progress=lambda done, total: self._post_to_ui(self.ui.show_progress, f'Indexando imagens para o filtro: {done}/{total}')
+            )
+
+        def done(summary):
+            if self.app_state.base_directory != base_dir or self.image_summary is not None:
+                return
+            pending = self.summary_pending_paths
+            self.summary_pending_paths = frozenset()
+            current = set(self.app_state.all_image_paths)
+            summary.remove_paths([path for path in pending if path not in current])
+            summary.update_paths([path for path in pending if path in current])
+            self.image_summary = summary
+            on_done()
+        if not self._run_in_background('image-summary', work, done):
+            return False
+        self.ui.show_progress('Indexando imagens para o filtro...')
+        return True
+
+    def _note_image_changed(self, image_path: str, removed: bool = False):
+        if self.image_summary is not None:
+            if removed:
+                self.image_summary.remove_paths([image_path])
+            else:
+                self.image_summary.update_paths([image_path])
+        elif 'image-summary' in self.background_tasks:
+            self.summary_pending_paths = self.summary_pending_paths | {image_path}
+
+    def apply_image_filter(self, query_text: Optional[str] = None):
+        if not self.app_state.base_directory:
+            return
+        query_text = (self.ui.filter_var.get() if query_text is None else query_text).strip()
+        if not query_text:
+            self.clear_image_filter()
+            return
+        try:
+            query = dataset_query.parse_query(query_text, self.app_state.class_names)
+        except dataset_query.QueryError as exc:
+            messagebox.showwarning(localization.tr('MSG_WARN_TITLE'), str(exc), parent=self.root)
+            return
+        self._save_current_annotations_before_bulk_cleanup()
+        if self.image_summary is None:
+            self.pending_image_filter = query_text
+            self._build_image_summary_in_background(lambda: self.apply_image_filter(self.pending_image_filter))
+            return
+        selected = query.select(self.image_summary)
+        self.app_state.image_filter = query.text
+        self._show_image_selection(selected)
+        self.ui.update_status_bar(f'Filtro "{query.text}": {len(selected)} de {len(self.app_state.all_image_paths)} imagem(ns).')
+
+    def clear_image_filter(self):
+        self.ui.filter_var.set('')
+        if not self.app_state.image_filter:
+            return
+        self._save_current_annotations_before_bulk_cleanup()
+        self.app_state.image_filter = ''
+        self._show_image_selection(list(self.app_state.all_image_paths))
+
+    def _show_image_selection(self, image_paths: List[str]):
+        current_path = self.app_state.get_current_image_path()
+        self.app_state.image_paths = image_paths
+        self.ui.refresh_image_list()
+        self.ui.update_filter_status(len(image_paths), len(self.app_state.all_image_paths))
+        if not image_paths:
+            self.app_state.current_image_index = -1
+            self.app_state.data_is_safe_to_save = False
+            self.app_state.annotations = []
+            self.app_state.current_pil_image = None
+            self.canvas_controller.displayed_photo = None
+            self.ui.canvas.delete('all')
+            self.ui.status_label.config(text='--')
+            self.ui.annotation_listbox.delete(0, tk.END)
+            return
+        index = image_paths.index(current_path) if current_path in image_paths else 0
+        self.show_image_at_index(index)
+
     def show_image_at_index(self, index):
         if not 0 <= index < len(self.app_state.image_paths):
             return
@@ -323,6 +447,9 @@ class MainApplication:
             return
         lp = self.ann_manager.get_label_path(self.app_state.get_current_image_path())
         if self.ann_manager.save_annotations(lp, self.app_state.annotations):
+            if self.class_index is not None:
+                self.class_index.update_paths([lp])
+            self._note_image_changed(self.app_state.get_current_image_path())
             if update_listbox:
                 self.ui.refresh_annotation_list()
             if new_selection is not None:
@@ -407,7 +534,14 @@ class MainApplication:
                 os.remove(image_path)
             if os.path.exists(label_path):
                 os.remove(label_path)
+            if self.class_index is not None:
+                self.class_index.update_paths([label_path])
             self.app_state.image_paths.pop(index)
+            if image_path in self.app_state.all_image_paths:
+                self.app_state.all_image_paths.remove(image_path)
+            self._note_image_changed(image_path, removed=True)
+            self.duplicate_report = None
+            self.ui.update_filter_status(len(self.app_state.image_paths), len(self.app_state.all_image_paths))
             self.ui.listbox.delete(index)
             new_index = min(index, len(self.app_state.image_paths) - 1)
             if new_index >= 0:
@@ -430,11 +564,7 @@ class MainApplication:
             self._save_and_refresh(update_listbox=False)
 
     def _label_file_is_empty(self, label_path: str) -> bool:
-        try:
-            with open(label_path, 'r', encoding='utf-8') as handle:
-                return not any(line.strip() for line in handle)
-        except OSError:
-            return False
+        return dataset_ops.label_file_is_empty(label_path)
 
     def _delete_image_paths(
         self,
@@ -463,15 +593,7 @@ class MainApplication:
         return (removed_count, errors)
 
     def _get_unlabeled_cleanup_groups(self) -> Tuple[List[str], List[str]]:
-        missing_label_images = []
-        empty_label_images = []
-        for image_path in self.app_state.image_paths:
-            label_path = self.ann_manager.get_label_path(image_path)
-            if not os.path.isfile(label_path):
-                missing_label_images.append(image_path)
-            elif self._label_file_is_empty(label_path):
-                empty_label_images.append(image_path)
-        return (missing_label_images, empty_label_images)
+        return dataset_ops.unlabeled_cleanup_groups(self.app_state.image_paths)
 
     def _format_cleanup_preview(self, image_paths: List[str]) -> str:
         if not image_paths:
@@ -577,48 +699,38 @@ class MainApplication:
             return None
         return bool(result['include_empty_labels'])
 
-    def _build_dataset_copy_plan(self, options: DatasetCopyOptions) -> DatasetCopyPlan:
-        total_images = len(self.app_state.image_paths)
-        missing_label_images = []
-        empty_label_images = []
-        cleanup_exclusions = set()
-        removed_missing_labels = 0
-        removed_empty_labels = 0
-
-        if options.remove_missing_labels or options.remove_empty_labels:
-            missing_label_images, empty_label_images = self._get_unlabeled_cleanup_groups()
-            if options.remove_missing_labels:
-                cleanup_exclusions.update(missing_label_images)
-                removed_missing_labels = len(missing_label_images)
-            if options.remove_empty_labels:
-                cleanup_exclusions.update(empty_label_images)
-                removed_empty_labels = len(empty_label_images)
-
-        candidate_images = [
-            image_path
-            for image_path in self.app_state.image_paths
-            if image_path not in cleanup_exclusions
-        ]
+    def _store_duplicate_report(self, report):
+        self.duplicate_report = report
+        summary = report.summary()
+        self.ui.update_status_bar(f"Duplicatas: {summary['redundant_images']} imagem(ns) redundante(s) em {len(report.clusters)} grupo(s).")
 
-        removed_by_reduction = 0
-        images_to_copy = list(candidate_images)
-        if options.reduce_percentage > 0:
-            removed_by_reduction = self._calculate_dataset_reduction_count(len(candidate_images), options.reduce_percentage)
-            if removed_by_reduction > 0:
-                excluded_by_reduction = set(random.sample(candidate_images, removed_by_reduction))
-                images_to_copy = [
-                    image_path
-                    for image_path in candidate_images
-                    if image_path not in excluded_by_reduction
-                ]
-
-        return DatasetCopyPlan(
-            total_images=total_images,
-            images_to_copy=tuple(images_to_copy),
-            removed_missing_labels=removed_missing_labels,
-            removed_empty_labels=removed_empty_labels,
-            removed_by_reduction=removed_by_reduction,
-        )
+    def _find_duplicates_in_background(self, on_done, progress, on_error=None) -> bool:
+        base_dir = self.app_state.base_directory
+        image_paths = list(self.app_state.all_image_paths)
+
+        def work():
+            return dataset_dedup.find_duplicates(base_dir, image_paths, progress=lambda done, total: self._post_to_ui(progress, done, total))
+
+        def done(report):
+            if self.app_state.base_directory == base_dir:
+                self._store_duplicate_report(report)
+            on_done()
+        return self._run_in_background('duplicate-search', work, done, on_error)
+
+    def _duplicate_groups(self) -> List[Tuple[str, ...]]:
+        if self.duplicate_report is None:
+            self.ui.show_progress('Procurando imagens duplicadas...')
+            self._store_duplicate_report(dataset_dedup.find_duplicates(
+                self.app_state.base_directory,
+                self.app_state.all_image_paths,
+                progress=lambda done, total: self.ui.show_progress(f'Procurando imagens duplicadas: {done}/{total}')
+            ))
+        return [cluster.paths for cluster in self.duplicate_report.clusters]
+
+    def _build_dataset_copy_plan(self, options: DatasetCopyOptions) -> DatasetCopyPlan:
+        total_images = len(self.app_state.all_image_paths) if self.app_state.image_filter else None
+        duplicate_groups = self._duplicate_groups() if options.remove_duplicates else ()
+        return dataset_ops.build_copy_plan(self.app_state.image_paths, options, total_images=total_images, duplicate_groups=duplicate_groups)
 
     def _format_dataset_copy_plan_summary(self, plan: DatasetCopyPlan, copied_count: Optional[int]=None) -> str:
         copied = plan.copied_count if copied_count is None else copied_count
@@ -632,34 +744,14 @@ class MainApplication:
             lines.append(f'Fora da copia por label vazio: {plan.removed_empty_labels} imagem(ns)')
         if plan.removed_by_reduction:
             lines.append(f'Fora da copia por reducao aleatoria: {plan.removed_by_reduction} imagem(ns)')
+        if plan.removed_by_filter:
+            lines.append(f'Fora da copia pelo filtro ativo: {plan.removed_by_filter} imagem(ns)')
+        if plan.removed_duplicates:
+            lines.append(f'Fora da copia por duplicatas: {plan.removed_duplicates} imagem(ns)')
         return '\n'.join(lines)
 
     def _build_dataset_copy_directory(self, options: DatasetCopyOptions, plan: DatasetCopyPlan) -> Path:
-        base_path = Path(self.app_state.base_directory).resolve()
-        keep_percentage = int(round((plan.copied_count / plan.total_images) * 100)) if plan.total_images else 0
-
-        if (
-            options.reduce_percentage > 0
-            and not options.remove_missing_labels
-            and not options.remove_empty_labels
-        ):
-            target_name = f'{base_path.name}_reduzido_{keep_percentage}pct'
-        else:
-            name_parts = ['copia']
-            if options.remove_missing_labels:
-                name_parts.append('sem_label')
-            if options.remove_empty_labels:
-                name_parts.append('sem_vazio')
-            if options.reduce_percentage > 0:
-                name_parts.append(f'reduzido_{keep_percentage}pct')
-            target_name = f'{base_path.name}_' + '_'.join(name_parts)
-
-        candidate = base_path.parent / target_name
-        suffix = 2
-        while candidate.exists():
-            candidate = base_path.parent / f'{target_name}_{suffix}'
-            suffix += 1
-        return candidate
+        return dataset_ops.build_copy_directory(self.app_state.base_directory, options, plan)
 
     def _create_dataset_copy(self, options: DatasetCopyOptions) -> Optional[Path]:
         if not self.app_state.base_directory or not self.app_state.image_paths:
@@ -679,7 +771,7 @@ class MainApplication:
 
         target_dir = self._build_dataset_copy_directory(options, plan)
         try:
-            copied_count, errors = self._copy_selected_dataset_files(list(plan.images_to_copy), target_dir)
+            copied_count, errors = self._copy_selected_dataset_files(list(plan.images_to_copy), target_dir, link_mode=options.link_mode)
         except Exception as exc:
             messagebox.showerror('Erro', f'Falha ao criar copia derivada:\n\n{exc}', parent=self.root)
             return None
@@ -723,6 +815,8 @@ class MainApplication:
         remove_empty_var = tk.BooleanVar(value=allow_cleanup and not missing_label_images and bool(empty_label_images))
         apply_reduction_var = tk.BooleanVar(value=allow_reduction and not allow_cleanup)
         percentage_var = tk.DoubleVar(value=10)
+        remove_duplicates_var = tk.BooleanVar(value=False)
+        link_mode_var = tk.StringVar(value=Config.DATASET_COPY_LINK_MODE)
         result = {'options': None}
 
         container = ttk.Frame(dialog, padding=14)
@@ -799,6 +893,38 @@ class MainApplication:
             )
             slider.pack(fill=tk.X, pady=(6, 0))
 
+        if allow_cleanup:
+            duplicates_frame = ttk.LabelFrame(container, text='Duplicatas', padding=10)
+            duplicates_frame.pack(fill=tk.X, pady=(0, 10))
+            ttk.Checkbutton(
+                duplicates_frame,
+                text='Manter apenas uma imagem por grupo de duplicatas (exatas ou quase identicas)',
+                variable=remove_duplicates_var,
+            ).pack(anchor='w')
+            ttk.Label(
+                duplicates_frame,
+                text='A busca usa hashes salvos em .xanotation, roda em segundo plano e so e feita ao marcar a opcao.',
+                foreground='#555555',
+                justify='left',
+                wraplength=500,
+            ).pack(anchor='w', pady=(4, 0))
+
+        link_frame = ttk.LabelFrame(container, text='Imagens na nova pasta', padding=10)
+        link_frame.pack(fill=tk.X, pady=(0, 10))
+        for value, text in (
+            ('copy', 'Copiar arquivos (independente do original)'),
+            ('hardlink', 'Hardlink (instantaneo, sem espaco extra; mesmo disco)'),
+            ('reflink', 'Reflink/clone (Btrfs, XFS; copia se nao suportado)'),
+        ):
+            ttk.Radiobutton(link_frame, text=text, value=value, variable=link_mode_var).pack(anchor='w')
+        ttk.Label(
+            link_frame,
+            text='Labels e metadados sempre sao copiados. Com hardlink, editar uma imagem altera tambem o original.',
+            foreground='#555555',
+            justify='left',
+            wraplength=500,
+        ).pack(anchor='w', pady=(4, 0))
+
         summary_label = ttk.Label(container, justify='left', wraplength=540)
         summary_label.pack(anchor='w', pady=(0, 10))
 
@@ -820,6 +946,8 @@ class MainApplication:
                 remove_missing_labels=allow_cleanup and remove_missing_var.get(),
                 remove_empty_labels=allow_cleanup and remove_empty_var.get(),
                 reduce_percentage=reduce_percentage,
+                link_mode=link_mode_var.get(),
+                remove_duplicates=allow_cleanup and remove_duplicates_var.get(),
             )
 
         def update_summary(*_):
@@ -832,11 +960,18 @@ class MainApplication:
             if slider is not None:
                 slider.config(state='normal' if options.reduce_percentage > 0 else 'disabled')
 
-            if not (options.remove_missing_labels or options.remove_empty_labels or options.reduce_percentage > 0):
+            if not (options.remove_missing_labels or options.remove_empty_labels or options.remove_duplicates or options.reduce_percentage > 0):
                 summary_label.config(text='Selecione pelo menos uma transformacao para criar a copia.')
                 create_button.config(state='disabled')
                 return
 
+            if options.remove_duplicates and self.duplicate_report is None:
+                summary_label.config(text='Procurando imagens duplicadas...')
+                create_button.config(state='disabled')
+                if not self._find_duplicates_in_background(refresh_if_open, show_duplicate_progress, duplicate_search_failed):
+                    dialog.after(500, refresh_if_open)
+                return
+
             plan = self._build_dataset_copy_plan(options)
             preview = self._format_dataset_copy_plan_summary(plan)
             if options.reduce_percentage > 0:
@@ -849,6 +984,19 @@ class MainApplication:
                 create_button.config(state='normal')
             summary_label.config(text=preview)
 
+        def refresh_if_open():
+            if dialog.winfo_exists():
+                update_summary()
+
+        def show_duplicate_progress(done, total):
+            if dialog.winfo_exists() and remove_duplicates_var.get():
+                summary_label.config(text=f'Procurando imagens duplicadas: {done}/{total}')
+
+        def duplicate_search_failed(message):
+            messagebox.showerror('Erro', f'Falha ao procurar duplicatas:\n\n{message}', parent=self.root)
+            if dialog.winfo_exists():
+                remove_duplicates_var.set(False)
+
         def confirm():
             result['options'] = current_options()
             dialog.destroy()
@@ -863,6 +1011,7 @@ class MainApplication:
         if allow_cleanup:
             remove_missing_var.trace_add('write', update_summary)
             remove_empty_var.trace_add('write', update_summary)
+            remove_duplicates_var.trace_add('write', update_summary)
         if allow_reduction:
             apply_reduction_var.trace_add('write', update_summary)
             slider.config(command=update_summary)
@@ -883,11 +1032,41 @@ class MainApplication:
             return
 
         self._save_current_annotations_before_bulk_cleanup()
+        if self._handle_interrupted_copies():
+            return
         options = self._ask_dataset_copy_options()
         if options is None:
             return
         self._create_dataset_copy(options)
 
+    def _handle_interrupted_copies(self) -> bool:
+        interrupted = dataset_ops.find_interrupted_copies(self.app_state.base_directory)
+        if not interrupted:
+            return False
+        names = '\n'.join(str(path) for path in interrupted)
+        answer = messagebox.askyesnocancel(
+            'Copia interrompida',
+            f'Copias derivadas incompletas foram encontradas:\n\n{names}\n\n'
+            'Sim: retomar de onde parou\nNao: apagar as copias incompletas\nCancelar: decidir depois',
+            parent=self.root,
+        )
+        if answer is None:
+            return True
+        for target_dir in interrupted:
+            try:
+                if answer:
+                    copied_count, errors = dataset_ops.resume_copy(target_dir, progress=self._report_copy_progress)
+                    summary = f'Copia concluida em:\n{target_dir}\n\n{copied_count} imagem(ns) na copia.'
+                    if errors:
+                        messagebox.showwarning('Copia parcial', summary + f'\n\n{len(errors)} arquivo(s) falharam.', parent=self.root)
+                    else:
+                        messagebox.showinfo('Copia derivada criada', summary, parent=self.root)
+                else:
+                    dataset_ops.rollback_copy(target_dir)
+            except Exception as exc:
+                messagebox.showerror('Erro', f'Falha ao recuperar {target_dir}:\n\n{exc}', parent=self.root)
+        return True
+
     def remove_images_without_labels(self):
         if not self.app_state.base_directory or not self.app_state.image_paths:
             messagebox.showwarning('Aviso', 'Abra um dataset com imagens.', parent=self.root)
@@ -911,11 +1090,7 @@ class MainApplication:
         )
 
     def _calculate_dataset_reduction_count(self, total_images: int, reduce_percentage: int) -> int:
-        if total_images <= 1 or reduce_percentage <= 0:
-            return 0
-        percentage = max(1, min(99, int(reduce_percentage)))
-        delete_count = int(total_images * percentage / 100 + 0.5)
-        return min(total_images - 1, max(1, delete_count))
+        return dataset_ops.calculate_reduction_count(total_images, reduce_percentage)
 
     def _ask_reduce_dataset_percentage(self) -> Optional[int]:
         total_images = len(self.app_state.image_paths)
@@ -1013,62 +1188,19 @@ class MainApplication:
         )
 
     def _relative_to_dataset_base(self, path: str) -> Optional[Path]:
-        try:
-            return Path(path).resolve().relative_to(Path(self.app_state.base_directory).resolve())
-        except ValueError:
-            return None
+        return dataset_ops.relative_to_base(self.app_state.base_directory, path)
 
     def _copy_dataset_metadata_to_target_dir(self, target_dir: Path) -> None:
-        base_path = Path(self.app_state.base_directory).resolve()
-        metadata_files = ['classes.txt', *Config.SUPPORTED_DATA_FILES]
-        for file_name in metadata_files:
-            source_path = base_path / file_name
-            if not source_path.is_file():
-                continue
-            target_path = target_dir / file_name
-            target_path.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(source_path, target_path)
-            if file_name in Config.SUPPORTED_DATA_FILES:
-                try:
-                    with open(target_path, 'r', encoding='utf-8') as handle:
-                        data = yaml.safe_load(handle) or {}
-                    if isinstance(data, dict) and 'path' in data:
-                        data['path'] = '.'
-                        with open(target_path, 'w', encoding='utf-8') as handle:
-                            yaml.dump(data, handle, sort_keys=False, allow_unicode=True)
-                except Exception:
-                    logger.exception(f'Falha ao ajustar path em {target_path}')
+        dataset_ops.copy_dataset_metadata(self.app_state.base_directory, target_dir)
 
     def _copy_dataset_metadata_to_reduced_dir(self, target_dir: Path) -> None:
         self._copy_dataset_metadata_to_target_dir(target_dir)
 
-    def _copy_selected_dataset_files(self, image_paths: List[str], target_dir: Path) -> Tuple[int, List[str]]:
-        copied_count = 0
-        errors = []
-        target_dir.mkdir(parents=True, exist_ok=False)
-        self._copy_dataset_metadata_to_target_dir(target_dir)
+    def _report_copy_progress(self, done: int, total: int) -> None:
+        self.ui.show_progress(f'Copiando dataset: {done}/{total} imagem(ns)')
 
-        for image_path in image_paths:
-            try:
-                relative_image_path = self._relative_to_dataset_base(image_path)
-                if relative_image_path is None:
-                    errors.append(f'{os.path.basename(image_path)}: caminho fora do dataset')
-                    continue
-                target_image_path = target_dir / relative_image_path
-                target_image_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(image_path, target_image_path)
-                copied_count += 1
-
-                label_path = self.ann_manager.get_label_path(image_path)
-                if os.path.isfile(label_path):
-                    relative_label_path = self._relative_to_dataset_base(label_path)
-                    if relative_label_path is not None:
-                        target_label_path = target_dir / relative_label_path
-                        target_label_path.parent.mkdir(parents=True, exist_ok=True)
-                        shutil.copy2(label_path, target_label_path)
-            except Exception as exc:
-                errors.append(f'{os.path.basename(image_path)}: {exc}')
-        return (copied_count, errors)
+    def _copy_selected_dataset_files(self, image_paths: List[str], target_dir: Path, link_mode: str = 'copy') -> Tuple[int, List[str]]:
+        return dataset_ops.copy_dataset_files(self.app_state.base_directory, image_paths, target_dir, progress=self._report_copy_progress, link_mode=link_mode)
 
     def _copy_reduced_dataset_files(self, image_paths: List[str], target_dir: Path) -> Tuple[int, List[str]]:
         return self._copy_selected_dataset_files(image_paths, target_dir)
@@ -1115,28 +1247,7 @@ class MainApplication:
         self.ui.canvas.config(cursor='crosshair' if self.app_state.is_drawing else '')
 
     def _load_class_names(self):
-        self.app_state.class_names = []
-        p = os.path.join(self.app_state.base_directory, 'classes.txt')
-        if os.path.exists(p):
-            with open(p, 'r', encoding='utf-8') as f:
-                self.app_state.class_names = [x.strip() for x in f if x.strip()]
-        else:
-            for yaml_file in Config.SUPPORTED_DATA_FILES:
-                yaml_path = os.path.join(self.app_state.base_directory, yaml_file)
-                if os.path.exists(yaml_path):
-                    try:
-                        with open(yaml_path, 'r', encoding='utf-8') as f:
-                            data = yaml.safe_load(f)
-                            if data and 'names' in data:
-                                names = data['names']
-                                if isinstance(names, dict):
-                                    self.app_state.class_names = [str(names[k]) for k in sorted(names.keys())]
-                                elif isinstance(names, list):
-                                    self.app_state.class_names = [str(n) for n in names]
-                        if self.app_state.class_names:
-                            break
-                    except Exception as e:
-                        logger.error(f"Erro ao carregar classes de {yaml_file}: {e}")
+        self.app_state.class_names = dataset_ops.load_class_names(self.app_state.base_directory)
         self.ui.update_class_selector()
 
     def _ask_for_class_id(self):
@@ -1168,7 +1279,7 @@ class MainApplication:
         self.root.lift()
 
     def open_new_project_wizard(self):
-        NewProjectWindow(self.root, self.on_project_created)
+        window_new_project.NewProjectWindow(self.root, self.on_project_created)
 
     def refresh_directory(self):
         self._load_directory_contents()
@@ -1177,11 +1288,12 @@ class MainApplication:
         if not self.app_state.base_directory:
             messagebox.showwarning(localization.tr('MSG_WARN_TITLE'), 'Abra um dataset.', parent=self.root)
             return
-        usage_counts = ClassCatalogManager.count_class_usage(
+        usage_counts, object_counts = ClassCatalogManager.class_usage(
             self.app_state.base_directory,
-            len(self.app_state.class_names)
+            len(self.app_state.class_names),
+            index=self.class_index
         )
-        ClassManagerWindow(self.root, self.app_state.class_names, self._on_classes_updated, usage_counts)
+        ClassManagerWindow(self.root, self.app_state.class_names, self._on_classes_updated, usage_counts, object_counts)
 
     def _on_classes_updated(self, payload):
         old_classes = list(self.app_state.class_names)
@@ -1203,70 +1315,166 @@ class MainApplication:
             ClassCatalogManager.remap_annotation_class_ids(
                 self.app_state.base_directory,
                 class_id_map,
-                deleted_ids=deleted_ids
+                deleted_ids=deleted_ids,
+                index=self.class_index
             )
-        except ValueError as exc:
+        except (ValueError, OSError) as exc:
             messagebox.showwarning(localization.tr('MSG_WARN_TITLE'), str(exc), parent=self.root)
             return
 
         self.app_state.class_names = class_names
-        with open(os.path.join(self.app_state.base_directory, 'classes.txt'), 'w', encoding='utf-8') as f:
-            f.write('\n'.join(class_names))
-        yaml_updated = False
-        for yaml_file in Config.SUPPORTED_DATA_FILES:
-            yaml_path = os.path.join(self.app_state.base_directory, yaml_file)
-            if not os.path.exists(yaml_path):
-                continue
-            try:
-                with open(yaml_path, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f) or {}
-                if not isinstance(data, dict):
-                    continue
-                data['nc'] = len(class_names)
-                if isinstance(data.get('names'), dict):
-                    data['names'] = {idx: name for idx, name in enumerate(class_names)}
-                else:
-                    data['names'] = class_names
-                with open(yaml_path, 'w', encoding='utf-8') as f:
-                    yaml.dump(data, f, sort_keys=False, allow_unicode=True)
-                yaml_updated = True
-            except Exception as exc:
-                logger.error(f'Erro ao atualizar {yaml_file}: {exc}')
-        if not yaml_updated:
-            yaml_path = os.path.join(self.app_state.base_directory, 'data.yaml')
-            data = {
-                'nc': len(class_names),
-                'names': {idx: name for idx, name in enumerate(class_names)},
-            }
-            with open(yaml_path, 'w', encoding='utf-8') as f:
-                yaml.dump(data, f, sort_keys=False, allow_unicode=True)
+        dataset_ops.write_class_catalog(self.app_state.base_directory, class_names)
         self.ui.update_class_selector()
         self.show_image_at_index(self.app_state.current_image_index)
 
-    def perform_dataset_split(self, train, val, test, shuffle):
+    def _show_split_result(self, result):
+        errors = result.get('errors', [])
+        if errors:
+            details = '\n'.join(errors[:5])
+            if len(errors) > 5:
+                details += f'\n... e mais {len(errors) - 5} erro(s)'
+            messagebox.showwarning('Split parcial', f'Alguns arquivos nao foram movidos:\n\n{details}\n\nO progresso foi registrado; abra o assistente de split novamente para retomar ou desfazer.')
+        else:
+            messagebox.showinfo('Sucesso', 'Dataset dividido com sucesso! As pastas train/val/test foram criadas.')
+        self.refresh_directory()
+
+    def perform_dataset_split(self, train, val, test, shuffle, options=None, plan=None):
         if not self.app_state.base_directory:
             return
         try:
-            DatasetUtils.split_dataset(base_dir=self.app_state.base_directory, train_ratio=train, val_ratio=val, test_ratio=test, shuffle=shuffle)
-            messagebox.showinfo('Sucesso', 'Dataset dividido com sucesso! As pastas train/val/test foram criadas.')
-            self.refresh_directory()
+            if options is None and plan is None:
+                result = DatasetUtils.split_dataset(base_dir=self.app_state.base_directory, train_ratio=train, val_ratio=val, test_ratio=test, shuffle=shuffle)
+            else:
+                if plan is None:
+                    plan = dataset_split.plan_split(dataset_split.scan_split_items(self.app_state.base_directory), (train, val, test), options)
+                result = DatasetUtils.apply_split(self.app_state.base_directory, plan.assignments())
         except Exception as e:
             messagebox.showerror('Erro', f'Falha ao dividir dataset: {str(e)}')
+            return
+        self._show_split_result(result)
+
+    def _handle_interrupted_split(self) -> bool:
+        journal = DatasetUtils.pending_split(self.app_state.base_directory)
+        if journal is None:
+            return False
+        answer = messagebox.askyesnocancel(
+            'Split interrompido',
+            f'Um split anterior foi interrompido ({len(journal.pending())} de {len(journal.actions)} item(ns) pendentes).\n\n'
+            'Sim: retomar o split salvo\nNao: desfazer e restaurar as posicoes originais\nCancelar: decidir depois',
+            parent=self.root,
+        )
+        if answer is None:
+            return True
+        try:
+            if answer:
+                self._show_split_result(DatasetUtils.resume_split(self.app_state.base_directory))
+            else:
+                restored = DatasetUtils.rollback_split(self.app_state.base_directory)
+                messagebox.showinfo('Split desfeito', f'{restored} arquivo(s) restaurados.', parent=self.root)
+                self.refresh_directory()
+        except Exception as e:
+            messagebox.showerror('Erro', f'Falha ao recuperar o split: {str(e)}', parent=self.root)
+        return True
 
     def open_split_wizard(self):
-        SplitWizard(self.root, self.perform_dataset_split)
+        if self.app_state.base_directory and self._handle_interrupted_split():
+            return
+        scanned = {}
+
+        def planner(ratios, options):
+            if 'items' not in scanned:
+                scanned['items'] = dataset_split.scan_split_items(self.app_state.base_directory)
+            plan = dataset_split.plan_split(scanned['items'], ratios, options)
+            DatasetUtils.plan_split_moves(self.app_state.base_directory, plan.assignments())
+            return plan
+        base_dir = self.app_state.base_directory
+        undo = self.undo_last_split if base_dir and DatasetUtils.last_split(base_dir) is not None else None
+        window_split_wizard.SplitWizard(self.root, self.perform_dataset_split, planner=planner if base_dir else None, class_names=self.app_state.class_names, undo=undo)
+
+    def undo_last_split(self):
+        journal = DatasetUtils.last_split(self.app_state.base_directory)
+        if journal is None:
+            return
+        moved = sum(len(action['moves']) for action in journal.actions)
+        if not messagebox.askyesno('Desfazer split', f'Devolver {moved} arquivo(s) movidos pelo ultimo split para as pastas de origem?', parent=self.root):
+            return
+        try:
+            restored = DatasetUtils.rollback_split(self.app_state.base_directory)
+        except Exception as e:
+            messagebox.showerror('Erro', f'Falha ao desfazer o split: {str(e)}', parent=self.root)
+            return
+        messagebox.showinfo('Split desfeito', f'{restored} arquivo(s) restaurados.', parent=self.root)
+        self.refresh_directory()
 
     def open_grid_viewer(self):
         if not self.app_state.image_paths:
             messagebox.showwarning('Aviso', 'Abra um dataset.')
             return
-        GridViewerWindow(self.root, self)
+        visualizador_grid.GridViewerWindow(self.root, self)
+
+    def open_validation(self):
+        if not self.app_state.base_directory:
+            messagebox.showwarning('Aviso', 'Abra um dataset.')
+            return
+        self._save_current_annotations_before_bulk_cleanup()
+        self._start_validation(lambda report: window_validation.ValidationWindow(self.root, report, self._apply_validation_fixes))
+
+    def _start_validation(self, on_done, before=None, on_error=None) -> bool:
+        base_dir = self.app_state.base_directory
+        class_count = len(self.app_state.class_names)
+
+        def work():
+            if before is not None:
+                before()
+            return dataset_validation.validate_dataset(
+                base_dir,
+                class_count,
+                progress=lambda done, total: self._post_to_ui(self.ui.show_progress, f'Validando labels: {done}/{total}')
+            )
+
+        def done(report):
+            self.ui.update_status_bar(f'Validação: {len(report.issues)} problema(s) em {report.files_checked} label(s).')
+            on_done(report)
+        if not self._run_in_background('label-validation', work, done, on_error):
+            return False
+        self.ui.show_progress('Validando labels...')
+        return True
+
+    def _apply_validation_fixes(self, report, actions, on_done):
+        changed_files = report.fixable_files(actions)
+        fix_errors = []
+
+        def apply():
+            files_changed, lines_changed, errors = dataset_validation.apply_fixes(report, actions)
+            fix_errors.extend(errors)
+            logger.info(f'Validação: {lines_changed} linha(s) corrigidas em {files_changed} arquivo(s).')
+
+        def sync_indexes():
+            if self.class_index is not None:
+                self.class_index.update_paths(changed_files)
+            if self.image_summary is not None:
+                self.image_summary.refresh()
+
+        def done(new_report):
+            sync_indexes()
+            if fix_errors:
+                messagebox.showwarning('Aviso', '\n'.join(fix_errors[:10]), parent=self.root)
+            if self.app_state.current_image_index != -1:
+                self.show_image_at_index(self.app_state.current_image_index)
+            on_done(new_report)
+
+        def failed(message):
+            sync_indexes()
+            messagebox.showerror('Erro', f'Falha ao aplicar correções:\n\n{message}', parent=self.root)
+            on_done(None)
+        if not self._start_validation(done, before=apply, on_error=failed):
+            on_done(None)
 
     def open_dataset_analyzer(self):
         if not self.app_state.base_directory:
             messagebox.showwarning('Aviso', 'Abra um dataset.')
             return
-        DatasetAnalyzerWindow(self.root, self.app_state.base_directory, self.app_state.class_names)
+        analisador_dataset.DatasetAnalyzerWindow(self.root, self.app_state.base_directory, self.app_state.class_names)
 
     def select_directory(self):
         initial_dir = self.app_state.base_directory or str(Path.cwd())
@@ -1278,7 +1486,7 @@ class MainApplication:
 
     def show_about_dialog(self):
         localization.reload()
-        AboutWindow(self.root)
+        window_about.AboutWindow(self.root)
 
     def change_language(self, code):
         localization.set_language(code)
@@ -1288,6 +1496,10 @@ class MainApplication:
     def on_close(self):
         if self.app_state.data_is_safe_to_save:
             self._save_and_refresh()
+        if self.class_index is not None and self.class_index.dirty:
+            self.class_index.save()
+        if self.image_summary is not None and self.image_summary.dirty:
+            self.image_summary.save()
         self._save_config()
         self.root.destroy()
 if __name__ == '__main__':
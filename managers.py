@@ -1,10 +1,20 @@
 import os
+import errno
 import shutil
 import random
+import tempfile
 import logging
 from typing import List, Dict, Tuple, Optional, Any
 from glob import glob
+from concurrent.futures import ThreadPoolExecutor
+from dataset_index import ClassIndex
+from operation_journal import SPLIT_JOURNAL_NAME, JournalError, OperationJournal
+from utils import lazy_import
+label_reader = lazy_import('label_reader')
 logger = logging.getLogger(__name__)
+SPLIT_MOVE_BATCH = 256
+SPLIT_MOVE_WORKERS = 8
+REMAP_WORKERS = 8
 
 class AnnotationManager:
 
@@ -18,6 +28,26 @@ class AnnotationManager:
             return os.path.join(possible_label_dir, base_name + '.txt')
         return os.path.join(image_dir, base_name + '.txt')
 
+    @staticmethod
+    def resolve_label_paths(image_paths: List[str]) -> List[Optional[str]]:
+        directories = {}
+        label_paths = []
+        for image_path in image_paths:
+            image_dir, name = os.path.split(image_path)
+            entry = directories.get(image_dir)
+            if entry is None:
+                label_dir = os.path.join(os.path.dirname(image_dir), 'labels')
+                if not os.path.isdir(label_dir):
+                    label_dir = image_dir
+                try:
+                    names = {os.path.normcase(f) for f in os.listdir(label_dir)}
+                except OSError:
+                    names = set()
+                entry = directories[image_dir] = (label_dir, names)
+            label_name = os.path.splitext(name)[0] + '.txt'
+            label_paths.append(os.path.join(entry[0], label_name) if os.path.normcase(label_name) in entry[1] else None)
+        return label_paths
+
     @staticmethod
     def load_annotations(label_path: str, image_size: Tuple[int, int]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
         annotations = []
@@ -123,76 +153,168 @@ class ClassCatalogManager:
         return sorted(annotation_files)
 
     @staticmethod
-    def _extract_used_class_ids(label_path: str) -> List[int]:
-        class_ids = set()
-        with open(label_path, 'r', encoding='utf-8') as handle:
-            for line in handle:
-                stripped = line.strip()
-                if not stripped:
-                    continue
-                parts = stripped.split()
-                if len(parts) < 5:
-                    continue
-                try:
-                    class_ids.add(int(parts[0]))
-                except ValueError:
-                    continue
-        return sorted(class_ids)
+    def class_usage(base_dir: str, class_count: int, index: Optional[ClassIndex] = None) -> Tuple[List[int], List[int]]:
+        if class_count <= 0 or not base_dir or not os.path.isdir(base_dir):
+            return ([0] * max(class_count, 0), [0] * max(class_count, 0))
+        if index is None:
+            index = ClassIndex.open(base_dir)
+        else:
+            index.refresh()
+        return index.usage(class_count)
 
     @staticmethod
     def count_class_usage(base_dir: str, class_count: int) -> List[int]:
-        usage = [0] * max(class_count, 0)
-        if class_count <= 0 or not base_dir or not os.path.isdir(base_dir):
-            return usage
-        for label_path in ClassCatalogManager.iter_annotation_files(base_dir):
-            for class_id in ClassCatalogManager._extract_used_class_ids(label_path):
-                if 0 <= class_id < class_count:
-                    usage[class_id] += 1
-        return usage
+        return ClassCatalogManager.class_usage(base_dir, class_count)[0]
+
+    @staticmethod
+    def _stage_label_file(label_path: str, class_id_map: Dict[int, int], deleted_ids) -> Optional[str]:
+        text, error = label_reader.read_label_text(label_path)
+        if text is None:
+            raise OSError(error or f'Label não encontrado: {label_path}')
+        labels = label_reader.parse_label_bytes(text.encode('utf-8'), coordinates=False)
+        moved = {}
+        for line_number, class_id in zip(labels.line_numbers.tolist(), labels.class_ids.tolist()):
+            if class_id in deleted_ids:
+                raise ValueError(f'Classe em uso detectada em {label_path}: {class_id}')
+            new_class_id = class_id_map.get(class_id, class_id)
+            if new_class_id != class_id:
+                moved[line_number] = new_class_id
+        if not moved:
+            return None
+        lines = text.split('\n')
+        if lines[-1] == '':
+            lines.pop()
+        directory = os.path.dirname(label_path)
+        fd, tmp_path = tempfile.mkstemp(prefix='.remap-', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as output:
+                for line_number, raw_line in enumerate(lines, start=1):
+                    if line_number in moved:
+                        parts = raw_line.split()
+                        parts[0] = str(moved[line_number])
+                        output.write(' '.join(parts) + '\n')
+                    else:
+                        output.write(raw_line[:-1] + '\n' if raw_line.endswith('\r') else raw_line + '\n')
+            shutil.copymode(label_path, tmp_path)
+            return tmp_path
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    @staticmethod
+    def _commit_staged_labels(staged: List[Tuple[str, str]]):
+        committed = []
+        try:
+            for label_path, tmp_path in staged:
+                backup_path = tmp_path + '.orig'
+                os.replace(label_path, backup_path)
+                try:
+                    os.replace(tmp_path, label_path)
+                except OSError:
+                    os.replace(backup_path, label_path)
+                    raise
+                committed.append((label_path, backup_path))
+        except OSError:
+            for label_path, backup_path in reversed(committed):
+                try:
+                    os.replace(backup_path, label_path)
+                except OSError as exc:
+                    logger.error(f'Falha ao restaurar {label_path} a partir de {backup_path}: {exc}')
+            raise
+        for _label_path, backup_path in committed:
+            os.remove(backup_path)
 
     @staticmethod
-    def remap_annotation_class_ids(base_dir: str, class_id_map: Dict[int, int], deleted_ids=None) -> None:
+    def remap_annotation_class_ids(base_dir: str, class_id_map: Dict[int, int], deleted_ids=None, index: Optional[ClassIndex] = None) -> int:
         if not base_dir or not os.path.isdir(base_dir):
-            return
+            return 0
         deleted_ids = set(deleted_ids or [])
-        pending_updates = []
-        for label_path in ClassCatalogManager.iter_annotation_files(base_dir):
-            changed = False
-            updated_lines = []
-            with open(label_path, 'r', encoding='utf-8') as handle:
-                for raw_line in handle:
-                    stripped = raw_line.strip()
-                    if not stripped:
-                        updated_lines.append(raw_line if raw_line.endswith('\n') else raw_line + '\n')
-                        continue
-                    parts = stripped.split()
-                    if len(parts) < 5:
-                        updated_lines.append(raw_line if raw_line.endswith('\n') else raw_line + '\n')
-                        continue
+        if index is None:
+            index = ClassIndex.open(base_dir)
+        else:
+            index.refresh()
+        for class_id in sorted(deleted_ids):
+            in_use = index.files_with_classes([class_id])
+            if in_use:
+                raise ValueError(f'Classe em uso detectada em {in_use[0]}: {class_id}')
+        moved_ids = [old_id for old_id, new_id in class_id_map.items() if old_id != new_id]
+        targets = index.files_with_classes(moved_ids)
+        if not targets:
+            return 0
+        workers = max(1, min(REMAP_WORKERS, len(targets)))
+        staged = []
+        changed = 0
+        failure = None
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='class-remap') as executor:
+                futures = [executor.submit(ClassCatalogManager._stage_label_file, label_path, class_id_map, deleted_ids) for label_path in targets]
+                for label_path, future in zip(targets, futures):
                     try:
-                        class_id = int(parts[0])
-                    except ValueError:
-                        updated_lines.append(raw_line if raw_line.endswith('\n') else raw_line + '\n')
+                        tmp_path = future.result()
+                    except (OSError, ValueError) as exc:
+                        failure = failure or exc
                         continue
-                    if class_id in deleted_ids:
-                        raise ValueError(f'Classe em uso detectada em {label_path}: {class_id}')
-                    new_class_id = class_id_map.get(class_id, class_id)
-                    if new_class_id != class_id:
-                        parts[0] = str(new_class_id)
-                        updated_lines.append(' '.join(parts) + '\n')
-                        changed = True
-                    else:
-                        updated_lines.append(raw_line if raw_line.endswith('\n') else raw_line + '\n')
-            if changed:
-                pending_updates.append((label_path, updated_lines))
-        for label_path, updated_lines in pending_updates:
-            with open(label_path, 'w', encoding='utf-8') as handle:
-                handle.writelines(updated_lines)
+                    if tmp_path:
+                        staged.append((label_path, tmp_path))
+            if failure is None:
+                ClassCatalogManager._commit_staged_labels(staged)
+                changed = len(staged)
+                staged = []
+        finally:
+            for _label_path, tmp_path in staged:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            index.update_paths(targets)
+            index.save()
+        if failure is not None:
+            logger.warning(f'Remapeamento de classes cancelado; nenhum label foi alterado: {failure}')
+            raise failure
+        logger.info(f'Remapeamento de classes: {changed} de {len(targets)} label(s) reescritos.')
+        return changed
+
+class SplitCollisionError(ValueError):
+
+    def __init__(self, collisions):
+        self.collisions = collisions
+        preview = '; '.join(f'{os.path.basename(dst)} ({src})' for dst, _, src in collisions[:5])
+        more = f' e mais {len(collisions) - 5}' if len(collisions) > 5 else ''
+        super().__init__(f'{len(collisions)} conflito(s) de nome no destino do split: {preview}{more}')
+
+
+def move_file(src, dst):
+    try:
+        os.rename(src, dst)
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+        shutil.move(src, dst)
 
 class DatasetUtils:
 
+    @staticmethod
+    def split_journal_path(base_dir):
+        return os.path.join(base_dir, SPLIT_JOURNAL_NAME)
+
+    @staticmethod
+    def pending_split(base_dir) -> Optional[OperationJournal]:
+        journal = OperationJournal.find(DatasetUtils.split_journal_path(base_dir), 'split')
+        if journal is None or journal.finished:
+            return None
+        return journal
+
+    @staticmethod
+    def resume_split(base_dir):
+        journal = DatasetUtils.pending_split(base_dir)
+        if journal is None:
+            raise JournalError(f'Nenhum split interrompido em {base_dir}')
+        logger.info(f'Retomando split em {base_dir}: {len(journal.pending())} de {len(journal.actions)} item(ns) pendentes.')
+        return DatasetUtils._run_split_journal(journal)
+
     @staticmethod
     def split_dataset(base_dir, train_ratio, val_ratio, test_ratio, shuffle=True):
+        if DatasetUtils.pending_split(base_dir) is not None:
+            logger.warning(f'Split interrompido encontrado em {base_dir}; retomando o plano salvo em vez de sortear outro.')
+            return DatasetUtils.resume_split(base_dir)
         logger.info(f'Iniciando Split: Train={train_ratio}, Val={val_ratio}, Test={test_ratio}')
         all_files = []
         valid_ext = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff')
@@ -200,10 +322,7 @@ class DatasetUtils:
             d[:] = [directory for directory in d if directory.casefold() != 'labels']
             for file in f:
                 if file.lower().endswith(valid_ext):
-                    img_path = os.path.join(r, file)
-                    label_path = AnnotationManager.get_label_path(img_path)
-                    pair = {'img': img_path, 'lbl': label_path if os.path.exists(label_path) else None, 'name': file}
-                    all_files.append(pair)
+                    all_files.append({'img': os.path.join(r, file), 'name': file})
         if not all_files:
             raise FileNotFoundError('Nenhuma imagem encontrada no diretório base.')
         if shuffle:
@@ -219,33 +338,131 @@ class DatasetUtils:
             train_set = all_files[:train_end]
             val_set = all_files[train_end:]
             test_set = []
-        dirs = {'train': {'img': os.path.join(base_dir, 'train', 'images'), 'lbl': os.path.join(base_dir, 'train', 'labels')}, 'valid': {'img': os.path.join(base_dir, 'valid', 'images'), 'lbl': os.path.join(base_dir, 'valid', 'labels')}}
-        if test_ratio > 0:
-            dirs['test'] = {'img': os.path.join(base_dir, 'test', 'images'), 'lbl': os.path.join(base_dir, 'test', 'labels')}
-        for key in dirs:
-            os.makedirs(dirs[key]['img'], exist_ok=True)
-            os.makedirs(dirs[key]['lbl'], exist_ok=True)
-
-        def move_files(file_list, dest_key):
-            if dest_key not in dirs:
-                return
-            target_img_dir = dirs[dest_key]['img']
-            target_lbl_dir = dirs[dest_key]['lbl']
-            for item in file_list:
-                try:
-                    if os.path.dirname(item['img']) != target_img_dir:
-                        shutil.move(item['img'], os.path.join(target_img_dir, item['name']))
-                except shutil.Error:
-                    pass
-                if item['lbl']:
-                    lbl_name = os.path.basename(item['lbl'])
-                    if os.path.dirname(item['lbl']) != target_lbl_dir:
-                        try:
-                            shutil.move(item['lbl'], os.path.join(target_lbl_dir, lbl_name))
-                        except shutil.Error:
-                            pass
-        move_files(train_set, 'train')
-        move_files(val_set, 'valid')
+        splits = {'train': train_set, 'valid': val_set}
         if test_ratio > 0:
-            move_files(test_set, 'test')
-        logger.info(f'Split concluído: Train={len(train_set)}, Val={len(val_set)}, Test={len(test_set)}')
+            splits['test'] = test_set
+        return DatasetUtils.apply_split(base_dir, {split_name: [item['img'] for item in file_list] for split_name, file_list in splits.items()})
+
+    @staticmethod
+    def plan_split_moves(base_dir, assignments: Dict[str, List[str]]) -> List[dict]:
+        image_order = [(split_name, img_path) for split_name, image_paths in assignments.items() for img_path in image_paths]
+        label_paths = AnnotationManager.resolve_label_paths([img_path for _, img_path in image_order])
+        actions = []
+        planned = {}
+        collisions = []
+        existing = {}
+        for (split_name, img_path), lbl_path in zip(image_order, label_paths):
+            moves = []
+            for src, target_dir in ((img_path, os.path.join(base_dir, split_name, 'images')), (lbl_path, os.path.join(base_dir, split_name, 'labels'))):
+                if src is None or os.path.dirname(src) == target_dir:
+                    continue
+                dst = os.path.join(target_dir, os.path.basename(src))
+                key = os.path.normcase(dst)
+                if key in planned:
+                    collisions.append((dst, planned[key], src))
+                    continue
+                planned[key] = src
+                if target_dir not in existing:
+                    try:
+                        existing[target_dir] = {os.path.normcase(name) for name in os.listdir(target_dir)}
+                    except OSError:
+                        existing[target_dir] = set()
+                if os.path.normcase(os.path.basename(dst)) in existing[target_dir]:
+                    collisions.append((dst, dst, src))
+                    continue
+                moves.append([src, dst])
+            if moves:
+                actions.append({'split': split_name, 'moves': moves})
+        if collisions:
+            raise SplitCollisionError(collisions)
+        return actions
+
+    @staticmethod
+    def apply_split(base_dir, assignments: Dict[str, List[str]]):
+        if DatasetUtils.pending_split(base_dir) is not None:
+            raise JournalError(f'Existe um split interrompido em {base_dir}; retome ou desfaça antes de iniciar outro.')
+        actions = DatasetUtils.plan_split_moves(base_dir, assignments)
+        counts = {split_name: len(assignments.get(split_name, ())) for split_name in ('train', 'valid', 'test')}
+        journal = OperationJournal.create(DatasetUtils.split_journal_path(base_dir), 'split', {'base_dir': os.path.abspath(base_dir), 'counts': counts, 'splits': list(assignments)}, actions)
+        return DatasetUtils._run_split_journal(journal)
+
+    @staticmethod
+    def _move_batch(batch):
+        results = []
+        for index, moves in batch:
+            try:
+                for src, dst in moves:
+                    if not os.path.exists(src) and os.path.exists(dst):
+                        continue
+                    if os.path.exists(dst):
+                        raise FileExistsError(f'destino já existe: {dst}')
+                    move_file(src, dst)
+                results.append((index, None))
+            except Exception as exc:
+                results.append((index, f'{os.path.basename(moves[0][0])}: {exc}'))
+        return results
+
+    @staticmethod
+    def _run_move_batches(jobs, on_done=None):
+        errors = []
+        batches = [jobs[start:start + SPLIT_MOVE_BATCH] for start in range(0, len(jobs), SPLIT_MOVE_BATCH)]
+        with ThreadPoolExecutor(max_workers=SPLIT_MOVE_WORKERS, thread_name_prefix='split-move') as executor:
+            for results in executor.map(DatasetUtils._move_batch, batches):
+                for index, error in results:
+                    if error is None:
+                        if on_done:
+                            on_done(index)
+                    else:
+                        errors.append(error)
+        return errors
+
+    @staticmethod
+    def _run_split_journal(journal):
+        base_dir = journal.meta['base_dir']
+        for split_name in journal.meta['splits']:
+            os.makedirs(os.path.join(base_dir, split_name, 'images'), exist_ok=True)
+            os.makedirs(os.path.join(base_dir, split_name, 'labels'), exist_ok=True)
+        try:
+            errors = DatasetUtils._run_move_batches([(index, action['moves']) for index, action in journal.pending()], on_done=journal.mark_done)
+        finally:
+            journal.close()
+        counts = dict(journal.meta['counts'])
+        if errors:
+            logger.error(f'Split concluído com {len(errors)} erro(s); o journal foi mantido para retomar ou desfazer.')
+        else:
+            journal.finish(keep=True)
+            logger.info(f'Split concluído: Train={counts['train']}, Val={counts['valid']}, Test={counts['test']}')
+        counts['errors'] = errors
+        return counts
+
+    @staticmethod
+    def last_split(base_dir) -> Optional[OperationJournal]:
+        return OperationJournal.find(DatasetUtils.split_journal_path(base_dir), 'split')
+
+    @staticmethod
+    def rollback_split(base_dir):
+        journal = DatasetUtils.last_split(base_dir)
+        if journal is None:
+            raise JournalError(f'Nenhum split registrado em {base_dir}')
+        reverse_jobs = []
+        for index, action in enumerate(journal.actions):
+            moves = [[dst, src] for src, dst in reversed(action['moves']) if os.path.exists(dst) and not os.path.exists(src)]
+            if moves:
+                reverse_jobs.append((index, moves))
+        for directory in {os.path.dirname(dst) for _, moves in reverse_jobs for _, dst in moves}:
+            os.makedirs(directory, exist_ok=True)
+        errors = DatasetUtils._run_move_batches(reverse_jobs)
+        if errors:
+            raise OSError(f'{len(errors)} arquivo(s) não puderam ser restaurados: ' + '; '.join(errors[:5]))
+        restored = sum(len(moves) for _, moves in reverse_jobs)
+        for split_name in journal.meta['splits']:
+            for sub in ('images', 'labels'):
+                directory = os.path.join(journal.meta['base_dir'], split_name, sub)
+                if os.path.isdir(directory) and not os.listdir(directory):
+                    os.rmdir(directory)
+            split_dir = os.path.join(journal.meta['base_dir'], split_name)
+            if os.path.isdir(split_dir) and not os.listdir(split_dir):
+                os.rmdir(split_dir)
+        journal.discard()
+        logger.info(f'Split desfeito: {restored} arquivo(s) restaurados.')
+        return restored
@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import logging
+from typing import Iterable, List, Optional, Tuple
+logger = logging.getLogger(__name__)
+
+JOURNAL_FORMAT = 1
+COPY_JOURNAL_NAME = '.copy_journal.jsonl'
+SPLIT_JOURNAL_NAME = '.split_journal.jsonl'
+
+
+class JournalError(Exception):
+    pass
+
+
+class OperationJournal:
+    FSYNC_INTERVAL_SECONDS = 2.0
+
+    def __init__(self, path: str, operation: str, meta: dict, actions: List[dict], done: Iterable[int] = (), finished: bool = False):
+        self.path = str(path)
+        self.operation = operation
+        self.meta = meta
+        self.actions = actions
+        self.done = set(done)
+        self.finished = finished
+        self._handle = None
+        self._last_sync = time.monotonic()
+
+    @classmethod
+    def create(cls, path: str, operation: str, meta: dict, actions: Iterable[dict]) -> 'OperationJournal':
+        journal = cls(path, operation, meta, list(actions))
+        tmp_path = journal.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'format': JOURNAL_FORMAT, 'operation': operation, 'meta': meta, 'count': len(journal.actions)}, ensure_ascii=False) + '\n')
+            for index, action in enumerate(journal.actions):
+                f.write(json.dumps({'plan': index, 'data': action}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, journal.path)
+        return journal
+
+    @classmethod
+    def load(cls, path: str) -> 'OperationJournal':
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().split('\n')
+        records = []
+        for line_number, line in enumerate(lines):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                if any(rest.strip() for rest in lines[line_number + 1:]):
+                    raise JournalError(f'Journal corrompido em {path}, linha {line_number + 1}')
+                logger.warning(f'Ignorando última linha incompleta do journal {path}')
+        if not records or records[0].get('format') != JOURNAL_FORMAT:
+            raise JournalError(f'Formato de journal não suportado: {path}')
+        header = records[0]
+        actions = [None] * header['count']
+        done = set()
+        finished = False
+        for record in records[1:]:
+            if 'plan' in record:
+                actions[record['plan']] = record['data']
+            elif 'done' in record:
+                done.add(record['done'])
+            elif record.get('finished'):
+                finished = True
+        if any(action is None for action in actions):
+            raise JournalError(f'Plano incompleto no journal {path}')
+        return cls(path, header['operation'], header['meta'], actions, done, finished)
+
+    @classmethod
+    def find(cls, path: str, operation: str) -> Optional['OperationJournal']:
+        if not os.path.isfile(path):
+            return None
+        try:
+            journal = cls.load(path)
+        except (OSError, JournalError, KeyError, TypeError, IndexError) as exc:
+            logger.error(f'Journal ilegível em {path}: {exc}')
+            return None
+        if journal.operation != operation:
+            return None
+        return journal
+
+    def pending(self) -> List[Tuple[int, dict]]:
+        return [(index, action) for index, action in enumerate(self.actions) if index not in self.done]
+
+    def _append(self, record: dict, force_sync: bool = False):
+        if self._handle is None:
+            self._handle = open(self.path, 'a', encoding='utf-8')
+        self._handle.write(json.dumps(record) + '\n')
+        self._handle.flush()
+        now = time.monotonic()
+        if force_sync or now - self._last_sync >= self.FSYNC_INTERVAL_SECONDS:
+            os.fsync(self._handle.fileno())
+            self._last_sync = now
+
+    def mark_done(self, index: int):
+        if index in self.done:
+            return
+        self.done.add(index)
+        self._append({'done': index})
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+            self._handle.close()
+            self._handle = None
+
+    def finish(self, keep: bool = False):
+        self.finished = True
+        self._append({'finished': True}, force_sync=True)
+        self.close()
+        if not keep:
+            self.discard()
+
+    def discard(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -6,6 +6,8 @@ class AppState:
     def __init__(self) -> None:
         self.base_directory: str = ''
         self.image_paths: List[str] = []
+        self.all_image_paths: List[str] = []
+        self.image_filter: str = ''
         self.class_names: List[str] = []
         self.current_image_index: int = -1
         self.current_pil_image: Optional[Image.Image] = None
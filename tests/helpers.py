@@ -1,3 +1,6 @@
+import threading
+
+
 class DummyVar:
 
     def __init__(self, value):
@@ -81,3 +84,15 @@ class FakeTree:
         if option == 'values':
             return values
         return {'values': values}
+
+
+class ImmediateRoot:
+
+    def after(self, _delay, callback, *args):
+        callback(*args)
+
+
+def join_threads(name):
+    for thread in threading.enumerate():
+        if thread.name == name:
+            thread.join()
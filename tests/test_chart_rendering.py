@@ -0,0 +1,60 @@
+import threading
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from analisador_dataset import draw_class_chart, draw_log_chart
+from chart_rendering import ChartRenderer, ChartSlot, aggregate_top_n
+
+
+def _build_slot():
+    slot = ChartSlot.__new__(ChartSlot)
+    slot.figure = Figure(dpi=ChartSlot.DPI)
+    slot.canvas = FigureCanvasAgg(slot.figure)
+    slot.lock = threading.Lock()
+    slot.generation = 1
+    return slot
+
+
+def test_aggregate_top_n_folds_tail_into_other_bucket():
+    labels = [f'c{index}' for index in range(1000)]
+    values = list(range(1000))
+
+    top_labels, top_values = aggregate_top_n(labels, values, 40, 'Outros')
+
+    assert len(top_labels) == 40
+    assert top_labels[0] == 'c999'
+    assert top_labels[-1] == 'Outros (961)'
+    assert sum(top_values) == sum(values)
+    assert aggregate_top_n(['a'], [1], 40) == (['a'], [1])
+
+
+def test_chart_slot_reuses_figure_and_renders_requested_size():
+    slot = _build_slot()
+    figure = slot.figure
+    labels, values = aggregate_top_n([f'c{index}' for index in range(1000)], list(range(1000)), 40)
+
+    first = slot.render_image(lambda fig: draw_class_chart(fig, labels, values, 'x', 't'), (400, 300))
+    second = slot.render_image(lambda fig: draw_log_chart(fig, labels, values, 'y', 'x', 't'), (640, 480))
+
+    assert slot.figure is figure
+    assert len(figure.axes) == 1
+    assert first.size == (400, 300)
+    assert second.size == (640, 480)
+
+
+def test_chart_renderer_posts_only_current_generation():
+    slot = _build_slot()
+    posted = []
+    renderer = ChartRenderer(lambda callback, *args: posted.append((callback, args)))
+    try:
+        renderer.submit(slot, 1, lambda fig: fig.add_subplot(111).plot([0, 1]), (200, 100)).result()
+        renderer.submit(slot, 0, lambda fig: fig.add_subplot(111), (200, 100)).result()
+    finally:
+        renderer.shutdown()
+
+    assert len(posted) == 1
+    callback, (generation, image) = posted[0]
+    assert callback == slot.show
+    assert generation == 1
+    assert image.size == (200, 100)
@@ -3,6 +3,7 @@ from types import SimpleNamespace
 
 import yaml
 
+import localization as localization_module
 import main as main_module
 import utils_ui
 import window_class_manager as class_manager_module
@@ -315,6 +316,7 @@ def test_remove_images_without_labels_creates_filtered_copy_without_changing_ori
     app.app_state.base_directory = str(base_dir)
     app.app_state.image_paths = [str(unlabeled_image), str(labeled_image), str(empty_label_image)]
     app._ask_remove_unlabeled_cleanup_options = lambda missing, empty: False
+    app.ui = SimpleNamespace(show_progress=lambda text: None)
 
     infos = []
     monkeypatch.setattr(main_module.messagebox, 'showinfo', lambda title, body, parent=None: infos.append((title, body)))
@@ -358,6 +360,7 @@ def test_remove_images_without_labels_can_include_empty_label_files(monkeypatch,
     app.app_state.base_directory = str(base_dir)
     app.app_state.image_paths = [str(unlabeled_image), str(labeled_image), str(empty_label_image)]
     app._ask_remove_unlabeled_cleanup_options = lambda missing, empty: True
+    app.ui = SimpleNamespace(show_progress=lambda text: None)
 
     monkeypatch.setattr(main_module.messagebox, 'showinfo', lambda *args, **kwargs: None)
 
@@ -402,6 +405,7 @@ def test_remove_images_without_labels_saves_current_annotated_image_before_scan(
         encoding='utf-8'
     )
     app._ask_remove_unlabeled_cleanup_options = lambda missing, empty: False
+    app.ui = SimpleNamespace(show_progress=lambda text: None)
 
     monkeypatch.setattr(main_module.messagebox, 'showinfo', lambda *args, **kwargs: None)
 
@@ -448,11 +452,13 @@ def test_reduce_dataset_randomly_creates_reduced_copy_without_changing_original(
     app.app_state.base_directory = str(base_dir)
     app.app_state.image_paths = image_paths
     app._ask_reduce_dataset_percentage = lambda: 30
+    progress_messages = []
+    app.ui = SimpleNamespace(show_progress=progress_messages.append)
     refresh_calls = []
     app.refresh_directory = lambda: refresh_calls.append('refresh')
     infos = []
 
-    monkeypatch.setattr(main_module.random, 'sample', lambda items, count: sorted(items)[:count])
+    monkeypatch.setattr(main_module.dataset_ops.random, 'sample', lambda items, count: sorted(items)[:count])
     monkeypatch.setattr(main_module.messagebox, 'showinfo', lambda title, body, parent=None: infos.append((title, body)))
 
     app.reduce_dataset_randomly()
@@ -473,6 +479,7 @@ def test_reduce_dataset_randomly_creates_reduced_copy_without_changing_original(
     reduced_yaml = yaml.safe_load((reduced_dir / 'data.yaml').read_text(encoding='utf-8'))
     assert reduced_yaml['path'] == '.'
     assert refresh_calls == []
+    assert progress_messages[-1] == 'Copiando dataset: 7/7 imagem(ns)'
     assert infos
 
 
@@ -502,9 +509,10 @@ def test_open_dataset_copy_dialog_can_combine_cleanup_and_reduction(monkeypatch,
     app.app_state.base_directory = str(base_dir)
     app.app_state.image_paths = image_paths
     app._ask_dataset_copy_options = lambda: DatasetCopyOptions(remove_missing_labels=True, reduce_percentage=50)
+    app.ui = SimpleNamespace(show_progress=lambda text: None)
 
     infos = []
-    monkeypatch.setattr(main_module.random, 'sample', lambda items, count: sorted(items)[:count])
+    monkeypatch.setattr(main_module.dataset_ops.random, 'sample', lambda items, count: sorted(items)[:count])
     monkeypatch.setattr(main_module.messagebox, 'showinfo', lambda title, body, parent=None: infos.append((title, body)))
 
     app.open_dataset_copy_dialog()
@@ -578,15 +586,16 @@ def test_main_open_class_manager_passes_usage_counts(monkeypatch, tmp_path):
     app.app_state = SimpleNamespace(base_directory=str(base_dir), class_names=['cat', 'dog'])
 
     captured = {}
-    monkeypatch.setattr(main_module.ClassCatalogManager, 'count_class_usage', lambda base_directory, class_count: [5, 0])
+    monkeypatch.setattr(main_module.ClassCatalogManager, 'class_usage', lambda base_directory, class_count, index=None: ([5, 0], [9, 0]))
     monkeypatch.setattr(
         main_module,
         'ClassManagerWindow',
-        lambda root, class_names, callback, usage_counts: captured.update(
+        lambda root, class_names, callback, usage_counts, object_counts: captured.update(
             root=root,
             class_names=list(class_names),
             callback=callback,
             usage_counts=list(usage_counts),
+            object_counts=list(object_counts),
         )
     )
 
@@ -594,6 +603,7 @@ def test_main_open_class_manager_passes_usage_counts(monkeypatch, tmp_path):
 
     assert captured['class_names'] == ['cat', 'dog']
     assert captured['usage_counts'] == [5, 0]
+    assert captured['object_counts'] == [9, 0]
     assert captured['callback'] == app._on_classes_updated
 
 
@@ -627,6 +637,8 @@ def test_main_load_directory_contents_accepts_base_dir_with_labels_in_name(tmp_p
         dir_label=DummyWidget(),
         add_box_check=DummyWidget(),
         refresh_image_list=lambda: None,
+        filter_var=DummyVar('class:1'),
+        update_filter_status=lambda shown, total: None,
     )
     app._load_class_names = lambda: None
     shown_indexes = []
@@ -635,5 +647,29 @@ def test_main_load_directory_contents_accepts_base_dir_with_labels_in_name(tmp_p
     app._load_directory_contents()
 
     assert app.app_state.image_paths == [str(image_dir / 'img1.jpg')]
+    assert app.app_state.all_image_paths == [str(image_dir / 'img1.jpg')]
+    assert app.ui.filter_var.get() == ''
     assert shown_indexes == [0]
     assert app.ui.add_box_check.calls[-1] == {'state': 'normal'}
+
+
+def test_ui_refresh_applies_flattened_lookup_in_one_pass(monkeypatch):
+    from ui import UIManager
+
+    manager = UIManager.__new__(UIManager)
+    button = {'text': 'ABOUT'}
+    dir_label = {}
+    tooltip = SimpleNamespace(text=None, update_text=lambda text: setattr(tooltip, 'text', text))
+    manager.dir_label = dir_label
+    manager.app_state = SimpleNamespace(base_directory='/data/project', image_paths=['a.jpg'])
+    manager._translatable_items = [(button, 'ABOUT', 'text'), (dir_label, 'FOLDER', 'text')]
+    manager._tooltip_items = [(tooltip, 'TIP_MISSING', 'Default tip')]
+    manager._refresh_zoom_values = lambda: None
+    manager._update_pan_button_label = lambda: None
+    monkeypatch.setattr(localization_module, 'get_lookup', lambda: {'ABOUT': 'Sobre', 'COL_FOLDER': 'Pasta'})
+
+    manager.refresh_ui()
+
+    assert button['text'] == 'Sobre'
+    assert dir_label['text'] == 'Pasta: project'
+    assert tooltip.text == 'Default tip'
@@ -0,0 +1,117 @@
+import errno
+import os
+
+import copy_engine
+from copy_engine import CopyEngine, CopyTask
+from dataset_ops import build_copy_tasks
+
+
+def _task(tmp_path, name, content=b'data', label=None):
+    src = tmp_path / 'src' / f'{name}.jpg'
+    src.parent.mkdir(parents=True, exist_ok=True)
+    src.write_bytes(content)
+    files = [(str(src), str(tmp_path / 'dst' / 'images' / f'{name}.jpg'))]
+    if label is not None:
+        files.append((str(label), str(tmp_path / 'dst' / 'labels' / f'{name}.txt')))
+    return CopyTask(f'{name}.jpg', tuple(files))
+
+
+def test_run_copies_contents_and_metadata_in_task_order(tmp_path):
+    tasks = [_task(tmp_path, f'img_{index}', content=bytes([index]) * 1000) for index in range(20)]
+    os.utime(tasks[0].files[0][0], (1_000_000, 1_000_000))
+    progress = []
+
+    copied, errors = CopyEngine(workers=4).run(tasks, progress=lambda done, total: progress.append((done, total)))
+
+    assert (copied, errors) == (20, [])
+    for index, task in enumerate(tasks):
+        with open(task.files[0][1], 'rb') as handle:
+            assert handle.read() == bytes([index]) * 1000
+    assert os.stat(tasks[0].files[0][1]).st_mtime == 1_000_000
+    assert progress[-1] == (20, 20)
+
+
+def test_copy_file_falls_back_when_copy_file_range_is_unsupported(tmp_path, monkeypatch):
+    def unsupported(*args):
+        raise OSError(errno.EXDEV, 'cross-device')
+
+    monkeypatch.setattr(copy_engine.os, 'copy_file_range', unsupported, raising=False)
+    engine = CopyEngine(workers=1)
+    engine.use_copy_file_range = True
+    task = _task(tmp_path, 'a', content=b'fallback')
+
+    copied, errors = engine.run([task])
+
+    assert (copied, errors) == (1, [])
+    assert open(task.files[0][1], 'rb').read() == b'fallback'
+    assert engine.use_copy_file_range is False
+
+
+def test_errors_are_reported_per_item_and_label_failures_still_count_image(tmp_path):
+    good = _task(tmp_path, 'good')
+    missing_label = _task(tmp_path, 'partial', label=tmp_path / 'nope.txt')
+    missing_image = CopyTask('ghost.jpg', ((str(tmp_path / 'ghost.jpg'), str(tmp_path / 'dst' / 'ghost.jpg')),))
+
+    copied, errors = CopyEngine(workers=2).run([good, missing_label, missing_image])
+
+    assert copied == 2
+    assert [error.split(':')[0] for error in errors] == ['partial.jpg', 'ghost.jpg']
+
+
+def test_build_copy_tasks_maps_paths_relative_to_base(tmp_path):
+    base = tmp_path / 'ds'
+    (base / 'train' / 'images').mkdir(parents=True)
+    (base / 'train' / 'labels').mkdir()
+    image = base / 'train' / 'images' / 'a.jpg'
+    image.write_bytes(b'x')
+    (base / 'train' / 'labels' / 'a.txt').write_text('0 0.5 0.5 0.1 0.1\n')
+    outside = tmp_path / 'elsewhere.jpg'
+    outside.write_bytes(b'x')
+    target = tmp_path / 'out'
+
+    tasks, errors = build_copy_tasks(str(base), [str(image), str(outside)], target)
+
+    assert errors == ['elsewhere.jpg: caminho fora do dataset']
+    assert [dst for _, dst in tasks[0].files] == [
+        str(target / 'train' / 'images' / 'a.jpg'),
+        str(target / 'train' / 'labels' / 'a.txt'),
+    ]
+
+
+def test_hardlink_mode_links_images_and_copies_labels(tmp_path):
+    label = tmp_path / 'a.txt'
+    label.write_text('0 0.5 0.5 0.1 0.1\n')
+    task = CopyTask('a.jpg', _task(tmp_path, 'a', label=label).files, link_primary=True)
+    engine = CopyEngine(workers=1, link_mode='hardlink')
+
+    copied, errors = engine.run([task])
+
+    (image_src, image_dst), (label_src, label_dst) = task.files
+    assert (copied, errors, engine.linked_count) == (1, [], 1)
+    assert os.path.samefile(image_src, image_dst)
+    assert not os.path.samefile(label_src, label_dst)
+
+
+def test_link_modes_fall_back_to_copy_when_linking_is_refused(tmp_path, monkeypatch):
+    def cross_device(*args):
+        raise OSError(errno.EXDEV, 'cross-device')
+
+    monkeypatch.setattr(copy_engine.os, 'link', cross_device)
+    task = CopyTask('a.jpg', _task(tmp_path, 'a', content=b'bytes').files, link_primary=True)
+    engine = CopyEngine(workers=1, link_mode='hardlink')
+
+    copied, errors = engine.run([task])
+
+    assert (copied, errors, engine.linked_count) == (1, [], 0)
+    assert open(task.files[0][1], 'rb').read() == b'bytes'
+    assert not os.path.samefile(*task.files[0])
+
+
+def test_reflink_mode_produces_independent_copy(tmp_path):
+    task = CopyTask('a.jpg', _task(tmp_path, 'a', content=b'clone').files, link_primary=True)
+
+    copied, errors = CopyEngine(workers=1, link_mode='reflink').run([task])
+
+    assert (copied, errors) == (1, [])
+    assert open(task.files[0][1], 'rb').read() == b'clone'
+    assert not os.path.samefile(*task.files[0])
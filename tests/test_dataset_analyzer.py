@@ -0,0 +1,232 @@
+import io
+import threading
+from collections import Counter
+
+from analisador_dataset import DatasetAnalyzerWindow, write_directory_tree
+
+
+class FakeTop:
+
+    def __init__(self):
+        self.calls = []
+
+    def after(self, delay_ms, callback, *args):
+        self.calls.append((callback, args))
+
+
+def _build_analyzer(base_dir, class_names=()):
+    analyzer = DatasetAnalyzerWindow.__new__(DatasetAnalyzerWindow)
+    analyzer.top = FakeTop()
+    analyzer.base_dir = str(base_dir)
+    analyzer.class_names = list(class_names)
+    analyzer.stats = {
+        'counts': Counter(),
+        'total_images': 0,
+        'total_objects': 0,
+        'types': {'box': 0, 'polygon': 0},
+        'split': {key: {'img': 0, 'obj': 0} for key in ('train', 'val', 'test', 'uncategorized')},
+        'integrity': {'imgs_no_lbl': [], 'lbls_no_img': []},
+    }
+    analyzer.detailed_files = []
+    analyzer.directory_listing = {}
+    analyzer.cancel_event = threading.Event()
+    analyzer.analysis_cancelled = False
+    return analyzer
+
+
+def _write_dataset(base_dir, count):
+    image_dir = base_dir / 'train' / 'images'
+    label_dir = base_dir / 'train' / 'labels'
+    image_dir.mkdir(parents=True)
+    label_dir.mkdir(parents=True)
+    for index in range(count):
+        (image_dir / f'img{index}.jpg').write_text('img', encoding='utf-8')
+        (label_dir / f'img{index}.txt').write_text('0 0.5 0.5 0.2 0.2\n1 0.1 0.1 0.3 0.1 0.2 0.2\n', encoding='utf-8')
+
+
+def test_analyzer_emits_progress_snapshots_with_running_counts(tmp_path):
+    _write_dataset(tmp_path, 3)
+    analyzer = _build_analyzer(tmp_path, ['cat', 'dog'])
+    analyzer.PROGRESS_INTERVAL_SECONDS = 0
+
+    analyzer._analyze_data()
+
+    callbacks = [callback.__name__ for callback, _ in analyzer.top.calls]
+    assert callbacks[-1] == '_update_ui'
+    snapshots = [args[0] for callback, args in analyzer.top.calls if callback.__name__ == '_render_progress']
+    assert [snapshot['processed'] for snapshot in snapshots] == [0, 1, 2, 3]
+    assert all(snapshot['total'] == 3 for snapshot in snapshots)
+    assert snapshots[-1]['counts'] == Counter({0: 3, 1: 3})
+    assert snapshots[-1]['eta'] == 0
+    assert analyzer.stats['split']['train'] == {'img': 3, 'obj': 6}
+    assert analyzer.analysis_cancelled is False
+
+
+def test_analyzer_cancel_stops_worker_and_keeps_partial_results(tmp_path):
+    _write_dataset(tmp_path, 5)
+    analyzer = _build_analyzer(tmp_path)
+    analyzer.PROGRESS_INTERVAL_SECONDS = 0
+    original_render = analyzer._build_progress_snapshot
+
+    def cancel_after_two(processed, total, started_at):
+        if processed == 2:
+            analyzer.cancel_event.set()
+        return original_render(processed, total, started_at)
+
+    analyzer._build_progress_snapshot = cancel_after_two
+
+    analyzer._analyze_data()
+
+    assert analyzer.analysis_cancelled is True
+    assert analyzer.stats['total_images'] == 2
+    assert len(analyzer.detailed_files) == 2
+    assert analyzer.stats['integrity']['lbls_no_img'] == []
+    assert analyzer.top.calls[-1][0].__name__ == '_update_ui'
+
+
+def test_analyzer_tree_is_rendered_from_scan_listing(tmp_path):
+    _write_dataset(tmp_path, 2)
+    (tmp_path / 'classes.txt').write_text('cat', encoding='utf-8')
+    analyzer = _build_analyzer(tmp_path)
+
+    analyzer._analyze_data()
+    buffer = io.StringIO()
+    analyzer.write_tree(buffer)
+
+    assert buffer.getvalue() == (
+        '.\n'
+        '├── classes.txt\n'
+        '└── train\n'
+        '    ├── images\n'
+        '    │   ├── img0.jpg\n'
+        '    │   └── img1.jpg\n'
+        '    └── labels\n'
+        '        ├── img0.txt\n'
+        '        └── img1.txt\n'
+    )
+
+
+def test_write_directory_tree_collapses_large_folders_and_limits_depth():
+    listing = {
+        'root': (['a'], ['x.txt']),
+        'root/a': (['deep'], [f'{index}.jpg' for index in range(4)] + ['notes.txt']),
+        'root/a/deep': ([], ['z.jpg']),
+    }
+
+    collapsed = io.StringIO()
+    write_directory_tree(listing, 'root', collapsed, collapse_files=3)
+    limited = io.StringIO()
+    write_directory_tree(listing, 'root', limited, max_depth=1)
+
+    assert collapsed.getvalue() == (
+        '.\n'
+        '├── a\n'
+        '│   ├── deep\n'
+        '│   │   └── z.jpg\n'
+        '│   └── [5 arquivos: 4 .jpg, 1 .txt]\n'
+        '└── x.txt\n'
+    )
+    assert limited.getvalue() == (
+        '.\n'
+        '├── a\n'
+        '│   └── [... 1 pastas, 5 arquivos]\n'
+        '└── x.txt\n'
+    )
+
+
+def test_write_directory_tree_handles_deep_nesting_and_denied_folders():
+    listing = {}
+    path = 'root'
+    for depth in range(3000):
+        child = f'{path}/d'
+        listing[path] = (['d'], [])
+        path = child
+    listing[path] = (['locked'], [])
+
+    buffer = io.StringIO()
+    write_directory_tree(listing, 'root', buffer)
+
+    lines = buffer.getvalue().splitlines()
+    assert len(lines) == 3003
+    assert lines[-1].endswith('└── [Acesso Negado]')
+
+
+class FakeText:
+
+    def __init__(self):
+        self.rows = []
+
+    def configure(self, **options):
+        pass
+
+    def delete(self, start, end):
+        self.rows = []
+
+    def insert(self, index, text, tags):
+        self.rows.append((text, tags))
+
+
+class FakeScrollbar:
+
+    def __init__(self):
+        self.position = None
+
+    def set(self, first, last):
+        self.position = (first, last)
+
+
+def test_report_model_keeps_rows_and_formats_error_entries(tmp_path):
+    _write_dataset(tmp_path, 2)
+    analyzer = _build_analyzer(tmp_path, ['cat', 'dog'])
+    analyzer._analyze_data()
+    analyzer.detailed_files.append({'name': 'broken.jpg', 'res': 'ERROR', 'path': 'x [Error: boom]'})
+
+    model = analyzer._build_report_model()
+    lines = list(model.iter_lines())
+
+    assert len(model) == len(lines)
+    assert model.lines(0, len(model)) == lines
+    assert sum(1 for text, _ in lines if 'img0.jpg' in text and '| 2    |' in text) == 1
+    error_rows = [(text, tag) for text, tag in lines if 'broken.jpg' in text]
+    assert error_rows == [(f'{"broken.jpg":<25} | {"ERROR":<10} | {"-":<4} | {"-":<10} | x [Error: boom]', 'error')]
+    assert lines[-1] == ('        └── img1.txt', 'tree')
+    assert ''.join(model.iter_text()).count('\n') == len(model)
+
+
+def test_virtual_text_view_inserts_only_visible_window():
+    from utils_ui import VirtualTextView
+    from analisador_dataset import ReportModel
+
+    model = ReportModel()
+    model.add_rows([{'n': index} for index in range(1000)], lambda row: (f'row {row['n']}', None))
+    view = VirtualTextView.__new__(VirtualTextView)
+    view.text = FakeText()
+    view.v_scroll = FakeScrollbar()
+    view.visible_lines = 20
+    view.first_line = 0
+
+    view.set_model(model)
+    assert [text for text, _ in view.text.rows] == [f'row {index}\n' for index in range(20)]
+
+    view.yview('moveto', '0.5')
+    assert view.text.rows[0][0] == 'row 500\n'
+    assert len(view.text.rows) == 20
+    assert view.v_scroll.position == (0.5, 0.52)
+
+    view.yview('scroll', 1, 'pages')
+    assert view.first_line == 519
+    view.yview('moveto', '1.0')
+    assert view.text.rows[-1][0] == 'row 999\n'
+
+
+def test_analyzer_accumulates_box_geometry_per_class_and_split(tmp_path):
+    _write_dataset(tmp_path, 3)
+    analyzer = _build_analyzer(tmp_path, ['cat', 'dog'])
+
+    analyzer._analyze_data()
+
+    assert analyzer.geometry.summary()['objects'] == 6
+    assert analyzer.geometry.summary('split', 'train')['objects_per_image'][2] == 3
+    dog = analyzer.geometry.summary('class', 1)
+    assert dog['objects'] == 3
+    assert int(dog['histograms']['width'][0][9:11].sum()) == 3
@@ -0,0 +1,111 @@
+import io
+import json
+
+import pytest
+
+import dataset_cli
+import dataset_ops
+
+
+def _make_dataset(root):
+    (root / 'images').mkdir(parents=True)
+    (root / 'labels').mkdir()
+    (root / 'classes.txt').write_text('cat\ndog\n', encoding='utf-8')
+    for name, label in (('a', '0 0.5 0.5 0.2 0.2\n1 0.3 0.3 0.1 0.1\n'), ('b', '1 0.4 0.4 0.2 0.2\n'), ('c', None), ('d', '')):
+        (root / 'images' / f'{name}.jpg').write_bytes(b'not-an-image')
+        if label is not None:
+            (root / 'labels' / f'{name}.txt').write_text(label, encoding='utf-8')
+    return root
+
+
+def _run(argv):
+    out = io.StringIO()
+    code = dataset_cli.main(argv, stdout=out)
+    return (code, json.loads(out.getvalue()))
+
+
+def test_analyze_reports_counts_and_exports(tmp_path):
+    dataset = _make_dataset(tmp_path / 'ds')
+
+    code, payload = _run(['analyze', str(dataset), '--export-dir', str(tmp_path / 'out'), '--formats', 'csv'])
+
+    assert code == dataset_cli.EXIT_OK
+    assert payload['command'] == 'analyze'
+    assert payload['total_images'] == 4
+    assert payload['total_objects'] == 3
+    assert payload['classes'] == {'cat': 1, 'dog': 2}
+    assert payload['images_without_labels'] == 2
+    assert sorted(p.rsplit('/', 1)[-1] for p in payload['exported']) == ['files.csv', 'stats.csv']
+
+
+def test_copy_filters_unlabeled_images_into_target(tmp_path):
+    dataset = _make_dataset(tmp_path / 'ds')
+    target = tmp_path / 'copy'
+
+    code, payload = _run(['copy', str(dataset), '--remove-missing-labels', '--remove-empty-labels', '--output', str(target)])
+
+    assert code == dataset_cli.EXIT_OK
+    assert payload['copied'] == 2
+    assert payload['removed_missing_labels'] == 1
+    assert payload['removed_empty_labels'] == 1
+    assert sorted(p.name for p in (target / 'images').iterdir()) == ['a.jpg', 'b.jpg']
+    assert (target / 'labels' / 'a.txt').is_file()
+    assert (target / 'classes.txt').is_file()
+
+
+def test_validate_returns_issue_exit_code(tmp_path):
+    dataset = _make_dataset(tmp_path / 'ds')
+    (dataset / 'labels' / 'b.txt').write_text('5 0.4 0.4 0.2 0.2\n0 1.5 0.4 0.2 0.2\n0 x 0.4 0.2 0.2\n', encoding='utf-8')
+    (dataset / 'labels' / 'ghost.txt').write_text('0 0.5 0.5 0.1 0.1\n', encoding='utf-8')
+
+    code, payload = _run(['validate', str(dataset)])
+
+    assert code == dataset_cli.EXIT_ISSUES
+    assert payload['summary'] == {
+        'class_out_of_range': 1,
+        'coordinate_out_of_range': 1,
+        'not_a_number': 1,
+        'missing_label': 1,
+        'orphan_label': 1,
+    }
+
+
+def test_remap_rewrites_labels_and_catalog(tmp_path):
+    dataset = _make_dataset(tmp_path / 'ds')
+
+    code, payload = _run(['remap', str(dataset), '--names', 'dog,cat', '--map', '0:1', '--map', '1:0'])
+
+    assert code == dataset_cli.EXIT_OK
+    assert (dataset / 'labels' / 'a.txt').read_text(encoding='utf-8').split('\n')[0].split()[0] == '1'
+    assert (dataset / 'labels' / 'b.txt').read_text(encoding='utf-8').split()[0] == '0'
+    assert dataset_ops.load_class_names(str(dataset)) == ['dog', 'cat']
+
+
+@pytest.mark.parametrize('argv', [['analyze', 'missing-dir'], ['remap', '.', '--names', 'a', '--map', 'zero:1'], ['unknown']])
+def test_usage_errors_exit_with_usage_code(tmp_path, monkeypatch, capsys, argv):
+    monkeypatch.chdir(tmp_path)
+
+    assert dataset_cli.main(argv, stdout=io.StringIO()) == dataset_cli.EXIT_USAGE
+
+
+def test_copy_hardlink_mode_shares_images_with_original(tmp_path):
+    dataset = _make_dataset(tmp_path / 'ds')
+    target = tmp_path / 'linked'
+
+    code, payload = _run(['copy', str(dataset), '--remove-missing-labels', '--link', 'hardlink', '--output', str(target)])
+
+    assert code == dataset_cli.EXIT_OK
+    assert payload['copied'] == 3
+    assert (target / 'images' / 'a.jpg').samefile(dataset / 'images' / 'a.jpg')
+    assert not (target / 'labels' / 'a.txt').samefile(dataset / 'labels' / 'a.txt')
+
+
+def test_split_dry_run_reports_per_class_preview_without_moving(tmp_path):
+    dataset = _make_dataset(tmp_path / 'ds')
+
+    code, payload = _run(['split', str(dataset), '--stratify', '--train', '0.5', '--val', '0.5', '--test', '0', '--seed', '1', '--dry-run'])
+
+    assert code == dataset_cli.EXIT_OK
+    assert sum(payload['preview']['images'].values()) == 4
+    assert sum(payload['preview']['classes']['dog'].values()) == 2
+    assert not (dataset / 'train').exists()
@@ -0,0 +1,111 @@
+import io
+import json
+
+import pytest
+from PIL import Image
+
+import dataset_cli
+import dataset_coco
+from dataset_coco import CocoFormatError, JsonStream, export_coco, import_coco
+
+
+def _make_dataset(base_dir):
+    image_dir = base_dir / 'train' / 'images'
+    labels_dir = base_dir / 'train' / 'labels'
+    image_dir.mkdir(parents=True)
+    labels_dir.mkdir(parents=True)
+    (base_dir / 'classes.txt').write_text('cat\ndog', encoding='utf-8')
+    Image.new('RGB', (200, 100)).save(image_dir / 'a.jpg')
+    Image.new('RGB', (50, 40)).save(image_dir / 'b.png')
+    Image.new('RGB', (10, 10)).save(image_dir / 'c.png')
+    (labels_dir / 'a.txt').write_text('0 0.5 0.5 0.2 0.4\n3 0.25 0.25 0.1 0.1\n', encoding='utf-8')
+    (labels_dir / 'b.txt').write_text('1 0.1 0.1 0.5 0.1 0.5 0.5\n', encoding='utf-8')
+    return base_dir
+
+
+def test_json_stream_reads_arrays_across_tiny_chunks():
+    document = {
+        'info': {'note': 'çãé "quoted" [not an array]'},
+        'images': [{'id': 1, 'file_name': 'ç/a.jpg', 'width': 1234567, 'height': 2}],
+        'licenses': [{'id': 1, 'url': 'http://x/[1]'}],
+        'annotations': [{'id': n, 'bbox': [0.125, 1e-3, 10, 20], 'ok': True, 'x': None} for n in range(5)],
+    }
+    raw = json.dumps(document, ensure_ascii=False, indent=1).encode('utf-8')
+
+    items = list(JsonStream(io.BytesIO(raw), chunk_size=3).iter_object(('images', 'annotations')))
+
+    assert [key for key, _ in items] == ['images'] + ['annotations'] * 5
+    assert items[0][1] == document['images'][0]
+    assert items[-1][1] == document['annotations'][-1]
+    with pytest.raises(CocoFormatError):
+        list(JsonStream(io.BytesIO(b'{"images": [1, 2'), chunk_size=4).iter_object(('images',)))
+
+
+def test_export_then_import_round_trips_labels(tmp_path):
+    dataset = _make_dataset(tmp_path / 'ds')
+    output = tmp_path / 'coco.json'
+
+    result = export_coco(str(dataset), str(output), workers=2)
+
+    document = json.loads(output.read_text(encoding='utf-8'))
+    assert (result.images, result.annotations, result.categories) == (3, 3, 4)
+    assert [category['name'] for category in document['categories']] == ['cat', 'dog', 'class_2', 'class_3']
+    assert document['images'][0] == {'file_name': 'train/images/a.jpg', 'width': 200, 'height': 100, 'id': 1}
+    assert document['annotations'][0]['bbox'] == [80.0, 30.0, 40.0, 40.0]
+    assert document['annotations'][2]['segmentation'] == [[5.0, 4.0, 25.0, 4.0, 25.0, 20.0]]
+
+    target = tmp_path / 'imported' / 'images'
+    target.mkdir(parents=True)
+    imported = import_coco(str(output), str(target), workers=2)
+
+    labels = tmp_path / 'imported' / 'labels' / 'train' / 'images'
+    assert (imported.images, imported.annotations, imported.skipped, imported.labels_written) == (3, 3, 0, 3)
+    assert (labels / 'a.txt').read_text(encoding='utf-8') == '0 0.500000 0.500000 0.200000 0.400000\n3 0.250000 0.250000 0.100000 0.100000\n'
+    assert (labels / 'b.txt').read_text(encoding='utf-8') == '1 0.100000 0.100000 0.500000 0.100000 0.500000 0.500000\n'
+    assert (labels / 'c.txt').read_text(encoding='utf-8') == ''
+    assert (tmp_path / 'imported' / 'classes.txt').read_text(encoding='utf-8') == 'cat\ndog\nclass_2\nclass_3'
+
+
+def test_import_maps_categories_and_skips_unusable_annotations(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_coco, 'COCO_SHARDS', 3)
+    document = {
+        'annotations': [
+            {'id': 1, 'image_id': 7, 'category_id': 90, 'bbox': [10, 10, 20, 20]},
+            {'id': 2, 'image_id': 7, 'category_id': 18, 'bbox': [0, 0, 10, 10], 'segmentation': {'counts': 'abc'}},
+            {'id': 3, 'image_id': 7, 'category_id': 18, 'bbox': [0, 0, 10, 10], 'iscrowd': 1},
+            {'id': 4, 'image_id': 8, 'category_id': 18, 'bbox': [0, 0, 10, 10]},
+            {'id': 5, 'image_id': 7, 'category_id': 90, 'bbox': [90, 90, 50, 50]},
+        ],
+        'images': [{'id': 7, 'file_name': 'x.jpg', 'width': 100, 'height': 100}],
+        'categories': [{'id': 90, 'name': 'toothbrush'}, {'id': 18, 'name': 'dog'}],
+    }
+    json_path = tmp_path / 'coco.json'
+    json_path.write_text(json.dumps(document), encoding='utf-8')
+    images_dir = tmp_path / 'photos'
+    images_dir.mkdir()
+
+    result = import_coco(str(json_path), str(images_dir), write_classes=False)
+
+    assert (result.annotations, result.skipped, result.class_names) == (3, 2, ('dog', 'toothbrush'))
+    assert (images_dir / 'x.txt').read_text(encoding='utf-8') == (
+        '1 0.200000 0.200000 0.200000 0.200000\n'
+        '0 0.050000 0.050000 0.100000 0.100000\n'
+        '1 0.950000 0.950000 0.100000 0.100000\n'
+    )
+    assert not (images_dir / 'classes.txt').exists()
+
+
+def test_cli_coco_export_and_import(tmp_path, capsys):
+    dataset = _make_dataset(tmp_path / 'ds')
+    output = tmp_path / 'out.json'
+
+    assert dataset_cli.main(['coco-export', str(dataset), '--output', str(output)]) == dataset_cli.EXIT_OK
+    exported = json.loads(capsys.readouterr().out)
+    assert exported['annotations'] == 3
+
+    images_dir = tmp_path / 'new' / 'images'
+    images_dir.mkdir(parents=True)
+    assert dataset_cli.main(['coco-import', str(output), str(images_dir), '--boxes-only']) == dataset_cli.EXIT_OK
+    imported = json.loads(capsys.readouterr().out)
+    assert imported['labels_dir'] == str(tmp_path / 'new' / 'labels')
+    assert imported['classes'] == ['cat', 'dog', 'class_2', 'class_3']
@@ -0,0 +1,183 @@
+import json
+import os
+from types import SimpleNamespace
+
+import numpy as np
+from PIL import Image
+
+import dataset_cli
+import dataset_dedup
+import dataset_ops
+import main as main_module
+from dataset_analysis import DatasetScan, classify_split
+from dataset_dedup import HashIndex, find_duplicates, find_split_leakage, near_pairs
+from main import MainApplication
+from tests.helpers import ImmediateRoot, join_threads
+
+
+def _gradient(seed, size=(96, 64)):
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 256, size=(8, 8, 3), dtype=np.uint8)
+    return Image.fromarray(base).resize(size, Image.Resampling.BICUBIC)
+
+
+def _make_dataset(base_dir):
+    image_dir = base_dir / 'images'
+    labels_dir = base_dir / 'labels'
+    image_dir.mkdir(parents=True)
+    labels_dir.mkdir()
+    _gradient(1).save(image_dir / 'a.png')
+    (image_dir / 'a_copy.png').write_bytes((image_dir / 'a.png').read_bytes())
+    _gradient(2).save(image_dir / 'b.jpg', quality=95)
+    _gradient(2).resize((192, 128), Image.Resampling.BICUBIC).save(image_dir / 'b_big.jpg', quality=70)
+    _gradient(3).save(image_dir / 'c.png')
+    for path in image_dir.iterdir():
+        (labels_dir / f'{path.stem}.txt').write_text('0 0.5 0.5 0.2 0.2\n', encoding='utf-8')
+    return sorted(str(path) for path in image_dir.iterdir())
+
+
+def _names(paths):
+    return [os.path.splitext(os.path.basename(path))[0] for path in paths]
+
+
+def test_find_duplicates_groups_exact_and_near_copies(tmp_path):
+    image_paths = _make_dataset(tmp_path)
+
+    report = find_duplicates(str(tmp_path), image_paths)
+
+    assert [(cluster.kind, _names(cluster.paths)) for cluster in report.clusters] == [
+        ('exact', ['a', 'a_copy']),
+        ('near', ['b_big', 'b']),
+    ]
+    assert _names(report.redundant_paths()) == ['a_copy', 'b']
+    assert report.summary() == {'exact_clusters': 1, 'near_clusters': 1, 'redundant_images': 2}
+    assert find_duplicates(str(tmp_path), image_paths, near=False).summary()['near_clusters'] == 0
+
+
+def test_hash_index_is_reused_until_the_file_changes(tmp_path, monkeypatch):
+    image_paths = _make_dataset(tmp_path)
+    find_duplicates(str(tmp_path), image_paths)
+    index = HashIndex(str(tmp_path))
+    assert index.load() is True
+    assert index.files['images/a.png'][2] is not None
+    assert index.files['images/c.png'][2] is None
+
+    calls = []
+    original = dataset_dedup.perceptual_hashes
+    monkeypatch.setattr(dataset_dedup, 'perceptual_hashes', lambda path: calls.append(path) or original(path))
+    find_duplicates(str(tmp_path), image_paths)
+    assert calls == []
+
+    _gradient(4).save(tmp_path / 'images' / 'c.png')
+    os.utime(tmp_path / 'images' / 'c.png', ns=(1, 1))
+    find_duplicates(str(tmp_path), image_paths)
+    assert _names(calls) == ['c']
+
+
+def test_near_pairs_matches_brute_force():
+    rng = np.random.default_rng(7)
+    base = rng.integers(0, 2 ** 63, size=40, dtype=np.uint64)
+    flips = np.uint64(1) << rng.integers(0, 64, size=40).astype(np.uint64)
+    dhashes = np.concatenate([base, base ^ flips])
+    phashes = np.zeros_like(dhashes)
+
+    expected = sorted(
+        (i, j) for i in range(len(dhashes)) for j in range(i + 1, len(dhashes))
+        if bin(int(dhashes[i]) ^ int(dhashes[j])).count('1') <= 3
+    )
+    assert near_pairs(dhashes, phashes, threshold=3) == expected
+
+
+def test_copy_plan_keeps_one_image_per_duplicate_group(tmp_path, capsys):
+    image_paths = _make_dataset(tmp_path)
+    groups = [cluster.paths for cluster in find_duplicates(str(tmp_path), image_paths).clusters]
+
+    plan = dataset_ops.build_copy_plan(image_paths, dataset_ops.DatasetCopyOptions(remove_duplicates=True), duplicate_groups=groups)
+
+    assert plan.removed_duplicates == 2
+    assert _names(plan.images_to_copy) == ['a', 'b_big', 'c']
+    assert dataset_ops.build_copy_directory(str(tmp_path), dataset_ops.DatasetCopyOptions(remove_duplicates=True), plan).name.endswith('_copia_sem_duplicatas')
+
+    code = dataset_cli.main(['copy', str(tmp_path), '--remove-duplicates', '--exact-only', '--output', str(tmp_path.parent / 'out')])
+    payload = json.loads(capsys.readouterr().out)
+    assert code == dataset_cli.EXIT_OK
+    assert (payload['removed_duplicates'], payload['copied']) == (1, 4)
+
+
+def test_main_searches_duplicates_off_the_ui_thread(tmp_path, monkeypatch):
+    image_paths = _make_dataset(tmp_path)
+    app = MainApplication.__new__(MainApplication)
+    app.root = ImmediateRoot()
+    app.app_state = main_module.AppState()
+    app.app_state.base_directory = str(tmp_path)
+    app.app_state.image_paths = list(image_paths)
+    app.app_state.all_image_paths = list(image_paths)
+    statuses = []
+    app.ui = SimpleNamespace(update_status_bar=statuses.append, show_progress=lambda text: None)
+    progress = []
+    finished = []
+
+    app.background_tasks = frozenset({'duplicate-search'})
+    assert app._find_duplicates_in_background(lambda: finished.append(False), lambda done, total: None) is False
+    app.background_tasks = frozenset()
+    assert app._find_duplicates_in_background(lambda: finished.append(True), lambda done, total: progress.append((done, total))) is True
+    join_threads('duplicate-search')
+
+    assert finished == [True]
+    assert progress[-1] == (5, 5)
+    assert app.background_tasks == frozenset()
+    assert statuses == ['Duplicatas: 2 imagem(ns) redundante(s) em 2 grupo(s).']
+    monkeypatch.setattr(main_module.dataset_dedup, 'find_duplicates', lambda *args, **kwargs: 1 / 0)
+    plan = app._build_dataset_copy_plan(dataset_ops.DatasetCopyOptions(remove_duplicates=True))
+    assert plan.removed_duplicates == 2
+
+
+def _make_split_dataset(base_dir):
+    for split in ('train', 'valid', 'contest'):
+        (base_dir / split / 'images').mkdir(parents=True)
+        (base_dir / split / 'labels').mkdir(parents=True)
+    _gradient(1).save(base_dir / 'train' / 'images' / 'a.png')
+    (base_dir / 'valid' / 'images' / 'a_copy.png').write_bytes((base_dir / 'train' / 'images' / 'a.png').read_bytes())
+    _gradient(2).save(base_dir / 'train' / 'images' / 'b.jpg', quality=95)
+    _gradient(2).resize((192, 128), Image.Resampling.BICUBIC).save(base_dir / 'valid' / 'images' / 'b_big.jpg', quality=70)
+    _gradient(3).save(base_dir / 'train' / 'images' / 'frame_7.png')
+    _gradient(4).save(base_dir / 'contest' / 'images' / 'frame_7.png')
+    _gradient(5).save(base_dir / 'train' / 'images' / 'c.png')
+    (base_dir / 'train' / 'images' / 'c_copy.png').write_bytes((base_dir / 'train' / 'images' / 'c.png').read_bytes())
+    (base_dir / 'data.yaml').write_text(
+        'path: .\ntrain: ../train/images\nval: valid/images\ntest: contest/images\nnames: [cat]\n',
+        encoding='utf-8',
+    )
+
+
+def test_split_leakage_reports_cross_split_duplicates_and_stems(tmp_path):
+    _make_split_dataset(tmp_path)
+    scan = DatasetScan(str(tmp_path))
+    scan.collect_image_entries()
+    split_paths = {split: paths for split, paths in scan.split_paths.items() if paths}
+
+    assert {split: len(paths) for split, paths in split_paths.items()} == {'train': 5, 'val': 2, 'test': 1}
+    assert classify_split(str(tmp_path / 'contest' / 'images'), str(tmp_path)) == 'uncategorized'
+
+    report = find_split_leakage(str(tmp_path), split_paths)
+
+    assert [(cluster.kind, cluster.splits, _names(cluster.paths)) for cluster in report.clusters] == [
+        ('exact', ('train', 'val'), ['a', 'a_copy']),
+        ('near', ('train', 'val'), ['b_big', 'b']),
+        ('stem', ('train', 'test'), ['frame_7', 'frame_7']),
+    ]
+    assert report.summary() == {'exact_clusters': 1, 'near_clusters': 1, 'stem_clusters': 1, 'images_involved': 6}
+    assert report.by_pair() == {'train/val': 2, 'train/test': 1}
+
+
+def test_cli_analyze_leakage_exits_with_issues(tmp_path, capsys):
+    _make_split_dataset(tmp_path)
+
+    code = dataset_cli.main(['analyze', str(tmp_path), '--leakage', '--exact-only'])
+    payload = json.loads(capsys.readouterr().out)
+
+    assert code == dataset_cli.EXIT_ISSUES
+    assert payload['split_source'].endswith('data.yaml')
+    assert payload['split']['test']['img'] == 1
+    assert payload['leakage']['summary']['near_clusters'] == 0
+    assert payload['leakage']['by_pair'] == {'train/val': 1, 'train/test': 1}
@@ -0,0 +1,60 @@
+import csv
+import json
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from dataset_export import FILE_FIELDS, export_analysis, iter_stats_rows, load_npz
+
+
+def _sample_stats():
+    return {
+        'counts': Counter({0: 3, 2: 1}),
+        'total_images': 2,
+        'total_objects': 4,
+        'types': {'box': 3, 'polygon': 1},
+        'split': {'train': {'img': 2, 'obj': 4}, 'val': {'img': 0, 'obj': 0}},
+        'integrity': {'imgs_no_lbl': [], 'lbls_no_img': ['/data/train/labels/orphan.txt']},
+    }
+
+
+def _sample_files():
+    return [
+        {'name': 'a.jpg', 'res': '640x480', 'fmt': 'JPEG', 'mode': 'RGB', 'size_kb': '12.50', 'created': 'c', 'mod': 'm', 'attrs': 'NORMAL', 'anns': 3, 'classes': '0', 'path': '/data/a.jpg'},
+        {'name': 'b.jpg', 'res': 'ERROR', 'path': '/data/b.jpg [Error: boom]'},
+    ]
+
+
+def test_export_analysis_writes_matching_csv_jsonl_and_npz(tmp_path):
+    written = export_analysis(str(tmp_path), _sample_files(), _sample_stats(), ['cat', 'dog'])
+
+    assert sorted(p.rsplit('/', 1)[-1] for p in written) == sorted(
+        f'{prefix}.{fmt}' for prefix in ('files', 'stats') for fmt in ('csv', 'jsonl', 'npz')
+    )
+    with open(tmp_path / 'files.csv', encoding='utf-8', newline='') as handle:
+        csv_rows = list(csv.DictReader(handle))
+    json_rows = [json.loads(line) for line in (tmp_path / 'files.jsonl').read_text(encoding='utf-8').splitlines()]
+    columns = load_npz(str(tmp_path / 'files.npz'))
+
+    assert list(csv_rows[0]) == list(FILE_FIELDS)
+    assert [row['name'] for row in csv_rows] == ['a.jpg', 'b.jpg']
+    assert json_rows[0]['anns'] == 3 and json_rows[0]['size_kb'] == 12.5
+    assert json_rows[1]['anns'] == -1 and json_rows[1]['fmt'] == ''
+    assert columns['anns'].dtype == np.int64
+    assert columns['anns'].tolist() == [3, -1]
+    assert columns['path'].tolist() == ['/data/a.jpg', '/data/b.jpg [Error: boom]']
+
+
+def test_stats_rows_cover_classes_splits_and_integrity():
+    rows = list(iter_stats_rows(_sample_stats(), ['cat', 'dog']))
+
+    classes = [(row['key'], row['name'], row['objects']) for row in rows if row['section'] == 'class']
+    assert classes == [('0', 'cat', 3), ('1', 'dog', 0), ('2', 'ID 2', 1)]
+    assert {row['key']: row['images'] for row in rows if row['section'] == 'split'} == {'train': 2, 'val': 0}
+    assert [row['name'] for row in rows if row['section'] == 'integrity'] == ['orphan.txt']
+
+
+def test_export_analysis_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        export_analysis(str(tmp_path), [], _sample_stats(), formats=('xlsx',))
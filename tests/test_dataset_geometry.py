@@ -0,0 +1,68 @@
+import numpy as np
+
+from dataset_geometry import METRIC_EDGES, GeometryStats, histogram_quantile, parse_label_box
+
+
+def _random_boxes(rng, count, n_classes):
+    cids = rng.integers(0, n_classes, count)
+    centers = rng.random((count, 2))
+    sizes = rng.random((count, 2)) * 0.5 + 0.001
+    return [(int(c), float(x), float(y), float(w), float(h)) for c, (x, y), (w, h) in zip(cids, centers, sizes)]
+
+
+def test_geometry_keys_classes_by_id_seen_without_dense_allocation():
+    stats = GeometryStats()
+    stats.add_image('train', [(5_000_000, 0.5, 0.5, 0.1, 0.1), (2, 0.2, 0.2, 0.1, 0.1)])
+    stats.add_image('val', [(5_000_000, 0.5, 0.5, 0.2, 0.2)])
+
+    assert stats.class_count == 2
+    assert stats.group_keys()[-2:] == [('class', 2), ('class', 5_000_000)]
+    assert stats.summary('class', 5_000_000)['objects'] == 2
+    assert stats.summary('class', 2)['heatmap'].sum() == 1
+
+
+def test_geometry_histograms_match_numpy_and_are_independent_of_flush_size():
+    rng = np.random.default_rng(7)
+    boxes = _random_boxes(rng, 5000, 4)
+    small = GeometryStats()
+    small.FLUSH_SIZE = 37
+    large = GeometryStats()
+    for start in range(0, len(boxes), 10):
+        chunk = boxes[start:start + 10]
+        split = 'train' if start % 20 == 0 else 'val'
+        small.add_image(split, chunk)
+        large.add_image(split, chunk)
+
+    widths = np.array([box[3] for box in boxes])
+    expected, _ = np.histogram(widths, bins=METRIC_EDGES['width'])
+    all_summary = large.summary()
+    assert all_summary['objects'] == 5000
+    assert all_summary['histograms']['width'][0].tolist() == expected.tolist()
+    assert int(all_summary['heatmap'].sum()) == 5000
+    for kind, key in large.group_keys():
+        a = small.summary(kind, key)
+        b = large.summary(kind, key)
+        for metric in METRIC_EDGES:
+            assert a['histograms'][metric][0].tolist() == b['histograms'][metric][0].tolist()
+        assert a['objects_per_image'].tolist() == b['objects_per_image'].tolist()
+    split_total = sum(large.summary('split', name)['objects'] for name in ('train', 'val'))
+    class_total = sum(large.summary('class', cid)['objects'] for cid in range(4))
+    assert split_total == class_total == 5000
+    assert large.summary('split', 'train')['objects_per_image'][10] == 250
+
+
+def test_parse_label_box_handles_boxes_polygons_and_garbage():
+    assert parse_label_box(['2', '0.5', '0.5', '0.2', '0.4']) == (2, 0.5, 0.5, 0.2, 0.4)
+    cid, x, y, w, h = parse_label_box(['1', '0.1', '0.1', '0.3', '0.1', '0.2', '0.5'])
+    assert cid == 1
+    assert np.allclose((x, y, w, h), (0.2, 0.3, 0.2, 0.4))
+    assert parse_label_box(['x', '0.1', '0.1', '0.1', '0.1']) is None
+
+
+def test_histogram_quantile_interpolates_within_bins():
+    counts = np.array([0, 10, 10, 0])
+    edges = np.array([0.0, 1.0, 2.0, 3.0, 4.0])
+
+    assert histogram_quantile(counts, edges, 0.5) == 2.0
+    assert histogram_quantile(counts, edges, 0.25) == 1.5
+    assert histogram_quantile(np.zeros(4), edges, 0.5) is None
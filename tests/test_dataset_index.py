@@ -0,0 +1,148 @@
+import os
+
+import pytest
+
+from dataset_index import ClassIndex, INDEX_DIR_NAME, INDEX_FILE_NAME
+from managers import ClassCatalogManager
+
+
+def _make_labels(base_dir):
+    labels_dir = base_dir / 'train' / 'labels'
+    labels_dir.mkdir(parents=True)
+    (labels_dir / 'a.txt').write_text('0 0.5 0.5 0.2 0.2\n2 0.3 0.3 0.1 0.1\n', encoding='utf-8')
+    (labels_dir / 'b.txt').write_text('1 0.4 0.4 0.2 0.2\n', encoding='utf-8')
+    (labels_dir / 'c.txt').write_text('2 0.4 0.4 0.2 0.2\n2 0.1 0.1 0.1 0.1\n', encoding='utf-8')
+    return labels_dir
+
+
+def test_class_index_persists_and_refreshes_only_stale_files(tmp_path):
+    labels_dir = _make_labels(tmp_path)
+
+    index = ClassIndex.open(str(tmp_path))
+
+    assert os.path.isfile(tmp_path / INDEX_DIR_NAME / INDEX_FILE_NAME)
+    assert index.classes[2] == {os.path.join('train', 'labels', 'a.txt'): 1, os.path.join('train', 'labels', 'c.txt'): 2}
+
+    reloaded = ClassIndex(str(tmp_path))
+    assert reloaded.load() is True
+    assert reloaded.refresh() == 0
+
+    (labels_dir / 'b.txt').write_text('3 0.4 0.4 0.2 0.2\n', encoding='utf-8')
+    os.remove(labels_dir / 'c.txt')
+
+    assert reloaded.refresh() == 2
+    assert 1 not in reloaded.classes
+    assert reloaded.files_with_classes([2, 3]) == [str(labels_dir / 'a.txt'), str(labels_dir / 'b.txt')]
+
+
+def test_remap_only_rewrites_files_with_moved_classes(tmp_path):
+    labels_dir = _make_labels(tmp_path)
+    untouched = labels_dir / 'b.txt'
+    before = untouched.stat().st_mtime_ns
+    os.chmod(labels_dir / 'c.txt', 0o640)
+
+    changed = ClassCatalogManager.remap_annotation_class_ids(str(tmp_path), {0: 0, 1: 1, 2: 3})
+
+    assert changed == 2
+    assert (labels_dir / 'a.txt').read_text(encoding='utf-8') == '0 0.5 0.5 0.2 0.2\n3 0.3 0.3 0.1 0.1\n'
+    assert (labels_dir / 'c.txt').read_text(encoding='utf-8') == '3 0.4 0.4 0.2 0.2\n3 0.1 0.1 0.1 0.1\n'
+    assert (labels_dir / 'c.txt').stat().st_mode & 0o777 == 0o640
+    assert untouched.stat().st_mtime_ns == before
+    assert not [name for name in os.listdir(labels_dir) if name.startswith('.remap-')]
+
+    index = ClassIndex(str(tmp_path))
+    index.load()
+    assert index.refresh() == 0
+    assert 2 not in index.classes
+    assert sorted(index.classes[3].values()) == [1, 2]
+
+
+def test_remap_refuses_deleted_class_in_use_before_writing(tmp_path):
+    labels_dir = _make_labels(tmp_path)
+    original = (labels_dir / 'a.txt').read_text(encoding='utf-8')
+
+    with pytest.raises(ValueError, match='Classe em uso detectada'):
+        ClassCatalogManager.remap_annotation_class_ids(str(tmp_path), {0: 1, 2: 0}, deleted_ids={1})
+
+    assert (labels_dir / 'a.txt').read_text(encoding='utf-8') == original
+
+
+def test_remap_leaves_every_label_untouched_when_one_file_fails(tmp_path, monkeypatch):
+    labels_dir = _make_labels(tmp_path)
+    (labels_dir / 'c.txt').write_bytes(b'2 0.4 0.4 0.2 0.2\n\xff\n')
+    original = (labels_dir / 'a.txt').read_text(encoding='utf-8')
+
+    with pytest.raises(OSError):
+        ClassCatalogManager.remap_annotation_class_ids(str(tmp_path), {0: 0, 1: 1, 2: 3})
+
+    assert (labels_dir / 'a.txt').read_text(encoding='utf-8') == original
+    assert not [name for name in os.listdir(labels_dir) if name.startswith('.remap-')]
+
+    (labels_dir / 'c.txt').write_text('2 0.4 0.4 0.2 0.2\n', encoding='utf-8')
+    real_replace = os.replace
+    moved = []
+
+    def flaky_replace(src, dst):
+        if str(src).endswith('.tmp'):
+            moved.append(dst)
+            if len(moved) == 2:
+                raise OSError('disco cheio')
+        real_replace(src, dst)
+
+    monkeypatch.setattr(os, 'replace', flaky_replace)
+    with pytest.raises(OSError, match='disco cheio'):
+        ClassCatalogManager.remap_annotation_class_ids(str(tmp_path), {0: 0, 1: 1, 2: 3})
+
+    assert (labels_dir / 'a.txt').read_text(encoding='utf-8') == original
+    assert (labels_dir / 'c.txt').read_text(encoding='utf-8') == '2 0.4 0.4 0.2 0.2\n'
+    assert not [name for name in os.listdir(labels_dir) if name.startswith('.remap-')]
+
+
+def test_remap_uses_the_index_line_rules_for_malformed_lines(tmp_path):
+    labels_dir = _make_labels(tmp_path)
+    (labels_dir / 'a.txt').write_text('0 0.5 0.5 0.2 0.2\r\n1 a b c d\r\n2 0.3 0.3 0.1 0.1', encoding='utf-8')
+    os.remove(labels_dir / 'b.txt')
+    index = ClassIndex.open(str(tmp_path))
+    assert index.files_with_classes([1]) == []
+
+    changed = ClassCatalogManager.remap_annotation_class_ids(str(tmp_path), {0: 0, 2: 1}, deleted_ids={1}, index=index)
+
+    assert changed == 2
+    assert (labels_dir / 'a.txt').read_bytes() == b'0 0.5 0.5 0.2 0.2\n1 a b c d\n1 0.3 0.3 0.1 0.1\n'
+    assert index.files_with_classes([1]) == [str(labels_dir / 'a.txt'), str(labels_dir / 'c.txt')]
+
+
+def test_remap_refreshes_a_stale_in_memory_index(tmp_path):
+    labels_dir = _make_labels(tmp_path)
+    index = ClassIndex.open(str(tmp_path))
+    os.remove(labels_dir / 'b.txt')
+    (labels_dir / 'd.txt').write_text('2 0.5 0.5 0.1 0.1\n', encoding='utf-8')
+
+    changed = ClassCatalogManager.remap_annotation_class_ids(str(tmp_path), {0: 0, 2: 1}, deleted_ids={1}, index=index)
+
+    assert changed == 3
+    assert (labels_dir / 'd.txt').read_text(encoding='utf-8') == '1 0.5 0.5 0.1 0.1\n'
+    assert index.usage(2) == ([1, 3], [1, 4])
+
+
+def test_class_index_tracks_file_and_object_counts_incrementally(tmp_path):
+    labels_dir = _make_labels(tmp_path)
+    index = ClassIndex.open(str(tmp_path))
+
+    assert index.usage(4) == ([1, 1, 2, 0], [1, 1, 3, 0])
+
+    (labels_dir / 'b.txt').write_text('2 0.4 0.4 0.2 0.2\n3 0.1 0.1 0.1 0.1\n', encoding='utf-8')
+    index.update_paths([str(labels_dir / 'b.txt')])
+
+    assert index.dirty is True
+    assert index.usage(4) == ([1, 0, 3, 1], [1, 0, 4, 1])
+    assert ClassCatalogManager.class_usage(str(tmp_path), 4, index=index) == ([1, 0, 3, 1], [1, 0, 4, 1])
+
+    os.remove(labels_dir / 'c.txt')
+    index.update_paths([str(labels_dir / 'c.txt')])
+    index.save()
+
+    reloaded = ClassIndex(str(tmp_path))
+    reloaded.load()
+    assert index.dirty is False
+    assert reloaded.usage(4) == ([1, 0, 2, 1], [1, 0, 2, 1])
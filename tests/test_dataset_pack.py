@@ -0,0 +1,73 @@
+import json
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import dataset_cli
+from dataset_pack import PackFormatError, PackedLabels, export_split_packs, pack_labels
+
+
+def _make_dataset(base_dir):
+    for split in ('train', 'valid'):
+        (base_dir / split / 'images').mkdir(parents=True)
+        (base_dir / split / 'labels').mkdir(parents=True)
+    for name in ('a.jpg', 'b.png', 'c.png', 'd.png'):
+        Image.new('RGB', (8, 8)).save(base_dir / 'train' / 'images' / name)
+    Image.new('RGB', (8, 8)).save(base_dir / 'valid' / 'images' / 'v.png')
+    labels = base_dir / 'train' / 'labels'
+    (labels / 'a.txt').write_text('0 0.5 0.5 0.2 0.4\n3 0.25 0.25 0.1 0.1\n', encoding='utf-8')
+    (labels / 'b.txt').write_text('1 0.1 0.1 0.5 0.1 0.5 0.5\nbad line\n2 x 0.1 0.1 0.1\n', encoding='utf-8')
+    (labels / 'c.txt').write_text('', encoding='utf-8')
+    (base_dir / 'valid' / 'labels' / 'v.txt').write_text('4 0.1 0.2 0.3 0.4\n', encoding='utf-8')
+    return sorted(str(path) for path in (base_dir / 'train' / 'images').iterdir())
+
+
+def test_pack_round_trips_boxes_polygons_and_empty_images(tmp_path):
+    image_paths = _make_dataset(tmp_path)
+    output = tmp_path / 'train.xapack'
+
+    assert pack_labels(str(tmp_path), image_paths, str(output), workers=2) == (4, 3, [])
+
+    with PackedLabels(str(output)) as packed:
+        assert len(packed) == 4
+        assert np.shares_memory(packed.boxes, packed._buffer)
+        assert [packed.image_path(row) for row in range(4)] == ['train/images/a.jpg', 'train/images/b.png', 'train/images/c.png', 'train/images/d.png']
+        classes, boxes = packed.labels(packed.index_of('train/images/a.jpg'))
+        assert classes.tolist() == [0, 3]
+        np.testing.assert_allclose(boxes, [[0.5, 0.5, 0.2, 0.4], [0.25, 0.25, 0.1, 0.1]])
+        row = packed.index_of(str(tmp_path / 'train' / 'images' / 'b.png'))
+        classes, boxes = packed.labels(row)
+        assert classes.tolist() == [1]
+        np.testing.assert_allclose(boxes, [[0.3, 0.3, 0.4, 0.4]], atol=1e-6)
+        polygon, = packed.polygons(row)
+        np.testing.assert_allclose(polygon, [[0.1, 0.1], [0.5, 0.1], [0.5, 0.5]])
+        assert packed.polygons(0) == [None, None]
+        assert packed.labels(2)[0].size == 0 and packed.labels(3)[0].size == 0
+        assert packed.label_mtime_ns[2] > 0 and packed.label_mtime_ns[3] == -1
+        with pytest.raises(KeyError):
+            packed.index_of('train/images/missing.png')
+
+
+def test_pack_rejects_foreign_files(tmp_path):
+    path = tmp_path / 'other.xapack'
+    path.write_bytes(b'not a pack at all')
+
+    with pytest.raises(PackFormatError):
+        PackedLabels(str(path))
+
+
+def test_export_split_packs_and_cli(tmp_path, capsys):
+    _make_dataset(tmp_path)
+
+    packs = export_split_packs(str(tmp_path), str(tmp_path / 'out'))
+
+    assert {split: (pack['images'], pack['objects']) for split, pack in packs.items()} == {'train': (4, 3), 'val': (1, 1)}
+    with PackedLabels(packs['val']['path']) as packed:
+        assert packed.meta['split'] == 'val'
+        assert packed.classes.tolist() == [4]
+
+    assert dataset_cli.main(['pack', str(tmp_path), '--splits', 'train']) == dataset_cli.EXIT_OK
+    payload = json.loads(capsys.readouterr().out)
+    assert list(payload['packs']) == ['train']
+    assert payload['packs']['train']['path'] == str(tmp_path / 'packed' / 'train.xapack')
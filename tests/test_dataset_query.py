@@ -0,0 +1,119 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+import dataset_ops
+import dataset_query
+import main as main_module
+from dataset_query import QueryError, build_image_summary, parse_query
+from main import MainApplication
+from tests.helpers import DummyVar, ImmediateRoot, join_threads
+
+
+def _make_dataset(base_dir):
+    image_dir = base_dir / 'train' / 'images'
+    labels_dir = base_dir / 'train' / 'labels'
+    image_dir.mkdir(parents=True)
+    labels_dir.mkdir(parents=True)
+    labels = {
+        'a': '0 0.5 0.5 0.5 0.5\n2 0.5 0.5 0.02 0.5\n',
+        'b': '1 0.1 0.1 0.3 0.1 0.3 0.4\n',
+        'c': ''.join('0 0.5 0.5 0.2 0.2\n' for _ in range(6)),
+        'd': '',
+    }
+    for stem, text in labels.items():
+        Image.new('RGB', (200, 100)).save(image_dir / f'{stem}.jpg')
+        (labels_dir / f'{stem}.txt').write_text(text, encoding='utf-8')
+    Image.new('RGB', (200, 100)).save(image_dir / 'e.jpg')
+    return sorted(str(path) for path in image_dir.iterdir())
+
+
+def _names(paths):
+    return [os.path.splitext(os.path.basename(path))[0] for path in paths]
+
+
+def test_queries_select_images_by_label_content(tmp_path):
+    image_paths = _make_dataset(tmp_path)
+    summary = build_image_summary(str(tmp_path), image_paths)
+    class_names = ['cat', 'dog', 'bird']
+
+    def select(text):
+        return _names(parse_query(text, class_names).select(summary))
+
+    assert summary.object_count.tolist() == [2, 1, 6, 0, 0]
+    assert select('class:bird') == ['a']
+    assert select('class:0,dog') == ['a', 'b', 'c']
+    assert select('objects>5') == ['c']
+    assert select('minsize<8px') == ['a']
+    assert select('has:polygon') == ['b']
+    assert select('-has:label') == ['e']
+    assert select('empty has:label') == ['d']
+    assert select('classes>=2 -class:dog') == ['a']
+    assert select('name:C') == ['c']
+
+
+def test_query_rejects_unknown_terms_and_classes():
+    with pytest.raises(QueryError):
+        parse_query('weight>3')
+    with pytest.raises(QueryError):
+        parse_query('class:horse', ['cat'])
+    with pytest.raises(QueryError):
+        parse_query('has:mask')
+
+
+def test_summary_cache_is_reused_and_kept_current(tmp_path):
+    image_paths = _make_dataset(tmp_path)
+    build_image_summary(str(tmp_path), image_paths)
+
+    summary = dataset_query.ImageSummary(str(tmp_path), image_paths)
+    assert summary.load_cached() == len(image_paths)
+    assert summary.refresh() == 0
+    assert parse_query('class:2').select(summary) == [image_paths[0]]
+
+    (tmp_path / 'train' / 'labels' / 'd.txt').write_text('2 0.5 0.5 0.1 0.1\n', encoding='utf-8')
+    summary.update_paths([image_paths[3]])
+    summary.remove_paths([image_paths[0]])
+
+    assert summary.dirty is True
+    assert _names(parse_query('class:2').select(summary)) == ['d']
+    assert summary.object_count.tolist() == [1, 6, 1, 0]
+
+
+def test_main_filter_restricts_navigation_and_copy_plan(tmp_path, monkeypatch):
+    image_paths = _make_dataset(tmp_path)
+    app = MainApplication.__new__(MainApplication)
+    app.root = ImmediateRoot()
+    app.app_state = main_module.AppState()
+    app.app_state.base_directory = str(tmp_path)
+    app.app_state.class_names = ['cat', 'dog', 'bird']
+    app.app_state.image_paths = list(image_paths)
+    app.app_state.all_image_paths = list(image_paths)
+    app.app_state.current_image_index = 2
+    statuses = []
+    app.ui = SimpleNamespace(
+        filter_var=DummyVar('class:cat'),
+        refresh_image_list=lambda: None,
+        update_filter_status=lambda shown, total: statuses.append((shown, total)),
+        show_progress=lambda text: None,
+        update_status_bar=lambda text: None,
+    )
+    shown = []
+    app.show_image_at_index = lambda index: shown.append(index)
+
+    app.apply_image_filter()
+    join_threads('image-summary')
+
+    assert _names(app.app_state.image_paths) == ['a', 'c']
+    assert shown == [1]
+    assert statuses[-1] == (2, 5)
+    plan = app._build_dataset_copy_plan(dataset_ops.DatasetCopyOptions())
+    assert plan.total_images == 5
+    assert plan.removed_by_filter == 3
+    assert plan.copied_count == 2
+
+    app.clear_image_filter()
+
+    assert app.app_state.image_paths == image_paths
+    assert app.app_state.image_filter == ''
@@ -0,0 +1,136 @@
+import numpy as np
+import pytest
+
+from dataset_split import SplitItems, SplitOptions, group_keys, plan_split, scan_split_items, strip_frame_suffix
+from managers import DatasetUtils
+from tests.helpers import DummyVar
+from window_split_wizard import SplitWizard
+
+
+def _items(class_rows, paths=None):
+    pairs = sorted({(image, cid): count for image, labels in enumerate(class_rows) for cid, count in labels.items()}.items())
+    paths = tuple(paths or (f'/data/img_{index:04d}.jpg' for index in range(len(class_rows))))
+    return SplitItems(
+        paths,
+        np.array([image for (image, _), _ in pairs], dtype=np.int64),
+        np.array([cid for (_, cid), _ in pairs], dtype=np.int64),
+        np.array([count for _, count in pairs], dtype=np.int64),
+        max((cid for (_, cid), _ in pairs), default=-1) + 1,
+    )
+
+
+def test_stratified_plan_keeps_rare_class_in_every_split():
+    rows = [{0: 1} for _ in range(90)] + [{0: 1, 1: 1} for _ in range(10)]
+
+    plan = plan_split(_items(rows), (0.7, 0.2, 0.1), SplitOptions(seed=7))
+
+    assert plan.image_counts.tolist() == [70, 20, 10]
+    assert plan.class_counts[:, 1].tolist() == [7, 2, 1]
+    assert plan.preview_rows(['common', 'rare'])[1] == (1, 'rare', 7, 2, 1)
+
+
+def test_group_mode_keeps_frames_of_one_video_together():
+    paths = [f'/data/video{video}_frame_{frame:03d}.jpg' for video in range(10) for frame in range(5)]
+    rows = [{video % 3: 1} for video in range(10) for _ in range(5)]
+
+    plan = plan_split(_items(rows, paths), (0.6, 0.2, 0.2), SplitOptions(group_mode='prefix', seed=1))
+
+    assert plan.group_count == 10
+    for video in range(10):
+        assert len(set(plan.assignment[video * 5:(video + 1) * 5].tolist())) == 1
+
+
+def test_plan_is_deterministic_for_a_seed():
+    rows = [{index % 4: 1 + index % 2} for index in range(200)]
+    items = _items(rows)
+
+    first = plan_split(items, (0.8, 0.2, 0.0), SplitOptions(seed=3))
+    again = plan_split(items, (0.8, 0.2, 0.0), SplitOptions(seed=3))
+    other = plan_split(items, (0.8, 0.2, 0.0), SplitOptions(seed=4))
+
+    assert np.array_equal(first.assignment, again.assignment)
+    assert not np.array_equal(first.assignment, other.assignment)
+    assert first.image_counts[2] == 0
+    assert set(first.assignments()) == {'train', 'valid'}
+
+
+def test_unshuffled_plain_plan_preserves_order():
+    plan = plan_split(_items([{} for _ in range(10)]), (0.5, 0.5, 0.0), SplitOptions(stratify=False, shuffle=False))
+
+    assert plan.assignment.tolist() == [0] * 5 + [1] * 5
+
+
+@pytest.mark.parametrize('stem, expected', [
+    ('video01_frame_0001', 'video01'),
+    ('cam-3.000120', 'cam-3'),
+    ('IMG1234', 'IMG'),
+    ('0001', '0001'),
+    ('no_digits', 'no_digits'),
+])
+def test_strip_frame_suffix(stem, expected):
+    assert strip_frame_suffix(stem) == expected
+
+
+def test_group_keys_pattern_uses_first_capture_group():
+    keys = group_keys(['/d/siteA__x1.jpg', '/d/siteB__x2.jpg', '/d/siteA__x3.jpg'], pattern='^(site\\w)__')
+
+    assert keys.tolist() == [0, 1, 0]
+
+
+def test_scan_and_apply_split_moves_files_per_plan(tmp_path):
+    base_dir = tmp_path / 'dataset'
+    (base_dir / 'images').mkdir(parents=True)
+    (base_dir / 'labels').mkdir()
+    for index in range(10):
+        (base_dir / 'images' / f'img{index}.jpg').write_bytes(b'x')
+        label = '1 0.5 0.5 0.1 0.1\n0 0.2 0.2 0.1 0.1\n' if index < 2 else '0 0.5 0.5 0.1 0.1\n'
+        (base_dir / 'labels' / f'img{index}.txt').write_text(label, encoding='utf-8')
+
+    items = scan_split_items(str(base_dir), workers=2)
+    plan = plan_split(items, (0.5, 0.5, 0.0), SplitOptions(seed=0))
+    result = DatasetUtils.apply_split(str(base_dir), plan.assignments())
+
+    assert items.class_count == 2
+    assert plan.class_counts[:, 1].tolist() == [1, 1, 0]
+    assert result == {'train': 5, 'valid': 5, 'test': 0, 'errors': []}
+    assert len(list((base_dir / 'valid' / 'labels').iterdir())) == 5
+    assert not (base_dir / 'test').exists()
+
+
+def test_scan_and_plan_handle_huge_class_ids_without_dense_allocation(tmp_path):
+    (tmp_path / 'images').mkdir()
+    (tmp_path / 'labels').mkdir()
+    for index in range(4):
+        (tmp_path / 'images' / f'img{index}.jpg').write_bytes(b'x')
+        label = '5000000000 0.5 0.5 0.1 0.1\n' if index % 2 else '0 0.5 0.5 0.1 0.1\n'
+        (tmp_path / 'labels' / f'img{index}.txt').write_text(label, encoding='utf-8')
+
+    items = scan_split_items(str(tmp_path), workers=1)
+    plan = plan_split(items, (0.5, 0.5, 0.0), SplitOptions(seed=0))
+
+    assert sorted(set(items.pair_class.tolist())) == [0, 5000000000]
+    assert plan.class_counts.shape == (3, 2)
+    assert plan.preview_rows(['cat']) == [(0, 'cat', 1, 1, 0), (5000000000, 'ID 5000000000', 1, 1, 0)]
+
+
+def test_split_wizard_apply_forwards_strategy_and_matching_preview():
+    captured = {}
+    wizard = SplitWizard.__new__(SplitWizard)
+    wizard.train_pct = DummyVar(80)
+    wizard.val_pct = DummyVar(20)
+    wizard.test_pct = DummyVar(0)
+    wizard.include_test = DummyVar(False)
+    wizard.shuffle = DummyVar(True)
+    wizard.stratify = DummyVar(True)
+    wizard.group_mode = DummyVar(SplitWizard.GROUP_MODE_LABELS[1][1])
+    wizard.seed = DummyVar('11')
+    wizard.planner = lambda ratios, options: None
+    wizard.preview_key = ((0.8, 0.2, 0.0), SplitOptions(group_mode='prefix', seed=11))
+    wizard.preview_plan = 'cached-plan'
+    wizard.callback = lambda *args, **kwargs: captured.update(args=args, kwargs=kwargs)
+    wizard.destroy = lambda: None
+
+    wizard.apply()
+
+    assert captured['args'] == (0.8, 0.2, 0.0, True)
+    assert captured['kwargs'] == {'options': SplitOptions(group_mode='prefix', seed=11), 'plan': 'cached-plan'}
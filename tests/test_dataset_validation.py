@@ -0,0 +1,121 @@
+import json
+from types import SimpleNamespace
+
+import dataset_cli
+import dataset_validation
+import main as main_module
+from dataset_index import ClassIndex
+from dataset_validation import apply_fixes, validate_dataset, validate_label_files
+from main import MainApplication
+from tests.helpers import ImmediateRoot, join_threads
+
+
+def _make_dataset(base_dir):
+    (base_dir / 'images').mkdir(parents=True)
+    (base_dir / 'labels').mkdir()
+    (base_dir / 'classes.txt').write_text('cat\ndog', encoding='utf-8')
+    for name in ('a', 'b', 'c'):
+        (base_dir / 'images' / f'{name}.jpg').write_bytes(b'img')
+    (base_dir / 'labels' / 'a.txt').write_text(
+        '0 0.5 0.5 0.2 0.2\n'
+        '0 0.5 0.5 0.2 0.2\n'
+        '1 0.95 0.5 0.2 0.2\n'
+        '1 0.5 0.5 0.0 0.3\n',
+        encoding='utf-8',
+    )
+    (base_dir / 'labels' / 'b.txt').write_text(
+        '7 0.5 0.5 0.2 0.2\n'
+        'x 0.5 0.5 0.2 0.2\n'
+        '0 0.1 0.1 0.2 0.2 0.3\n'
+        '0 0.1 0.1 0.2 0.2 0.3 0.3\n'
+        '1 0.1 0.1 0.5 0.1 0.9 0.4\n',
+        encoding='utf-8',
+    )
+    return base_dir
+
+
+def test_validation_report_categorizes_label_problems(tmp_path):
+    dataset = _make_dataset(tmp_path / 'ds')
+
+    report = validate_dataset(str(dataset))
+
+    assert report.files_checked == 2
+    assert report.objects_checked == 9
+    assert report.summary() == {
+        'missing_label': 1,
+        'duplicate_box': 1,
+        'box_out_of_bounds': 1,
+        'degenerate_box': 1,
+        'class_out_of_range': 1,
+        'not_a_number': 1,
+        'odd_polygon_coordinates': 1,
+        'degenerate_polygon': 1,
+    }
+    assert report.by_category()['duplicate_box'][0]['line'] == 2
+    assert report.by_category()['class_out_of_range'][0]['class_id'] == 7
+    assert report.fixable_files(['dedup']) == [str(dataset / 'labels' / 'a.txt')]
+
+
+def test_apply_fixes_clips_drops_and_dedups(tmp_path):
+    dataset = _make_dataset(tmp_path / 'ds')
+    report = validate_dataset(str(dataset))
+
+    files_changed, lines_changed, errors = apply_fixes(report)
+
+    assert (files_changed, lines_changed, errors) == (2, 4, [])
+    assert (dataset / 'labels' / 'a.txt').read_text(encoding='utf-8') == '0 0.5 0.5 0.2 0.2\n1 0.925000 0.500000 0.150000 0.200000\n'
+    remaining = validate_dataset(str(dataset)).summary()
+    assert remaining == {'missing_label': 1, 'class_out_of_range': 1, 'not_a_number': 1, 'odd_polygon_coordinates': 1}
+
+
+def test_main_applies_fixes_and_revalidates_off_the_ui_thread(tmp_path):
+    dataset = _make_dataset(tmp_path / 'ds')
+    app = MainApplication.__new__(MainApplication)
+    app.root = ImmediateRoot()
+    app.app_state = main_module.AppState()
+    app.app_state.base_directory = str(dataset)
+    app.app_state.class_names = ['cat', 'dog']
+    statuses = []
+    app.ui = SimpleNamespace(update_status_bar=statuses.append, show_progress=lambda text: None)
+    app.class_index = ClassIndex.open(str(dataset))
+    reports = []
+
+    assert app._start_validation(reports.append) is True
+    join_threads('label-validation')
+    assert app._apply_validation_fixes(reports[0], ['clip', 'drop_degenerate', 'dedup'], reports.append) is None
+    join_threads('label-validation')
+
+    assert len(reports) == 2 and len(reports[0].issues) == 8
+    assert reports[1].summary() == {'missing_label': 1, 'class_out_of_range': 1, 'not_a_number': 1, 'odd_polygon_coordinates': 1}
+    assert statuses[-1] == 'Validação: 4 problema(s) em 2 label(s).'
+    assert app.background_tasks == frozenset()
+    assert app.class_index.classes[0][str((dataset / 'labels' / 'a.txt').relative_to(dataset))] == 1
+
+
+def test_box_checks_match_across_chunks_and_process_pool(tmp_path, monkeypatch):
+    labels = []
+    for index in range(6):
+        path = tmp_path / f'{index}.txt'
+        path.write_text('0 0.5 0.5 0.2 0.2\n0 0.5 0.5 0.2 0.2\n0 1.5 0.5 0.2 0.2\n', encoding='utf-8')
+        labels.append(str(path))
+    issues, objects = validate_label_files(labels, 1)
+    assert objects == 18
+    assert sorted({issue['issue'] for issue in issues}) == ['coordinate_out_of_range', 'duplicate_box']
+
+    dataset = _make_dataset(tmp_path / 'ds')
+    monkeypatch.setattr(dataset_validation, 'PROCESS_THRESHOLD', 1)
+    monkeypatch.setattr(dataset_validation, 'CHUNK_SIZE', 1)
+    pooled = validate_dataset(str(dataset), workers=2)
+    assert pooled.summary() == validate_dataset(str(dataset), workers=1).summary()
+
+
+def test_cli_validate_fix_reports_remaining_issues(tmp_path, capsys):
+    dataset = _make_dataset(tmp_path / 'ds')
+
+    code = dataset_cli.main(['validate', str(dataset), '--fix', 'dedup'])
+    payload = json.loads(capsys.readouterr().out)
+
+    assert code == dataset_cli.EXIT_ISSUES
+    assert payload['fixed']['lines'] == 1
+    assert 'duplicate_box' not in payload['remaining_summary']
+    assert payload['summary']['duplicate_box'] == 1
@@ -0,0 +1,86 @@
+import pytest
+from PIL import Image, features
+
+import image_metadata
+from image_metadata import ImageInfo, probe_image_header, read_image_info
+
+
+@pytest.mark.parametrize('extension, pil_format, mode', [
+    ('png', 'PNG', 'RGB'),
+    ('png', 'PNG', 'RGBA'),
+    ('png', 'PNG', 'L'),
+    ('jpg', 'JPEG', 'RGB'),
+    ('jpg', 'JPEG', 'L'),
+    ('bmp', 'BMP', 'RGB'),
+    ('gif', 'GIF', 'P'),
+    ('tiff', 'TIFF', 'RGB'),
+    ('tiff', 'TIFF', 'L'),
+])
+def test_probe_image_header_matches_pillow(tmp_path, extension, pil_format, mode):
+    image_path = tmp_path / f'sample.{extension}'
+    Image.new(mode, (37, 23)).save(image_path, format=pil_format)
+
+    info = probe_image_header(str(image_path))
+
+    with Image.open(image_path) as img:
+        assert info == ImageInfo(img.size[0], img.size[1], img.format, img.mode)
+
+
+@pytest.mark.skipif(not features.check('webp'), reason='Pillow sem suporte a WebP')
+@pytest.mark.parametrize('mode, lossless', [('RGB', False), ('RGBA', True)])
+def test_probe_image_header_reads_webp_variants(tmp_path, mode, lossless):
+    image_path = tmp_path / 'sample.webp'
+    Image.new(mode, (41, 19)).save(image_path, format='WEBP', lossless=lossless)
+
+    info = probe_image_header(str(image_path))
+
+    assert info.size == (41, 19)
+    assert info.format == 'WEBP'
+
+
+def test_probe_image_header_skips_large_jpeg_segments_without_reading_them(tmp_path, monkeypatch):
+    image_path = tmp_path / 'exif.jpg'
+    exif = Image.Exif()
+    exif[0x010E] = 'x' * 60000
+    Image.new('RGB', (64, 48)).save(image_path, format='JPEG', exif=exif.tobytes())
+    bytes_read = []
+    real_open = open
+
+    class CountingFile:
+
+        def __init__(self, handle):
+            self.handle = handle
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.handle.close()
+
+        def readinto(self, buffer):
+            count = self.handle.readinto(buffer)
+            bytes_read.append(count)
+            return count
+
+        def read(self, size=-1):
+            data = self.handle.read(size)
+            bytes_read.append(len(data))
+            return data
+
+        def seek(self, offset):
+            return self.handle.seek(offset)
+
+    monkeypatch.setattr(image_metadata, 'open', lambda *args, **kwargs: CountingFile(real_open(*args, **kwargs)), raising=False)
+
+    info = probe_image_header(str(image_path))
+
+    assert info.size == (64, 48)
+    assert sum(bytes_read) <= image_metadata.HEADER_PROBE_SIZE + 64
+    assert image_path.stat().st_size > 10 * sum(bytes_read)
+
+
+def test_read_image_info_falls_back_to_none_for_unknown_files(tmp_path):
+    broken = tmp_path / 'broken.jpg'
+    broken.write_text('not an image', encoding='utf-8')
+
+    assert read_image_info(str(broken)) is None
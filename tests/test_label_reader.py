@@ -0,0 +1,78 @@
+import numpy as np
+
+import label_reader
+from dataset_index import read_class_counts
+from label_reader import LabelReader, iter_label_text, iter_labels, parse_label_bytes, read_label
+
+
+def _reference(text):
+    rows = []
+    for number, line in enumerate(text.splitlines(), start=1):
+        parts = line.split()
+        if len(parts) < 5:
+            continue
+        try:
+            rows.append((int(parts[0]), [float(value) for value in parts[1:]], number))
+        except ValueError:
+            continue
+    return rows
+
+
+def _rows(labels):
+    return [(int(labels.class_ids[i]), labels.row(i).tolist(), int(labels.line_numbers[i])) for i in range(len(labels))]
+
+
+def test_parse_matches_reference_parser():
+    text = (
+        '0 0.5 0.5 0.2 0.4\r\n'
+        'bad line\n'
+        '\n'
+        '  3\t0.25 .25 1e-1 0.1000000000000000055511151231257827  \n'
+        '2 x 0.1 0.1 0.1\n'
+        '1.5 0.1 0.1 0.1 0.1\n'
+        '-1 -0.5 +0.5 1E2 0\n'
+        '7 0.1 0.1 0.5 0.1 0.5 0.5'
+    )
+
+    labels = parse_label_bytes(text.encode('utf-8'))
+
+    assert _rows(labels) == _reference(text)
+    classes_only = parse_label_bytes(text.encode('utf-8'), coordinates=False)
+    assert classes_only.class_ids.tolist() == labels.class_ids.tolist()
+    assert classes_only.line_numbers.tolist() == labels.line_numbers.tolist()
+    assert labels.coord_counts.tolist() == [4, 4, 4, 6]
+    np.testing.assert_allclose(labels.boxes()[-1], [0.3, 0.3, 0.4, 0.4])
+    assert len(parse_label_bytes(b'')) == 0
+
+
+def test_reader_batches_files_and_reports_missing(tmp_path, monkeypatch):
+    paths = []
+    texts = ['0 0.1 0.2 0.3 0.4\n' * (n % 4) + '5 0.5 0.5 0.1 0.1' * (n % 2) for n in range(9)]
+    for n, text in enumerate(texts):
+        path = tmp_path / f'{n}.txt'
+        path.write_text(text, encoding='utf-8')
+        paths.append(str(path))
+    monkeypatch.setattr(label_reader, 'MMAP_THRESHOLD', 40)
+    query = paths[:4] + [str(tmp_path / 'missing.txt'), None] + paths[4:]
+
+    results = list(LabelReader(batch_files=3, batch_bytes=16).iter_labels(query))
+
+    assert [path for path, _labels, _error in results] == query
+    assert results[4][1] is None and results[4][2] is None and results[5][1] is None
+    parsed = [labels for path, labels, _error in results if path in paths]
+    assert [_rows(labels) for labels in parsed] == [_reference(text) for text in texts]
+    assert read_label(paths[3], coordinates=False)[0].class_ids.tolist() == [0, 0, 0, 5]
+    assert read_class_counts(paths[3]) == {0: 3, 5: 1}
+
+
+def test_text_reader_reports_decode_errors(tmp_path):
+    good = tmp_path / 'good.txt'
+    bad = tmp_path / 'bad.txt'
+    good.write_text('0 0.5 0.5 0.1 0.1\n', encoding='utf-8')
+    bad.write_bytes(b'0 0.5 0.5 0.1 \xff\n')
+
+    (_p1, text, error), (_p2, bad_text, bad_error) = iter_label_text([str(good), str(bad)])
+
+    assert (text, error) == ('0 0.5 0.5 0.1 0.1\n', None)
+    assert bad_text is None and 'utf-8' in bad_error
+    assert _rows(next(iter_labels([str(bad)]))[1]) == []
@@ -0,0 +1,91 @@
+import os
+
+import localization
+from localization import LocalizationManager, compile_catalog, read_catalog_index
+
+CATALOG = '''<?xml version='1.0' encoding='utf-8'?>
+<languages>
+    <language code="en_US" name="English">
+        <string key="ABOUT">About</string>
+        <string key="ONLY_EN">English only</string>
+    </language>
+    <language code="pt_BR" name="Português">
+        <string key="ABOUT">Sobre</string>
+    </language>
+    <language code="de_DE" name="Deutsch">
+        <string key="ABOUT">Über</string>
+    </language>
+</languages>
+'''
+
+
+def _build_manager(xml_path, cache_dir):
+    manager = object.__new__(LocalizationManager)
+    manager.xml_path = xml_path
+    manager.cache_dir = cache_dir
+    manager.language_names = {}
+    manager.strings = {}
+    manager.current_language = 'pt_BR'
+    manager.load_languages()
+    return manager
+
+
+def test_catalog_is_compiled_once_and_languages_load_on_demand(tmp_path, monkeypatch):
+    xml_path = tmp_path / 'languages.xml'
+    xml_path.write_text(CATALOG, encoding='utf-8')
+    cache_dir = tmp_path / 'cache'
+    _build_manager(xml_path, cache_dir)
+
+    monkeypatch.setattr(localization, 'iter_xml_languages', lambda path: (_ for _ in ()).throw(AssertionError('xml reparsed')))
+    manager = _build_manager(xml_path, cache_dir)
+
+    assert manager.get_available_languages() == [('English', 'en_US'), ('Português', 'pt_BR'), ('Deutsch', 'de_DE')]
+    assert sorted(manager.strings) == ['en_US', 'pt_BR']
+    manager.set_language('de_DE')
+    assert manager.get_string('ABOUT') == 'Über'
+    assert manager.get_string('ONLY_EN') == 'English only'
+    assert manager.get_string('MISSING') == 'MISSING'
+    assert sorted(manager.strings) == ['de_DE', 'en_US', 'pt_BR']
+
+
+def test_catalog_cache_is_invalidated_when_xml_changes(tmp_path):
+    xml_path = tmp_path / 'languages.xml'
+    xml_path.write_text(CATALOG, encoding='utf-8')
+    cache_dir = tmp_path / 'cache'
+    compile_catalog(xml_path, cache_dir)
+    assert read_catalog_index(xml_path, cache_dir) is not None
+
+    xml_path.write_text(CATALOG.replace('Über', 'Ueber!'), encoding='utf-8')
+    stat = os.stat(xml_path)
+    os.utime(xml_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert read_catalog_index(xml_path, cache_dir) is None
+    manager = _build_manager(xml_path, cache_dir)
+    manager.set_language('de_DE')
+    assert manager.get_string('ABOUT') == 'Ueber!'
+
+
+def test_catalog_falls_back_to_memory_when_cache_is_not_writable(tmp_path):
+    xml_path = tmp_path / 'languages.xml'
+    xml_path.write_text(CATALOG, encoding='utf-8')
+    blocker = tmp_path / 'blocked'
+    blocker.write_text('not a directory', encoding='utf-8')
+
+    manager = _build_manager(xml_path, blocker / 'cache')
+
+    assert sorted(manager.strings) == ['de_DE', 'en_US', 'pt_BR']
+    assert manager.get_string('ABOUT') == 'Sobre'
+
+
+def test_lookup_table_is_flattened_in_fallback_order(tmp_path):
+    xml_path = tmp_path / 'languages.xml'
+    xml_path.write_text(CATALOG, encoding='utf-8')
+    manager = _build_manager(xml_path, tmp_path / 'cache')
+
+    assert manager.lookup == {'ABOUT': 'Sobre', 'ONLY_EN': 'English only'}
+    manager.set_language('de_DE')
+    assert manager.lookup == {'ABOUT': 'Über', 'ONLY_EN': 'English only'}
+    manager.set_language('xx_XX')
+    assert manager.current_language == 'de_DE'
+    manager.set_language('en_US')
+    assert manager.lookup['ABOUT'] == 'About'
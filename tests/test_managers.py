@@ -1,7 +1,9 @@
+import errno
 from pathlib import Path
 
 import pytest
 
+import managers
 from managers import AnnotationManager, DatasetUtils
 
 
@@ -106,3 +108,69 @@ def test_dataset_utils_split_dataset_accepts_base_dir_with_labels_in_name(monkey
 
     assert (base_dir / 'train' / 'images' / 'img1.jpg').exists()
     assert (base_dir / 'train' / 'labels' / 'img1.txt').exists()
+
+
+def test_split_dataset_refuses_name_collisions_before_moving_anything(tmp_path):
+    base_dir = tmp_path / 'dataset'
+    for folder in ('cam_a', 'cam_b'):
+        (base_dir / folder).mkdir(parents=True)
+        (base_dir / folder / 'img_001.jpg').write_text(folder, encoding='utf-8')
+        (base_dir / folder / 'img_001.txt').write_text('0 0.5 0.5 0.2 0.2\n', encoding='utf-8')
+
+    with pytest.raises(managers.SplitCollisionError) as excinfo:
+        DatasetUtils.split_dataset(str(base_dir), train_ratio=1.0, val_ratio=0.0, test_ratio=0.0, shuffle=False)
+
+    assert len(excinfo.value.collisions) == 2
+    assert (base_dir / 'cam_a' / 'img_001.jpg').exists()
+    assert (base_dir / 'cam_b' / 'img_001.jpg').exists()
+    assert DatasetUtils.last_split(str(base_dir)) is None
+
+
+def test_undo_last_split_reverses_completed_plan(tmp_path):
+    base_dir = tmp_path / 'dataset'
+    (base_dir / 'images').mkdir(parents=True)
+    (base_dir / 'labels').mkdir()
+    for index in range(6):
+        (base_dir / 'images' / f'img{index}.jpg').write_text('img', encoding='utf-8')
+        (base_dir / 'labels' / f'img{index}.txt').write_text('0 0.5 0.5 0.2 0.2\n', encoding='utf-8')
+    before = sorted(str(path.relative_to(base_dir)) for path in base_dir.rglob('*'))
+
+    result = DatasetUtils.split_dataset(str(base_dir), train_ratio=0.5, val_ratio=0.5, test_ratio=0.0, shuffle=False)
+    restored = DatasetUtils.rollback_split(str(base_dir))
+
+    assert result['errors'] == []
+    assert restored == 12
+    assert sorted(str(path.relative_to(base_dir)) for path in base_dir.rglob('*')) == before
+    assert DatasetUtils.last_split(str(base_dir)) is None
+
+
+def test_resolve_label_paths_matches_per_image_lookup(tmp_path):
+    (tmp_path / 'split' / 'images').mkdir(parents=True)
+    (tmp_path / 'split' / 'labels').mkdir()
+    (tmp_path / 'flat').mkdir()
+    images = [tmp_path / 'split' / 'images' / 'a.jpg', tmp_path / 'split' / 'images' / 'b.jpg', tmp_path / 'flat' / 'c.png']
+    for image in images:
+        image.write_text('img', encoding='utf-8')
+    (tmp_path / 'split' / 'labels' / 'a.txt').write_text('', encoding='utf-8')
+    (tmp_path / 'flat' / 'c.txt').write_text('', encoding='utf-8')
+
+    resolved = AnnotationManager.resolve_label_paths([str(image) for image in images])
+
+    expected = [AnnotationManager.get_label_path(str(image)) for image in images]
+    assert resolved == [expected[0], None, expected[2]]
+
+
+def test_move_file_falls_back_to_shutil_move_across_devices(tmp_path, monkeypatch):
+    src = tmp_path / 'a.jpg'
+    src.write_text('img', encoding='utf-8')
+    moved = []
+
+    def cross_device(*args):
+        raise OSError(errno.EXDEV, 'cross-device link')
+
+    monkeypatch.setattr(managers.os, 'rename', cross_device)
+    monkeypatch.setattr(managers.shutil, 'move', lambda a, b: moved.append((a, b)))
+
+    managers.move_file(str(src), str(tmp_path / 'b.jpg'))
+
+    assert moved == [(str(src), str(tmp_path / 'b.jpg'))]
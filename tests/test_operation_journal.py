@@ -0,0 +1,140 @@
+import os
+
+import pytest
+
+import dataset_ops
+import managers
+from managers import DatasetUtils
+from operation_journal import COPY_JOURNAL_NAME, JournalError, OperationJournal, SPLIT_JOURNAL_NAME
+
+
+def test_journal_round_trip_ignores_truncated_tail(tmp_path):
+    path = str(tmp_path / 'op.jsonl')
+    journal = OperationJournal.create(path, 'copy', {'base_dir': '/data'}, [{'name': 'a'}, {'name': 'b'}, {'name': 'c'}])
+    journal.mark_done(0)
+    journal.mark_done(2)
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as handle:
+        handle.write('{"done": 1')
+
+    loaded = OperationJournal.load(path)
+
+    assert loaded.operation == 'copy'
+    assert loaded.meta == {'base_dir': '/data'}
+    assert loaded.pending() == [(1, {'name': 'b'})]
+    assert loaded.finished is False
+
+
+def test_journal_rejects_corruption_before_the_tail(tmp_path):
+    path = tmp_path / 'op.jsonl'
+    OperationJournal.create(str(path), 'copy', {}, [{'name': 'a'}]).close()
+    lines = path.read_text(encoding='utf-8').splitlines()
+    path.write_text('\n'.join([lines[0], 'garbage', lines[1]]) + '\n', encoding='utf-8')
+
+    with pytest.raises(JournalError):
+        OperationJournal.load(str(path))
+
+
+def _make_dataset(base_dir, count):
+    (base_dir / 'images').mkdir(parents=True)
+    (base_dir / 'labels').mkdir()
+    images = []
+    for index in range(count):
+        image = base_dir / 'images' / f'img{index}.jpg'
+        image.write_bytes(bytes([index]) * 10)
+        (base_dir / 'labels' / f'img{index}.txt').write_text('0 0.5 0.5 0.2 0.2\n', encoding='utf-8')
+        images.append(str(image))
+    return images
+
+
+def test_interrupted_copy_is_found_resumed_and_skips_completed_items(tmp_path, monkeypatch):
+    base_dir = tmp_path / 'dataset'
+    images = _make_dataset(base_dir, 6)
+    target_dir = tmp_path / 'dataset_copia'
+    real_copy = dataset_ops.CopyEngine.copy_file
+
+    def failing_copy(engine, src, dst):
+        if src.endswith('img4.jpg'):
+            raise OSError('disco cheio')
+        return real_copy(engine, src, dst)
+
+    monkeypatch.setattr(dataset_ops.CopyEngine, 'copy_file', failing_copy)
+    copied, errors = dataset_ops.copy_dataset_files(str(base_dir), images, target_dir)
+
+    assert (copied, len(errors)) == (5, 1)
+    assert dataset_ops.find_interrupted_copies(str(base_dir)) == [target_dir]
+
+    copied_again = []
+    monkeypatch.setattr(dataset_ops.CopyEngine, 'copy_file', lambda engine, src, dst: copied_again.append(os.path.basename(src)) or real_copy(engine, src, dst))
+    copied, errors = dataset_ops.resume_copy(target_dir)
+
+    assert (copied, errors) == (6, [])
+    assert copied_again == ['img4.jpg', 'img4.txt']
+    assert not (target_dir / COPY_JOURNAL_NAME).exists()
+    assert dataset_ops.find_interrupted_copies(str(base_dir)) == []
+
+
+def test_rollback_copy_only_removes_journaled_targets(tmp_path):
+    plain_dir = tmp_path / 'unrelated'
+    plain_dir.mkdir()
+
+    with pytest.raises(JournalError):
+        dataset_ops.rollback_copy(plain_dir)
+    assert plain_dir.exists()
+
+
+def test_failed_split_keeps_journal_and_rerun_resumes_saved_plan(tmp_path, monkeypatch):
+    base_dir = tmp_path / 'dataset'
+    base_dir.mkdir()
+    for index in range(4):
+        (base_dir / f'img{index}.jpg').write_text('img', encoding='utf-8')
+        (base_dir / f'img{index}.txt').write_text('0 0.5 0.5 0.2 0.2\n', encoding='utf-8')
+    monkeypatch.setattr('managers.random.shuffle', lambda items: items.sort(key=lambda item: item['name']))
+    real_move = managers.move_file
+
+    def flaky_move(src, dst):
+        if src.endswith('img3.jpg'):
+            raise OSError('NFS indisponível')
+        return real_move(src, dst)
+
+    monkeypatch.setattr(managers, 'move_file', flaky_move)
+    result = DatasetUtils.split_dataset(str(base_dir), train_ratio=0.5, val_ratio=0.25, test_ratio=0.25)
+
+    assert result['errors'] == ['img3.jpg: NFS indisponível']
+    assert (base_dir / SPLIT_JOURNAL_NAME).exists()
+    assert DatasetUtils.pending_split(str(base_dir)).pending() != []
+
+    monkeypatch.setattr(managers, 'move_file', real_move)
+    result = DatasetUtils.split_dataset(str(base_dir), train_ratio=1.0, val_ratio=0.0, test_ratio=0.0)
+
+    assert result == {'train': 2, 'valid': 1, 'test': 1, 'errors': []}
+    assert sorted(path.name for path in (base_dir / 'test' / 'images').iterdir()) == ['img3.jpg']
+    assert DatasetUtils.pending_split(str(base_dir)) is None
+    assert DatasetUtils.last_split(str(base_dir)).finished is True
+
+
+def test_rollback_split_restores_original_layout(tmp_path, monkeypatch):
+    base_dir = tmp_path / 'dataset'
+    base_dir.mkdir()
+    for index in range(3):
+        (base_dir / f'img{index}.jpg').write_text('img', encoding='utf-8')
+        (base_dir / f'img{index}.txt').write_text('0 0.5 0.5 0.2 0.2\n', encoding='utf-8')
+    original = sorted(os.listdir(base_dir))
+
+    real_move = managers.move_file
+    calls = []
+
+    def stop_after_two(src, dst):
+        calls.append(src)
+        if len(calls) > 2:
+            raise OSError('queda de energia')
+        return real_move(src, dst)
+
+    monkeypatch.setattr(managers, 'move_file', stop_after_two)
+    DatasetUtils.split_dataset(str(base_dir), train_ratio=0.34, val_ratio=0.66, test_ratio=0.0, shuffle=False)
+    monkeypatch.undo()
+
+    restored = DatasetUtils.rollback_split(str(base_dir))
+
+    assert restored == 2
+    assert sorted(os.listdir(base_dir)) == original
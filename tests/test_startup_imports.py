@@ -0,0 +1,47 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from utils import lazy_import
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+STARTUP_IMPORT_BUDGET_SECONDS = 2.0
+HEAVY_MODULES = ('matplotlib', 'numpy', 'matplotlib.pyplot', 'matplotlib.font_manager')
+
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+print(json.dumps({'elapsed': elapsed, 'loaded': sorted(name for name in %r if name in sys.modules)}))
+''' % (HEAVY_MODULES,)
+
+
+def test_main_cold_import_skips_heavy_modules_and_stays_under_budget():
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=60,
+        check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert report['loaded'] == []
+    assert report['elapsed'] < STARTUP_IMPORT_BUDGET_SECONDS
+
+
+def test_lazy_import_defers_module_execution(tmp_path, monkeypatch):
+    (tmp_path / 'lazy_probe_module.py').write_text('import sys\nsys.lazy_probe_hits = getattr(sys, "lazy_probe_hits", 0) + 1\nVALUE = 42\n', encoding='utf-8')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, 'lazy_probe_module', raising=False)
+    monkeypatch.setattr(sys, 'lazy_probe_hits', 0, raising=False)
+
+    module = lazy_import('lazy_probe_module')
+    assert sys.lazy_probe_hits == 0
+
+    assert module.VALUE == 42
+    assert sys.lazy_probe_hits == 1
+    assert lazy_import('lazy_probe_module') is module
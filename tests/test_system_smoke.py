@@ -6,12 +6,29 @@ def test_core_modules_import_successfully():
     modules = [
         'analisador_dataset',
         'canvas',
+        'chart_rendering',
         'config',
+        'copy_engine',
+        'dataset_analysis',
+        'dataset_cli',
+        'dataset_coco',
+        'dataset_dedup',
+        'dataset_export',
+        'dataset_geometry',
+        'dataset_index',
+        'dataset_query',
+        'dataset_ops',
+        'dataset_pack',
+        'dataset_split',
+        'dataset_validation',
         'generate_languages',
+        'image_metadata',
+        'label_reader',
         'localization',
         'logger_config',
         'main',
         'managers',
+        'operation_journal',
         'state',
         'ui',
         'utils',
@@ -21,6 +38,7 @@ def test_core_modules_import_successfully():
         'window_class_manager',
         'window_new_project',
         'window_split_wizard',
+        'window_validation',
         'windows',
     ]
 
@@ -27,6 +27,8 @@ class UIManager:
         self.prop_h = tk.StringVar(value='0')
         self.pan_mode_var = tk.BooleanVar(value=False)
         self.zoom_var = tk.StringVar()
+        self.filter_var = tk.StringVar()
+        self.filter_status_var = tk.StringVar()
         self._translatable_items = []
         self._tooltip_items = []
         self._create_widgets()
@@ -50,23 +52,31 @@ class UIManager:
         self._tooltip_items.append((tooltip, key, default))
         return tooltip
 
+    def _dir_label_text(self, lookup):
+        folder = os.path.basename(self.app_state.base_directory)
+        prefix = lookup.get('COL_FOLDER', 'COL_FOLDER')
+        if hasattr(self.app_state, 'image_paths') and not self.app_state.image_paths:
+            return f'{prefix}: {folder} (Empty)'
+        return f'{prefix}: {folder}'
+
     def refresh_ui(self):
+        lookup = localization.get_lookup()
+        dir_text = self._dir_label_text(lookup) if self.app_state.base_directory else None
+        updates = []
         for widget, key, attr in self._translatable_items:
+            if dir_text is not None and widget == self.dir_label:
+                updates.append((widget, attr, dir_text))
+            else:
+                updates.append((widget, attr, lookup.get(key, key)))
+        for widget, attr, value in updates:
             try:
-                if widget == self.dir_label and self.app_state.base_directory:
-                    folder = os.path.basename(self.app_state.base_directory)
-                    prefix = localization.tr('COL_FOLDER')
-                    if hasattr(self.app_state, 'image_paths') and not self.app_state.image_paths:
-                        widget[attr] = f'{prefix}: {folder} (Empty)'
-                    else:
-                        widget[attr] = f'{prefix}: {folder}'
-                    continue
-                widget[attr] = localization.tr(key)
+                widget[attr] = value
             except Exception:
                 pass
 
         for tooltip, key, default in self._tooltip_items:
-            tooltip.update_text(self._translate_or_default(key, default))
+            value = lookup.get(key, key)
+            tooltip.update_text(default if value == key else value)
 
         self._refresh_zoom_values()
         self._update_pan_button_label()
@@ -159,6 +169,11 @@ class UIManager:
         if Config.FEATURE_SHOW_ANALYZER:
             btn_stats.pack(side=tk.LEFT, padx=5)
 
+        btn_validate = ttk.Button(top_frame, text=self._translate_or_default('VALIDATE', 'Validar'), command=self.app.open_validation)
+        self._register_tooltip(btn_validate, 'TIP_VALIDATE', 'Verifica todos os labels e oferece correcoes automaticas.')
+        if Config.FEATURE_SHOW_VALIDATION:
+            btn_validate.pack(side=tk.LEFT, padx=5)
+
         btn_dataset_copy = ttk.Button(top_frame, command=self.app.open_dataset_copy_dialog)
         self._register_translation(btn_dataset_copy, 'REDUCE_DATASET')
         self._register_tooltip(btn_dataset_copy, 'TIP_REDUCE_DATASET', 'Abre uma janela para criar uma copia filtrada ou reduzida do dataset atual.')
@@ -233,6 +248,20 @@ class UIManager:
         img_fr = ttk.LabelFrame(parent_for_scrolled, padding=2)
         self._register_translation(img_fr, 'IMAGES_FRAME')
         img_fr.pack(fill=tk.X, expand=False, pady=(0, 5))
+        if Config.FEATURE_SHOW_IMAGE_FILTER:
+            filter_fr = ttk.Frame(img_fr)
+            filter_fr.pack(side=tk.TOP, fill=tk.X, pady=(0, 2))
+            filter_entry = ttk.Entry(filter_fr, textvariable=self.filter_var)
+            filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+            filter_entry.bind('<Return>', lambda _event: self.app.apply_image_filter())
+            self._register_tooltip(
+                filter_entry,
+                'TIP_IMAGE_FILTER',
+                'Ex.: class:7  objects>50  minsize<8  has:polygon  empty  name:frame  -class:cat'
+            )
+            ttk.Button(filter_fr, text=self._translate_or_default('BTN_FILTER', 'Filtrar'), width=7, command=self.app.apply_image_filter).pack(side=tk.LEFT, padx=(2, 0))
+            ttk.Button(filter_fr, text='✕', width=3, command=self.app.clear_image_filter).pack(side=tk.LEFT, padx=(2, 0))
+            ttk.Label(img_fr, textvariable=self.filter_status_var, style='TLabel').pack(side=tk.BOTTOM, anchor='w')
         self.listbox = tk.Listbox(img_fr, borderwidth=0, highlightthickness=0, height=12)
         sb = ttk.Scrollbar(img_fr, orient='vertical', command=self.listbox.yview)
         self.listbox.config(yscrollcommand=sb.set)
@@ -475,6 +504,10 @@ class UIManager:
     def update_status_bar(self, text: str) -> None:
         self.coord_label.config(text=text)
 
+    def show_progress(self, text: str) -> None:
+        self.coord_label.config(text=text)
+        self.coord_label.update_idletasks()
+
     def set_edit_controls_state(self, state: str) -> None:
         self.class_selector.config(state=state)
         self.change_class_button.config(state=state)
@@ -504,6 +537,9 @@ class UIManager:
         for path in self.app_state.image_paths:
             self.listbox.insert(tk.END, os.path.relpath(path, self.app_state.base_directory))
 
+    def update_filter_status(self, shown: int, total: int) -> None:
+        self.filter_status_var.set(f'{shown} / {total}' if shown != total else '')
+
     def refresh_annotation_list(self) -> None:
         self.annotation_listbox.delete(0, tk.END)
         for ann in self.app_state.annotations:
@@ -1,7 +1,29 @@
 import os
+import sys
+import importlib.util
+from types import ModuleType
 from typing import Optional
 
+
+def lazy_import(name: str) -> ModuleType:
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f'No module named {name!r}', name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
 def find_font_path() -> Optional[str]:
+    font_paths = ['c:/windows/fonts/arial.ttf', 'c:/windows/fonts/segoeui.ttf', 'c:/windows/fonts/calibri.ttf', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf', '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf', '/System/Library/Fonts/Supplemental/Arial.ttf', '/Library/Fonts/Arial.ttf']
+    for path in font_paths:
+        if os.path.exists(path):
+            return path
     try:
         from matplotlib import font_manager
         font_path = font_manager.findfont('Arial')
@@ -9,8 +31,4 @@ def find_font_path() -> Optional[str]:
             return font_path
     except ImportError:
         pass
-    font_paths = ['c:/windows/fonts/arial.ttf', 'c:/windows/fonts/segoeui.ttf', 'c:/windows/fonts/calibri.ttf', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf', '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf', '/System/Library/Fonts/Supplemental/Arial.ttf', '/Library/Fonts/Arial.ttf']
-    for path in font_paths:
-        if os.path.exists(path):
-            return path
     return None
\ No newline at end of file
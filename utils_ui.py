@@ -1,5 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+import tkinter.font as tkfont
 import logging
 import functools
 logger = logging.getLogger(__name__)
@@ -126,3 +127,75 @@ class ToolTip:
         if self.tip_window:
             self.tip_window.destroy()
             self.tip_window = None
+
+class VirtualTextView(ttk.Frame):
+
+    def __init__(self, parent, font=('Consolas', 9), **kwargs):
+        super().__init__(parent, **kwargs)
+        self.model = None
+        self.first_line = 0
+        self.visible_lines = 1
+        self.text = tk.Text(self, wrap=tk.NONE, font=font)
+        self.v_scroll = ttk.Scrollbar(self, orient='vertical', command=self.yview)
+        self.h_scroll = ttk.Scrollbar(self, orient='horizontal', command=self.text.xview)
+        self.text.configure(xscrollcommand=self.h_scroll.set)
+        self.v_scroll.pack(side='right', fill='y')
+        self.h_scroll.pack(side='bottom', fill='x')
+        self.text.pack(side='left', fill='both', expand=True)
+        self.text.bind('<Configure>', self._on_configure)
+        self.text.bind('<MouseWheel>', self._on_mousewheel)
+        self.text.bind('<Button-4>', lambda e: self.yview('scroll', -3, 'units'))
+        self.text.bind('<Button-5>', lambda e: self.yview('scroll', 3, 'units'))
+        self.text.bind('<Prior>', lambda e: self.yview('scroll', -1, 'pages'))
+        self.text.bind('<Next>', lambda e: self.yview('scroll', 1, 'pages'))
+
+    def tag_config(self, tag, **options):
+        self.text.tag_config(tag, **options)
+
+    def set_model(self, model):
+        self.model = model
+        self.first_line = 0
+        self.render()
+
+    def total_lines(self):
+        return len(self.model) if self.model is not None else 0
+
+    def yview(self, action, *args):
+        total = self.total_lines()
+        if action == 'moveto':
+            target = int(float(args[0]) * total)
+        elif action == 'scroll':
+            step = int(args[0])
+            target = self.first_line + (step * max(self.visible_lines - 1, 1) if args[1] == 'pages' else step)
+        else:
+            return
+        target = max(0, min(target, total - self.visible_lines))
+        if target != self.first_line:
+            self.first_line = target
+            self.render()
+
+    def render(self):
+        total = self.total_lines()
+        self.first_line = max(0, min(self.first_line, total - self.visible_lines))
+        stop = min(self.first_line + self.visible_lines, total)
+        self.text.configure(state='normal')
+        self.text.delete('1.0', tk.END)
+        if total:
+            for text, tag in self.model.lines(self.first_line, stop):
+                self.text.insert(tk.END, text + '\n', tag or ())
+        self.text.configure(state='disabled')
+        if total:
+            self.v_scroll.set(self.first_line / total, stop / total)
+        else:
+            self.v_scroll.set(0.0, 1.0)
+
+    def _on_configure(self, event):
+        line_height = max(tkfont.Font(font=self.text.cget('font')).metrics('linespace'), 1)
+        visible = max(event.height // line_height, 1)
+        if visible != self.visible_lines:
+            self.visible_lines = visible
+            self.render()
+
+    def _on_mousewheel(self, event):
+        self.yview('scroll', -3 if event.delta > 0 else 3, 'units')
+        return 'break'
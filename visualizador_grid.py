@@ -6,6 +6,7 @@ import threading
 import logging
 import math
 from config import Config
+from label_reader import iter_labels
 from utils_ui import log_errors
 import localization
 logger = logging.getLogger(__name__)
@@ -203,6 +204,8 @@ class GridViewerWindow:
         class_names = self.app.app_state.class_names
         base_dir = self.app.app_state.base_directory
         font_large, font_small = self._get_fonts()
+        label_paths = [self.app.ann_manager.get_label_path(path) for path in paths]
+        page_labels = [labels for _label_path, labels, _error in iter_labels(label_paths)]
         for idx, path in enumerate(paths):
             try:
                 orig_img = Image.open(path)
@@ -210,47 +213,40 @@ class GridViewerWindow:
                 fmt = orig_img.format or 'UNK'
                 size_kb = os.path.getsize(path) / 1024
                 thumb_img = Image.new('RGB', (self.card_size, self.card_size), (240, 240, 240))
-                img_copy = orig_img.copy().convert('RGB')
                 safe_margin = 20
                 safe_size = max(50, self.card_size - safe_margin)
+                orig_img.draft('RGB', (safe_size, safe_size))
+                img_copy = orig_img.convert('RGB')
                 img_copy.thumbnail((safe_size, safe_size), Image.Resampling.LANCZOS)
                 paste_x = (self.card_size - img_copy.width) // 2
                 paste_y = (self.card_size - img_copy.height) // 2
                 thumb_img.paste(img_copy, (paste_x, paste_y))
-                label_path = self.app.ann_manager.get_label_path(path)
+                labels = page_labels[idx]
                 ann_count = 0
-                if os.path.exists(label_path):
+                if labels is not None:
                     draw = ImageDraw.Draw(thumb_img)
-                    with open(label_path, 'r') as f:
-                        for line in f:
-                            parts = line.strip().split()
-                            if not parts:
-                                continue
-                            ann_count += 1
-                            cid = int(parts[0])
-                            color = Config.CLASS_COLORS[cid % len(Config.CLASS_COLORS)]
-                            cls_name = class_names[cid] if cid < len(class_names) else str(cid)
-                            if len(parts) > 5:
-                                coords = list(map(float, parts[1:]))
-                                points = []
-                                for i in range(0, len(coords), 2):
-                                    px = coords[i] * img_copy.width + paste_x
-                                    py = coords[i + 1] * img_copy.height + paste_y
-                                    points.append((px, py))
-                                if len(points) > 2:
-                                    draw.polygon(points, outline=color, width=max(2, int(self.font_scale / 4)))
-                                if points:
-                                    self._draw_grid_label(draw, points[0][0], points[0][1], cls_name, color, font_small)
-                            elif len(parts) == 5:
-                                cx, cy, cw, ch = map(float, parts[1:5])
-                                abs_cx = cx * img_copy.width + paste_x
-                                abs_cy = cy * img_copy.height + paste_y
-                                abs_w = cw * img_copy.width
-                                abs_h = ch * img_copy.height
-                                x1, y1 = (abs_cx - abs_w / 2, abs_cy - abs_h / 2)
-                                x2, y2 = (abs_cx + abs_w / 2, abs_cy + abs_h / 2)
-                                draw.rectangle([x1, y1, x2, y2], outline=color, width=max(2, int(self.font_scale / 4)))
-                                self._draw_grid_label(draw, x1, y1, cls_name, color, font_small)
+                    ann_count = len(labels)
+                    for row, cid in enumerate(labels.class_ids.tolist()):
+                        color = Config.CLASS_COLORS[cid % len(Config.CLASS_COLORS)]
+                        cls_name = class_names[cid] if cid < len(class_names) else str(cid)
+                        coords = labels.row(row)
+                        if len(coords) > 4:
+                            coords = coords[:len(coords) // 2 * 2].reshape(-1, 2) * (img_copy.width, img_copy.height) + (paste_x, paste_y)
+                            points = [tuple(point) for point in coords.tolist()]
+                            if len(points) > 2:
+                                draw.polygon(points, outline=color, width=max(2, int(self.font_scale / 4)))
+                            if points:
+                                self._draw_grid_label(draw, points[0][0], points[0][1], cls_name, color, font_small)
+                        else:
+                            cx, cy, cw, ch = coords.tolist()
+                            abs_cx = cx * img_copy.width + paste_x
+                            abs_cy = cy * img_copy.height + paste_y
+                            abs_w = cw * img_copy.width
+                            abs_h = ch * img_copy.height
+                            x1, y1 = (abs_cx - abs_w / 2, abs_cy - abs_h / 2)
+                            x2, y2 = (abs_cx + abs_w / 2, abs_cy + abs_h / 2)
+                            draw.rectangle([x1, y1, x2, y2], outline=color, width=max(2, int(self.font_scale / 4)))
+                            self._draw_grid_label(draw, x1, y1, cls_name, color, font_small)
                 try:
                     rel_path = os.path.relpath(path, base_dir)
                 except Exception:
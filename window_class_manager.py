@@ -8,7 +8,7 @@ import utils_ui
 
 class ClassManagerWindow(tk.Toplevel):
 
-    def __init__(self, master, class_list: List[str], callback: callable, usage_counts: Optional[List[int]]=None):
+    def __init__(self, master, class_list: List[str], callback: callable, usage_counts: Optional[List[int]]=None, object_counts: Optional[List[int]]=None):
         super().__init__(master)
         self.title(localization.tr('TITLE_CLASS_MANAGER'))
         self.geometry('620x560')
@@ -17,11 +17,13 @@ class ClassManagerWindow(tk.Toplevel):
         self.grab_set()
         self.callback = callback
         usage_counts = usage_counts or []
+        object_counts = object_counts or []
         self.class_entries = [
             {
                 'source_index': idx,
                 'name': name,
                 'image_count': usage_counts[idx] if idx < len(usage_counts) else 0,
+                'object_count': object_counts[idx] if idx < len(object_counts) else 0,
             }
             for idx, name in enumerate(class_list)
         ]
@@ -34,14 +36,16 @@ class ClassManagerWindow(tk.Toplevel):
 
         tree_frame = ttk.Frame(list_frame)
         tree_frame.pack(fill=tk.BOTH, expand=True)
-        columns = ('id', 'class_name', 'images')
+        columns = ('id', 'class_name', 'images', 'objects')
         self.tree = ttk.Treeview(tree_frame, columns=columns, show='headings', selectmode='browse')
         self.tree.heading('id', text=localization.tr('COL_ID'))
         self.tree.heading('class_name', text=localization.tr('COL_CLASS_NAME'))
         self.tree.heading('images', text=self._tr('COL_IMAGE_USAGE', 'Imagens'))
+        self.tree.heading('objects', text=self._tr('COL_OBJECT_USAGE', 'Objetos'))
         self.tree.column('id', width=60, anchor='center', stretch=False)
-        self.tree.column('class_name', width=320, anchor='w', stretch=True)
+        self.tree.column('class_name', width=260, anchor='w', stretch=True)
         self.tree.column('images', width=90, anchor='center', stretch=False)
+        self.tree.column('objects', width=90, anchor='center', stretch=False)
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         self.tree.bind('<Double-1>', lambda _event: self.edit())
 
@@ -91,7 +95,7 @@ class ClassManagerWindow(tk.Toplevel):
         for item in self.tree.get_children():
             self.tree.delete(item)
         for idx, entry in enumerate(self.class_entries):
-            self.tree.insert('', 'end', iid=str(idx), values=(idx, entry['name'], entry['image_count']))
+            self.tree.insert('', 'end', iid=str(idx), values=(idx, entry['name'], entry['image_count'], entry.get('object_count', 0)))
         if current_selection is not None and current_selection < len(self.class_entries):
             iid = str(current_selection)
             self.tree.selection_set(iid)
@@ -115,7 +119,7 @@ class ClassManagerWindow(tk.Toplevel):
                 parent=self
             )
             return
-        self.class_entries.append({'source_index': None, 'name': clean_name, 'image_count': 0})
+        self.class_entries.append({'source_index': None, 'name': clean_name, 'image_count': 0, 'object_count': 0})
         self._refresh_tree()
         iid = str(len(self.class_entries) - 1)
         self.tree.selection_set(iid)
@@ -1,3 +1,4 @@
+import threading
 import tkinter as tk
 from tkinter import ttk
 
@@ -7,15 +8,23 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import localization
 import utils_ui
 from config import Config
+from dataset_split import SplitOptions
 
 
 class SplitWizard(tk.Toplevel):
+    GROUP_MODE_LABELS = (('none', 'Sem agrupamento'), ('prefix', 'Prefixo do arquivo (ex.: video_0001)'), ('folder', 'Pasta de origem'))
+    planner = None
+    preview_plan = None
+    preview_key = None
 
-    def __init__(self, master, callback):
+    def __init__(self, master, callback, planner=None, class_names=(), undo=None):
         super().__init__(master)
         self.callback = callback
+        self.planner = planner
+        self.undo = undo
+        self.class_names = list(class_names)
         self.title(localization.tr('TITLE_SPLIT_WIZARD'))
-        self.geometry('700x480')
+        self.geometry('760x720' if planner else '700x480')
         self.resizable(False, False)
         self.transient(master)
         self.grab_set()
@@ -24,6 +33,9 @@ class SplitWizard(tk.Toplevel):
         self.test_pct = tk.DoubleVar(value=0)
         self.include_test = tk.BooleanVar(value=False)
         self.shuffle = tk.BooleanVar(value=True)
+        self.stratify = tk.BooleanVar(value=True)
+        self.group_mode = tk.StringVar(value=self.GROUP_MODE_LABELS[0][1])
+        self.seed = tk.StringVar(value=str(Config.SPLIT_DEFAULT_SEED))
         self._setup_ui()
         self._on_scale_change()
         utils_ui.center_window(self, master)
@@ -81,6 +93,8 @@ class SplitWizard(tk.Toplevel):
         self.chk_shuffle = ttk.Checkbutton(left_panel, text=localization.tr('CHK_SHUFFLE'), variable=self.shuffle)
         self.chk_shuffle.pack(anchor='w')
         ttk.Button(left_panel, text=localization.tr('BTN_APPLY_SPLIT'), command=self.apply).pack(fill=tk.X, side=tk.BOTTOM)
+        if self.undo is not None:
+            ttk.Button(left_panel, text=self._tr_default('BTN_UNDO_SPLIT', 'Desfazer ultimo split'), command=self.undo_last_split).pack(fill=tk.X, side=tk.BOTTOM, pady=(0, 6))
 
         right_panel = ttk.Frame(content, width=260)
         right_panel.pack(side=tk.RIGHT, fill=tk.BOTH)
@@ -89,6 +103,68 @@ class SplitWizard(tk.Toplevel):
         self.canvas = FigureCanvasTkAgg(self.fig, master=right_panel)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
+        if self.planner is not None:
+            self._setup_strategy_ui(main_frame)
+
+    def _setup_strategy_ui(self, parent):
+        strategy = ttk.LabelFrame(parent, text=self._tr_default('LBL_SPLIT_STRATEGY', 'Estrategia'), padding=8)
+        strategy.pack(fill=tk.BOTH, expand=True, pady=(10, 0))
+
+        options_row = ttk.Frame(strategy)
+        options_row.pack(fill=tk.X)
+        ttk.Checkbutton(options_row, text=self._tr_default('CHK_STRATIFY', 'Estratificar por classe'), variable=self.stratify).pack(side=tk.LEFT)
+        ttk.Label(options_row, text=self._tr_default('LBL_SPLIT_GROUP', 'Agrupar:')).pack(side=tk.LEFT, padx=(12, 4))
+        ttk.Combobox(options_row, textvariable=self.group_mode, state='readonly', width=34, values=[label for _, label in self.GROUP_MODE_LABELS]).pack(side=tk.LEFT)
+        ttk.Label(options_row, text=self._tr_default('LBL_SPLIT_SEED', 'Seed:')).pack(side=tk.LEFT, padx=(12, 4))
+        ttk.Entry(options_row, textvariable=self.seed, width=8).pack(side=tk.LEFT)
+        self.btn_preview = ttk.Button(options_row, text=self._tr_default('BTN_SPLIT_PREVIEW', 'Pre-visualizar'), command=self.preview)
+        self.btn_preview.pack(side=tk.RIGHT)
+
+        self.lbl_preview = ttk.Label(strategy, text='', font=Config.FONTS['small'])
+        self.lbl_preview.pack(anchor='w', pady=(6, 4))
+        columns = ('class', 'train', 'valid', 'test')
+        self.preview_tree = ttk.Treeview(strategy, columns=columns, show='headings', height=6)
+        for column, title, width in zip(columns, ('Classe', 'Train', 'Val', 'Test'), (260, 90, 90, 90)):
+            self.preview_tree.heading(column, text=title)
+            self.preview_tree.column(column, width=width, anchor='w' if column == 'class' else 'e')
+        self.preview_tree.pack(fill=tk.BOTH, expand=True)
+
+    def current_options(self):
+        seed_text = self.seed.get().strip()
+        group_mode = next((mode for mode, label in self.GROUP_MODE_LABELS if label == self.group_mode.get()), 'none')
+        return SplitOptions(stratify=self.stratify.get(), group_mode=group_mode, seed=int(seed_text) if seed_text.lstrip('-').isdigit() else None, shuffle=self.shuffle.get())
+
+    def current_ratios(self):
+        return (self.train_pct.get() / 100, self.val_pct.get() / 100, self.test_pct.get() / 100 if self.include_test.get() else 0.0)
+
+    def preview(self):
+        key = (self.current_ratios(), self.current_options())
+        self.btn_preview.config(state='disabled')
+        self.lbl_preview.config(text=self._tr_default('LBL_SPLIT_PREVIEW_RUNNING', 'Calculando distribuicao...'))
+
+        def worker():
+            try:
+                plan = self.planner(*key)
+            except Exception as e:
+                self.after(0, self._show_preview_error, str(e))
+                return
+            self.after(0, self._show_preview, key, plan)
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _show_preview_error(self, message):
+        self.btn_preview.config(state='normal')
+        self.lbl_preview.config(text=message)
+
+    def _show_preview(self, key, plan):
+        self.preview_key = key
+        self.preview_plan = plan
+        self.btn_preview.config(state='normal')
+        train, valid, test = plan.image_counts.tolist()
+        self.lbl_preview.config(text=f'Imagens: train {train} | val {valid} | test {test}  ({plan.group_count} grupo(s))')
+        self.preview_tree.delete(*self.preview_tree.get_children())
+        for class_id, name, *counts in plan.preview_rows(self.class_names):
+            self.preview_tree.insert('', 'end', values=(f'{class_id}: {name}', *counts))
+
     def _on_test_toggle(self):
         if self.include_test.get():
             self.test_scale_frame.pack(fill=tk.X, pady=5, before=self.chk_shuffle)
@@ -153,11 +229,15 @@ class SplitWizard(tk.Toplevel):
             self.ax.axis('equal')
         self.canvas.draw()
 
+    def undo_last_split(self):
+        self.destroy()
+        self.undo()
+
     def apply(self):
-        self.callback(
-            self.train_pct.get() / 100,
-            self.val_pct.get() / 100,
-            self.test_pct.get() / 100 if self.include_test.get() else 0.0,
-            self.shuffle.get()
-        )
+        if self.planner is None:
+            self.callback(*self.current_ratios(), self.shuffle.get())
+        else:
+            key = (self.current_ratios(), self.current_options())
+            plan = self.preview_plan if key == self.preview_key else None
+            self.callback(*key[0], self.shuffle.get(), options=key[1], plan=plan)
         self.destroy()
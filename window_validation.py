@@ -0,0 +1,154 @@
+import os
+import tkinter as tk
+from tkinter import messagebox, ttk
+from typing import Callable, Optional
+
+import localization
+import utils_ui
+from dataset_validation import FIX_ACTIONS, ISSUE_FIXES, ValidationReport
+
+ISSUE_LABELS = {
+    'missing_label': 'Imagem sem label',
+    'orphan_label': 'Label sem imagem',
+    'unreadable': 'Arquivo ilegível',
+    'malformed_line': 'Linha malformada',
+    'odd_polygon_coordinates': 'Polígono com coordenadas ímpares',
+    'not_a_number': 'Valor não numérico',
+    'class_out_of_range': 'Classe fora do catálogo',
+    'coordinate_out_of_range': 'Coordenada fora de [0, 1]',
+    'box_out_of_bounds': 'Caixa ultrapassa a imagem',
+    'degenerate_box': 'Caixa com área zero',
+    'degenerate_polygon': 'Polígono com área zero',
+    'duplicate_box': 'Anotação duplicada',
+}
+FIX_LABELS = {
+    'clip': 'Recortar coordenadas para dentro da imagem',
+    'drop_degenerate': 'Remover caixas/polígonos com área zero',
+    'dedup': 'Remover anotações duplicadas',
+}
+DETAIL_LIMIT = 2000
+
+
+class ValidationWindow(tk.Toplevel):
+
+    def __init__(self, master, report: ValidationReport, on_fix: Callable[[ValidationReport, list, Callable[[Optional[ValidationReport]], None]], None]):
+        super().__init__(master)
+        self.title(self._tr('TITLE_VALIDATION', 'Validação do dataset'))
+        self.geometry('760x560')
+        self.minsize(600, 420)
+        self.transient(master)
+        self.grab_set()
+        self.on_fix = on_fix
+        self.report = report
+        self.fix_vars = {action: tk.BooleanVar(value=True) for action in FIX_ACTIONS}
+
+        main_container = ttk.Frame(self, padding=15)
+        main_container.pack(fill=tk.BOTH, expand=True)
+        self.summary_var = tk.StringVar()
+        ttk.Label(main_container, textvariable=self.summary_var).pack(anchor='w', pady=(0, 8))
+
+        panes = ttk.PanedWindow(main_container, orient=tk.VERTICAL)
+        panes.pack(fill=tk.BOTH, expand=True)
+        category_frame = ttk.Frame(panes)
+        detail_frame = ttk.Frame(panes)
+        panes.add(category_frame, weight=1)
+        panes.add(detail_frame, weight=2)
+
+        self.category_tree = ttk.Treeview(category_frame, columns=('issue', 'count', 'fix'), show='headings', height=6, selectmode='browse')
+        self.category_tree.heading('issue', text=self._tr('COL_ISSUE', 'Problema'))
+        self.category_tree.heading('count', text=self._tr('COL_COUNT', 'Ocorrências'))
+        self.category_tree.heading('fix', text=self._tr('COL_AUTOFIX', 'Correção'))
+        self.category_tree.column('issue', width=330, anchor='w')
+        self.category_tree.column('count', width=100, anchor='center', stretch=False)
+        self.category_tree.column('fix', width=140, anchor='center', stretch=False)
+        self.category_tree.pack(fill=tk.BOTH, expand=True)
+        self.category_tree.bind('<<TreeviewSelect>>', lambda _event: self._refresh_details())
+
+        self.detail_tree = ttk.Treeview(detail_frame, columns=('file', 'line', 'info'), show='headings', selectmode='browse')
+        self.detail_tree.heading('file', text=self._tr('COL_FILE', 'Arquivo'))
+        self.detail_tree.heading('line', text=self._tr('COL_LINE', 'Linha'))
+        self.detail_tree.heading('info', text=self._tr('COL_DETAILS', 'Detalhes'))
+        self.detail_tree.column('file', width=420, anchor='w')
+        self.detail_tree.column('line', width=60, anchor='center', stretch=False)
+        self.detail_tree.column('info', width=160, anchor='w')
+        scrollbar = ttk.Scrollbar(detail_frame, orient=tk.VERTICAL, command=self.detail_tree.yview)
+        self.detail_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.detail_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, pady=(8, 0))
+
+        fix_frame = ttk.LabelFrame(main_container, text=self._tr('GRP_AUTOFIX', 'Correções automáticas'), padding=8)
+        fix_frame.pack(fill=tk.X, pady=(10, 0))
+        for action in FIX_ACTIONS:
+            ttk.Checkbutton(fix_frame, text=FIX_LABELS[action], variable=self.fix_vars[action]).pack(anchor='w')
+
+        btn_fr = ttk.Frame(main_container)
+        btn_fr.pack(fill=tk.X, pady=(10, 0))
+        btn_fr.columnconfigure(0, weight=1)
+        btn_fr.columnconfigure(1, weight=1)
+        self.fix_button = ttk.Button(btn_fr, text=self._tr('BTN_APPLY_FIXES', 'Aplicar correções'), command=self.apply_fixes)
+        self.fix_button.grid(row=0, column=0, padx=2, sticky='ew')
+        ttk.Button(btn_fr, text=localization.tr('BTN_CLOSE'), command=self.destroy).grid(row=0, column=1, padx=2, sticky='ew')
+
+        self._refresh()
+        utils_ui.center_window(self, master)
+
+    def _tr(self, key: str, default: str) -> str:
+        value = localization.tr(key)
+        return default if value == key else value
+
+    def _refresh(self):
+        summary = self.report.summary()
+        self.summary_var.set(
+            f'{len(self.report.issues)} problema(s) em {self.report.files_checked} label(s) '
+            f'e {self.report.objects_checked} anotação(ões) verificadas.'
+        )
+        for item in self.category_tree.get_children():
+            self.category_tree.delete(item)
+        for name in sorted(summary, key=lambda key: -summary[key]):
+            fix = ISSUE_FIXES.get(name)
+            self.category_tree.insert('', 'end', iid=name, values=(ISSUE_LABELS.get(name, name), summary[name], fix or '-'))
+        fixable = bool(self.report.fixable_files())
+        self.fix_button.configure(state='normal' if fixable else 'disabled')
+        children = self.category_tree.get_children()
+        if children:
+            self.category_tree.selection_set(children[0])
+        self._refresh_details()
+
+    def _refresh_details(self):
+        for item in self.detail_tree.get_children():
+            self.detail_tree.delete(item)
+        selection = self.category_tree.selection()
+        if not selection:
+            return
+        issues = self.report.by_category().get(selection[0], [])
+        for issue in issues[:DETAIL_LIMIT]:
+            info = issue.get('error') or (f"classe {issue['class_id']}" if 'class_id' in issue else '')
+            self.detail_tree.insert('', 'end', values=(os.path.relpath(issue['file'], self.report.base_dir), issue['line'] or '-', info))
+
+    def selected_actions(self) -> list:
+        return [action for action in FIX_ACTIONS if self.fix_vars[action].get()]
+
+    def apply_fixes(self):
+        actions = self.selected_actions()
+        if not actions:
+            return
+        files = self.report.fixable_files(actions)
+        if not files:
+            messagebox.showinfo(self.title(), 'Nenhum problema corrigível com as opções escolhidas.', parent=self)
+            return
+        if not messagebox.askyesno(
+            localization.tr('DIALOG_CONFIRM_TITLE'),
+            f'Reescrever {len(files)} arquivo(s) de label aplicando: {", ".join(actions)}?',
+            parent=self
+        ):
+            return
+        self.fix_button.configure(state='disabled')
+        self.summary_var.set('Aplicando correções e validando novamente...')
+        self.on_fix(self.report, actions, self._show_report)
+
+    def _show_report(self, report: Optional[ValidationReport]):
+        if not self.winfo_exists():
+            return
+        if report is not None:
+            self.report = report
+        self._refresh()